@@ -55,6 +55,61 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480  # 8 hours
 
+    # ── Response compression / cache ──────────────────────────
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes — smaller bodies are sent uncompressed
+    CACHE_TTL_SECONDS: int = 300      # lifetime of cached dashboard / list payloads
+    CACHE_MAX_ENTRIES: int = 512      # LRU bound on cached payloads
+    # Stale-while-revalidate: past its TTL a payload is served (X-Cache: STALE)
+    # while rebuilt in the background, for at most this much longer; it is also
+    # the fallback when a rebuild fails or outlasts CACHE_STALE_WAIT_SECONDS.
+    CACHE_STALE_SECONDS: int = 3600
+    CACHE_STALE_WAIT_SECONDS: float = 5.0
+
+    # ── Change notifications (LISTEN/NOTIFY) ──────────────────
+    # While the listener is connected, cached payloads are invalidated by
+    # database triggers (migrations/cache_notify.sql) and can live longer.
+    CACHE_LISTEN_ENABLED: bool = True
+    CACHE_LISTEN_TTL_SECONDS: int = 86400  # TTL used while notifications are flowing
+    CACHE_NOTIFY_CHANNEL: str = "dashboard_changes"
+
+    # ── Live dashboard push (SSE / WebSocket) ─────────────────
+    LIVE_REFRESH_SECONDS: int = 60    # periodic recompute for subscribed filter sets
+    LIVE_HEARTBEAT_SECONDS: int = 15  # keep-alive interval for idle streams
+
+    # ── Startup warm-up ───────────────────────────────────────
+    # Pre-connects the pool and precomputes the national / per-province
+    # dashboards; GET /ready returns 503 until it finishes.
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT_SECONDS: int = 120
+
+    # ── Progressive dashboard stream (GET /dashboard/stream) ──
+    # Sessions one stream may hold at once; the pool (5 + 5 overflow) is
+    # shared with every other request.
+    DASHBOARD_STREAM_CONCURRENCY: int = 3
+
+    # ── Bulk import (Excel / CSV) ─────────────────────────────
+    # Each chunk is COPYed to a staging table and merged in its own short
+    # transaction, so live-table row locks are held for one chunk only.
+    IMPORT_CHUNK_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 200      # row errors reported back (all are counted)
+
+    # ── Approximate counts (?approx=true) ─────────────────────
+    # Tiles are estimated from a TABLESAMPLE of about this many rows per
+    # table, sized from planner statistics; smaller tables are read in full.
+    APPROX_SAMPLE_ROWS: int = 20000
+
+    # ── Columnar snapshot (optional, needs numpy) ─────────────
+    # Section 1/2/3 counts answered from an in-memory copy of the
+    # registration tables once it has been validated against SQL.
+    SNAPSHOT_ENABLED: bool = False
+    SNAPSHOT_REFRESH_SECONDS: int = 60   # incremental refresh from *_updated_at
+    SNAPSHOT_RELOAD_SECONDS: int = 3600  # full reload + validation
+
+    # ── Reference names (in-memory code → name dictionaries) ──
+    # Reloaded on cmm_* change notifications; this bounds their age only
+    # while the change listener is not connected.
+    REFERENCE_TTL_SECONDS: int = 300
+
     @property
     def cors_origins_list(self) -> list[str]:
         """Return CORS origins as a list, splitting on commas."""
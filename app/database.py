@@ -4,6 +4,7 @@ Buddhist Affairs MIS Dashboard - Database Connection
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from typing import AsyncGenerator
 
 from app.config import settings
@@ -59,6 +60,24 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# SQLSTATE of a query naming a table that does not exist (migration not applied)
+UNDEFINED_TABLE = "42P01"
+
+
+def is_undefined_table(exc: DBAPIError) -> bool:
+    """
+    True when `exc` was raised because a table or view does not exist.
+    Optional-table fallbacks re-raise everything else (timeouts, broken
+    connections, bad SQL) rather than hiding it behind the fallback.
+    """
+    error = exc.orig
+    while error is not None:
+        if UNDEFINED_TABLE in (getattr(error, "sqlstate", None), getattr(error, "pgcode", None)):
+            return True
+        error = error.__cause__
+    return False
+
+
 async def check_database_connection() -> bool:
     """Check if database connection is working"""
     try:
@@ -2,12 +2,25 @@
 Buddhist Affairs MIS Dashboard - FastAPI Application
 Main application entry point
 """
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from app.config import settings
 from app.database import check_database_connection
+from app.utils.autocomplete import autocomplete_index
+from app.utils.compression import CompressionMiddleware
+from app.utils.cache_invalidation import cache_listener
+from app.utils.live_hub import live_hub
+from app.utils.references import reference_names
+from app.utils.snapshot import snapshot_engine
+from app.utils.warmup import warm_up, warmup_state
 from app.routers import (
     auth_router,
     require_auth,
@@ -18,6 +31,10 @@ from app.routers import (
     temples_router,
     lookups_router,
     persons_router,
+    trends_router,
+    imports_router,
+    live_router,
+    live_ws_router,
 )
 
 
@@ -25,17 +42,50 @@ from app.routers import (
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
-    print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION} (imports {_IMPORT_MS:.0f}ms)")
     
     # Check database connection
     if await check_database_connection():
         print("✅ Database connection successful")
     else:
         print("❌ Database connection failed - check configuration")
+
+    # Warm pool / caches in the background; /ready reports when done
+    warmup_task = None
+    if settings.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(warm_up())
+    else:
+        warmup_state.ready = True
+
+    # Invalidate cached responses from database change notifications
+    if settings.CACHE_LISTEN_ENABLED:
+        cache_listener.start()
+
+    # In-memory reference names and autocomplete index: reload on change notifications
+    cache_listener.subscribe(reference_names.on_change)
+    cache_listener.subscribe(autocomplete_index.on_change)
+
+    # Live dashboard push: recompute subscribed views on change notifications
+    cache_listener.subscribe(live_hub.on_change)
+    live_hub.start()
+
+    # Optional in-memory snapshot for the section counts
+    if settings.SNAPSHOT_ENABLED:
+        cache_listener.subscribe(snapshot_engine.on_change)
+        snapshot_engine.start()
     
     yield
     
     # Shutdown
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    await live_hub.stop()
+    cache_listener.unsubscribe(live_hub.on_change)
+    await snapshot_engine.stop()
+    cache_listener.unsubscribe(snapshot_engine.on_change)
+    cache_listener.unsubscribe(reference_names.on_change)
+    cache_listener.unsubscribe(autocomplete_index.on_change)
+    await cache_listener.stop()
     print("👋 Shutting down application")
 
 
@@ -98,8 +148,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (gzip, or brotli when installed) above a minimum size.
+# Cached payloads arrive already encoded and pass through untouched.
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 # ── Public routes (no auth required) ──────────────────────────
 app.include_router(auth_router, prefix=settings.API_V1_PREFIX)
+# WebSocket handshakes cannot carry headers — the route checks ?token= itself
+app.include_router(live_ws_router, prefix=settings.API_V1_PREFIX)
 
 # ── Protected routes (JWT required) ───────────────────────────
 _auth_dep = [Depends(require_auth)]
@@ -111,6 +167,9 @@ app.include_router(section3_router,  prefix=settings.API_V1_PREFIX, dependencies
 app.include_router(temples_router,   prefix=settings.API_V1_PREFIX, dependencies=_auth_dep)
 app.include_router(lookups_router,   prefix=settings.API_V1_PREFIX, dependencies=_auth_dep)
 app.include_router(persons_router,   prefix=settings.API_V1_PREFIX, dependencies=_auth_dep)
+app.include_router(trends_router,    prefix=settings.API_V1_PREFIX, dependencies=_auth_dep)
+app.include_router(imports_router,   prefix=settings.API_V1_PREFIX, dependencies=_auth_dep)
+app.include_router(live_router,      prefix=settings.API_V1_PREFIX, dependencies=_auth_dep)
 
 
 @app.get("/", tags=["Root"])
@@ -126,6 +185,15 @@ async def root():
     }
 
 
+@app.get("/ready", tags=["Root"])
+async def readiness():
+    """Readiness probe - 503 until the startup warm-up has finished"""
+    return JSONResponse(
+        status_code=200 if warmup_state.ready else 503,
+        content=warmup_state.as_dict(),
+    )
+
+
 @app.get("/api", tags=["Root"])
 async def api_info():
     """API information endpoint"""
@@ -136,5 +204,9 @@ async def api_info():
             "section2": f"{settings.API_V1_PREFIX}/section2",
             "section3": f"{settings.API_V1_PREFIX}/section3",
             "temples": f"{settings.API_V1_PREFIX}/temples",
+            "live": f"{settings.API_V1_PREFIX}/live/dashboard",
         }
     }
+
+
+_IMPORT_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
@@ -9,6 +9,9 @@ from app.routers.section3 import router as section3_router
 from app.routers.temples import router as temples_router
 from app.routers.lookups import router as lookups_router
 from app.routers.persons import router as persons_router
+from app.routers.trends import router as trends_router
+from app.routers.imports import router as imports_router
+from app.routers.live import router as live_router, ws_router as live_ws_router
 
 __all__ = [
     "auth_router",
@@ -20,5 +23,9 @@ __all__ = [
     "temples_router",
     "lookups_router",
     "persons_router",
+    "trends_router",
+    "imports_router",
+    "live_router",
+    "live_ws_router",
 ]
 
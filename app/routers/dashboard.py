@@ -1,25 +1,33 @@
 """
 Buddhist Affairs MIS Dashboard - Main Dashboard Router
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
 from app.database import get_db
 from app.services.dashboard_service import DashboardService
+from app.services.compare_service import COMPARE_TABLES, MAX_COMPARE_REGIONS, CompareService
+from app.services.facets_service import FacetsService
+from app.services.location import location_scope
+from app.schemas.dashboard import CompareResponse, FacetsResponse
 from app.schemas.filters import DashboardFilters
+from app.utils.cache import cached_response, request_scope, response_cache
+from app.utils.dashboard_stream import stream_dashboard
+from app.utils.snapshot import snapshot_engine
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
 @router.get("/", summary="Get Full Dashboard Data")
 async def get_full_dashboard(
+    request: Request,
     type_filter: str = None,
     nikaya_code: str = None,
     grade: str = None,
     province_code: str = None,
-    district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    district_code: str = None
 ) -> Dict[str, Any]:
     """
     Get complete dashboard data for all sections.
@@ -40,8 +48,100 @@ async def get_full_dashboard(
         district_code=district_code
     )
     
-    service = DashboardService(db)
-    return await service.get_full_dashboard(filters)
+    return await cached_response(
+        request, lambda session: DashboardService(session).get_full_dashboard(filters)
+    )
+
+
+@router.get("/stream", summary="Stream Dashboard Data Progressively (NDJSON)")
+async def stream_full_dashboard(
+    request: Request,
+    type_filter: str = None,
+    nikaya_code: str = None,
+    grade: str = None,
+    province_code: str = None,
+    district_code: str = None,
+) -> StreamingResponse:
+    """
+    Same data as GET /dashboard/ (plus the province and district breakdowns),
+    written as newline-delimited JSON, one line per part as soon as it is ready.
+
+    Lines:
+    - {"type": "start", "parts": [...]}: the parts that will follow
+    - {"type": "part", "part": "section1.summary_a", "data": ...}: one per part, fastest first
+    - {"type": "error", "part": ..., "error": ...}: a part that failed; the others still arrive
+    - {"type": "end"}: the stream is complete
+    """
+    filters = DashboardFilters(
+        type_filter=type_filter,
+        nikaya_code=nikaya_code,
+        grade=grade,
+        province_code=province_code,
+        district_code=district_code
+    )
+    params = [(k, v) for k, v in request.query_params.multi_items() if v]
+
+    return StreamingResponse(
+        stream_dashboard(filters, params, request_scope(request)),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/facets", response_model=FacetsResponse, summary="Get Cross-Filter Facet Counts")
+async def get_facets(
+    request: Request,
+    type_filter: str = None,
+    nikaya_code: str = None,
+    grade: str = None,
+    province_code: str = None,
+    district_code: str = None,
+    parshawa_code: str = None
+) -> FacetsResponse:
+    """
+    Counts for every value of every dimension (type, province, district,
+    nikaya, parshawa, grade) in one query.
+
+    Each dimension is counted under all the current filters except its own,
+    so the response shows what every tile would read after the next click.
+    """
+    filters = DashboardFilters(
+        type_filter=type_filter,
+        nikaya_code=nikaya_code,
+        grade=grade,
+        province_code=province_code,
+        district_code=district_code,
+        parshawa_code=parshawa_code,
+    )
+
+    return await cached_response(
+        request, lambda session: FacetsService(session).get_facets(filters)
+    )
+
+
+@router.get("/compare", response_model=CompareResponse, summary="Compare Provinces or Districts Side by Side")
+async def compare_regions(
+    request: Request,
+    province_code: str = Query(None, description="Comma-separated province codes"),
+    district_code: str = Query(None, description="Comma-separated district codes (compared; within province_code if given)")
+) -> CompareResponse:
+    """
+    Section 1/2/3 metrics (Summary A/B/C, bikku types, parshawa, SSBM by
+    nikaya) for each selected region, e.g. `?district_code=D1,D2,D3`.
+
+    All regions are counted in one grouped query over the selected regions
+    only; they are returned in the order requested.
+    """
+    scope = location_scope(province_code=province_code, district_code=district_code, finest="district")
+    if scope is None:
+        raise HTTPException(status_code=400, detail="Give province_code or district_code (comma-separated)")
+    if len(scope.codes) > MAX_COMPARE_REGIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_REGIONS} regions can be compared")
+
+    return await cached_response(
+        request, lambda session: CompareService(session).compare_regions(scope),
+        tables=COMPARE_TABLES,
+    )
 
 
 @router.get("/stats", summary="Get Quick Dashboard Statistics")
@@ -56,6 +156,16 @@ async def get_dashboard_stats(
     return await service.get_dashboard_stats()
 
 
+@router.get("/snapshot", summary="Columnar Snapshot Status")
+async def snapshot_status() -> Dict[str, Any]:
+    """
+    State of the in-memory snapshot answering Section 1/2/3 counts:
+    whether it is serving, row counts, timings and any disagreement
+    with SQL found by its last validation.
+    """
+    return snapshot_engine.status()
+
+
 @router.post("/refresh-views", summary="Refresh Materialized Views")
 async def refresh_views(
     db: AsyncSession = Depends(get_db)
@@ -70,6 +180,8 @@ async def refresh_views(
     success = await service.refresh_dashboard_views()
     
     if success:
+        response_cache.clear()
+        snapshot_engine.reload()
         return {"status": "success", "message": "Dashboard views refreshed successfully"}
     else:
         raise HTTPException(
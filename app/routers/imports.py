@@ -0,0 +1,49 @@
+"""
+Buddhist Affairs MIS Dashboard - Imports Router
+Bulk registration uploads (CSV / Excel)
+"""
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.routers.auth import require_auth
+from app.services.import_service import ImportService, IMPORT_TARGETS
+from app.schemas.dashboard import ImportResult
+from app.utils.cache import response_cache
+from app.utils.snapshot import snapshot_engine
+
+router = APIRouter(prefix="/imports", tags=["Imports"])
+
+
+@router.post("/{entity}", response_model=ImportResult, summary="Import Registrations from a Spreadsheet")
+async def import_registrations(
+    entity: str,
+    file: UploadFile = File(..., description="CSV, XLSX or XLS with a header row"),
+    dry_run: bool = Query(False, description="Validate only; nothing is written"),
+    chunk_size: int = Query(None, ge=100, le=50000, description="Rows per COPY / merge transaction"),
+    user: str = Depends(require_auth),
+    db: AsyncSession = Depends(get_db),
+) -> ImportResult:
+    """
+    Insert or update registrations of one entity type (bikku, silmatha,
+    vihara, arama) from a spreadsheet, keyed on the registration number.
+
+    Headers are column names, with or without the table prefix
+    (e.g. `br_gihiname` or `gihiname`). Invalid rows are skipped and listed
+    in `errors`; valid rows are loaded chunk by chunk.
+    """
+    if entity not in IMPORT_TARGETS:
+        raise HTTPException(status_code=404, detail=f"Unknown entity: {entity}")
+
+    try:
+        result = await ImportService(db).import_file(
+            file.file, file.filename or "", entity,
+            user=user, chunk_size=chunk_size, dry_run=dry_run,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if result.inserted or result.updated:
+        response_cache.clear()
+        snapshot_engine.reload()
+    return result
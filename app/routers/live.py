@@ -0,0 +1,139 @@
+"""
+Buddhist Affairs MIS Dashboard - Live Dashboard Router
+Push channel replacing per-section polling.
+
+Clients subscribe with their current dashboard filters and receive:
+- snapshot: the full dashboard, once on subscribe
+- update:   only the parts (e.g. section1.summary_a) whose data changed
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.routers.auth import _verify_token
+from app.utils.live_hub import LIVE_FILTER_FIELDS, live_hub
+
+# SSE goes through the normal Bearer-token dependency (mounted in main.py)
+router = APIRouter(prefix="/live", tags=["Live Dashboard"])
+
+# Browsers cannot set headers on a WebSocket handshake, so this router is
+# mounted without the auth dependency and checks ?token= itself
+ws_router = APIRouter(prefix="/live", tags=["Live Dashboard"])
+
+
+def _encode(message: Dict[str, Any]) -> str:
+    return json.dumps(jsonable_encoder(message), ensure_ascii=False, separators=(",", ":"))
+
+
+@router.get("/dashboard", summary="Live Dashboard Updates (Server-Sent Events)")
+async def live_dashboard_sse(
+    request: Request,
+    type_filter: str = None,
+    nikaya_code: str = None,
+    grade: str = None,
+    province_code: str = None,
+    district_code: str = None,
+) -> StreamingResponse:
+    """
+    Stream dashboard changes for the given filters as Server-Sent Events.
+
+    Events:
+    - snapshot: full dashboard data (first event)
+    - update: changed parts only, e.g. {"section2": {"bikku_type": [...]}}
+
+    Idle streams receive a comment line every LIVE_HEARTBEAT_SECONDS.
+    """
+    filters = {
+        "type_filter": type_filter,
+        "nikaya_code": nikaya_code,
+        "grade": grade,
+        "province_code": province_code,
+        "district_code": district_code,
+    }
+    queue = live_hub.subscribe(filters)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=settings.LIVE_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {message['version']}\nevent: {message['type']}\ndata: {_encode(message)}\n\n"
+        finally:
+            live_hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@ws_router.websocket("/ws")
+async def live_dashboard_ws(websocket: WebSocket, token: str = None):
+    """
+    WebSocket variant of /live/dashboard.
+
+    Connect with ?token=<JWT> plus any dashboard filters as query params.
+    Send {"type": "subscribe", "filters": {...}} to switch filters; the
+    server replies with a fresh snapshot followed by updates.
+    """
+    try:
+        _verify_token(token or "")
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    queue = live_hub.subscribe(
+        {name: websocket.query_params.get(name) for name in LIVE_FILTER_FIELDS}
+    )
+
+    async def receive_filters():
+        nonlocal queue
+        while True:
+            message = await websocket.receive_json()
+            if isinstance(message, dict) and message.get("type") == "subscribe":
+                previous, queue = queue, live_hub.subscribe(message.get("filters") or {})
+                live_hub.unsubscribe(previous)
+                # Wake the sender, which may be waiting on the old queue
+                try:
+                    previous.put_nowait(None)
+                except asyncio.QueueFull:
+                    pass
+
+    receiver = asyncio.create_task(receive_filters())
+    try:
+        while not receiver.done():
+            current = queue
+            getter = asyncio.create_task(current.get())
+            done, _ = await asyncio.wait(
+                {getter, receiver},
+                timeout=settings.LIVE_HEARTBEAT_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if getter in done:
+                if getter.result() is not None and current is queue:
+                    await websocket.send_text(_encode(getter.result()))
+            else:
+                getter.cancel()
+                if not done:
+                    await websocket.send_text(_encode({"type": "ping"}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        await asyncio.gather(receiver, return_exceptions=True)
+        live_hub.unsubscribe(queue)
@@ -2,19 +2,21 @@
 Buddhist Affairs MIS Dashboard - Lookups Router
 Provides reference data for dropdowns and filters
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 from typing import List, Dict, Any
 
 from app.database import get_db
+from app.services.lookup_service import LookupService, LOOKUP_TABLES
+from app.utils.autocomplete import KIND_SOURCES, autocomplete_index
+from app.utils.cache import cached_response
 
 router = APIRouter(prefix="/lookups", tags=["Lookups"])
 
 
 @router.get("/provinces", summary="Get All Provinces")
 async def get_provinces(
-    db: AsyncSession = Depends(get_db)
+    request: Request
 ) -> List[Dict[str, Any]]:
     """
     Get list of all provinces.
@@ -23,29 +25,16 @@ async def get_provinces(
     - cp_code: Province code
     - cp_name: Province name (in Sinhala)
     """
-    query = text("""
-        SELECT cp_code, cp_name
-        FROM cmm_province
-        WHERE cp_is_deleted = false OR cp_is_deleted IS NULL
-        ORDER BY cp_name
-    """)
-    
-    result = await db.execute(query)
-    rows = result.fetchall()
-    
-    return [
-        {
-            "code": row.cp_code,
-            "name": row.cp_name
-        }
-        for row in rows
-    ]
+    return await cached_response(
+        request, lambda session: LookupService(session).get_provinces(),
+        tables=LOOKUP_TABLES["provinces"],
+    )
 
 
 @router.get("/districts", summary="Get Districts")
 async def get_districts(
-    province_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    province_code: str = None
 ) -> List[Dict[str, Any]]:
     """
     Get list of districts, optionally filtered by province.
@@ -58,39 +47,15 @@ async def get_districts(
     - dd_dname: District name
     - dd_prcode: Province code
     """
-    if province_code:
-        query = text("""
-            SELECT dd_dcode, dd_dname, dd_prcode
-            FROM cmm_districtdata
-            WHERE (dd_is_deleted = false OR dd_is_deleted IS NULL)
-              AND dd_prcode = :province_code
-            ORDER BY dd_dname
-        """)
-        result = await db.execute(query, {"province_code": province_code})
-    else:
-        query = text("""
-            SELECT dd_dcode, dd_dname, dd_prcode
-            FROM cmm_districtdata
-            WHERE dd_is_deleted = false OR dd_is_deleted IS NULL
-            ORDER BY dd_dname
-        """)
-        result = await db.execute(query)
-    
-    rows = result.fetchall()
-    
-    return [
-        {
-            "code": row.dd_dcode,
-            "name": row.dd_dname,
-            "province_code": row.dd_prcode
-        }
-        for row in rows
-    ]
+    return await cached_response(
+        request, lambda session: LookupService(session).get_districts(province_code),
+        tables=LOOKUP_TABLES["districts"],
+    )
 
 
 @router.get("/nikaya", summary="Get All Nikaya")
 async def get_nikaya(
-    db: AsyncSession = Depends(get_db)
+    request: Request
 ) -> List[Dict[str, Any]]:
     """
     Get list of all Nikaya (Buddhist orders).
@@ -99,29 +64,16 @@ async def get_nikaya(
     - nk_nkn: Nikaya code
     - nk_nname: Nikaya name
     """
-    query = text("""
-        SELECT nk_nkn, nk_nname
-        FROM cmm_nikayadata
-        WHERE nk_is_deleted = false OR nk_is_deleted IS NULL
-        ORDER BY nk_nname
-    """)
-    
-    result = await db.execute(query)
-    rows = result.fetchall()
-    
-    return [
-        {
-            "code": row.nk_nkn,
-            "name": row.nk_nname
-        }
-        for row in rows
-    ]
+    return await cached_response(
+        request, lambda session: LookupService(session).get_nikaya(),
+        tables=LOOKUP_TABLES["nikaya"],
+    )
 
 
 @router.get("/parshawa", summary="Get Parshawa by Nikaya")
 async def get_parshawa(
-    nikaya_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    nikaya_code: str = None
 ) -> List[Dict[str, Any]]:
     """
     Get list of Parshawa (sub-sections), optionally filtered by Nikaya.
@@ -133,30 +85,17 @@ async def get_parshawa(
     - pr_prn: Parshawa code
     - pr_pname: Parshawa name
     """
-    query = text("""
-        SELECT pr_prn, pr_pname
-        FROM cmm_parshawadata
-        WHERE pr_is_deleted = false OR pr_is_deleted IS NULL
-        ORDER BY pr_pname
-    """)
-    
-    result = await db.execute(query)
-    rows = result.fetchall()
-    
-    return [
-        {
-            "code": row.pr_prn,
-            "name": row.pr_pname
-        }
-        for row in rows
-    ]
+    return await cached_response(
+        request, lambda session: LookupService(session).get_parshawa(),
+        tables=LOOKUP_TABLES["parshawa"],
+    )
 
 
 @router.get("/divisional-secretariat", summary="Get Divisional Secretariats")
 async def get_divisional_secretariats(
+    request: Request,
     district_code: str = None,
-    ssbm_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    ssbm_code: str = None
 ) -> List[Dict[str, Any]]:
     """
     Get list of Divisional Secretariats from cmm_dvsec.
@@ -166,52 +105,18 @@ async def get_divisional_secretariats(
     - district_code: Filter by district (optional)
     - ssbm_code: Return only DS offices belonging to this SSBM (optional, takes priority)
     """
-    if ssbm_code:
-        # cmm_sasanarbm.sr_dvcd is a direct FK to cmm_dvsec.dv_dvcode
-        query = text("""
-            SELECT DISTINCT dv.dv_dvcode, dv.dv_dvname, dv.dv_distrcd
-            FROM cmm_dvsec dv
-            WHERE dv.dv_dvcode IN (
-                SELECT sr_dvcd FROM cmm_sasanarbm WHERE sr_ssbmcode = :ssbm_code
-            )
-            ORDER BY dv.dv_dvname
-        """)
-        result = await db.execute(query, {"ssbm_code": ssbm_code})
-    elif district_code:
-        query = text("""
-            SELECT dv_dvcode, dv_dvname, dv_distrcd
-            FROM cmm_dvsec
-            WHERE (dv_is_deleted = false OR dv_is_deleted IS NULL)
-              AND dv_distrcd = :district_code
-            ORDER BY dv_dvname
-        """)
-        result = await db.execute(query, {"district_code": district_code})
-    else:
-        query = text("""
-            SELECT dv_dvcode, dv_dvname, dv_distrcd
-            FROM cmm_dvsec
-            WHERE dv_is_deleted = false OR dv_is_deleted IS NULL
-            ORDER BY dv_dvname
-        """)
-        result = await db.execute(query)
-
-    rows = result.fetchall()
-
-    return [
-        {
-            "code": row.dv_dvcode,
-            "name": row.dv_dvname,
-            "district_code": row.dv_distrcd
-        }
-        for row in rows
-    ]
+    return await cached_response(
+        request,
+        lambda session: LookupService(session).get_divisional_secretariats(district_code, ssbm_code),
+        tables=LOOKUP_TABLES["divisional_secretariats"],
+    )
 
 
 @router.get("/gn", summary="Get GN Divisions")
 async def get_gn_divisions(
+    request: Request,
     ds_code: str = None,
-    ssbm_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    ssbm_code: str = None
 ) -> List[Dict[str, Any]]:
     """
     Get list of Grama Niladhari (GN) Divisions from cmm_gndata.
@@ -221,55 +126,18 @@ async def get_gn_divisions(
     - ds_code: Filter by Divisional Secretariat code (optional)
     - ssbm_code: Return GN divisions whose temples belong to this SSBM (optional)
     """
-    if ds_code:
-        query = text("""
-            SELECT gn_gnc, gn_gnname, gn_dvcode
-            FROM cmm_gndata
-            WHERE (gn_is_deleted = false OR gn_is_deleted IS NULL)
-              AND gn_dvcode = :ds_code
-            ORDER BY gn_gnname
-        """)
-        result = await db.execute(query, {"ds_code": ds_code})
-    elif ssbm_code:
-        # No direct FK from GN to SSBM — join through vihaddata
-        query = text("""
-            SELECT DISTINCT gn.gn_gnc, gn.gn_gnname, gn.gn_dvcode
-            FROM cmm_gndata gn
-            JOIN vihaddata v
-                ON v.vh_gndiv = gn.gn_gnc
-               AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
-            WHERE (gn.gn_is_deleted = false OR gn.gn_is_deleted IS NULL)
-              AND v.vh_ssbmcode = :ssbm_code
-            ORDER BY gn.gn_gnname
-        """)
-        result = await db.execute(query, {"ssbm_code": ssbm_code})
-    else:
-        query = text("""
-            SELECT gn_gnc, gn_gnname, gn_dvcode
-            FROM cmm_gndata
-            WHERE gn_is_deleted = false OR gn_is_deleted IS NULL
-            ORDER BY gn_gnname
-            LIMIT 100
-        """)
-        result = await db.execute(query)
-
-    rows = result.fetchall()
-
-    return [
-        {
-            "code": row.gn_gnc,
-            "name": row.gn_gnname,
-            "ds_code": row.gn_dvcode
-        }
-        for row in rows
-    ]
+    return await cached_response(
+        request,
+        lambda session: LookupService(session).get_gn_divisions(ds_code, ssbm_code),
+        tables=LOOKUP_TABLES["gn_divisions"],
+    )
 
 
 @router.get("/ssbm", summary="Get SSBM Organizations")
 async def get_ssbm_list(
+    request: Request,
     district_code: str = None,
-    ds_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    ds_code: str = None
 ) -> List[Dict[str, Any]]:
     """
     Get list of Sasanarakshana Bala Mandala (SSBM) organizations from cmm_sasanarbm.
@@ -280,40 +148,11 @@ async def get_ssbm_list(
     - district_code: Filter by district via sr_discd (optional)
     - ds_code: Filter by DS via sr_dvsCd — takes priority (optional)
     """
-    if ds_code:
-        query = text("""
-            SELECT sr_ssbmcode, sr_ssbname
-            FROM cmm_sasanarbm
-            WHERE sr_dvcd = :ds_code
-            ORDER BY sr_ssbname
-        """)
-        result = await db.execute(query, {"ds_code": ds_code})
-    elif district_code:
-        query = text("""
-            SELECT sr_ssbmcode, sr_ssbname
-            FROM cmm_sasanarbm
-            WHERE sr_discd = :district_code
-            ORDER BY sr_ssbname
-        """)
-        result = await db.execute(query, {"district_code": district_code})
-    else:
-        query = text("""
-            SELECT sr_ssbmcode, sr_ssbname
-            FROM cmm_sasanarbm
-            ORDER BY sr_ssbname
-            LIMIT 200
-        """)
-        result = await db.execute(query)
-
-    rows = result.fetchall()
-
-    return [
-        {
-            "code": row.sr_ssbmcode,
-            "name": row.sr_ssbname or row.sr_ssbmcode
-        }
-        for row in rows
-    ]
+    return await cached_response(
+        request,
+        lambda session: LookupService(session).get_ssbm_list(district_code, ds_code),
+        tables=LOOKUP_TABLES["ssbm"],
+    )
 
 
 @router.get("/grades", summary="Get Vihara Grades")
@@ -333,18 +172,40 @@ async def get_grades() -> List[Dict[str, str]]:
 
 @router.get("/vihara-types", summary="Get Vihara / Arama Types")
 async def get_vihara_types(
-    db: AsyncSession = Depends(get_db)
+    request: Request
 ) -> List[Dict[str, str]]:
     """
     Get distinct vihara/arama types (vh_typ) from vihaddata.
     Returns the actual type codes stored in the database.
     """
-    result = await db.execute(text("""
-        SELECT DISTINCT vh_typ
-        FROM vihaddata
-        WHERE vh_typ IS NOT NULL AND vh_typ != ''
-          AND (vh_is_deleted = false OR vh_is_deleted IS NULL)
-        ORDER BY vh_typ
-    """))
-    rows = result.fetchall()
-    return [{"code": row[0], "name": row[0]} for row in rows]
+    return await cached_response(
+        request, lambda session: LookupService(session).get_vihara_types(),
+        tables=LOOKUP_TABLES["vihara_types"],
+    )
+
+
+@router.get("/autocomplete", summary="Autocomplete Places and Temples")
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100, description="Typed text (Sinhala, romanized or English)"),
+    types: str = Query(None, description="Comma-separated subset of district,ds,gn,ssbm,temple"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+) -> List[Dict[str, Any]]:
+    """
+    Ranked type-ahead suggestions over district, DS, GN, SSBM and temple
+    names, served from the in-memory index (app/utils/autocomplete.py).
+
+    Returns:
+    - type: district | ds | gn | ssbm | temple
+    - code, name
+    - context: parent area (province, district or DS name)
+    - score: match rank (exact > name prefix > word prefix > similar)
+    """
+    kinds = [kind.strip() for kind in types.split(",") if kind.strip()] if types else None
+    unknown = [kind for kind in kinds or () if kind not in KIND_SOURCES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(unknown)}")
+
+    # Only reads the database before the warm-up has loaded the index
+    await autocomplete_index.ensure(db)
+    return autocomplete_index.search(q, kinds, limit)
@@ -2,29 +2,35 @@
 Buddhist Affairs MIS Dashboard - Persons Router
 Bhikku & Silmatha combined list endpoint
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import List
 
-from app.database import get_db
-from app.services.persons_service import PersonsService
-from app.schemas.dashboard import PersonListItem
+from app.services.persons_service import PersonsService, decode_cursor
+from app.schemas.dashboard import PersonListItem, PersonPage
+from app.utils.cache import cached_response
 
 router = APIRouter(prefix="/persons", tags=["Persons"])
 
+# Tables the persons list reads, for change-notification invalidation
+_PERSONS_TABLES = frozenset({
+    "bhikku_regist", "silmatha_regist", "vihaddata", "cmm_nikayadata",
+    "cmm_parshawadata", "cmm_province", "cmm_districtdata",
+})
+
 
 @router.get("", response_model=List[PersonListItem], summary="Get Persons List (Bhikku + Silmatha)")
 async def get_persons(
+    request: Request,
     person_type:   str = None,   # BHIKKU | SILMATHA | None (all)
     province_code: str = None,
     district_code: str = None,
     nikaya_code:   str = None,
     parshawa_code: str = None,
     search:        str = None,
-    date_from:     str = None,
-    date_to:       str = None,
+    date_from:     date = None,
+    date_to:       date = None,
     limit:         int = 200,
-    db: AsyncSession = Depends(get_db),
 ) -> List[PersonListItem]:
     """
     Get combined list of Bhikku (monks) and Silmatha (nuns).
@@ -36,16 +42,66 @@ async def get_persons(
     - **search**: free-text search on name / reg_no
     - **date_from / date_to**: filter by last updated date (YYYY-MM-DD)
     - **limit**: max rows returned (default 200)
+
+    Use GET /persons/page to browse beyond the first `limit` rows.
     """
-    service = PersonsService(db)
-    return await service.get_persons_list(
-        person_type=person_type,
-        province_code=province_code,
-        district_code=district_code,
-        nikaya_code=nikaya_code,
-        parshawa_code=parshawa_code,
-        search=search,
-        date_from=date_from,
-        date_to=date_to,
-        limit=limit,
+    return await cached_response(
+        request, lambda session: PersonsService(session).get_persons_list(
+            person_type=person_type,
+            province_code=province_code,
+            district_code=district_code,
+            nikaya_code=nikaya_code,
+            parshawa_code=parshawa_code,
+            search=search,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+        ),
+        tables=_PERSONS_TABLES,
+    )
+
+
+@router.get("/page", response_model=PersonPage, summary="Browse Persons (keyset pages)")
+async def get_persons_page(
+    request: Request,
+    person_type:   str = None,
+    province_code: str = None,
+    district_code: str = None,
+    nikaya_code:   str = None,
+    parshawa_code: str = None,
+    search:        str = None,
+    date_from:     date = None,
+    date_to:       date = None,
+    limit:         int = Query(200, ge=1, le=1000),
+    cursor:        str = Query(None, description="next_cursor from the previous page"),
+) -> PersonPage:
+    """
+    Same filters and order as GET /persons, one page at a time.
+
+    Returns:
+    - data: up to `limit` persons ordered by name
+    - next_cursor: opaque token for the following page (null on the last page)
+
+    Every page is read straight from the name indexes, so page 100 costs
+    the same as page 1.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return await cached_response(
+        request, lambda session: PersonsService(session).get_persons_page(
+            person_type=person_type,
+            province_code=province_code,
+            district_code=district_code,
+            nikaya_code=nikaya_code,
+            parshawa_code=parshawa_code,
+            search=search,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+            cursor=after,
+        ),
+        tables=_PERSONS_TABLES,
     )
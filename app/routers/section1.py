@@ -1,12 +1,11 @@
 """
 Buddhist Affairs MIS Dashboard - Section 1 Router (Overall Summary)
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from fastapi import APIRouter, Header, Query, Request
+from typing import List, Optional
 
-from app.database import get_db
 from app.services.section1_service import Section1Service
+from app.services.estimate_service import EstimateService, count_mode, count_mode_headers
 from app.schemas.dashboard import (
     Section1Response,
     SummaryTypeItem,
@@ -14,15 +13,18 @@ from app.schemas.dashboard import (
     SummaryGradeItem,
 )
 from app.schemas.filters import DashboardFilters
+from app.utils.cache import cached_response
 
 router = APIRouter(prefix="/section1", tags=["Section 1 - Overall Summary"])
 
 
 @router.get("/", response_model=Section1Response, summary="Get Section 1 Data")
 async def get_section1(
+    request: Request,
     province_code: str = None,
     district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    approx: bool = Query(False, description="Return sampled estimates with margins instead of exact counts"),
+    x_count_mode: Optional[str] = Header(None, description="'approx' to request estimates (same as approx=true)")
 ) -> Section1Response:
     """
     Get all Section 1 data (Summary A, B, C).
@@ -37,15 +39,22 @@ async def get_section1(
         district_code=district_code
     )
     
-    service = Section1Service(db)
-    return await service.get_overall_summary(filters)
+    mode = count_mode(approx, x_count_mode)
+    service = EstimateService if mode == "approx" else Section1Service
+    return await cached_response(
+        request, lambda session: service(session).get_overall_summary(filters),
+        variant=mode if mode == "approx" else None,
+        headers=count_mode_headers(mode),
+    )
 
 
 @router.get("/types", response_model=List[SummaryTypeItem], summary="Get Type Summary")
 async def get_type_summary(
+    request: Request,
     province_code: str = None,
     district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    approx: bool = Query(False, description="Return sampled estimates with margins instead of exact counts"),
+    x_count_mode: Optional[str] = Header(None, description="'approx' to request estimates (same as approx=true)")
 ) -> List[SummaryTypeItem]:
     """
     Get Summary A - Type breakdown (Bikku, Silmatha, etc.)
@@ -65,15 +74,22 @@ async def get_type_summary(
         district_code=district_code
     )
     
-    service = Section1Service(db)
-    return await service.get_type_summary(filters)
+    mode = count_mode(approx, x_count_mode)
+    service = EstimateService if mode == "approx" else Section1Service
+    return await cached_response(
+        request, lambda session: service(session).get_type_summary(filters),
+        variant=mode if mode == "approx" else None,
+        headers=count_mode_headers(mode),
+    )
 
 
 @router.get("/nikaya", response_model=List[SummaryNikayaItem], summary="Get Nikaya Summary")
 async def get_nikaya_summary(
+    request: Request,
     province_code: str = None,
     district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    approx: bool = Query(False, description="Return sampled estimates with margins instead of exact counts"),
+    x_count_mode: Optional[str] = Header(None, description="'approx' to request estimates (same as approx=true)")
 ) -> List[SummaryNikayaItem]:
     """
     Get Summary B - Nikaya breakdown.
@@ -89,15 +105,22 @@ async def get_nikaya_summary(
         district_code=district_code
     )
     
-    service = Section1Service(db)
-    return await service.get_nikaya_summary(filters)
+    mode = count_mode(approx, x_count_mode)
+    service = EstimateService if mode == "approx" else Section1Service
+    return await cached_response(
+        request, lambda session: service(session).get_nikaya_summary(filters),
+        variant=mode if mode == "approx" else None,
+        headers=count_mode_headers(mode),
+    )
 
 
 @router.get("/grades", response_model=List[SummaryGradeItem], summary="Get Grade Summary")
 async def get_grade_summary(
+    request: Request,
     province_code: str = None,
     district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    approx: bool = Query(False, description="Return sampled estimates with margins instead of exact counts"),
+    x_count_mode: Optional[str] = Header(None, description="'approx' to request estimates (same as approx=true)")
 ) -> List[SummaryGradeItem]:
     """
     Get Summary C - Vihara Grading breakdown.
@@ -113,5 +136,10 @@ async def get_grade_summary(
         district_code=district_code
     )
     
-    service = Section1Service(db)
-    return await service.get_grade_summary(filters)
+    mode = count_mode(approx, x_count_mode)
+    service = EstimateService if mode == "approx" else Section1Service
+    return await cached_response(
+        request, lambda session: service(session).get_grade_summary(filters),
+        variant=mode if mode == "approx" else None,
+        headers=count_mode_headers(mode),
+    )
@@ -1,12 +1,11 @@
 """
 Buddhist Affairs MIS Dashboard - Section 2 Router (Detail Reports)
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from fastapi import APIRouter, Header, Query, Request
+from typing import List, Optional
 
-from app.database import get_db
 from app.services.section2_service import Section2Service
+from app.services.estimate_service import EstimateService, count_mode, count_mode_headers
 from app.schemas.dashboard import (
     Section2Response,
     BikkuTypeItem,
@@ -16,18 +15,21 @@ from app.schemas.dashboard import (
     GeographicResponse,
 )
 from app.schemas.filters import DashboardFilters
+from app.utils.cache import cached_response
 
 router = APIRouter(prefix="/section2", tags=["Section 2 - Detail Reports"])
 
 
 @router.get("/", response_model=Section2Response, summary="Get Section 2 Data")
 async def get_section2(
+    request: Request,
     type_filter: str = None,
     nikaya_code: str = None,
     grade: str = None,
     province_code: str = None,
     district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    approx: bool = Query(False, description="Return sampled estimates with margins instead of exact counts"),
+    x_count_mode: Optional[str] = Header(None, description="'approx' to request estimates (same as approx=true)")
 ) -> Section2Response:
     """
     Get all Section 2 detail reports.
@@ -46,16 +48,23 @@ async def get_section2(
         district_code=district_code
     )
     
-    service = Section2Service(db)
-    return await service.get_detail_reports(filters)
+    mode = count_mode(approx, x_count_mode)
+    service = EstimateService if mode == "approx" else Section2Service
+    return await cached_response(
+        request, lambda session: service(session).get_detail_reports(filters),
+        variant=mode if mode == "approx" else None,
+        headers=count_mode_headers(mode),
+    )
 
 
 @router.get("/bikku-types", response_model=List[BikkuTypeItem], summary="Get Bikku Type Breakdown")
 async def get_bikku_types(
+    request: Request,
     nikaya_code: str = None,
     province_code: str = None,
     district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    approx: bool = Query(False, description="Return sampled estimates with margins instead of exact counts"),
+    x_count_mode: Optional[str] = Header(None, description="'approx' to request estimates (same as approx=true)")
 ) -> List[BikkuTypeItem]:
     """
     Get Bikku Type breakdown.
@@ -71,15 +80,20 @@ async def get_bikku_types(
         district_code=district_code
     )
     
-    service = Section2Service(db)
-    return await service.get_bikku_type_breakdown(filters)
+    mode = count_mode(approx, x_count_mode)
+    service = EstimateService if mode == "approx" else Section2Service
+    return await cached_response(
+        request, lambda session: service(session).get_bikku_type_breakdown(filters),
+        variant=mode if mode == "approx" else None,
+        headers=count_mode_headers(mode),
+    )
 
 
 @router.get("/dahampasal", response_model=List[DahampasalItem], summary="Get Dahampasal Breakdown")
 async def get_dahampasal(
+    request: Request,
     province_code: str = None,
-    district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    district_code: str = None
 ) -> List[DahampasalItem]:
     """
     Get Dahampasal (Sunday School) location breakdown.
@@ -95,15 +109,16 @@ async def get_dahampasal(
         district_code=district_code
     )
     
-    service = Section2Service(db)
-    return await service.get_dahampasal_breakdown(filters)
+    return await cached_response(
+        request, lambda session: Section2Service(session).get_dahampasal_breakdown(filters)
+    )
 
 
 @router.get("/teachers", response_model=List[TeacherItem], summary="Get Teachers Breakdown")
 async def get_teachers(
+    request: Request,
     province_code: str = None,
-    district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    district_code: str = None
 ) -> List[TeacherItem]:
     """
     Get Dahampasal Teachers breakdown.
@@ -121,15 +136,16 @@ async def get_teachers(
         district_code=district_code
     )
     
-    service = Section2Service(db)
-    return await service.get_teachers_breakdown(filters)
+    return await cached_response(
+        request, lambda session: Section2Service(session).get_teachers_breakdown(filters)
+    )
 
 
 @router.get("/students", response_model=List[StudentItem], summary="Get Students Breakdown")
 async def get_students(
+    request: Request,
     province_code: str = None,
-    district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    district_code: str = None
 ) -> List[StudentItem]:
     """
     Get Dahampasal Students breakdown.
@@ -145,16 +161,19 @@ async def get_students(
         district_code=district_code
     )
     
-    service = Section2Service(db)
-    return await service.get_students_breakdown(filters)
+    return await cached_response(
+        request, lambda session: Section2Service(session).get_students_breakdown(filters)
+    )
 
 
 @router.get("/provinces", response_model=GeographicResponse, summary="Get Province Data")
 async def get_province_data(
+    request: Request,
     type_filter: str = None,
     nikaya_code: str = None,
     grade: str = None,
-    db: AsyncSession = Depends(get_db)
+    approx: bool = Query(False, description="Return sampled estimates with margins instead of exact counts"),
+    x_count_mode: Optional[str] = Header(None, description="'approx' to request estimates (same as approx=true)")
 ) -> GeographicResponse:
     """
     Get Province-wise breakdown of all metrics.
@@ -175,17 +194,24 @@ async def get_province_data(
         grade=grade
     )
     
-    service = Section2Service(db)
-    return await service.get_province_data(filters)
+    mode = count_mode(approx, x_count_mode)
+    service = EstimateService if mode == "approx" else Section2Service
+    return await cached_response(
+        request, lambda session: service(session).get_province_data(filters),
+        variant=mode if mode == "approx" else None,
+        headers=count_mode_headers(mode),
+    )
 
 
 @router.get("/districts", response_model=GeographicResponse, summary="Get District Data")
 async def get_district_data(
+    request: Request,
     province_code: str = None,
     type_filter: str = None,
     nikaya_code: str = None,
     grade: str = None,
-    db: AsyncSession = Depends(get_db)
+    approx: bool = Query(False, description="Return sampled estimates with margins instead of exact counts"),
+    x_count_mode: Optional[str] = Header(None, description="'approx' to request estimates (same as approx=true)")
 ) -> GeographicResponse:
     """
     Get District-wise breakdown of all metrics.
@@ -210,5 +236,10 @@ async def get_district_data(
         grade=grade
     )
     
-    service = Section2Service(db)
-    return await service.get_district_data(filters)
+    mode = count_mode(approx, x_count_mode)
+    service = EstimateService if mode == "approx" else Section2Service
+    return await cached_response(
+        request, lambda session: service(session).get_district_data(filters),
+        variant=mode if mode == "approx" else None,
+        headers=count_mode_headers(mode),
+    )
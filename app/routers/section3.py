@@ -1,11 +1,10 @@
 """
 Buddhist Affairs MIS Dashboard - Section 3 Router (Selection Reports)
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from fastapi import APIRouter, Request
 from typing import List
 
-from app.database import get_db
 from app.services.section3_service import Section3Service
 from app.schemas.dashboard import (
     Section3Response,
@@ -16,12 +15,14 @@ from app.schemas.dashboard import (
     TempleListItem,
 )
 from app.schemas.filters import DashboardFilters
+from app.utils.cache import cached_response
 
 router = APIRouter(prefix="/section3", tags=["Section 3 - Selection Reports"])
 
 
 @router.get("/", response_model=Section3Response, summary="Get Section 3 Data")
 async def get_section3(
+    request: Request,
     province_code: str = None,
     district_code: str = None,
     ds_code: str = None,
@@ -29,8 +30,7 @@ async def get_section3(
     nikaya_code: str = None,
     parshawa_code: str = None,
     ssbm_code: str = None,
-    grade: str = None,
-    db: AsyncSession = Depends(get_db)
+    grade: str = None
 ) -> Section3Response:
     """
     Get all Section 3 selection reports.
@@ -46,17 +46,18 @@ async def get_section3(
         grade=grade
     )
 
-    service = Section3Service(db)
-    return await service.get_selection_reports(filters)
+    return await cached_response(
+        request, lambda session: Section3Service(session).get_selection_reports(filters)
+    )
 
 
 @router.get("/parshawa", response_model=List[ParshawaItem], summary="Get Parshawa Breakdown")
 async def get_parshawa(
+    request: Request,
     province_code: str = None,
     district_code: str = None,
     nikaya_code: str = None,
-    parshawa_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    parshawa_code: str = None
 ) -> List[ParshawaItem]:
     """
     Get Parshawa (Buddhist sub-section) breakdown with counts.
@@ -69,16 +70,17 @@ async def get_parshawa(
         parshawa_code=parshawa_code,
     )
     
-    service = Section3Service(db)
-    return await service.get_parshawa_breakdown(filters)
+    return await cached_response(
+        request, lambda session: Section3Service(session).get_parshawa_breakdown(filters)
+    )
 
 
 @router.get("/ssbm-org", summary="Get SSBM Organisations with Counts")
 async def get_ssbm_org_list(
+    request: Request,
     province_code: str = None,
     district_code: str = None,
-    ds_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    ds_code: str = None
 ):
     """
     Get SSBM organisations from cmm_sasanarbm with vihara, bhikku,
@@ -89,15 +91,16 @@ async def get_ssbm_org_list(
         district_code=district_code,
         ds_code=ds_code,
     )
-    service = Section3Service(db)
-    return await service.get_ssbm_org_list(filters)
+    return await cached_response(
+        request, lambda session: Section3Service(session).get_ssbm_org_list(filters)
+    )
 
 
 @router.get("/ssbm", response_model=List[SSBMItem], summary="Get SSBM by Nikaya")
 async def get_ssbm_by_nikaya(
+    request: Request,
     province_code: str = None,
-    district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    district_code: str = None
 ) -> List[SSBMItem]:
     """
     Get Sasana Rakshaka Bala Mandala (SSBM) breakdown by Nikaya.
@@ -109,14 +112,15 @@ async def get_ssbm_by_nikaya(
         district_code=district_code
     )
     
-    service = Section3Service(db)
-    return await service.get_ssbm_by_nikaya(filters)
+    return await cached_response(
+        request, lambda session: Section3Service(session).get_ssbm_by_nikaya(filters)
+    )
 
 
 @router.get("/divisional-secretariat", response_model=List[DivisionalSecItem], summary="Get DS Breakdown")
 async def get_divisional_secretariat(
-    district_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    district_code: str = None
 ) -> List[DivisionalSecItem]:
     """
     Get Divisional Secretariat breakdown.
@@ -128,14 +132,15 @@ async def get_divisional_secretariat(
         district_code=district_code
     )
     
-    service = Section3Service(db)
-    return await service.get_divisional_secretariat(filters)
+    return await cached_response(
+        request, lambda session: Section3Service(session).get_divisional_secretariat(filters)
+    )
 
 
 @router.get("/gn", response_model=List[GNItem], summary="Get GN Division Breakdown")
 async def get_gn_divisions(
-    ds_code: str = None,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    ds_code: str = None
 ) -> List[GNItem]:
     """
     Get Grama Niladhari (GN) Division breakdown.
@@ -150,12 +155,14 @@ async def get_gn_divisions(
     
     filters = DashboardFilters(ds_code=ds_code)
     
-    service = Section3Service(db)
-    return await service.get_gn_divisions(filters)
+    return await cached_response(
+        request, lambda session: Section3Service(session).get_gn_divisions(filters)
+    )
 
 
 @router.get("/temples", response_model=List[TempleListItem], summary="Get Temple List")
 async def get_temple_list(
+    request: Request,
     province_code: str = None,
     district_code: str = None,
     ds_code: str = None,
@@ -165,10 +172,9 @@ async def get_temple_list(
     ssbm_code: str = None,
     grade: str = None,
     search: str = None,
-    date_from: str = None,
-    date_to: str = None,
-    limit: int = 200,
-    db: AsyncSession = Depends(get_db)
+    date_from: date = None,
+    date_to: date = None,
+    limit: int = 200
 ) -> List[TempleListItem]:
     """
     Get list of temples based on filters.
@@ -186,7 +192,8 @@ async def get_temple_list(
         grade=grade
     )
 
-    service = Section3Service(db)
-    return await service.get_temple_list(
-        filters, limit=limit, search=search, date_from=date_from, date_to=date_to
+    return await cached_response(
+        request, lambda session: Section3Service(session).get_temple_list(
+            filters, limit=limit, search=search, date_from=date_from, date_to=date_to
+        )
     )
@@ -1,21 +1,77 @@
 """
 Buddhist Affairs MIS Dashboard - Temples Router (Section 4 - Temple Profile)
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from app.database import get_db
 from app.services.temple_service import TempleService
-from app.schemas.dashboard import TempleProfileResponse
+from app.schemas.dashboard import (
+    TempleProfileResponse,
+    TempleBatchRequest,
+    TempleBatchResponse,
+)
+from app.utils.cache import cached_response
 
 router = APIRouter(prefix="/temples", tags=["Section 4 - Temple Profile"])
 
+MAX_BATCH_TRNS = 200
+
+# Tables each cached endpoint reads, for change-notification invalidation
+_PROFILE_TABLES = frozenset({
+    "vihaddata", "cmm_nikayadata", "cmm_parshawadata",
+    "cmm_province", "cmm_districtdata", "cmm_gndata",
+})
+_STATISTICS_TABLES = frozenset({"bhikku_regist", "sasanarakshana_regist"})
+# Province filters resolve districts through location_closure
+_SEARCH_TABLES = frozenset({"vihaddata", "cmm_province", "cmm_districtdata", "location_closure"})
+
+
+def _split_trns(values: List[str]) -> List[str]:
+    """Accept repeated ?trn= params as well as comma-separated lists."""
+    trns = [t.strip() for value in values for t in value.split(",") if t.strip()]
+    if len(trns) > MAX_BATCH_TRNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_TRNS} TRNs can be requested per batch"
+        )
+    return trns
+
+
+# Batch routes must be registered before /{temple_trn} so "batch" is not taken as a TRN
+@router.get("/batch", response_model=TempleBatchResponse, summary="Get Temple Profiles in Batch")
+async def get_temple_batch(
+    trn: List[str] = Query(..., description="Temple TRNs (repeat the param or comma-separate)"),
+    db: AsyncSession = Depends(get_db)
+) -> TempleBatchResponse:
+    """
+    Get profiles and statistics for many temples in a single database round trip.
+
+    Returns:
+    - temples: {TRN: {profile, statistics}} for every active temple found
+    - not_found: requested TRNs with no active temple
+    """
+    service = TempleService(db)
+    return await service.get_temple_batch(_split_trns(trn))
+
+
+@router.post("/batch", response_model=TempleBatchResponse, summary="Get Temple Profiles in Batch (POST)")
+async def post_temple_batch(
+    body: TempleBatchRequest,
+    db: AsyncSession = Depends(get_db)
+) -> TempleBatchResponse:
+    """
+    Same as GET /temples/batch, for TRN lists too long for a query string.
+    """
+    service = TempleService(db)
+    return await service.get_temple_batch(_split_trns(body.trns))
+
 
 @router.get("/{temple_trn}", response_model=TempleProfileResponse, summary="Get Temple Profile")
 async def get_temple_profile(
-    temple_trn: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    temple_trn: str
 ) -> TempleProfileResponse:
     """
     Get complete temple profile by Temple Registration Number (TRN).
@@ -27,22 +83,23 @@ async def get_temple_profile(
     - Dahampasal Information
     - Grade and Workflow Status
     """
-    service = TempleService(db)
-    profile = await service.get_temple_profile(temple_trn)
-    
-    if not profile:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Temple with TRN '{temple_trn}' not found"
-        )
-    
-    return profile
+    async def build(session: AsyncSession) -> TempleProfileResponse:
+        profile = await TempleService(session).get_temple_profile(temple_trn)
+        if not profile:
+            # Raised inside the build so a missing temple is never cached
+            raise HTTPException(
+                status_code=404,
+                detail=f"Temple with TRN '{temple_trn}' not found"
+            )
+        return profile
+
+    return await cached_response(request, build, tables=_PROFILE_TABLES)
 
 
 @router.get("/{temple_trn}/statistics", summary="Get Temple Statistics")
 async def get_temple_statistics(
-    temple_trn: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    temple_trn: str
 ) -> Dict[str, Any]:
     """
     Get statistics for a specific temple.
@@ -54,20 +111,22 @@ async def get_temple_statistics(
     - Dahampasal students count
     - Has SSBM (whether SSBM exists for this temple)
     """
-    service = TempleService(db)
-    return await service.get_temple_statistics(temple_trn)
+    return await cached_response(
+        request, lambda session: TempleService(session).get_temple_statistics(temple_trn),
+        tables=_STATISTICS_TABLES,
+    )
 
 
 @router.get("/", summary="Search Temples")
 async def search_temples(
+    request: Request,
     search: str = None,
     province_code: str = None,
     district_code: str = None,
     nikaya_code: str = None,
     grade: str = None,
     page: int = 1,
-    page_size: int = 20,
-    db: AsyncSession = Depends(get_db)
+    page_size: int = 20
 ) -> Dict[str, Any]:
     """
     Search and list temples with filters and pagination.
@@ -88,13 +147,15 @@ async def search_temples(
     - page_size: Items per page
     - total_pages: Total number of pages
     """
-    service = TempleService(db)
-    return await service.search_temples(
-        search_term=search,
-        province_code=province_code,
-        district_code=district_code,
-        nikaya_code=nikaya_code,
-        grade=grade,
-        page=page,
-        page_size=min(page_size, 100)  # Cap at 100
+    return await cached_response(
+        request, lambda session: TempleService(session).search_temples(
+            search_term=search,
+            province_code=province_code,
+            district_code=district_code,
+            nikaya_code=nikaya_code,
+            grade=grade,
+            page=page,
+            page_size=min(page_size, 100)  # Cap at 100
+        ),
+        tables=_SEARCH_TABLES,
     )
@@ -0,0 +1,57 @@
+"""
+Buddhist Affairs MIS Dashboard - Trends Router
+Registration trend series for charts
+"""
+from datetime import date
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.services.trends_service import TrendsService, TREND_ENTITIES, TREND_TABLES
+from app.schemas.dashboard import TrendResponse
+from app.utils.cache import cached_response
+
+router = APIRouter(prefix="/trends", tags=["Trends"])
+
+
+@router.get("/registrations", response_model=TrendResponse, summary="Get Registration Trends")
+async def get_registration_trends(
+    request: Request,
+    granularity:   str = Query("month", pattern="^(month|week)$"),
+    entity:        str = Query(None, description="Comma-separated: bikku,silmatha,vihara,arama,ssbm (omit for all)"),
+    province_code: str = None,
+    district_code: str = None,
+    group_by:      str = Query(None, pattern="^(province|district)$"),
+    date_from:     date = None,
+    date_to:       date = None,
+) -> TrendResponse:
+    """
+    New registrations per month or ISO week for each entity type.
+
+    - **granularity**: month (default) or week
+    - **entity**: restrict to some entity types
+    - **province_code / district_code**: geographic filter
+    - **group_by**: split each series by province or district
+    - **date_from / date_to**: inclusive range (YYYY-MM-DD); weekly series
+      default to the last 26 weeks
+
+    Monthly series come from a trigger-maintained rollup and stay cheap over
+    any range; weekly series scan the requested created-date range only.
+    """
+    entities = None
+    if entity:
+        entities = [e.strip().lower() for e in entity.split(",") if e.strip()]
+        unknown = [e for e in entities if e not in TREND_ENTITIES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown entity: {', '.join(unknown)}")
+
+    return await cached_response(
+        request, lambda session: TrendsService(session).get_registration_trends(
+            granularity=granularity,
+            entities=entities,
+            province_code=province_code,
+            district_code=district_code,
+            group_by=group_by,
+            date_from=date_from,
+            date_to=date_to,
+        ),
+        tables=TREND_TABLES,
+    )
@@ -2,7 +2,7 @@
 Buddhist Affairs MIS Dashboard - Dashboard Response Schemas
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import date
 
 
@@ -168,6 +168,8 @@ class TempleListItem(BaseModel):
     chief_of_temple: Optional[str] = Field(None, description="Viharadhipathi name")
     mobile:         Optional[str] = Field(None, description="Mobile number")
     updated_at:     Optional[str] = Field(None, description="Last updated datetime (vh_updated_at)")
+    bhikku_count:   Optional[int] = Field(None, description="Active bhikkus living in the temple (temple_listing only)")
+    ssbm_count:     Optional[int] = Field(None, description="Active SSBM registrations of the temple (temple_listing only)")
     # legacy aliases kept for backward compatibility
     temple_trn:     Optional[str] = Field(None, description="Alias for reg_no")
     temple_name:    Optional[str] = Field(None, description="Alias for vihara_name")
@@ -206,6 +208,12 @@ class PersonListItem(BaseModel):
     updated_at:    Optional[str] = Field(None)
 
 
+class PersonPage(BaseModel):
+    """One keyset page of the persons list"""
+    data: List[PersonListItem] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= for the next page; null on the last page")
+
+
 # ============================================
 # Section 4 - Temple Profile Schemas
 # ============================================
@@ -262,3 +270,110 @@ class TempleProfileResponse(BaseModel):
     dahampasal: Optional[TempleDahampasal] = None
     grade: Optional[str] = None
     workflow_status: Optional[str] = None
+
+
+class TempleBatchRequest(BaseModel):
+    """Body of POST /temples/batch"""
+    trns: List[str] = Field(..., min_length=1, description="Temple registration numbers")
+
+
+class TempleBatchItem(BaseModel):
+    """Profile and statistics for one temple in a batch"""
+    profile: TempleProfileResponse
+    statistics: Dict[str, Any] = Field(default_factory=dict)
+
+
+class TempleBatchResponse(BaseModel):
+    """Batch temple profiles keyed by TRN"""
+    temples: Dict[str, TempleBatchItem] = Field(default_factory=dict)
+    not_found: List[str] = Field(default_factory=list, description="Requested TRNs with no active temple")
+
+
+# ============================================
+# Registration Trends Schemas
+# ============================================
+
+class TrendPoint(BaseModel):
+    """Registrations of one entity type in one period (and region)"""
+    period: date = Field(..., description="First day of the month / ISO week")
+    entity: str = Field(..., description="bikku, silmatha, vihara, arama or ssbm")
+    region_code: Optional[str] = Field(None, description="Province or district code when grouped by region")
+    count: int = Field(0, description="New registrations in the period")
+
+
+class TrendResponse(BaseModel):
+    """GET /trends/registrations"""
+    granularity: str = Field(..., description="month or week")
+    group_by: Optional[str] = Field(None, description="province, district or null")
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    series: List[TrendPoint] = Field(default_factory=list)
+
+
+# ============================================
+# Facet Schemas
+# ============================================
+
+class FacetValue(BaseModel):
+    """One value of a facet and how many registrations it would match"""
+    code: str
+    name: str
+    count: int = 0
+
+
+class FacetsResponse(BaseModel):
+    """GET /dashboard/facets"""
+    filters: Dict[str, str] = Field(default_factory=dict, description="Filters applied")
+    total: int = Field(0, description="Registrations matching every filter")
+    facets: Dict[str, List[FacetValue]] = Field(
+        default_factory=dict,
+        description="Per dimension, counts with every filter except that dimension's own",
+    )
+
+
+# ============================================
+# Region Comparison Schemas
+# ============================================
+
+class CompareRegion(BaseModel):
+    """Dashboard metrics of one compared province or district"""
+    region_code: str = Field(..., description="Province or district code")
+    region_name: Optional[str] = Field(None, description="Province or district name")
+    section1: Section1Response = Field(default_factory=Section1Response, description="Summary A, B and C")
+    bikku_type: List[BikkuTypeItem] = Field(default_factory=list, description="Samanera / Upasampada / Upavidi")
+    parshawa: List[ParshawaItem] = Field(default_factory=list, description="Parshawa breakdown")
+    ssbm_by_nikaya: List[SSBMItem] = Field(default_factory=list, description="SSBM by Nikaya")
+
+
+class CompareResponse(BaseModel):
+    """GET /dashboard/compare"""
+    level: str = Field(..., description="province or district")
+    regions: List[CompareRegion] = Field(default_factory=list, description="One entry per requested code, in request order")
+
+
+# ============================================
+# Bulk Import Schemas
+# ============================================
+
+class ImportRowError(BaseModel):
+    """A spreadsheet row (or chunk) that was not loaded"""
+    row: Optional[int] = Field(None, description="Spreadsheet row number (header = 1)")
+    column: Optional[str] = Field(None)
+    message: str
+
+
+class ImportResult(BaseModel):
+    """POST /imports/{entity}"""
+    entity: str
+    table: str
+    rows_read: int = 0
+    rows_valid: int = 0
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    chunks: int = 0
+    dry_run: bool = False
+    views_refreshed: bool = False
+    elapsed_ms: float = 0
+    ignored_columns: List[str] = Field(default_factory=list, description="Headers that match no column")
+    errors: List[ImportRowError] = Field(default_factory=list)
@@ -1,60 +1,91 @@
 """
 Buddhist Affairs MIS Dashboard - Filter Schemas
 """
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, List, Optional
+
+# Filters that take several values ("WP,SP" or a list), matched with = ANY(:param)
+MULTI_VALUE_FILTERS = (
+    "type_filter",
+    "nikaya_code",
+    "grade",
+    "province_code",
+    "district_code",
+    "ds_code",
+    "gn_code",
+    "parshawa_code",
+    "ssbm_code",
+)
+
+
+def split_codes(value: Any) -> Optional[List[str]]:
+    """'WP,SP' / ['WP', 'SP'] / 'WP' → ['WP', 'SP'] (None when nothing is left)."""
+    if value is None:
+        return None
+    items = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+    codes = []
+    for item in items:
+        for code in str(item).split(","):
+            code = code.strip()
+            if code and code not in codes:
+                codes.append(code)
+    return codes or None
 
 
 class DashboardFilters(BaseModel):
-    """Filter parameters for dashboard queries"""
+    """
+    Filter parameters for dashboard queries.
+    Every code filter accepts several values, comma-separated or as a list;
+    a row matches if it has any of them.
+    """
     
     # Type filter (from Summary A)
-    type_filter: Optional[str] = Field(
+    type_filter: Optional[List[str]] = Field(
         None, 
         description="Type filter: bikku, silmatha, dahampasal_teachers, dahampasal_students, vihara, arama, dahampasal, ssbm"
     )
     
     # Nikaya filter (from Summary B)
-    nikaya_code: Optional[str] = Field(
+    nikaya_code: Optional[List[str]] = Field(
         None, 
         description="Nikaya code filter"
     )
     
     # Grade filter (from Summary C)
-    grade: Optional[str] = Field(
+    grade: Optional[List[str]] = Field(
         None, 
         description="Vihara grade filter: A, B, C, D"
     )
     
     # Geographic filters
-    province_code: Optional[str] = Field(
+    province_code: Optional[List[str]] = Field(
         None, 
         description="Province code filter"
     )
     
-    district_code: Optional[str] = Field(
+    district_code: Optional[List[str]] = Field(
         None, 
         description="District code filter"
     )
     
-    ds_code: Optional[str] = Field(
+    ds_code: Optional[List[str]] = Field(
         None, 
         description="Divisional Secretariat code filter"
     )
     
-    gn_code: Optional[str] = Field(
+    gn_code: Optional[List[str]] = Field(
         None, 
         description="Grama Niladhari division code filter"
     )
     
     # Parshawa filter
-    parshawa_code: Optional[str] = Field(
+    parshawa_code: Optional[List[str]] = Field(
         None, 
         description="Parshawa code filter"
     )
 
     # SSBM filter
-    ssbm_code: Optional[str] = Field(
+    ssbm_code: Optional[List[str]] = Field(
         None,
         description="Sasanarakshana Bala Mandala code filter"
     )
@@ -68,6 +99,18 @@ class DashboardFilters(BaseModel):
     # Pagination
     page: int = Field(1, ge=1, description="Page number")
     page_size: int = Field(50, ge=1, le=500, description="Items per page")
+
+    @field_validator(*MULTI_VALUE_FILTERS, mode="before")
+    @classmethod
+    def _split_codes(cls, value: Any) -> Optional[List[str]]:
+        return split_codes(value)
+
+    def echo(self) -> dict:
+        """The code filters as comma-separated strings, as they were requested."""
+        return {
+            name: ",".join(getattr(self, name)) if getattr(self, name) else None
+            for name in MULTI_VALUE_FILTERS
+        }
     
     class Config:
         use_enum_values = True
@@ -1,16 +1,28 @@
 """
 Buddhist Affairs MIS Dashboard - Services Package
 """
+from app.services.counters_service import CountersService
 from app.services.dashboard_service import DashboardService
+from app.services.estimate_service import EstimateService
+from app.services.facets_service import FacetsService
+from app.services.import_service import ImportService
+from app.services.lookup_service import LookupService
 from app.services.section1_service import Section1Service
 from app.services.section2_service import Section2Service
 from app.services.section3_service import Section3Service
 from app.services.temple_service import TempleService
+from app.services.trends_service import TrendsService
 
 __all__ = [
+    "CountersService",
     "DashboardService",
+    "EstimateService",
+    "FacetsService",
+    "ImportService",
+    "LookupService",
     "Section1Service",
     "Section2Service",
     "Section3Service",
     "TempleService",
+    "TrendsService",
 ]
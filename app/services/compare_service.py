@@ -0,0 +1,234 @@
+"""
+Buddhist Affairs MIS Dashboard - Region Comparison Service
+Section 1/2/3 metrics for several provinces or districts side by side, for
+GET /dashboard/compare.
+
+The registrations of the selected regions are read once into a single row
+set (one row per vihara, bikku, silmatha, arama or SSBM registration, with
+its region key and dimensions); the location filter is pushed into every
+branch, so only the selected regions are scanned.  One GROUPING SETS
+aggregate then counts every metric for every region together, instead of
+running the dashboard once per region.
+
+Metrics that only list rows (DS, GN, temples) and the dahampasal
+placeholders are not compared.
+"""
+from collections import defaultdict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from typing import Any, Dict, Optional
+
+from app.database import is_undefined_table
+from app.schemas.dashboard import (
+    CompareRegion,
+    CompareResponse,
+    ParshawaItem,
+    Section1Response,
+    SSBMItem,
+    SummaryGradeItem,
+    SummaryNikayaItem,
+)
+from app.services.location import LocationScope, entity_location
+from app.services.section1_service import grade_name, type_items
+from app.services.section2_service import ORDINATION_SOURCES, ORDINATION_STATUS, bikku_type_items
+from app.utils.references import ReferenceNames, reference_names
+
+MAX_COMPARE_REGIONS = 10
+
+# Tables a comparison depends on, for change-notification invalidation
+COMPARE_TABLES = frozenset({
+    "bhikku_regist", "bhikku_high_regist", "silmatha_regist", "vihaddata", "aramadata",
+    "sasanarakshana_regist", "cmm_nikayadata", "cmm_parshawadata", "cmm_province",
+    "cmm_districtdata", "location_closure",
+})
+
+# Dimensions counted per (region, entity); the rollup without one is the entity total
+_DIMENSIONS = ("nikaya", "parshawa", "grade", "status")
+
+
+class CompareService:
+    """Service for side-by-side region comparison"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def compare_regions(self, scope: LocationScope) -> CompareResponse:
+        """
+        Metrics for each of the scope's codes (provinces or districts), in
+        the order given; a province filter given with districts restricts them.
+        """
+        level, codes = scope.level, scope.codes
+        rows = None
+        for source in ORDINATION_SOURCES:
+            try:
+                # Savepoint so a missing table does not abort the transaction
+                async with self.db.begin_nested():
+                    rows = await self._count(scope, source)
+                break
+            except DBAPIError as exc:
+                if not is_undefined_table(exc):
+                    raise
+                continue
+        if rows is None:
+            rows = await self._count(scope, None)
+
+        # region → dimension → (entity, value) → count
+        counts: Dict[str, Dict[str, Dict[tuple, int]]] = defaultdict(lambda: defaultdict(dict))
+        for row in rows:
+            counts[row.region][row.dimension][(row.entity, row.value)] = int(row.n)
+
+        names = await reference_names.get(self.db)
+        dictionary = "provinces" if level == "province" else "districts"
+        return CompareResponse(
+            level=level,
+            regions=[
+                self._region(code, names.name(dictionary, code), counts.get(code, {}), names)
+                for code in codes
+            ],
+        )
+
+    async def _count(self, scope: LocationScope, ordination: Optional[str]) -> list:
+        """
+        One grouped pass over the selected regions' registrations.
+        `ordination` is one of ORDINATION_SOURCES (None: every bhikku is samanera).
+        """
+        params: Dict[str, Any] = {}
+
+        def region(district_col: str) -> str:
+            return "lc.province_code" if scope.level == "province" else district_col
+
+        def closure(district_col: str) -> str:
+            if scope.level != "province":
+                return ""
+            return f"LEFT JOIN location_closure lc ON lc.level = 'district' AND lc.code = {district_col}"
+
+        status, ordination_join = "'samanera'", ""
+        if ordination:
+            status = ORDINATION_STATUS
+            ordination_join = f"LEFT JOIN ({ordination}) o ON o.br_regn = b.br_regn"
+
+        result = await self.db.execute(text(f"""
+            WITH r AS (
+                SELECT 'vihara' AS entity, {region('v.vh_district')} AS region,
+                       v.vh_nikaya AS nikaya, NULLIF(v.vh_parshawa, '') AS parshawa,
+                       COALESCE(v.vh_typ, 'N/A') AS grade, NULL::text AS status
+                FROM vihaddata v {closure('v.vh_district')}
+                WHERE (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
+                  AND {entity_location("vihara", "v", scope, params)}
+                UNION ALL
+                SELECT 'bikku', {region('b.br_district')}, b.br_nikaya, b.br_parshawaya, NULL, {status}
+                FROM bhikku_regist b {closure('b.br_district')} {ordination_join}
+                WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL)
+                  AND {entity_location("bikku", "b", scope, params)}
+                UNION ALL
+                SELECT 'silmatha', {region('s.sil_district')}, NULL, NULL, NULL, NULL
+                FROM silmatha_regist s {closure('s.sil_district')}
+                WHERE (s.sil_is_deleted = false OR s.sil_is_deleted IS NULL)
+                  AND {entity_location("silmatha", "s", scope, params)}
+                UNION ALL
+                SELECT 'arama', {region('a.ar_district')}, a.ar_nikaya, a.ar_parshawa, NULL, NULL
+                FROM aramadata a {closure('a.ar_district')}
+                WHERE (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL)
+                  AND {entity_location("arama", "a", scope, params)}
+                UNION ALL
+                -- SSBM registrations are located through their temple and take its nikaya
+                SELECT 'ssbm', {region('v.vh_district')}, v.vh_nikaya, NULL, NULL, NULL
+                FROM sasanarakshana_regist sar
+                JOIN vihaddata v ON v.vh_trn = sar.sar_temple_trn {closure('v.vh_district')}
+                WHERE (sar.sar_is_deleted = false OR sar.sar_is_deleted IS NULL)
+                  AND {entity_location("vihara", "v", scope, params)}
+            )
+            SELECT
+                r.region,
+                r.entity,
+                CASE {" ".join(f"WHEN GROUPING(r.{d}) = 0 THEN '{d}'" for d in _DIMENSIONS)}
+                     ELSE 'total' END AS dimension,
+                CASE {" ".join(f"WHEN GROUPING(r.{d}) = 0 THEN r.{d}::text" for d in _DIMENSIONS)}
+                     END AS value,
+                COUNT(*) AS n
+            FROM r
+            GROUP BY GROUPING SETS (
+                (r.region, r.entity),
+                {", ".join(f"(r.region, r.entity, r.{d})" for d in _DIMENSIONS)}
+            )
+        """), params)
+        return result.fetchall()
+
+    @staticmethod
+    def _region(
+        code: str, name: Optional[str], counts: Dict[str, Dict[tuple, int]], names: ReferenceNames
+    ) -> CompareRegion:
+        """Assemble one region's tiles from its grouped counts"""
+        totals = counts.get("total", {})
+        by_nikaya = counts.get("nikaya", {})
+        by_parshawa = counts.get("parshawa", {})
+
+        def total(entity: str) -> int:
+            return totals.get((entity, None), 0)
+
+        summary_a = type_items({entity: total(entity) for entity in ("bikku", "silmatha", "vihara", "arama", "ssbm")})
+
+        # Summary B / SSBM by nikaya: nikayas known to cmm_nikayadata, as the joins did
+        nikaya_codes = {value for _, value in by_nikaya if value in names.nikaya}
+        summary_b = []
+        ssbm_by_nikaya = []
+        for nikaya in nikaya_codes:
+            bhikku = by_nikaya.get(("bikku", nikaya), 0)
+            vihara = by_nikaya.get(("vihara", nikaya), 0)
+            arama = by_nikaya.get(("arama", nikaya), 0)
+            ssbm = by_nikaya.get(("ssbm", nikaya), 0)
+            nikaya_name = names.name("nikaya", nikaya)
+            if bhikku + vihara + arama > 0:
+                summary_b.append(SummaryNikayaItem(
+                    nikaya_code=nikaya, nikaya_name=nikaya_name, total=bhikku,
+                    bhikku_count=bhikku, vihara_count=vihara, silmatha_count=0, arama_count=arama,
+                ))
+            if ssbm > 0:
+                ssbm_by_nikaya.append(SSBMItem(
+                    nikaya_code=nikaya, nikaya_name=nikaya_name or nikaya, total=ssbm,
+                    vihara_count=vihara, bhikku_count=bhikku, silmatha_count=0, arama_count=arama,
+                ))
+        summary_b.sort(key=lambda item: (-item.bhikku_count, item.nikaya_code))
+        ssbm_by_nikaya.sort(key=lambda item: (-item.total, item.nikaya_code))
+
+        summary_c = sorted(
+            (
+                SummaryGradeItem(grade=grade, grade_name=grade_name(None if grade == "N/A" else grade), total=n)
+                for (entity, grade), n in counts.get("grade", {}).items()
+                if entity == "vihara"
+            ),
+            key=lambda item: (-item.total, item.grade),
+        )
+
+        parshawa = []
+        for parshawa_code in {value for _, value in by_parshawa if value in names.parshawa}:
+            parshawa_name = names.name("parshawa", parshawa_code)
+            vihara = by_parshawa.get(("vihara", parshawa_code), 0)
+            bhikku = by_parshawa.get(("bikku", parshawa_code), 0)
+            arama = by_parshawa.get(("arama", parshawa_code), 0)
+            if vihara + bhikku + arama > 0:
+                parshawa.append(ParshawaItem(
+                    parshawa_code=parshawa_code, parshawa_name=parshawa_name or parshawa_code,
+                    total=vihara, vihara_count=vihara, bhikku_count=bhikku, silmatha_count=0, arama_count=arama,
+                ))
+        parshawa.sort(key=lambda item: (-item.vihara_count, item.parshawa_code))
+        not_assigned = by_parshawa.get(("vihara", None), 0)
+        if not_assigned > 0:
+            parshawa.append(ParshawaItem(
+                parshawa_code="NOT_ASSIGNED", parshawa_name="No Parshawa", total=not_assigned,
+                vihara_count=not_assigned, bhikku_count=0, silmatha_count=0, arama_count=0,
+            ))
+
+        bikku_type = bikku_type_items({
+            status: n for (entity, status), n in counts.get("status", {}).items() if entity == "bikku"
+        })
+
+        return CompareRegion(
+            region_code=code,
+            region_name=name,
+            section1=Section1Response(summary_a=summary_a, summary_b=summary_b, summary_c=summary_c),
+            bikku_type=bikku_type,
+            parshawa=parshawa,
+            ssbm_by_nikaya=ssbm_by_nikaya,
+        )
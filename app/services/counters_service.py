@@ -0,0 +1,39 @@
+"""
+Buddhist Affairs MIS Dashboard - Headline Counters Service
+Reads the trigger-maintained dashboard_counters row
+(see migrations/dashboard_counters.sql).
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from typing import Dict, Optional
+
+from app.database import is_undefined_table
+
+
+class CountersService:
+    """Service for the O(1) headline counters"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_counters(self) -> Optional[Dict[str, int]]:
+        """
+        Return {bikku, silmatha, vihara, arama, ssbm} from dashboard_counters,
+        or None when the counters migration has not been applied.
+        """
+        try:
+            # Savepoint so a missing table does not abort the caller's transaction
+            async with self.db.begin_nested():
+                result = await self.db.execute(text("""
+                    SELECT bikku, silmatha, vihara, arama, ssbm
+                    FROM dashboard_counters
+                    WHERE id = 1
+                """))
+                row = result.mappings().first()
+        except DBAPIError as exc:
+            if not is_undefined_table(exc):
+                raise
+            return None
+
+        return {key: int(value) for key, value in row.items()} if row else None
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import Dict, Any
 
+from app.services.counters_service import CountersService
 from app.services.section1_service import Section1Service
 from app.services.section2_service import Section2Service
 from app.services.section3_service import Section3Service
@@ -37,25 +38,35 @@ class DashboardService:
             "section2": section2_data,
             "section3": section3_data,
             "filters": {
-                "type_filter": filters.type_filter,
-                "nikaya_code": filters.nikaya_code,
-                "grade": filters.grade,
-                "province_code": filters.province_code,
-                "district_code": filters.district_code,
+                name: value
+                for name, value in filters.echo().items()
+                if name in ("type_filter", "nikaya_code", "grade", "province_code", "district_code")
             }
         }
     
     async def get_dashboard_stats(self) -> Dict[str, int]:
         """
         Get quick dashboard statistics.
-        Uses materialized views for fast performance.
+        Reads the trigger-maintained counters row, then the materialized
+        view, and only falls back to COUNT(*) scans when neither exists.
         """
+        counters = await CountersService(self.db).get_counters()
+        if counters is not None:
+            return {
+                **counters,
+                # Placeholders for tables not yet created
+                "dahampasal_teachers": 0,
+                "dahampasal_students": 0,
+                "dahampasal": 0,
+            }
+
         try:
-            result = await self.db.execute(text("""
-                SELECT type_key, total 
-                FROM mv_dashboard_type_summary
-            """))
-            rows = result.fetchall()
+            async with self.db.begin_nested():
+                result = await self.db.execute(text("""
+                    SELECT type_key, total 
+                    FROM mv_dashboard_type_summary
+                """))
+                rows = result.fetchall()
             return {row[0]: row[1] for row in rows}
         except Exception:
             # Fallback to direct queries if views don't exist
@@ -0,0 +1,344 @@
+"""
+Buddhist Affairs MIS Dashboard - Approximate Count Service
+Estimated Section 1 / 2 tiles for ?approx=true (or X-Count-Mode: approx),
+so the first paint does not wait for the heaviest exact aggregate.
+
+Each table is read through TABLESAMPLE SYSTEM at a rate sized from planner
+statistics (pg_class.reltuples) to about APPROX_SAMPLE_ROWS rows, and the
+sampled counts are scaled up with a 95% margin.  Tables no larger than the
+sample are read in full and reported exactly (margin 0).
+
+Payloads have the shape of the exact endpoints plus a `margins` map on each
+item (count field → ± half-width), so clients can render them at once and
+swap in the exact values from a follow-up request.
+"""
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.config import settings
+from app.database import is_undefined_table
+from app.schemas.dashboard import (
+    BikkuTypeItem,
+    GeographicItem,
+    SummaryGradeItem,
+    SummaryNikayaItem,
+)
+from app.schemas.filters import DashboardFilters
+from app.services.location import closure_condition, entity_location, location_scope
+from app.services.section1_service import grade_name, type_conditions, type_items
+from app.services.section2_service import ORDINATION_SOURCES, ORDINATION_STATUS, Section2Service
+
+COUNT_MODE_HEADER = "X-Count-Mode"
+
+Z_95 = 1.96
+
+
+def count_mode(approx: bool = False, header: Optional[str] = None) -> str:
+    """'approx' when asked for by query flag or X-Count-Mode header, else 'exact'"""
+    if approx or (header or "").strip().lower() in ("approx", "approximate"):
+        return "approx"
+    return "exact"
+
+
+def count_mode_headers(mode: str) -> Dict[str, str]:
+    """Response headers naming the count mode; shared caches must key on the request header too"""
+    return {COUNT_MODE_HEADER: mode, "Vary": f"Accept-Encoding, {COUNT_MODE_HEADER}"}
+
+
+@dataclass(frozen=True)
+class Estimate:
+    """A count scaled up from `hits` matching rows in a `fraction` sample of the table"""
+    hits: int
+    fraction: float  # 1.0 = the whole table was read
+
+    @property
+    def value(self) -> int:
+        return round(self.hits / self.fraction)
+
+    @property
+    def margin(self) -> int:
+        """
+        95% half-width, treating the sample as independent rows.  SYSTEM
+        samples whole pages, so values clustered on disk can vary more.
+        """
+        if self.fraction >= 1:
+            return 0
+        if self.hits == 0:
+            return math.ceil(3 / self.fraction)  # rule of three
+        return math.ceil(Z_95 * math.sqrt(self.hits * (1 - self.fraction)) / self.fraction)
+
+    def __add__(self, other: "Estimate") -> "Estimate":
+        # Only groups of the same sample are added together
+        return Estimate(self.hits + other.hits, self.fraction)
+
+
+def _approx(item: BaseModel, estimates: Dict[str, Estimate]) -> Dict[str, Any]:
+    """Serialized item with its estimated counts and their margins"""
+    data = item.model_dump()
+    data.update({name: est.value for name, est in estimates.items()})
+    data["margins"] = {name: est.margin for name, est in estimates.items()}
+    return data
+
+
+class EstimateService:
+    """Sampled estimates for the Section 1 / 2 count tiles"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._fractions: Dict[str, float] = {}
+
+    async def _fraction(self, table: str) -> float:
+        """Sampling fraction giving about APPROX_SAMPLE_ROWS rows of `table`"""
+        if table not in self._fractions:
+            result = await self.db.execute(
+                text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": table},
+            )
+            rows = result.scalar() or 0
+            # reltuples is -1 (or 0) before the first ANALYZE: read it all
+            self._fractions[table] = 1.0 if rows <= settings.APPROX_SAMPLE_ROWS else settings.APPROX_SAMPLE_ROWS / rows
+        return self._fractions[table]
+
+    async def sample_counts(
+        self,
+        table: str,
+        alias: str = "",
+        where: Optional[List[str]] = None,
+        group: Optional[str] = None,
+        joins: str = "",
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[Any, Estimate]:
+        """Estimated row counts of `table` matching `where`, per value of `group` (or under None)"""
+        fraction = await self._fraction(table)
+        sample = f"TABLESAMPLE SYSTEM ({fraction * 100:.6f}) REPEATABLE (0)" if fraction < 1 else ""
+        where_sql = " AND ".join(where) if where else "TRUE"
+        result = await self.db.execute(text(f"""
+            SELECT {group or 'NULL'} AS grp, COUNT(*) AS hits
+            FROM {table} {alias} {sample}
+            {joins}
+            WHERE {where_sql}
+            GROUP BY 1
+        """), params or {})
+        return {row[0]: Estimate(row[1], fraction) for row in result.fetchall()}
+
+    async def _total(self, table: str, where: str, params: Dict[str, Any]) -> Estimate:
+        counts = await self.sample_counts(table, where=[where], params=params)
+        return counts.get(None) or Estimate(0, await self._fraction(table))
+
+    # ── Section 1 ─────────────────────────────────────────────
+
+    async def get_overall_summary(self, filters: DashboardFilters = None) -> Dict[str, Any]:
+        return {
+            "summary_a": await self.get_type_summary(filters),
+            "summary_b": await self.get_nikaya_summary(filters),
+            "summary_c": await self.get_grade_summary(filters),
+        }
+
+    async def get_type_summary(self, filters: DashboardFilters = None) -> List[Dict[str, Any]]:
+        """Summary A with estimated totals"""
+        params: Dict[str, Any] = {}
+        bikku_where, sil_where, vh_where, ar_where, ssbm_where = type_conditions(filters, params)
+        estimates = {
+            "bikku":    await self._total("bhikku_regist", bikku_where, params),
+            "silmatha": await self._total("silmatha_regist", sil_where, params),
+            "vihara":   await self._total("vihaddata", vh_where, params),
+            "arama":    await self._total("aramadata", ar_where, params),
+            "ssbm":     await self._total("sasanarakshana_regist", ssbm_where, params),
+        }
+        items = type_items({key: est.value for key, est in estimates.items()})
+        return [
+            _approx(item, {"total": estimates[item.type_key]}) if item.type_key in estimates
+            else _approx(item, {})
+            for item in items
+        ]
+
+    async def get_nikaya_summary(self, filters: DashboardFilters = None) -> List[Dict[str, Any]]:
+        """Summary B with estimated bhikku, vihara and arama counts per nikaya"""
+        params: Dict[str, Any] = {}
+        b_where = ["(b.br_is_deleted = false OR b.br_is_deleted IS NULL)"]
+        v_where = ["(v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)"]
+        a_where = ["(a.ar_is_deleted = false OR a.ar_is_deleted IS NULL)"]
+        if filters and filters.nikaya_code:
+            b_where.append("b.br_nikaya = ANY(:nikaya)")
+            v_where.append("v.vh_nikaya = ANY(:nikaya)")
+            a_where.append("a.ar_nikaya = ANY(:nikaya)")
+            params["nikaya"] = filters.nikaya_code
+        scope = location_scope(filters)
+        if scope:
+            b_where.append(entity_location("bikku", "b", scope, params))
+            v_where.append(entity_location("vihara", "v", scope, params))
+            a_where.append(entity_location("arama", "a", scope, params))
+
+        bhikku = await self.sample_counts("bhikku_regist", "b", b_where, "b.br_nikaya", params=params)
+        vihara = await self.sample_counts("vihaddata", "v", v_where, "v.vh_nikaya", params=params)
+        arama = await self.sample_counts("aramadata", "a", a_where, "a.ar_nikaya", params=params)
+        zero = {
+            "bhikku": Estimate(0, await self._fraction("bhikku_regist")),
+            "vihara": Estimate(0, await self._fraction("vihaddata")),
+            "arama":  Estimate(0, await self._fraction("aramadata")),
+        }
+
+        result = await self.db.execute(text("""
+            SELECT nk_nkn, nk_nname FROM cmm_nikayadata
+            WHERE nk_is_deleted = false OR nk_is_deleted IS NULL
+        """))
+        items = []
+        for code, name in result.fetchall():
+            b = bhikku.get(code, zero["bhikku"])
+            v = vihara.get(code, zero["vihara"])
+            a = arama.get(code, zero["arama"])
+            if b.hits + v.hits + a.hits == 0:
+                continue
+            item = SummaryNikayaItem(nikaya_code=code, nikaya_name=name, silmatha_count=0)
+            items.append(_approx(item, {
+                "total": b, "bhikku_count": b, "vihara_count": v, "arama_count": a,
+            }))
+        items.sort(key=lambda item: item["bhikku_count"], reverse=True)
+        return items
+
+    async def get_grade_summary(self, filters: DashboardFilters = None) -> List[Dict[str, Any]]:
+        """Summary C with estimated vihara counts per grade"""
+        params: Dict[str, Any] = {}
+        where = ["(vh_is_deleted = false OR vh_is_deleted IS NULL)"]
+        scope = location_scope(filters)
+        if scope:
+            where.append(entity_location("vihara", "", scope, params))
+        grades = await self.sample_counts("vihaddata", where=where, group="vh_typ", params=params)
+        items = [
+            _approx(SummaryGradeItem(grade=grade or "N/A", grade_name=grade_name(grade)), {"total": est})
+            for grade, est in grades.items()
+        ]
+        items.sort(key=lambda item: item["total"], reverse=True)
+        return items
+
+    # ── Section 2 ─────────────────────────────────────────────
+
+    async def get_detail_reports(self, filters: DashboardFilters = None) -> Dict[str, Any]:
+        # Dahampasal tiles are placeholders without tables behind them
+        section2 = Section2Service(self.db)
+        return {
+            "bikku_type": await self.get_bikku_type_breakdown(filters),
+            "dahampasal": [_approx(item, {}) for item in await section2.get_dahampasal_breakdown(filters)],
+            "dahampasal_teachers": [_approx(item, {}) for item in await section2.get_teachers_breakdown(filters)],
+            "dahampasal_students": [_approx(item, {}) for item in await section2.get_students_breakdown(filters)],
+        }
+
+    async def get_bikku_type_breakdown(self, filters: DashboardFilters = None) -> List[Dict[str, Any]]:
+        """Bikku types with estimated samanera / upasampada counts"""
+        params: Dict[str, Any] = {}
+        where = ["(b.br_is_deleted = false OR b.br_is_deleted IS NULL)"]
+        if filters and filters.nikaya_code:
+            where.append("b.br_nikaya = ANY(:nikaya)")
+            params["nikaya"] = filters.nikaya_code
+        scope = location_scope(filters)
+        if scope:
+            where.append(entity_location("bikku", "b", scope, params))
+
+        counts = None
+        for source in ORDINATION_SOURCES:
+            try:
+                # Savepoint so a missing table does not abort the transaction
+                async with self.db.begin_nested():
+                    counts = await self.sample_counts(
+                        "bhikku_regist", "b", where, group=ORDINATION_STATUS,
+                        joins=f"LEFT JOIN ({source}) o ON o.br_regn = b.br_regn", params=params,
+                    )
+                break
+            except DBAPIError as exc:
+                if not is_undefined_table(exc):
+                    raise
+                continue
+        if counts is None:
+            counts = {"samanera": (await self.sample_counts("bhikku_regist", "b", where, params=params)).get(None)}
+        empty = Estimate(0, await self._fraction("bhikku_regist"))
+        samanera = counts.get("samanera") or empty
+        upasampada = counts.get("upasampada") or empty
+
+        return [
+            _approx(BikkuTypeItem(type_key="samanera",   type_name="සාමණේර"), {"total": samanera}),
+            _approx(BikkuTypeItem(type_key="upasampada", type_name="උපසම්පදා"), {"total": upasampada}),
+            _approx(BikkuTypeItem(type_key="upavidi",    type_name="උපවිදි"), {}),
+        ]
+
+    async def _district_estimates(self) -> Dict[str, Dict[Any, Estimate]]:
+        """Estimated registrations per district for each geographic count field"""
+        return {
+            "vihara_count": await self.sample_counts(
+                "vihaddata", where=["(vh_is_deleted = false OR vh_is_deleted IS NULL)"], group="vh_district"),
+            "bikku_count": await self.sample_counts(
+                "bhikku_regist", where=["(br_is_deleted = false OR br_is_deleted IS NULL)"], group="br_district"),
+            "silmatha_count": await self.sample_counts(
+                "silmatha_regist", where=["(sil_is_deleted = false OR sil_is_deleted IS NULL)"], group="sil_district"),
+            "arama_count": await self.sample_counts(
+                "aramadata", where=["(ar_is_deleted = false OR ar_is_deleted IS NULL)"], group="ar_district"),
+            "ssbm_count": await self.sample_counts(
+                "sasanarakshana_regist", "sar", group="v.vh_district",
+                joins="JOIN vihaddata v ON sar.sar_temple_trn = v.vh_trn"),
+        }
+
+    async def _geographic(
+        self,
+        rows: list,
+        per_district: Dict[str, Dict[Any, Estimate]],
+        districts_of: Dict[str, List[str]],
+    ) -> Dict[str, Any]:
+        tables = {
+            "vihara_count": "vihaddata", "bikku_count": "bhikku_regist", "silmatha_count": "silmatha_regist",
+            "arama_count": "aramadata", "ssbm_count": "sasanarakshana_regist",
+        }
+        zero = {field: Estimate(0, await self._fraction(table)) for field, table in tables.items()}
+        items = []
+        for code, name in rows:
+            estimates = {}
+            for field, counts in per_district.items():
+                total = zero[field]
+                for district in districts_of.get(code, ()):
+                    if district in counts:
+                        total = total + counts[district]
+                estimates[field] = total
+            items.append(_approx(GeographicItem(code=code, name=name or code), estimates))
+        return {"data": items, "total_count": len(items)}
+
+    async def get_province_data(self, filters: DashboardFilters = None) -> Dict[str, Any]:
+        """Province breakdown summed from estimated district counts through location_closure"""
+        per_district = await self._district_estimates()
+        result = await self.db.execute(text("""
+            SELECT lc.province_code, lc.code
+            FROM location_closure lc
+            WHERE lc.level = 'district'
+        """))
+        districts_of: Dict[str, List[str]] = {}
+        for province, district in result.fetchall():
+            districts_of.setdefault(province, []).append(district)
+
+        result = await self.db.execute(text("""
+            SELECT p.cp_code, p.cp_name FROM cmm_province p
+            WHERE p.cp_is_deleted = false OR p.cp_is_deleted IS NULL
+            ORDER BY p.cp_name
+        """))
+        return await self._geographic(result.fetchall(), per_district, districts_of)
+
+    async def get_district_data(self, filters: DashboardFilters = None) -> Dict[str, Any]:
+        """District breakdown from estimated per-district counts"""
+        params: Dict[str, Any] = {}
+        where_clause = ""
+        condition = closure_condition("lc", location_scope(filters, finest="district"), params)
+        if condition:
+            where_clause = f"AND {condition}"
+        per_district = await self._district_estimates()
+        result = await self.db.execute(text(f"""
+            SELECT d.dd_dcode, d.dd_dname
+            FROM cmm_districtdata d
+            JOIN location_closure lc ON lc.level = 'district' AND lc.code = d.dd_dcode
+            WHERE (d.dd_is_deleted = false OR d.dd_is_deleted IS NULL)
+            {where_clause}
+            ORDER BY d.dd_dname
+        """), params)
+        rows = result.fetchall()
+        return await self._geographic(rows, per_district, {code: [code] for code, _ in rows})
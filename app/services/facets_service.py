@@ -0,0 +1,144 @@
+"""
+Buddhist Affairs MIS Dashboard - Facets Service
+Cross-filter counts for GET /dashboard/facets: for every dimension (type,
+province, district, nikaya, parshawa, grade), how many registrations each
+of its values matches under all the *other* current filters — what every
+tile would show after the next click.
+
+The registrations are read once into a single row set (one row per vihara,
+bikku, silmatha, arama or SSBM registration, with its dimensions), and one
+GROUPING SETS aggregate counts every facet over it, each facet with its own
+FILTER clause.  A filter on a dimension a registration does not have (e.g.
+grade on a bikku) excludes that registration.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from typing import Dict, List
+
+from app.schemas.dashboard import FacetValue, FacetsResponse
+from app.schemas.filters import DashboardFilters
+from app.services.section1_service import grade_name, type_items
+
+# facet → (DashboardFilters field, row column)
+FACETS: Dict[str, tuple] = {
+    "type":     ("type_filter",   "entity"),
+    "province": ("province_code", "province"),
+    "district": ("district_code", "district"),
+    "nikaya":   ("nikaya_code",   "nikaya"),
+    "parshawa": ("parshawa_code", "parshawa"),
+    "grade":    ("grade",         "grade"),
+}
+
+TYPE_NAMES = {
+    item.type_key: item.type_name
+    for item in type_items(dict.fromkeys(("bikku", "silmatha", "vihara", "arama", "ssbm"), 0))
+}
+
+# One row per active registration; provinces come from the district via location_closure
+_REGISTRATIONS = """
+    SELECT 'vihara' AS entity, vh_district AS district, vh_nikaya AS nikaya,
+           NULLIF(vh_parshawa, '') AS parshawa, vh_typ AS grade
+    FROM vihaddata
+    WHERE vh_is_deleted = false OR vh_is_deleted IS NULL
+    UNION ALL
+    SELECT 'bikku', br_district, br_nikaya, br_parshawaya, NULL
+    FROM bhikku_regist
+    WHERE br_is_deleted = false OR br_is_deleted IS NULL
+    UNION ALL
+    SELECT 'silmatha', sil_district, NULL, NULL, NULL
+    FROM silmatha_regist
+    WHERE sil_is_deleted = false OR sil_is_deleted IS NULL
+    UNION ALL
+    SELECT 'arama', ar_district, ar_nikaya, ar_parshawa, NULL
+    FROM aramadata
+    WHERE ar_is_deleted = false OR ar_is_deleted IS NULL
+    UNION ALL
+    -- SSBM registrations are located through their temple
+    SELECT 'ssbm', v.vh_district, NULL, NULL, NULL
+    FROM sasanarakshana_regist sar
+    JOIN vihaddata v ON v.vh_trn = sar.sar_temple_trn
+    WHERE sar.sar_is_deleted = false OR sar.sar_is_deleted IS NULL
+"""
+
+
+class FacetsService:
+    """Service for cross-filter facet counts"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_facets(self, filters: DashboardFilters = None) -> FacetsResponse:
+        """Counts per value of every facet, each under all filters but its own."""
+        params = {}
+        predicates = {}
+        for facet, (field, column) in FACETS.items():
+            value = getattr(filters, field, None) if filters else None
+            if value:
+                params[facet] = value
+                predicates[facet] = f"r.{column} = ANY(:{facet})"
+
+        def counted(excluded: str = None) -> str:
+            where = [predicate for facet, predicate in predicates.items() if facet != excluded]
+            return f"COUNT(*) FILTER (WHERE {' AND '.join(where)})" if where else "COUNT(*)"
+
+        def per_facet(expression) -> str:
+            return "\n".join(
+                f"WHEN GROUPING(r.{column}) = 0 THEN {expression(facet, column)}"
+                for facet, (_, column) in FACETS.items()
+            )
+
+        grouping_sets = ", ".join(f"(r.{column})" for _, column in FACETS.values())
+        result = await self.db.execute(text(f"""
+            WITH r AS (
+                SELECT u.*, lc.province_code AS province
+                FROM ({_REGISTRATIONS}) u
+                LEFT JOIN location_closure lc ON lc.level = 'district' AND lc.code = u.district
+            ),
+            f AS (
+                SELECT
+                    CASE {per_facet(lambda facet, column: f"'{facet}'")} ELSE 'total' END AS facet,
+                    CASE {per_facet(lambda facet, column: f"r.{column}::text")} END AS value,
+                    CASE {per_facet(lambda facet, column: counted(facet))} ELSE {counted()} END AS n
+                FROM r
+                GROUP BY GROUPING SETS ({grouping_sets}, ())
+            )
+            SELECT f.facet, f.value, f.n,
+                   COALESCE(p.cp_name, d.dd_dname, nk.nk_nname, pr.pr_pname) AS name
+            FROM f
+            LEFT JOIN cmm_province p
+                ON f.facet = 'province' AND p.cp_code = f.value
+               AND (p.cp_is_deleted = false OR p.cp_is_deleted IS NULL)
+            LEFT JOIN cmm_districtdata d
+                ON f.facet = 'district' AND d.dd_dcode = f.value
+               AND (d.dd_is_deleted = false OR d.dd_is_deleted IS NULL)
+            LEFT JOIN cmm_nikayadata nk
+                ON f.facet = 'nikaya' AND nk.nk_nkn = f.value
+               AND (nk.nk_is_deleted = false OR nk.nk_is_deleted IS NULL)
+            LEFT JOIN cmm_parshawadata pr
+                ON f.facet = 'parshawa' AND pr.pr_prn = f.value
+               AND (pr.pr_is_deleted = false OR pr.pr_is_deleted IS NULL)
+            WHERE f.facet = 'total' OR (f.value IS NOT NULL AND f.n > 0)
+            ORDER BY f.facet, f.n DESC, f.value
+        """), params)
+
+        total = 0
+        facets: Dict[str, List[FacetValue]] = {facet: [] for facet in FACETS}
+        for facet, value, count, name in result.fetchall():
+            if facet == "total":
+                total = count
+            else:
+                facets[facet].append(FacetValue(code=value, name=self._name(facet, value, name), count=count))
+
+        return FacetsResponse(
+            filters={FACETS[facet][0]: ",".join(value) for facet, value in params.items()},
+            total=total,
+            facets=facets,
+        )
+
+    @staticmethod
+    def _name(facet: str, value: str, name: str) -> str:
+        if facet == "type":
+            return TYPE_NAMES.get(value, value)
+        if facet == "grade":
+            return grade_name(value)
+        return name or value
@@ -0,0 +1,353 @@
+"""
+Buddhist Affairs MIS Dashboard - Bulk Import Service
+Loads registration spreadsheets (CSV / XLSX / XLS) into the live tables.
+
+Pipeline, per chunk of IMPORT_CHUNK_SIZE rows:
+1. stream   — rows are read from the file a chunk at a time
+2. validate — each cell is converted / checked against the ORM column
+              (type, length, NOT NULL); bad rows are rejected and reported
+3. stage    — valid rows are COPYed (binary protocol) into a temp table
+4. merge    — one INSERT ... ON CONFLICT (natural key) DO UPDATE moves the
+              chunk into the live table and commits
+
+Row locks on the live table are therefore held for one set-based statement
+per chunk, and statement-level triggers (counters, rollups, notifications)
+fire once per chunk.  The dashboard views are refreshed once per file.
+"""
+import asyncio
+import time
+from datetime import date, datetime, timezone
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, String, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Aramadata, BhikkuRegist, SilmathaRegist, Vihaddata
+from app.schemas.dashboard import ImportResult, ImportRowError
+from app.services.dashboard_service import DashboardService
+from app.utils.spreadsheet import is_blank_row, iter_spreadsheet_chunks
+
+# entity → (model, natural key column)
+IMPORT_TARGETS: Dict[str, Tuple[type, str]] = {
+    "bikku":    (BhikkuRegist, "br_regn"),
+    "silmatha": (SilmathaRegist, "sil_regn"),
+    "vihara":   (Vihaddata, "vh_trn"),
+    "arama":    (Aramadata, "ar_trn"),
+}
+
+_STAGE_TABLE = "_import_stage"
+
+_TRUE = {"1", "true", "t", "yes", "y"}
+_FALSE = {"0", "false", "f", "no", "n"}
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%Y")
+
+
+# ── Cell converters ───────────────────────────────────────────────────────
+
+def _blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _string(length: Optional[int]) -> Callable[[Any], Optional[str]]:
+    def convert(value: Any) -> Optional[str]:
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)  # Excel stores numbers (phone, reg no) as floats
+        elif isinstance(value, datetime):
+            value = value.date() if value.time() == datetime.min.time() else value
+        result = str(value).strip()
+        if length and len(result) > length:
+            raise ValueError(f"longer than {length} characters")
+        return result
+    return convert
+
+
+def _integer(value: Any) -> int:
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError("not a whole number")
+    return int(number)
+
+
+def _boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    token = str(value).strip().lower()
+    if token.endswith(".0"):
+        token = token[:-2]
+    if token in _TRUE:
+        return True
+    if token in _FALSE:
+        return False
+    raise ValueError("expected yes/no")
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    token = str(value).strip()
+    try:
+        return datetime.fromisoformat(token)
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(token, fmt)
+        except ValueError:
+            continue
+    raise ValueError("unrecognised date")
+
+
+def _date(value: Any) -> date:
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    return _parse_datetime(value).date()
+
+
+def _datetime(aware: bool) -> Callable[[Any], datetime]:
+    def convert(value: Any) -> datetime:
+        result = _parse_datetime(value)
+        if aware and result.tzinfo is None:
+            result = result.replace(tzinfo=timezone.utc)
+        elif not aware and result.tzinfo is not None:
+            result = result.astimezone(timezone.utc).replace(tzinfo=None)
+        return result
+    return convert
+
+
+def _converter(column) -> Callable[[Any], Any]:
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return _boolean
+    if isinstance(column_type, Integer):
+        return _integer
+    if isinstance(column_type, DateTime):
+        return _datetime(bool(column_type.timezone))
+    if isinstance(column_type, Date):
+        return _date
+    if isinstance(column_type, String):
+        return _string(column_type.length)
+    return lambda value: value
+
+
+def _normalize_header(header: str) -> str:
+    return header.strip().lower().replace(" ", "_").replace("-", "_")
+
+
+class RowMapper:
+    """
+    Maps spreadsheet headers onto a model's columns and converts rows into
+    COPY-ready tuples.  Headers may be full column names ("br_regn") or
+    omit the table prefix ("regn").
+    """
+
+    def __init__(self, model: type, key: str, headers: Sequence[str], user: Optional[str] = None):
+        self.table: str = model.__tablename__
+        self.key = key
+        prefix = key.split("_", 1)[0] + "_"
+        columns = {c.name: c for c in model.__table__.columns}
+
+        self.positions: Dict[str, int] = {}
+        self.ignored: List[str] = []
+        for index, header in enumerate(headers):
+            name = _normalize_header(str(header))
+            if not name:
+                continue
+            column_name = name if name in columns else prefix + name
+            if column_name in columns and not columns[column_name].primary_key:
+                self.positions.setdefault(column_name, index)
+            else:
+                self.ignored.append(str(header))
+
+        if key not in self.positions:
+            raise ValueError(f"Missing required column: {key}")
+
+        # Columns filled on the server side of the import: audit fields and
+        # model defaults for columns the file does not provide
+        self.fixed: Dict[str, Callable[[], Any]] = {}
+        for audit in ("created_by", "updated_by"):
+            if user and prefix + audit in columns and prefix + audit not in self.positions:
+                self.fixed[prefix + audit] = lambda: user
+        for name, column in columns.items():
+            if name in self.positions or name in self.fixed or column.primary_key:
+                continue
+            if column.default is not None and column.default.is_scalar:
+                self.fixed[name] = (lambda v: lambda: v)(column.default.arg)
+            elif column.default is not None and column.default.is_callable:
+                self.fixed[name] = (lambda fn: lambda: fn(None))(column.default.arg)
+            elif not column.nullable and column.server_default is None:
+                raise ValueError(f"Missing required column: {name}")
+
+        self.columns: List[str] = list(self.positions) + list(self.fixed)
+        self._convert = [(name, self.positions[name], _converter(columns[name]), columns[name].nullable)
+                         for name in self.positions]
+
+        # Re-imported rows update what the file provides plus the audit trail
+        touched = [prefix + c for c in ("updated_at", "updated_by", "version") if prefix + c in self.fixed]
+        self.update_columns: List[str] = [c for c in self.positions if c != key] + touched
+        self.version_counter: Optional[str] = (
+            prefix + "version_number" if prefix + "version_number" in columns else None
+        )
+
+    def convert(self, rows: Sequence[Sequence[Any]], first_row: int) -> Tuple[List[tuple], List[ImportRowError], int]:
+        """Returns (records, errors, rejected count) for one chunk."""
+        fixed_values = [make() for make in self.fixed.values()]
+        records: List[tuple] = []
+        errors: List[ImportRowError] = []
+        rejected = 0
+
+        for offset, row in enumerate(rows):
+            if is_blank_row(row):
+                continue
+            row_number = first_row + offset
+            values: List[Any] = []
+            row_errors: List[ImportRowError] = []
+            for name, position, convert, nullable in self._convert:
+                raw = row[position] if position < len(row) else None
+                if _blank(raw):
+                    if not nullable or name == self.key:
+                        row_errors.append(ImportRowError(row=row_number, column=name, message="required"))
+                    values.append(None)
+                    continue
+                try:
+                    values.append(convert(raw))
+                except (TypeError, ValueError) as e:
+                    row_errors.append(ImportRowError(row=row_number, column=name, message=f"{raw!r}: {e}"))
+                    values.append(None)
+            if row_errors:
+                rejected += 1
+                errors.extend(row_errors)
+            else:
+                records.append(tuple(values) + tuple(fixed_values))
+
+        return records, errors, rejected
+
+
+class ImportService:
+    """Service for COPY-based bulk imports"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def import_file(
+        self,
+        file: BinaryIO,
+        filename: str,
+        entity: str,
+        user: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> ImportResult:
+        """
+        Import one spreadsheet into the entity's table.
+        Raises ValueError for an unknown entity, unsupported file type or a
+        header row missing required columns; row-level problems are
+        reported in the result instead.
+        """
+        if entity not in IMPORT_TARGETS:
+            raise ValueError(f"Unknown entity: {entity}")
+        model, key = IMPORT_TARGETS[entity]
+        chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+
+        started = time.perf_counter()
+        result = ImportResult(entity=entity, table=model.__tablename__, dry_run=dry_run)
+        chunks = iter_spreadsheet_chunks(file, filename, chunk_size)
+        mapper: Optional[RowMapper] = None
+        next_row = 2  # row 1 is the header
+
+        while True:
+            # Parsing is CPU-bound; keep it off the event loop
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            headers, rows = chunk
+            if mapper is None:
+                mapper = RowMapper(model, key, headers, user)
+                result.ignored_columns = mapper.ignored
+
+            first_row, next_row = next_row, next_row + len(rows)
+            records, errors, rejected = mapper.convert(rows, first_row)
+            result.chunks += 1
+            result.rows_read += len(rows)
+            result.rows_valid += len(records)
+            result.rejected += rejected
+            self._add_errors(result, errors)
+
+            if dry_run or not records:
+                continue
+            try:
+                inserted, updated = await self._merge(mapper, records)
+                result.inserted += inserted
+                result.updated += updated
+            except Exception as e:
+                await self.db.rollback()
+                result.rejected += len(records)
+                self._add_errors(result, [ImportRowError(
+                    row=first_row, message=f"rows {first_row}-{next_row - 1} not loaded: {e}"
+                )])
+
+        if result.inserted or result.updated:
+            result.views_refreshed = await self._refresh_views()
+
+        result.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(
+            f"📥 Import {entity}: {result.rows_read} rows in {result.elapsed_ms:.0f}ms — "
+            f"{result.inserted} inserted, {result.updated} updated, {result.rejected} rejected"
+        )
+        return result
+
+    @staticmethod
+    def _add_errors(result: ImportResult, errors: List[ImportRowError]) -> None:
+        room = settings.IMPORT_MAX_ERRORS - len(result.errors)
+        if room > 0:
+            result.errors.extend(errors[:room])
+
+    async def _merge(self, mapper: RowMapper, records: List[tuple]) -> Tuple[int, int]:
+        """COPY one chunk into a staging table and upsert it; returns (inserted, updated)."""
+        column_list = ", ".join(mapper.columns)
+        await self.db.execute(text(
+            f"CREATE TEMP TABLE {_STAGE_TABLE} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {mapper.table} WITH NO DATA"
+        ))
+
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            _STAGE_TABLE, records=records, columns=mapper.columns
+        )
+
+        assignments = [f"{c} = EXCLUDED.{c}" for c in mapper.update_columns]
+        if assignments and mapper.version_counter:
+            assignments.append(f"{mapper.version_counter} = COALESCE(t.{mapper.version_counter}, 0) + 1")
+        conflict = f"DO UPDATE SET {', '.join(assignments)}" if assignments else "DO NOTHING"
+
+        # DISTINCT ON: the last occurrence of a key within the chunk wins
+        merged = await self.db.execute(text(f"""
+            INSERT INTO {mapper.table} AS t ({column_list})
+            SELECT DISTINCT ON ({mapper.key}) {column_list}
+            FROM {_STAGE_TABLE}
+            ORDER BY {mapper.key}, ctid DESC
+            ON CONFLICT ({mapper.key}) {conflict}
+            RETURNING (xmax = 0) AS inserted
+        """))
+        flags = merged.scalars().all()
+        await self.db.commit()
+
+        inserted = sum(1 for f in flags if f)
+        return inserted, len(flags) - inserted
+
+    async def _refresh_views(self) -> bool:
+        """Refresh the dashboard materialized views once for the whole file."""
+        try:
+            # The refresh can outlast the pool's per-statement timeout
+            await self.db.execute(text("SET LOCAL statement_timeout = 0"))
+            refreshed = await DashboardService(self.db).refresh_dashboard_views()
+            if not refreshed:
+                await self.db.rollback()
+            return refreshed
+        except Exception as e:
+            await self.db.rollback()
+            print(f"⚠️  View refresh after import failed: {e}")
+            return False
@@ -0,0 +1,135 @@
+"""
+Buddhist Affairs MIS Dashboard - Location Filters
+Resolves province / district / DS / GN filters through location_closure
+(see migrations/location_closure.sql) so every service filters and groups
+geography the same way:
+
+- province and district filters match a row's district
+- DS and GN filters match a row's GN division
+
+The finest filter given is the scope; coarser filters given with it are
+kept as `within` and ANDed, so province P1 with a district of P2 matches
+nothing rather than the whole district.  A filter may name several areas
+of its level (e.g. two provinces); rows in any of them match, through one
+= ANY(:loc_codes) predicate per level.  A single code is matched with
+plain equality instead, so a (district, name) index still yields rows in
+name order for a keyset page.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.schemas.filters import split_codes
+
+# Finest first
+LOCATION_LEVELS = ("gn", "ds", "district", "province")
+
+# entity → (district column, GN column)
+ENTITY_LOCATION_COLUMNS = {
+    "bikku":    ("br_district", "br_gndiv"),
+    "silmatha": ("sil_district", "sil_gndiv"),
+    "vihara":   ("vh_district", "vh_gndiv"),
+    "arama":    ("ar_district", "ar_gndiv"),
+}
+
+
+@dataclass(frozen=True)
+class LocationScope:
+    level: str  # gn | ds | district | province
+    codes: Tuple[str, ...]
+    within: Optional["LocationScope"] = None  # next coarser filter given, if any
+
+    def levels(self) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        """(level, codes) of this filter and every coarser one, finest first"""
+        scope = self
+        while scope is not None:
+            yield scope.level, scope.codes
+            scope = scope.within
+
+    def param(self, level: str) -> str:
+        """Bind parameter of `level`'s codes: :loc_codes for the scope's own level"""
+        return "loc_codes" if level == self.level else f"loc_{level}_codes"
+
+
+def location_scope(filters: Any = None, finest: str = "gn", **codes: Any) -> Optional[LocationScope]:
+    """
+    The geographic filters set on `filters` (DashboardFilters, TempleFilter,
+    ...) or passed as `<level>_code=` keywords (a code, a comma-separated
+    string or a list), finest first.  Levels finer than `finest` are
+    ignored.
+    """
+    scope = None
+    for level in reversed(LOCATION_LEVELS[LOCATION_LEVELS.index(finest):]):
+        values = split_codes(codes.get(f"{level}_code") or getattr(filters, f"{level}_code", None))
+        if values:
+            scope = LocationScope(level, tuple(values), scope)
+    return scope
+
+
+def location_condition(
+    scope: Optional[LocationScope],
+    district_col: str,
+    gn_col: str,
+    params: Dict[str, Any],
+) -> Optional[str]:
+    """
+    SQL predicate restricting rows to `scope`, given the row's district and
+    GN columns; binds :loc_codes (and :loc_<level>_codes for coarser
+    filters).  None when there is no scope.
+    """
+    if scope is None:
+        return None
+    conditions = []
+    for level, codes in scope.levels():
+        name = scope.param(level)
+        if level == "district":
+            conditions.append(_codes_match(district_col, name, codes, params))
+        elif level == "gn":
+            conditions.append(_codes_match(gn_col, name, codes, params))
+        elif level == "province":
+            params[name] = list(codes)
+            conditions.append(f"{district_col} IN (SELECT lc.code FROM location_closure lc "
+                              f"WHERE lc.level = 'district' AND lc.province_code = ANY(:{name}))")
+        else:
+            params[name] = list(codes)
+            conditions.append(f"{gn_col} IN (SELECT lc.code FROM location_closure lc "
+                              f"WHERE lc.level = 'gn' AND lc.ds_code = ANY(:{name}))")
+    return " AND ".join(conditions)
+
+
+def entity_location(
+    entity: str,
+    alias: str,
+    scope: Optional[LocationScope],
+    params: Dict[str, Any],
+) -> Optional[str]:
+    """location_condition for one of bikku / silmatha / vihara / arama under table alias `alias`."""
+    district_col, gn_col = ENTITY_LOCATION_COLUMNS[entity]
+    prefix = f"{alias}." if alias else ""
+    return location_condition(scope, prefix + district_col, prefix + gn_col, params)
+
+
+def closure_condition(alias: str, scope: Optional[LocationScope], params: Dict[str, Any]) -> Optional[str]:
+    """Predicate on a location_closure row `alias`: the node lies within `scope`."""
+    return columns_condition(scope, {level: f"{alias}.{level}_code" for level in LOCATION_LEVELS}, params)
+
+
+def columns_condition(scope: Optional[LocationScope], columns: Dict[str, str], params: Dict[str, Any]) -> Optional[str]:
+    """
+    Predicate on a table holding one column per level (`columns`: level →
+    column), e.g. a denormalised listing.  None when there is no scope.
+    """
+    if scope is None:
+        return None
+    conditions = []
+    for level, codes in scope.levels():
+        conditions.append(_codes_match(columns[level], scope.param(level), codes, params))
+    return " AND ".join(conditions)
+
+
+def _codes_match(column: str, name: str, codes: Tuple[str, ...], params: Dict[str, Any]) -> str:
+    """`column` equals one of `codes`, bound as :name (a scalar for a single code)."""
+    if len(codes) == 1:
+        params[name] = codes[0]
+        return f"{column} = :{name}"
+    params[name] = list(codes)
+    return f"{column} = ANY(:{name})"
@@ -0,0 +1,262 @@
+"""
+Buddhist Affairs MIS Dashboard - Lookup Service
+Reference data for dropdowns and filters
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from typing import List, Dict, Any, Optional
+
+from app.database import is_undefined_table
+
+# Tables behind each lookup, for change-notification cache invalidation
+LOOKUP_TABLES = {
+    "provinces": frozenset({"cmm_province"}),
+    "districts": frozenset({"cmm_districtdata"}),
+    "nikaya": frozenset({"cmm_nikayadata"}),
+    "parshawa": frozenset({"cmm_parshawadata"}),
+    "divisional_secretariats": frozenset({"cmm_dvsec", "cmm_sasanarbm"}),
+    "gn_divisions": frozenset({"cmm_gndata", "vihaddata", "cmm_sasanarbm"}),
+    "ssbm": frozenset({"cmm_sasanarbm"}),
+    "vihara_types": frozenset({"vihaddata"}),
+}
+
+
+class LookupService:
+    """Service for reference (cmm_*) lookup lists"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_provinces(self) -> List[Dict[str, Any]]:
+        """All provinces"""
+        result = await self.db.execute(text("""
+            SELECT cp_code, cp_name
+            FROM cmm_province
+            WHERE cp_is_deleted = false OR cp_is_deleted IS NULL
+            ORDER BY cp_name
+        """))
+        return [
+            {"code": row.cp_code, "name": row.cp_name}
+            for row in result.fetchall()
+        ]
+
+    async def get_districts(self, province_code: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Districts, optionally filtered by province"""
+        if province_code:
+            query = text("""
+                SELECT dd_dcode, dd_dname, dd_prcode
+                FROM cmm_districtdata
+                WHERE (dd_is_deleted = false OR dd_is_deleted IS NULL)
+                  AND dd_prcode = :province_code
+                ORDER BY dd_dname
+            """)
+            result = await self.db.execute(query, {"province_code": province_code})
+        else:
+            query = text("""
+                SELECT dd_dcode, dd_dname, dd_prcode
+                FROM cmm_districtdata
+                WHERE dd_is_deleted = false OR dd_is_deleted IS NULL
+                ORDER BY dd_dname
+            """)
+            result = await self.db.execute(query)
+
+        return [
+            {
+                "code": row.dd_dcode,
+                "name": row.dd_dname,
+                "province_code": row.dd_prcode
+            }
+            for row in result.fetchall()
+        ]
+
+    async def get_nikaya(self) -> List[Dict[str, Any]]:
+        """All Nikaya (Buddhist orders)"""
+        result = await self.db.execute(text("""
+            SELECT nk_nkn, nk_nname
+            FROM cmm_nikayadata
+            WHERE nk_is_deleted = false OR nk_is_deleted IS NULL
+            ORDER BY nk_nname
+        """))
+        return [
+            {"code": row.nk_nkn, "name": row.nk_nname}
+            for row in result.fetchall()
+        ]
+
+    async def get_parshawa(self) -> List[Dict[str, Any]]:
+        """All Parshawa (sub-sections)"""
+        result = await self.db.execute(text("""
+            SELECT pr_prn, pr_pname
+            FROM cmm_parshawadata
+            WHERE pr_is_deleted = false OR pr_is_deleted IS NULL
+            ORDER BY pr_pname
+        """))
+        return [
+            {"code": row.pr_prn, "name": row.pr_pname}
+            for row in result.fetchall()
+        ]
+
+    async def get_divisional_secretariats(
+        self,
+        district_code: Optional[str] = None,
+        ssbm_code: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """DS offices by district, or reverse-cascaded from an SSBM"""
+        if ssbm_code:
+            # cmm_sasanarbm.sr_dvcd is a direct FK to cmm_dvsec.dv_dvcode
+            query = text("""
+                SELECT DISTINCT dv.dv_dvcode, dv.dv_dvname, dv.dv_distrcd
+                FROM cmm_dvsec dv
+                WHERE dv.dv_dvcode IN (
+                    SELECT sr_dvcd FROM cmm_sasanarbm WHERE sr_ssbmcode = :ssbm_code
+                )
+                ORDER BY dv.dv_dvname
+            """)
+            result = await self.db.execute(query, {"ssbm_code": ssbm_code})
+        elif district_code:
+            query = text("""
+                SELECT dv_dvcode, dv_dvname, dv_distrcd
+                FROM cmm_dvsec
+                WHERE (dv_is_deleted = false OR dv_is_deleted IS NULL)
+                  AND dv_distrcd = :district_code
+                ORDER BY dv_dvname
+            """)
+            result = await self.db.execute(query, {"district_code": district_code})
+        else:
+            query = text("""
+                SELECT dv_dvcode, dv_dvname, dv_distrcd
+                FROM cmm_dvsec
+                WHERE dv_is_deleted = false OR dv_is_deleted IS NULL
+                ORDER BY dv_dvname
+            """)
+            result = await self.db.execute(query)
+
+        return [
+            {
+                "code": row.dv_dvcode,
+                "name": row.dv_dvname,
+                "district_code": row.dv_distrcd
+            }
+            for row in result.fetchall()
+        ]
+
+    async def get_gn_divisions(
+        self,
+        ds_code: Optional[str] = None,
+        ssbm_code: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """GN divisions by DS, or by SSBM via temple links"""
+        if ds_code:
+            query = text("""
+                SELECT gn_gnc, gn_gnname, gn_dvcode
+                FROM cmm_gndata
+                WHERE (gn_is_deleted = false OR gn_is_deleted IS NULL)
+                  AND gn_dvcode = :ds_code
+                ORDER BY gn_gnname
+            """)
+            result = await self.db.execute(query, {"ds_code": ds_code})
+            rows = result.fetchall()
+        elif ssbm_code:
+            # No direct FK from GN to SSBM — the GNs of its member temples
+            # (migrations/ssbm_membership.sql), by index
+            try:
+                # Savepoint so a missing table does not abort the caller's transaction
+                async with self.db.begin_nested():
+                    result = await self.db.execute(text("""
+                        SELECT gn.gn_gnc, gn.gn_gnname, gn.gn_dvcode
+                        FROM cmm_gndata gn
+                        WHERE (gn.gn_is_deleted = false OR gn.gn_is_deleted IS NULL)
+                          AND gn.gn_gnc IN (
+                              SELECT m.gn_code FROM ssbm_membership m WHERE m.ssbm_code = :ssbm_code
+                          )
+                        ORDER BY gn.gn_gnname
+                    """), {"ssbm_code": ssbm_code})
+                    rows = result.fetchall()
+            except DBAPIError as exc:
+                if not is_undefined_table(exc):
+                    raise
+                # Without the table: temples join their SSBM through the DS
+                # (vh_ssbmcode is not populated)
+                result = await self.db.execute(text("""
+                    SELECT DISTINCT gn.gn_gnc, gn.gn_gnname, gn.gn_dvcode
+                    FROM cmm_gndata gn
+                    JOIN vihaddata v
+                        ON v.vh_gndiv = gn.gn_gnc
+                       AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
+                    JOIN cmm_sasanarbm s
+                        ON s.sr_dvcd = v.vh_divisional_secretariat
+                    WHERE (gn.gn_is_deleted = false OR gn.gn_is_deleted IS NULL)
+                      AND (s.sr_is_deleted = false OR s.sr_is_deleted IS NULL)
+                      AND s.sr_ssbmcode = :ssbm_code
+                    ORDER BY gn.gn_gnname
+                """), {"ssbm_code": ssbm_code})
+                rows = result.fetchall()
+        else:
+            query = text("""
+                SELECT gn_gnc, gn_gnname, gn_dvcode
+                FROM cmm_gndata
+                WHERE gn_is_deleted = false OR gn_is_deleted IS NULL
+                ORDER BY gn_gnname
+                LIMIT 100
+            """)
+            result = await self.db.execute(query)
+            rows = result.fetchall()
+
+        return [
+            {
+                "code": row.gn_gnc,
+                "name": row.gn_gnname,
+                "ds_code": row.gn_dvcode
+            }
+            for row in rows
+        ]
+
+    async def get_ssbm_list(
+        self,
+        district_code: Optional[str] = None,
+        ds_code: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """SSBM organizations by DS (priority) or district"""
+        if ds_code:
+            query = text("""
+                SELECT sr_ssbmcode, sr_ssbname
+                FROM cmm_sasanarbm
+                WHERE sr_dvcd = :ds_code
+                ORDER BY sr_ssbname
+            """)
+            result = await self.db.execute(query, {"ds_code": ds_code})
+        elif district_code:
+            query = text("""
+                SELECT sr_ssbmcode, sr_ssbname
+                FROM cmm_sasanarbm
+                WHERE sr_discd = :district_code
+                ORDER BY sr_ssbname
+            """)
+            result = await self.db.execute(query, {"district_code": district_code})
+        else:
+            query = text("""
+                SELECT sr_ssbmcode, sr_ssbname
+                FROM cmm_sasanarbm
+                ORDER BY sr_ssbname
+                LIMIT 200
+            """)
+            result = await self.db.execute(query)
+
+        return [
+            {
+                "code": row.sr_ssbmcode,
+                "name": row.sr_ssbname or row.sr_ssbmcode
+            }
+            for row in result.fetchall()
+        ]
+
+    async def get_vihara_types(self) -> List[Dict[str, str]]:
+        """Distinct vihara/arama type codes (vh_typ)"""
+        result = await self.db.execute(text("""
+            SELECT DISTINCT vh_typ
+            FROM vihaddata
+            WHERE vh_typ IS NOT NULL AND vh_typ != ''
+              AND (vh_is_deleted = false OR vh_is_deleted IS NULL)
+            ORDER BY vh_typ
+        """))
+        return [{"code": row[0], "name": row[0]} for row in result.fetchall()]
@@ -1,12 +1,65 @@
 """
 Buddhist Affairs MIS Dashboard - Persons Service
 Handles Bhikku & Silmatha combined queries
+
+Listing is keyset-paginated on (sort name, person type, reg no): each
+branch is read in index order (see migrations/persons_keyset.sql) with its
+own LIMIT and returns codes only, the two short streams are merged in name
+order, and the page's names are filled in from the in-memory reference
+dictionary (app/utils/references.py).  Every page costs the same as the
+first.
 """
+import base64
+import json
+from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.schemas.dashboard import PersonListItem, PersonPage
+from app.schemas.filters import split_codes
+from app.services.location import entity_location, location_scope
+from app.utils.references import reference_names
+
+# Sort expressions — must match the expression indexes in migrations/persons_keyset.sql
+BHIKKU_SORT_NAME = "COALESCE(NULLIF(b.br_mahananame, ''), b.br_gihiname, '')"
+SILMATHA_SORT_NAME = "COALESCE(NULLIF(s.sil_mahananame, ''), s.sil_gihiname, '')"
+
+Cursor = Tuple[str, str, str]  # (sort name, person type, reg no)
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Opaque, URL-safe continuation token"""
+    raw = json.dumps(list(cursor), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
-from app.schemas.dashboard import PersonListItem
+
+def decode_cursor(token: str) -> Cursor:
+    """Inverse of encode_cursor; raises ValueError on a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        name, person_type, reg_no = json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if person_type not in ("BHIKKU", "SILMATHA"):
+        raise ValueError("Invalid cursor")
+    return str(name), person_type, str(reg_no)
+
+
+def _after_cursor(branch_type: str, sort_expr: str, regn_col: str, cursor: Optional[Cursor]) -> Optional[str]:
+    """
+    Keyset predicate for one branch: rows strictly after the cursor in
+    (sort name, person type, reg no) order.  The person type is constant
+    within a branch, so it folds into the comparison on the name.
+    """
+    if cursor is None:
+        return None
+    _, cursor_type, _ = cursor
+    if branch_type == cursor_type:
+        return f"({sort_expr}, {regn_col}) > (:cursor_name, :cursor_regn)"
+    if branch_type > cursor_type:
+        return f"{sort_expr} >= :cursor_name"
+    return f"{sort_expr} > :cursor_name"
 
 
 class PersonsService:
@@ -21,48 +74,97 @@ class PersonsService:
         nikaya_code: Optional[str] = None,
         parshawa_code: Optional[str] = None,
         search: Optional[str] = None,
-        date_from: Optional[str] = None,
-        date_to: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
         limit: int = 200,
     ) -> List[PersonListItem]:
+        """First `limit` persons in name order (see get_persons_page)"""
+        page = await self.get_persons_page(
+            person_type=person_type,
+            province_code=province_code,
+            district_code=district_code,
+            nikaya_code=nikaya_code,
+            parshawa_code=parshawa_code,
+            search=search,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+        )
+        return page.data
+
+    async def get_persons_page(
+        self,
+        person_type: Optional[str] = None,
+        province_code: Optional[str] = None,
+        district_code: Optional[str] = None,
+        nikaya_code: Optional[str] = None,
+        parshawa_code: Optional[str] = None,
+        search: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        limit: int = 200,
+        cursor: Optional[Cursor] = None,
+    ) -> PersonPage:
+        """
+        One page of the combined Bhikku + Silmatha list, ordered by name.
+        Pass the previous page's next_cursor (decoded) to continue.
+        """
+        params: Dict[str, Any] = {"fetch": limit + 1}
+        if cursor is not None:
+            params["cursor_name"], _, params["cursor_regn"] = cursor
+
+        search_term = search.strip() if search else ""
+        if search_term:
+            params["search"] = f"%{search_term}%"
+        scope = location_scope(province_code=province_code, district_code=district_code)
+        nikaya_code = split_codes(nikaya_code)
+        parshawa_code = split_codes(parshawa_code)
+        if nikaya_code:
+            params["nikaya_code"] = nikaya_code
+        if parshawa_code:
+            params["parshawa_code"] = parshawa_code
+        if date_from:
+            params["date_from"] = date_from
+        if date_to:
+            params["date_to"] = date_to
 
         # ── Bhikku where clauses ──────────────────────────────────────────
         b_where = ["(b.br_is_deleted = false OR b.br_is_deleted IS NULL)"]
 
-        if province_code:
-            b_where.append(f"b.br_province = '{province_code}'")
-        if district_code:
-            b_where.append(f"b.br_district = '{district_code}'")
+        if scope:
+            b_where.append(entity_location("bikku", "b", scope, params))
         if nikaya_code:
-            b_where.append(f"b.br_nikaya = '{nikaya_code}'")
+            b_where.append("b.br_nikaya = ANY(:nikaya_code)")
         if parshawa_code:
-            b_where.append(f"b.br_parshawaya = '{parshawa_code}'")
-        if search and search.strip():
-            s = search.strip().replace("'", "''")
+            b_where.append("b.br_parshawaya = ANY(:parshawa_code)")
+        if search_term:
             b_where.append(
-                f"(b.br_gihiname ILIKE '%{s}%' OR b.br_mahananame ILIKE '%{s}%' OR b.br_regn ILIKE '%{s}%')"
+                "(b.br_gihiname ILIKE :search OR b.br_mahananame ILIKE :search OR b.br_regn ILIKE :search)"
             )
         if date_from:
-            b_where.append(f"b.br_updated_at >= '{date_from}'")
+            b_where.append("b.br_updated_at >= CAST(:date_from AS date)")
         if date_to:
-            b_where.append(f"b.br_updated_at < ('{date_to}'::date + INTERVAL '1 day')")
+            b_where.append("b.br_updated_at < CAST(:date_to AS date) + 1")
+        b_keyset = _after_cursor("BHIKKU", BHIKKU_SORT_NAME, "b.br_regn", cursor)
+        if b_keyset:
+            b_where.append(b_keyset)
 
         # ── Silmatha where clauses ────────────────────────────────────────
         s_where = ["(s.sil_is_deleted = false OR s.sil_is_deleted IS NULL)"]
 
-        if province_code:
-            s_where.append(f"s.sil_province = '{province_code}'")
-        if district_code:
-            s_where.append(f"s.sil_district = '{district_code}'")
-        if search and search.strip():
-            sv = search.strip().replace("'", "''")
+        if scope:
+            s_where.append(entity_location("silmatha", "s", scope, params))
+        if search_term:
             s_where.append(
-                f"(s.sil_gihiname ILIKE '%{sv}%' OR s.sil_mahananame ILIKE '%{sv}%' OR s.sil_regn ILIKE '%{sv}%')"
+                "(s.sil_gihiname ILIKE :search OR s.sil_mahananame ILIKE :search OR s.sil_regn ILIKE :search)"
             )
         if date_from:
-            s_where.append(f"s.sil_updated_at >= '{date_from}'")
+            s_where.append("s.sil_updated_at >= CAST(:date_from AS date)")
         if date_to:
-            s_where.append(f"s.sil_updated_at < ('{date_to}'::date + INTERVAL '1 day')")
+            s_where.append("s.sil_updated_at < CAST(:date_to AS date) + 1")
+        s_keyset = _after_cursor("SILMATHA", SILMATHA_SORT_NAME, "s.sil_regn", cursor)
+        if s_keyset:
+            s_where.append(s_keyset)
 
         # ── Decide which tables to include ────────────────────────────────
         pt = (person_type or "").upper()
@@ -74,10 +176,10 @@ class PersonsService:
 
         parts = []
 
-        # ── Bhikku subquery ───────────────────────────────────────────────
+        # ── Bhikku branch: codes only, limited in index order ────────────
         if include_bhikku:
             parts.append(f"""
-                SELECT
+                (SELECT
                     b.br_id::text                              AS person_id,
                     b.br_regn                                  AS reg_no,
                     'BHIKKU'                                   AS person_type,
@@ -86,27 +188,25 @@ class PersonsService:
                     b.br_mahananame                            AS ordained_name,
                     b.br_dofb::text                            AS dob,
                     b.br_mobile                                AS mobile,
-                    nk.nk_nname                                AS nikaya_name,
-                    pr.pr_pname                                AS parshawa_name,
-                    v.vh_vname                                 AS vihara_name,
-                    prov.cp_name                               AS province_name,
-                    dist.dd_dname                              AS district_name,
+                    b.br_nikaya::text                          AS nikaya_code,
+                    b.br_parshawaya::text                      AS parshawa_code,
+                    b.br_livtemple::text                       AS temple_trn,
+                    b.br_province::text                        AS province_code,
+                    b.br_district::text                        AS district_code,
                     b.br_cat                                   AS category,
                     b.br_currstat                              AS status,
-                    b.br_updated_at::text                      AS updated_at
+                    b.br_updated_at::text                      AS updated_at,
+                    {BHIKKU_SORT_NAME}                         AS sort_name
                 FROM bhikku_regist b
-                LEFT JOIN cmm_nikayadata    nk   ON nk.nk_nkn    = b.br_nikaya
-                LEFT JOIN cmm_parshawadata  pr   ON pr.pr_prn     = b.br_parshawaya
-                LEFT JOIN vihaddata         v    ON v.vh_trn      = b.br_livtemple
-                LEFT JOIN cmm_province      prov ON prov.cp_code  = b.br_province
-                LEFT JOIN cmm_districtdata  dist ON dist.dd_dcode = b.br_district
                 WHERE {' AND '.join(b_where)}
+                ORDER BY {BHIKKU_SORT_NAME}, b.br_regn
+                LIMIT :fetch)
             """)
 
-        # ── Silmatha subquery ─────────────────────────────────────────────
+        # ── Silmatha branch ───────────────────────────────────────────────
         if include_silmatha:
             parts.append(f"""
-                SELECT
+                (SELECT
                     s.sil_id::text                               AS person_id,
                     s.sil_regn                                   AS reg_no,
                     'SILMATHA'                                   AS person_type,
@@ -115,29 +215,38 @@ class PersonsService:
                     s.sil_mahananame                             AS ordained_name,
                     s.sil_dofb::text                             AS dob,
                     s.sil_mobile                                 AS mobile,
-                    NULL                                         AS nikaya_name,
-                    NULL                                         AS parshawa_name,
-                    v.vh_vname                                   AS vihara_name,
-                    prov.cp_name                                 AS province_name,
-                    dist.dd_dname                                AS district_name,
+                    NULL                                         AS nikaya_code,
+                    NULL                                         AS parshawa_code,
+                    s.sil_robing_after_residence_temple::text    AS temple_trn,
+                    s.sil_province::text                         AS province_code,
+                    s.sil_district::text                         AS district_code,
                     s.sil_cat                                    AS category,
                     s.sil_currstat                               AS status,
-                    s.sil_updated_at::text                       AS updated_at
+                    s.sil_updated_at::text                       AS updated_at,
+                    {SILMATHA_SORT_NAME}                         AS sort_name
                 FROM silmatha_regist s
-                LEFT JOIN vihaddata         v    ON v.vh_trn      = s.sil_robing_after_residence_temple
-                LEFT JOIN cmm_province      prov ON prov.cp_code  = s.sil_province
-                LEFT JOIN cmm_districtdata  dist ON dist.dd_dcode = s.sil_district
                 WHERE {' AND '.join(s_where)}
+                ORDER BY {SILMATHA_SORT_NAME}, s.sil_regn
+                LIMIT :fetch)
             """)
 
         if not parts:
-            return []
+            return PersonPage(data=[], next_cursor=None)
 
-        sql = " UNION ALL ".join(parts) + f" ORDER BY name LIMIT {limit}"
-        result = await self.db.execute(text(sql))
+        # Merge the two pre-sorted, pre-limited streams
+        sql = " UNION ALL ".join(parts) + " ORDER BY sort_name, person_type, reg_no LIMIT :fetch"
+        result = await self.db.execute(text(sql), params)
         rows = result.fetchall()
 
-        return [
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor((last.sort_name, last.person_type, last.reg_no))
+
+        # Names come from the in-memory reference dictionary, not joins
+        names = await reference_names.get(self.db, temples=(row.temple_trn for row in rows))
+        data = [
             PersonListItem(
                 person_id=row[0],
                 reg_no=row[1],
@@ -147,14 +256,15 @@ class PersonsService:
                 ordained_name=row[5],
                 dob=str(row[6])[:10] if row[6] else None,
                 mobile=row[7],
-                nikaya_name=row[8],
-                parshawa_name=row[9],
-                vihara_name=row[10],
-                province_name=row[11],
-                district_name=row[12],
+                nikaya_name=names.name("nikaya", row[8]),
+                parshawa_name=names.name("parshawa", row[9]),
+                vihara_name=names.name("temples", row[10]),
+                province_name=names.name("provinces", row[11]),
+                district_name=names.name("districts", row[12]),
                 category=row[13],
                 status=row[14],
                 updated_at=str(row[15])[:19] if row[15] else None,
             )
             for row in rows
         ]
+        return PersonPage(data=data, next_cursor=next_cursor)
@@ -4,7 +4,7 @@ Uses direct queries for reliability - no materialized view dependency.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import List
+from typing import List, Optional
 
 from app.schemas.dashboard import (
     SummaryTypeItem,
@@ -13,13 +13,69 @@ from app.schemas.dashboard import (
     Section1Response,
 )
 from app.schemas.filters import DashboardFilters
+from app.services.counters_service import CountersService
+from app.services.location import entity_location, location_scope
+from app.utils.snapshot import snapshot_engine
+
+# vh_typ → display name for Summary C
+GRADE_NAMES = {
+    "VH":        "Vihara",
+    "MAIN":      "Main Vihara",
+    "BRANCH":    "Branch Vihara",
+    "VIHARA":    "Vihara (Other)",
+    "VIKASITHA": "Vikasitha",
+    "A":         "Grade A",
+    "B":         "Grade B",
+    "C":         "Grade C",
+    "D":         "Grade D",
+}
+
+
+def grade_name(grade: Optional[str]) -> str:
+    return GRADE_NAMES.get(grade, grade or "Not Graded")
+
+
+def type_items(counts: dict) -> List[SummaryTypeItem]:
+    """Summary A tiles from per-type totals"""
+    return [
+        SummaryTypeItem(type_key="bikku",               type_name="Bikku",               icon="bhikku",   total=counts["bikku"]),
+        SummaryTypeItem(type_key="silmatha",            type_name="Silmatha",            icon="silmatha", total=counts["silmatha"]),
+        SummaryTypeItem(type_key="dahampasal_teachers", type_name="Dahampasal Teachers", icon="teacher",  total=0),
+        SummaryTypeItem(type_key="dahampasal_students", type_name="Dahampasal Students", icon="student",  total=0),
+        SummaryTypeItem(type_key="vihara",              type_name="Vihara",              icon="temple",   total=counts["vihara"]),
+        SummaryTypeItem(type_key="arama",               type_name="Arama",               icon="arama",    total=counts["arama"]),
+        SummaryTypeItem(type_key="dahampasal",          type_name="Dahampasal",          icon="school",   total=0),
+        SummaryTypeItem(type_key="ssbm",                type_name="SSBM",                icon="ssbm",     total=counts["ssbm"]),
+    ]
+
+
+def type_conditions(filters: DashboardFilters, params: dict) -> tuple:
+    """WHERE conditions for the bikku, silmatha, vihara, arama and SSBM counts of Summary A"""
+    scope = location_scope(filters)
+    bikku_where = "(br_is_deleted = false OR br_is_deleted IS NULL)"
+    sil_where   = "(sil_is_deleted = false OR sil_is_deleted IS NULL)"
+    vh_where    = "(vh_is_deleted = false OR vh_is_deleted IS NULL)"
+    ar_where    = "(ar_is_deleted = false OR ar_is_deleted IS NULL)"
+    ssbm_where  = "(sar_is_deleted = false OR sar_is_deleted IS NULL)"
+
+    if scope:
+        bikku_where += " AND " + entity_location("bikku", "", scope, params)
+        sil_where   += " AND " + entity_location("silmatha", "", scope, params)
+        vh_where    += " AND " + entity_location("vihara", "", scope, params)
+        ar_where    += " AND " + entity_location("arama", "", scope, params)
+        # SSBM rows are located through their temple
+        ssbm_where  += (" AND sar_temple_trn IN (SELECT v.vh_trn FROM vihaddata v WHERE "
+                        + entity_location("vihara", "v", scope, params) + ")")
+    return bikku_where, sil_where, vh_where, ar_where, ssbm_where
 
 
 class Section1Service:
     """Service for Section 1 - Overall Summary data"""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, use_snapshot: bool = True):
         self.db = db
+        # In-memory snapshot answering the counts without a query, when loaded and current
+        self.snapshot = snapshot_engine.current() if use_snapshot else None
 
     async def get_overall_summary(self, filters: DashboardFilters = None) -> Section1Response:
         """Get all Summary A, B, C data"""
@@ -34,26 +90,25 @@ class Section1Service:
         )
     
     async def get_type_summary(self, filters: DashboardFilters = None) -> List[SummaryTypeItem]:
-        """Get Summary A - Type breakdown using a single direct query (no materialized view)"""
+        """
+        Get Summary A - Type breakdown.
+        Unfiltered (national) totals come from the trigger-maintained counters row;
+        geographic filters use a single direct query.
+        """
+        if self.snapshot is not None:
+            return self.snapshot.get_type_summary(filters)
+        counts = None
+        if location_scope(filters) is None:
+            counts = await CountersService(self.db).get_counters()
+        if counts is None:
+            counts = await self._count_types(filters)
+
+        return type_items(counts)
+
+    async def _count_types(self, filters: DashboardFilters = None) -> dict:
+        """Summary A counts using a single direct query (no materialized view)"""
         params = {}
-        bikku_where = "(br_is_deleted = false OR br_is_deleted IS NULL)"
-        sil_where   = "(sil_is_deleted = false OR sil_is_deleted IS NULL)"
-        vh_where    = "(vh_is_deleted = false OR vh_is_deleted IS NULL)"
-        ar_where    = "(ar_is_deleted = false OR ar_is_deleted IS NULL)"
-
-        if filters and filters.province_code:
-            bikku_where += " AND br_province = :province"
-            sil_where   += " AND sil_province = :province"
-            vh_where    += " AND vh_province = :province"
-            ar_where    += " AND ar_province = :province"
-            params["province"] = filters.province_code
-
-        if filters and filters.district_code:
-            bikku_where += " AND br_district = :district"
-            sil_where   += " AND sil_district = :district"
-            vh_where    += " AND vh_district = :district"
-            ar_where    += " AND ar_district = :district"
-            params["district"] = filters.district_code
+        bikku_where, sil_where, vh_where, ar_where, ssbm_where = type_conditions(filters, params)
 
         result = await self.db.execute(text(f"""
             SELECT
@@ -61,64 +116,63 @@ class Section1Service:
                 (SELECT COUNT(*) FROM silmatha_regist      WHERE {sil_where})   AS sil_count,
                 (SELECT COUNT(*) FROM vihaddata            WHERE {vh_where})    AS vh_count,
                 (SELECT COUNT(*) FROM aramadata            WHERE {ar_where})    AS ar_count,
-                (SELECT COUNT(*) FROM sasanarakshana_regist
-                    WHERE sar_is_deleted = false OR sar_is_deleted IS NULL)     AS ssbm_count
+                (SELECT COUNT(*) FROM sasanarakshana_regist WHERE {ssbm_where}) AS ssbm_count
         """), params)
         row = result.fetchone()
 
-        return [
-            SummaryTypeItem(type_key="bikku",               type_name="Bikku",               icon="bhikku",   total=row[0] or 0),
-            SummaryTypeItem(type_key="silmatha",            type_name="Silmatha",            icon="silmatha", total=row[1] or 0),
-            SummaryTypeItem(type_key="dahampasal_teachers", type_name="Dahampasal Teachers", icon="teacher",  total=0),
-            SummaryTypeItem(type_key="dahampasal_students", type_name="Dahampasal Students", icon="student",  total=0),
-            SummaryTypeItem(type_key="vihara",              type_name="Vihara",              icon="temple",   total=row[2] or 0),
-            SummaryTypeItem(type_key="arama",               type_name="Arama",               icon="arama",    total=row[3] or 0),
-            SummaryTypeItem(type_key="dahampasal",          type_name="Dahampasal",          icon="school",   total=0),
-            SummaryTypeItem(type_key="ssbm",                type_name="SSBM",                icon="ssbm",     total=row[4] or 0),
-        ]
+        return {
+            "bikku":    row[0] or 0,
+            "silmatha": row[1] or 0,
+            "vihara":   row[2] or 0,
+            "arama":    row[3] or 0,
+            "ssbm":     row[4] or 0,
+        }
     
     async def get_nikaya_summary(self, filters: DashboardFilters = None) -> List[SummaryNikayaItem]:
         """Get Summary B - Nikaya breakdown with vihara, bhikku and arama counts"""
+        if self.snapshot is not None:
+            return self.snapshot.get_nikaya_summary(filters)
         params = {}
         b_where = "(b.br_is_deleted = false OR b.br_is_deleted IS NULL)"
         v_where = "(v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)"
         a_where = "(a.ar_is_deleted = false OR a.ar_is_deleted IS NULL)"
 
         if filters and filters.nikaya_code:
-            b_where += " AND b.br_nikaya = :nikaya"
-            v_where += " AND v.vh_nikaya = :nikaya"
-            a_where += " AND a.ar_nikaya = :nikaya"
+            b_where += " AND b.br_nikaya = ANY(:nikaya)"
+            v_where += " AND v.vh_nikaya = ANY(:nikaya)"
+            a_where += " AND a.ar_nikaya = ANY(:nikaya)"
             params["nikaya"] = filters.nikaya_code
 
-        if filters and filters.province_code:
-            b_where += " AND b.br_province = :province"
-            v_where += " AND v.vh_province = :province"
-            a_where += " AND a.ar_province = :province"
-            params["province"] = filters.province_code
-
-        if filters and filters.district_code:
-            b_where += " AND b.br_district = :district"
-            v_where += " AND v.vh_district = :district"
-            a_where += " AND a.ar_district = :district"
-            params["district"] = filters.district_code
+        scope = location_scope(filters)
+        if scope:
+            b_where += " AND " + entity_location("bikku", "b", scope, params)
+            v_where += " AND " + entity_location("vihara", "v", scope, params)
+            a_where += " AND " + entity_location("arama", "a", scope, params)
 
+        # Each table is counted per nikaya before the join: joining the rows
+        # themselves multiplies bhikku x vihara x arama per nikaya
         result = await self.db.execute(text(f"""
             SELECT
-                n.nk_nkn                    AS nikaya_code,
-                n.nk_nname                  AS nikaya_name,
-                COUNT(DISTINCT b.br_id)     AS bhikku_count,
-                COUNT(DISTINCT v.vh_trn)    AS vihara_count,
-                COUNT(DISTINCT a.ar_id)     AS arama_count
+                n.nk_nkn                        AS nikaya_code,
+                n.nk_nname                      AS nikaya_name,
+                COALESCE(b.n, 0)                AS bhikku_count,
+                COALESCE(v.n, 0)                AS vihara_count,
+                COALESCE(a.n, 0)                AS arama_count
             FROM cmm_nikayadata n
-            LEFT JOIN bhikku_regist b
-                ON b.br_nikaya = n.nk_nkn AND {b_where}
-            LEFT JOIN vihaddata v
-                ON v.vh_nikaya = n.nk_nkn AND {v_where}
-            LEFT JOIN aramadata a
-                ON a.ar_nikaya = n.nk_nkn AND {a_where}
+            LEFT JOIN (
+                SELECT b.br_nikaya AS nikaya, COUNT(*) AS n
+                FROM bhikku_regist b WHERE {b_where} GROUP BY 1
+            ) b ON b.nikaya = n.nk_nkn
+            LEFT JOIN (
+                SELECT v.vh_nikaya AS nikaya, COUNT(DISTINCT v.vh_trn) AS n
+                FROM vihaddata v WHERE {v_where} GROUP BY 1
+            ) v ON v.nikaya = n.nk_nkn
+            LEFT JOIN (
+                SELECT a.ar_nikaya AS nikaya, COUNT(*) AS n
+                FROM aramadata a WHERE {a_where} GROUP BY 1
+            ) a ON a.nikaya = n.nk_nkn
             WHERE (n.nk_is_deleted = false OR n.nk_is_deleted IS NULL)
-            GROUP BY n.nk_nkn, n.nk_nname
-            HAVING COUNT(DISTINCT b.br_id) + COUNT(DISTINCT v.vh_trn) + COUNT(DISTINCT a.ar_id) > 0
+              AND COALESCE(b.n, 0) + COALESCE(v.n, 0) + COALESCE(a.n, 0) > 0
             ORDER BY bhikku_count DESC
         """), params)
         rows = result.fetchall()
@@ -138,31 +192,19 @@ class Section1Service:
     
     async def get_grade_summary(self, filters: DashboardFilters = None) -> List[SummaryGradeItem]:
         """Get Summary C - Vihara grade breakdown using direct query"""
+        if self.snapshot is not None:
+            return self.snapshot.get_grade_summary(filters)
         params = {}
         extra_where = ""
 
-        if filters and filters.province_code:
-            extra_where += " AND vh_province = :province"
-            params["province"] = filters.province_code
-        if filters and filters.district_code:
-            extra_where += " AND vh_district = :district"
-            params["district"] = filters.district_code
+        scope = location_scope(filters)
+        if scope:
+            extra_where += " AND " + entity_location("vihara", "", scope, params)
 
         result = await self.db.execute(text(f"""
             SELECT
                 COALESCE(vh_typ, 'N/A') AS grade,
-                CASE vh_typ
-                    WHEN 'VH'        THEN 'Vihara'
-                    WHEN 'MAIN'      THEN 'Main Vihara'
-                    WHEN 'BRANCH'    THEN 'Branch Vihara'
-                    WHEN 'VIHARA'    THEN 'Vihara (Other)'
-                    WHEN 'VIKASITHA' THEN 'Vikasitha'
-                    WHEN 'A'         THEN 'Grade A'
-                    WHEN 'B'         THEN 'Grade B'
-                    WHEN 'C'         THEN 'Grade C'
-                    WHEN 'D'         THEN 'Grade D'
-                    ELSE COALESCE(vh_typ, 'Not Graded')
-                END AS grade_name,
+                vh_typ,
                 COUNT(*) AS total
             FROM vihaddata
             WHERE (vh_is_deleted = false OR vh_is_deleted IS NULL)
@@ -173,6 +215,6 @@ class Section1Service:
         rows = result.fetchall()
 
         return [
-            SummaryGradeItem(grade=row[0], grade_name=row[1], total=row[2])
+            SummaryGradeItem(grade=row[0], grade_name=grade_name(row[1]), total=row[2])
             for row in rows
         ]
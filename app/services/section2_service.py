@@ -3,8 +3,10 @@ Buddhist Affairs MIS Dashboard - Section 2 Service (Detail Reports)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from typing import List
 
+from app.database import is_undefined_table
 from app.schemas.dashboard import (
     BikkuTypeItem,
     DahampasalItem,
@@ -15,13 +17,63 @@ from app.schemas.dashboard import (
     GeographicResponse,
 )
 from app.schemas.filters import DashboardFilters
+from app.services.location import closure_condition, entity_location, location_scope
+from app.utils.snapshot import snapshot_engine
+
+# Registrations per district, one grouped scan per entity; joined to
+# location_closure for province totals (see _get_province_fallback)
+_DISTRICT_COUNTS = {
+    "vihara": """
+        SELECT vh_district AS code, COUNT(*) AS n FROM vihaddata
+        WHERE vh_is_deleted = false OR vh_is_deleted IS NULL
+        GROUP BY vh_district""",
+    "bikku": """
+        SELECT br_district AS code, COUNT(*) AS n FROM bhikku_regist
+        WHERE br_is_deleted = false OR br_is_deleted IS NULL
+        GROUP BY br_district""",
+    "silmatha": """
+        SELECT sil_district AS code, COUNT(*) AS n FROM silmatha_regist
+        WHERE sil_is_deleted = false OR sil_is_deleted IS NULL
+        GROUP BY sil_district""",
+    "arama": """
+        SELECT ar_district AS code, COUNT(*) AS n FROM aramadata
+        WHERE ar_is_deleted = false OR ar_is_deleted IS NULL
+        GROUP BY ar_district""",
+    "ssbm": """
+        SELECT v.vh_district AS code, COUNT(*) AS n FROM sasanarakshana_regist sar
+        JOIN vihaddata v ON sar.sar_temple_trn = v.vh_trn
+        GROUP BY v.vh_district""",
+}
+
+
+# Ordination status per bhikku (br_regn, status); bhikkus without a row are
+# samanera.  The trigger-maintained table from migrations/bhikku_ordination.sql
+# first, then the same rows derived from bhikku_high_regist.
+ORDINATION_SOURCES = (
+    "SELECT br_regn, status FROM bhikku_ordination",
+    """SELECT DISTINCT bhr_samanera_serial_no AS br_regn, 'upasampada' AS status
+       FROM bhikku_high_regist
+       WHERE bhr_is_deleted = false OR bhr_is_deleted IS NULL""",
+)
+ORDINATION_STATUS = "COALESCE(o.status, 'samanera')"
+
+
+def bikku_type_items(counts: dict) -> List[BikkuTypeItem]:
+    """Bikku type tiles from per-status totals"""
+    return [
+        BikkuTypeItem(type_key="samanera",   type_name="සාමණේර",   total=counts.get("samanera", 0)),
+        BikkuTypeItem(type_key="upasampada", type_name="උපසම්පදා", total=counts.get("upasampada", 0)),
+        BikkuTypeItem(type_key="upavidi",    type_name="උපවිදි",    total=counts.get("upavidi", 0)),
+    ]
 
 
 class Section2Service:
     """Service for Section 2 - Detail Reports"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, use_snapshot: bool = True):
         self.db = db
+        # In-memory snapshot answering the counts without a query, when loaded and current
+        self.snapshot = snapshot_engine.current() if use_snapshot else None
     
     async def get_detail_reports(self, filters: DashboardFilters = None) -> Section2Response:
         """Get all detail report data for Section 2"""
@@ -38,51 +90,45 @@ class Section2Service:
         )
     
     async def get_bikku_type_breakdown(self, filters: DashboardFilters = None) -> List[BikkuTypeItem]:
-        """Get Bikku Type breakdown (Samanera / Upasampada / Upavidi) using direct queries"""
+        """
+        Get Bikku Type breakdown (Samanera / Upasampada / Upavidi) from one
+        grouped scan of bhikku_regist joined to each bhikku's ordination status
+        """
+        if self.snapshot is not None:
+            return self.snapshot.get_bikku_type_breakdown(filters)
         params = {}
         extra_b = ""
         if filters:
             if filters.nikaya_code:
-                extra_b += " AND b.br_nikaya = :nikaya"
+                extra_b += " AND b.br_nikaya = ANY(:nikaya)"
                 params["nikaya"] = filters.nikaya_code
-            if filters.province_code:
-                extra_b += " AND b.br_province = :province"
-                params["province"] = filters.province_code
-            if filters.district_code:
-                extra_b += " AND b.br_district = :district"
-                params["district"] = filters.district_code
+            scope = location_scope(filters)
+            if scope:
+                extra_b += " AND " + entity_location("bikku", "b", scope, params)
 
-        try:
-            result = await self.db.execute(text(f"""
-                SELECT
-                  (SELECT COUNT(*) FROM bhikku_regist b
-                   WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL) {extra_b}
-                     AND NOT EXISTS (
-                         SELECT 1 FROM bhikku_high_regist bh
-                         WHERE bh.bhr_samanera_serial_no = b.br_regn
-                           AND (bh.bhr_is_deleted = false OR bh.bhr_is_deleted IS NULL)
-                     )) AS samanera,
-                  (SELECT COUNT(*) FROM bhikku_high_regist
-                   WHERE bhr_is_deleted = false OR bhr_is_deleted IS NULL) AS upasampada
-            """), params)
-            row = result.fetchone()
-            return [
-                BikkuTypeItem(type_key="samanera",   type_name="සාමණේර",   total=row[0] or 0),
-                BikkuTypeItem(type_key="upasampada", type_name="උපසම්පදා", total=row[1] or 0),
-                BikkuTypeItem(type_key="upavidi",    type_name="උපවිදි",    total=0),
-            ]
-        except Exception:
-            # bhikku_high_regist table may not exist - just count all bhikku
-            result2 = await self.db.execute(text(f"""
-                SELECT COUNT(*) FROM bhikku_regist b
-                WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL) {extra_b}
-            """), params)
-            total = result2.scalar() or 0
-            return [
-                BikkuTypeItem(type_key="samanera",   type_name="සාමණේර",   total=total),
-                BikkuTypeItem(type_key="upasampada", type_name="උපසම්පදා", total=0),
-                BikkuTypeItem(type_key="upavidi",    type_name="උපවිදි",    total=0),
-            ]
+        for source in ORDINATION_SOURCES:
+            try:
+                # Savepoint so a missing table does not abort the caller's transaction
+                async with self.db.begin_nested():
+                    result = await self.db.execute(text(f"""
+                        SELECT {ORDINATION_STATUS} AS status, COUNT(*) AS total
+                        FROM bhikku_regist b
+                        LEFT JOIN ({source}) o ON o.br_regn = b.br_regn
+                        WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL) {extra_b}
+                        GROUP BY 1
+                    """), params)
+                    return bikku_type_items(dict(result.fetchall()))
+            except DBAPIError as exc:
+                if not is_undefined_table(exc):
+                    raise
+                continue
+
+        # Neither table exists - every bhikku counts as samanera
+        result = await self.db.execute(text(f"""
+            SELECT COUNT(*) FROM bhikku_regist b
+            WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL) {extra_b}
+        """), params)
+        return bikku_type_items({"samanera": result.scalar() or 0})
     
     async def get_dahampasal_breakdown(self, filters: DashboardFilters = None) -> List[DahampasalItem]:
         """
@@ -122,6 +168,8 @@ class Section2Service:
         Get Province-wise breakdown of all metrics using direct queries (no materialized views)
         so that province totals always reconcile with district totals.
         """
+        if self.snapshot is not None:
+            return self.snapshot.get_province_data(filters)
         return await self._get_province_fallback(filters)
 
     async def _get_province_data_mv(self, filters: DashboardFilters = None) -> GeographicResponse:
@@ -169,55 +217,37 @@ class Section2Service:
     
     async def _get_province_fallback(self, filters: DashboardFilters = None) -> GeographicResponse:
         """
-        Province data aggregated via district join so that province totals always equal
-        the sum of their district totals. Uses vh_district/br_district (reliably populated)
-        rather than vh_province/br_province (often NULL in DB).
+        Province data aggregated from district counts through location_closure, so
+        province totals always equal the sum of their district totals. Uses
+        vh_district/br_district (reliably populated) rather than vh_province/br_province
+        (often NULL in DB).
         """
-        result = await self.db.execute(text("""
+        per_province = {
+            key: f"""
+                SELECT lc.province_code AS code, SUM(c.n) AS n
+                FROM ({sql}) c
+                JOIN location_closure lc ON lc.level = 'district' AND lc.code = c.code
+                GROUP BY lc.province_code"""
+            for key, sql in _DISTRICT_COUNTS.items()
+        }
+        result = await self.db.execute(text(f"""
             SELECT 
                 p.cp_code,
                 p.cp_name,
-                COALESCE((
-                    SELECT COUNT(*) FROM vihaddata v
-                    WHERE (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
-                      AND EXISTS (
-                          SELECT 1 FROM cmm_districtdata d
-                          WHERE d.dd_dcode = v.vh_district AND d.dd_prcode = p.cp_code
-                            AND (d.dd_is_deleted = false OR d.dd_is_deleted IS NULL)
-                      )
-                ), 0) as vihara_count,
-                COALESCE((
-                    SELECT COUNT(*) FROM bhikku_regist b
-                    WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL)
-                      AND EXISTS (
-                          SELECT 1 FROM cmm_districtdata d
-                          WHERE d.dd_dcode = b.br_district AND d.dd_prcode = p.cp_code
-                            AND (d.dd_is_deleted = false OR d.dd_is_deleted IS NULL)
-                      )
-                ), 0) as bikku_count,
-                COALESCE((
-                    SELECT COUNT(*) FROM silmatha_regist s
-                    WHERE (s.sil_is_deleted = false OR s.sil_is_deleted IS NULL)
-                      AND EXISTS (
-                          SELECT 1 FROM cmm_districtdata d
-                          WHERE d.dd_dcode = s.sil_district AND d.dd_prcode = p.cp_code
-                            AND (d.dd_is_deleted = false OR d.dd_is_deleted IS NULL)
-                      )
-                ), 0) as silmatha_count,
-                COALESCE((
-                    SELECT COUNT(*) FROM aramadata a
-                    WHERE (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL)
-                      AND EXISTS (
-                          SELECT 1 FROM cmm_districtdata d
-                          WHERE d.dd_dcode = a.ar_district AND d.dd_prcode = p.cp_code
-                            AND (d.dd_is_deleted = false OR d.dd_is_deleted IS NULL)
-                      )
-                ), 0) as arama_count,
+                COALESCE(v.n, 0)  as vihara_count,
+                COALESCE(b.n, 0)  as bikku_count,
+                COALESCE(s.n, 0)  as silmatha_count,
+                COALESCE(a.n, 0)  as arama_count,
                 0 as dahampasal_teachers_count,
                 0 as dahampasal_students_count,
-                0 as ssbm_count,
+                COALESCE(sb.n, 0) as ssbm_count,
                 0 as dahampasal_count
             FROM cmm_province p
+            LEFT JOIN ({per_province["vihara"]})   v  ON v.code  = p.cp_code
+            LEFT JOIN ({per_province["bikku"]})    b  ON b.code  = p.cp_code
+            LEFT JOIN ({per_province["silmatha"]}) s  ON s.code  = p.cp_code
+            LEFT JOIN ({per_province["arama"]})    a  ON a.code  = p.cp_code
+            LEFT JOIN ({per_province["ssbm"]})     sb ON sb.code = p.cp_code
             WHERE p.cp_is_deleted = false OR p.cp_is_deleted IS NULL
             ORDER BY p.cp_name
         """))
@@ -246,37 +276,41 @@ class Section2Service:
         Get District-wise breakdown using direct queries (no materialized views)
         so that district totals always reconcile with province totals.
         """
+        if self.snapshot is not None:
+            return self.snapshot.get_district_data(filters)
         return await self._get_district_fallback(filters)
 
     async def _get_district_fallback(self, filters: DashboardFilters = None) -> GeographicResponse:
         """District data using direct queries — no materialized views, results match province aggregates."""
+        params = {}
         where_clause = ""
-        if filters and filters.province_code:
-            where_clause = f"AND d.dd_prcode = '{filters.province_code}'"
-        
+        condition = closure_condition("lc", location_scope(filters, finest="district"), params)
+        if condition:
+            where_clause = f"AND {condition}"
+
         result = await self.db.execute(text(f"""
             SELECT 
                 d.dd_dcode,
                 d.dd_dname,
-                COALESCE((SELECT COUNT(*) FROM sasanarakshana_regist sar 
-                         JOIN vihaddata v ON sar.sar_temple_trn = v.vh_trn 
-                         WHERE v.vh_district = d.dd_dcode), 0) as ssbm_count,
-                COALESCE((SELECT COUNT(*) FROM bhikku_regist WHERE br_district = d.dd_dcode 
-                         AND (br_is_deleted = false OR br_is_deleted IS NULL)), 0) as bikku_count,
-                COALESCE((SELECT COUNT(*) FROM silmatha_regist WHERE sil_district = d.dd_dcode 
-                         AND (sil_is_deleted = false OR sil_is_deleted IS NULL)), 0) as silmatha_count,
+                COALESCE(sb.n, 0) as ssbm_count,
+                COALESCE(b.n, 0)  as bikku_count,
+                COALESCE(s.n, 0)  as silmatha_count,
                 0 as dahampasal_teachers_count,
                 0 as dahampasal_students_count,
-                COALESCE((SELECT COUNT(*) FROM vihaddata WHERE vh_district = d.dd_dcode 
-                         AND (vh_is_deleted = false OR vh_is_deleted IS NULL)), 0) as vihara_count,
-                COALESCE((SELECT COUNT(*) FROM aramadata WHERE ar_district = d.dd_dcode 
-                         AND (ar_is_deleted = false OR ar_is_deleted IS NULL)), 0) as arama_count,
+                COALESCE(v.n, 0)  as vihara_count,
+                COALESCE(a.n, 0)  as arama_count,
                 0 as dahampasal_count
             FROM cmm_districtdata d
+            JOIN location_closure lc ON lc.level = 'district' AND lc.code = d.dd_dcode
+            LEFT JOIN ({_DISTRICT_COUNTS["ssbm"]})     sb ON sb.code = d.dd_dcode
+            LEFT JOIN ({_DISTRICT_COUNTS["bikku"]})    b  ON b.code  = d.dd_dcode
+            LEFT JOIN ({_DISTRICT_COUNTS["silmatha"]}) s  ON s.code  = d.dd_dcode
+            LEFT JOIN ({_DISTRICT_COUNTS["vihara"]})   v  ON v.code  = d.dd_dcode
+            LEFT JOIN ({_DISTRICT_COUNTS["arama"]})    a  ON a.code  = d.dd_dcode
             WHERE (d.dd_is_deleted = false OR d.dd_is_deleted IS NULL)
             {where_clause}
             ORDER BY d.dd_dname
-        """))
+        """), params)
         rows = result.fetchall()
         
         items = [
@@ -1,10 +1,13 @@
 """
 Buddhist Affairs MIS Dashboard - Section 3 Service (Selection Reports)
 """
+from datetime import date, datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import List
+from sqlalchemy.exc import DBAPIError
+from typing import List, Optional
 
+from app.database import is_undefined_table
 from app.schemas.dashboard import (
     ParshawaItem,
     SSBMItem,
@@ -14,13 +17,45 @@ from app.schemas.dashboard import (
     Section3Response,
 )
 from app.schemas.filters import DashboardFilters
+from app.services.location import LocationScope, closure_condition, columns_condition, entity_location, location_scope
+from app.utils.references import reference_names
+from app.utils.snapshot import snapshot_engine
+
+# location scope level → temple_listing column (see migrations/temple_listing.sql)
+LISTING_LOCATION_COLUMNS = {
+    "province": "loc_province",
+    "district": "district_code",
+    "ds":       "loc_ds",
+    "gn":       "gn_code",
+}
+
+# location scope level → ssbm_stats column (see migrations/ssbm_membership.sql)
+SSBM_STATS_LOCATION_COLUMNS = {
+    "province": "loc_province",
+    "district": "district_code",
+    "ds":       "ds_code",
+}
+
+
+def _updated_between(column: str, date_from: Optional[date], date_to: Optional[date], params: dict) -> List[str]:
+    """Inclusive date range on a timestamp column, as a plain range the index serves"""
+    conditions = []
+    if date_from:
+        params["date_from"] = datetime.combine(date_from, datetime.min.time())
+        conditions.append(f"{column} >= :date_from")
+    if date_to:
+        params["date_to"] = datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+        conditions.append(f"{column} < :date_to")
+    return conditions
 
 
 class Section3Service:
     """Service for Section 3 - Selection Reports"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, use_snapshot: bool = True):
         self.db = db
+        # In-memory snapshot answering the counts without a query, when loaded and current
+        self.snapshot = snapshot_engine.current() if use_snapshot else None
     
     async def get_selection_reports(self, filters: DashboardFilters = None) -> Section3Response:
         """Get all selection report data for Section 3"""
@@ -43,51 +78,60 @@ class Section3Service:
         Get Parshawa breakdown with vihara, bhikku and arama counts.
         Uses direct query to support full entity counts and geographic filtering.
         """
+        if self.snapshot is not None:
+            return self.snapshot.get_parshawa_breakdown(filters)
         return await self._get_parshawa_fallback(filters)
     
     async def _get_parshawa_fallback(self, filters: DashboardFilters = None) -> List[ParshawaItem]:
         """Fallback method for parshawa breakdown with full entity counts"""
+        params = {}
         v_where = b_where = a_where = p_where = ""
+        scope = location_scope(filters)
+        if scope:
+            v_where += " AND " + entity_location("vihara", "v", scope, params)
+            b_where += " AND " + entity_location("bikku", "b", scope, params)
+            a_where += " AND " + entity_location("arama", "a", scope, params)
         if filters:
-            if filters.province_code:
-                v_where += f" AND v.vh_province = '{filters.province_code}'"
-                b_where += f" AND b.br_province = '{filters.province_code}'"
-                a_where += f" AND a.ar_province = '{filters.province_code}'"
-            if filters.district_code:
-                v_where += f" AND v.vh_district = '{filters.district_code}'"
-                b_where += f" AND b.br_district = '{filters.district_code}'"
-                a_where += f" AND a.ar_district = '{filters.district_code}'"
             if filters.nikaya_code:
-                p_where += f" AND p.pr_nikayacd = '{filters.nikaya_code}'"
+                p_where += " AND p.pr_nikayacd = ANY(:nikaya)"
+                params["nikaya"] = filters.nikaya_code
             if filters.parshawa_code:
-                p_where += f" AND p.pr_prn = '{filters.parshawa_code}'"
+                p_where += " AND p.pr_prn = ANY(:parshawa)"
+                params["parshawa"] = filters.parshawa_code
 
+        # Each table is counted per parshawa before the join: joining the rows
+        # themselves multiplies vihara x bhikku x arama per parshawa
         result = await self.db.execute(text(f"""
             SELECT
                 p.pr_prn                     AS parshawa_code,
                 p.pr_pname                   AS parshawa_name,
-                COUNT(DISTINCT v.vh_trn)     AS vihara_count,
-                COUNT(DISTINCT b.br_id)      AS bhikku_count,
-                COUNT(DISTINCT a.ar_id)      AS arama_count
+                COALESCE(v.n, 0)             AS vihara_count,
+                COALESCE(b.n, 0)             AS bhikku_count,
+                COALESCE(a.n, 0)             AS arama_count
             FROM cmm_parshawadata p
-            LEFT JOIN vihaddata v
-                ON v.vh_parshawa = p.pr_prn
-               AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
-               {v_where}
-            LEFT JOIN bhikku_regist b
-                ON b.br_parshawaya = p.pr_prn
-               AND (b.br_is_deleted = false OR b.br_is_deleted IS NULL)
-               {b_where}
-            LEFT JOIN aramadata a
-                ON a.ar_parshawa = p.pr_prn
-               AND (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL)
-               {a_where}
+            LEFT JOIN (
+                SELECT v.vh_parshawa AS parshawa, COUNT(DISTINCT v.vh_trn) AS n
+                FROM vihaddata v
+                WHERE (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL) {v_where}
+                GROUP BY 1
+            ) v ON v.parshawa = p.pr_prn
+            LEFT JOIN (
+                SELECT b.br_parshawaya AS parshawa, COUNT(*) AS n
+                FROM bhikku_regist b
+                WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL) {b_where}
+                GROUP BY 1
+            ) b ON b.parshawa = p.pr_prn
+            LEFT JOIN (
+                SELECT a.ar_parshawa AS parshawa, COUNT(*) AS n
+                FROM aramadata a
+                WHERE (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL) {a_where}
+                GROUP BY 1
+            ) a ON a.parshawa = p.pr_prn
             WHERE (p.pr_is_deleted = false OR p.pr_is_deleted IS NULL)
+              AND COALESCE(v.n, 0) + COALESCE(b.n, 0) + COALESCE(a.n, 0) > 0
               {p_where}
-            GROUP BY p.pr_prn, p.pr_pname
-            HAVING COUNT(DISTINCT v.vh_trn) + COUNT(DISTINCT b.br_id) + COUNT(DISTINCT a.ar_id) > 0
             ORDER BY vihara_count DESC
-        """))
+        """), params)
         rows = result.fetchall()
 
         items = [
@@ -109,7 +153,7 @@ class Section3Service:
             WHERE (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
               AND (v.vh_parshawa IS NULL OR v.vh_parshawa = '')
               {v_where}
-        """))
+        """), params)
         not_assigned = result.scalar() or 0
         if not_assigned > 0:
             items.append(ParshawaItem(
@@ -126,25 +170,74 @@ class Section3Service:
     
     async def get_ssbm_org_list(self, filters: DashboardFilters = None) -> list:
         """
-        Get SSBM organisations from cmm_sasanarbm with vihara, bhikku,
-        silmatha and arama counts — filtered by district and/or DS code.
+        Get SSBM organisations with vihara, bhikku, silmatha and arama counts,
+        filtered by province, district and/or DS code.
+        Served from the trigger-maintained ssbm_stats table
+        (migrations/ssbm_membership.sql) when it is installed; GN filters
+        and databases without it resolve membership at query time.
+        """
+        scope = location_scope(filters)
+        if scope is None or all(level in SSBM_STATS_LOCATION_COLUMNS for level, _ in scope.levels()):
+            items = await self._ssbm_org_from_stats(scope)
+            if items is not None:
+                return items
+        return await self._get_ssbm_org_fallback(filters)
+
+    async def _ssbm_org_from_stats(self, scope: Optional[LocationScope]) -> Optional[list]:
+        """SSBM organisations from ssbm_stats, or None when it is not installed"""
+        params = {}
+        where = "vihara_count + bhikku_count + silmatha_count + arama_count > 0"
+        if scope:
+            where += f" AND {columns_condition(scope, SSBM_STATS_LOCATION_COLUMNS, params)}"
+        try:
+            # Savepoint so a missing table does not abort the caller's transaction
+            async with self.db.begin_nested():
+                result = await self.db.execute(text(f"""
+                    SELECT ssbm_code, ssbm_name, vihara_count, bhikku_count, silmatha_count, arama_count
+                    FROM ssbm_stats
+                    WHERE {where}
+                    ORDER BY ssbm_name
+                """), params)
+                rows = result.fetchall()
+        except DBAPIError as exc:
+            if not is_undefined_table(exc):
+                raise
+            return None
+        return [
+            {
+                "ssbm_code":     row[0],
+                "ssbm_name":     row[1] or row[0],
+                "vihara_count":  row[2],
+                "bhikku_count":  row[3],
+                "silmatha_count": row[4],
+                "arama_count":   row[5],
+            }
+            for row in rows
+        ]
+
+    async def _get_ssbm_org_fallback(self, filters: DashboardFilters = None) -> list:
+        """
+        SSBM organisations with membership resolved at query time.
 
         Key relationships (confirmed from DB):
           vihaddata.vh_divisional_secretariat = cmm_sasanarbm.sr_dvcd
           bhikku_regist.br_division           = cmm_sasanarbm.sr_dvcd
           silmatha_regist.sil_gndiv / aramadata.ar_gndiv  via vihara GN
         """
+        params = {}
         ssbm_where = ""
         v_where    = ""
+        scope = location_scope(filters)
+        if scope:
+            v_where += " AND " + entity_location("vihara", "v", scope, params)
         if filters:
-            if filters.province_code:
-                v_where    += f" AND v.vh_province  = '{filters.province_code}'"
             if filters.district_code:
-                ssbm_where += f" AND s.sr_discd = '{filters.district_code}'"
-                v_where    += f" AND v.vh_district = '{filters.district_code}'"
+                ssbm_where += " AND s.sr_discd = ANY(:district)"
+                params["district"] = filters.district_code
             if filters.ds_code:
                 # sr_dvcd already scopes the DS; also filter viharas directly
-                ssbm_where += f" AND s.sr_dvcd = '{filters.ds_code}'"
+                ssbm_where += " AND s.sr_dvcd = ANY(:ds)"
+                params["ds"] = filters.ds_code
 
         result = await self.db.execute(text(f"""
             SELECT
@@ -176,7 +269,7 @@ class Section3Service:
             HAVING COUNT(DISTINCT v.vh_trn) + COUNT(DISTINCT b.br_id)
                  + COUNT(DISTINCT sl.sil_id) + COUNT(DISTINCT a.ar_id) > 0
             ORDER BY s.sr_ssbname
-        """))
+        """), params)
         rows = result.fetchall()
         return [
             {
@@ -194,46 +287,53 @@ class Section3Service:
         """
         Get SSBM breakdown by Nikaya with vihara, bhikku and arama counts
         """
+        if self.snapshot is not None:
+            return self.snapshot.get_ssbm_by_nikaya(filters)
+        params = {}
         v_where = b_where = a_where = ""
-        if filters:
-            if filters.province_code:
-                v_where += f" AND v.vh_province = '{filters.province_code}'"
-                b_where += f" AND b.br_province = '{filters.province_code}'"
-                a_where += f" AND a.ar_province = '{filters.province_code}'"
-            if filters.district_code:
-                v_where += f" AND v.vh_district = '{filters.district_code}'"
-                b_where += f" AND b.br_district = '{filters.district_code}'"
-                a_where += f" AND a.ar_district = '{filters.district_code}'"
+        scope = location_scope(filters)
+        if scope:
+            v_where += " AND " + entity_location("vihara", "v", scope, params)
+            b_where += " AND " + entity_location("bikku", "b", scope, params)
+            a_where += " AND " + entity_location("arama", "a", scope, params)
 
+        # Each table is counted per nikaya before the join: joining the rows
+        # themselves multiplies vihara x bhikku x arama per nikaya
         result = await self.db.execute(text(f"""
             SELECT
                 n.nk_nkn                        AS nikaya_code,
                 n.nk_nname                      AS nikaya_name,
-                COUNT(DISTINCT sar.sar_id)      AS total,
-                COUNT(DISTINCT v.vh_trn)        AS vihara_count,
-                COUNT(DISTINCT b.br_id)         AS bhikku_count,
-                COUNT(DISTINCT a.ar_id)         AS arama_count
+                v.ssbm                          AS total,
+                v.viharas                       AS vihara_count,
+                COALESCE(b.n, 0)                AS bhikku_count,
+                COALESCE(a.n, 0)                AS arama_count
             FROM cmm_nikayadata n
-            LEFT JOIN vihaddata v
-                ON v.vh_nikaya = n.nk_nkn
-               AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
-               {v_where}
-            LEFT JOIN sasanarakshana_regist sar
-                ON sar.sar_temple_trn = v.vh_trn
-               AND (sar.sar_is_deleted = false OR sar.sar_is_deleted IS NULL)
-            LEFT JOIN bhikku_regist b
-                ON b.br_nikaya = n.nk_nkn
-               AND (b.br_is_deleted = false OR b.br_is_deleted IS NULL)
-               {b_where}
-            LEFT JOIN aramadata a
-                ON a.ar_nikaya = n.nk_nkn
-               AND (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL)
-               {a_where}
+            JOIN (
+                SELECT v.vh_nikaya AS nikaya,
+                       COUNT(DISTINCT v.vh_trn) AS viharas,
+                       COUNT(DISTINCT sar.sar_id) AS ssbm
+                FROM vihaddata v
+                LEFT JOIN sasanarakshana_regist sar
+                    ON sar.sar_temple_trn = v.vh_trn
+                   AND (sar.sar_is_deleted = false OR sar.sar_is_deleted IS NULL)
+                WHERE (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL) {v_where}
+                GROUP BY 1
+            ) v ON v.nikaya = n.nk_nkn AND v.ssbm > 0
+            LEFT JOIN (
+                SELECT b.br_nikaya AS nikaya, COUNT(*) AS n
+                FROM bhikku_regist b
+                WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL) {b_where}
+                GROUP BY 1
+            ) b ON b.nikaya = n.nk_nkn
+            LEFT JOIN (
+                SELECT a.ar_nikaya AS nikaya, COUNT(*) AS n
+                FROM aramadata a
+                WHERE (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL) {a_where}
+                GROUP BY 1
+            ) a ON a.nikaya = n.nk_nkn
             WHERE (n.nk_is_deleted = false OR n.nk_is_deleted IS NULL)
-            GROUP BY n.nk_nkn, n.nk_nname
-            HAVING COUNT(DISTINCT sar.sar_id) > 0
             ORDER BY total DESC
-        """))
+        """), params)
         rows = result.fetchall()
 
         return [
@@ -252,48 +352,47 @@ class Section3Service:
     async def get_divisional_secretariat(self, filters: DashboardFilters = None) -> List[DivisionalSecItem]:
         """
         Get Divisional Secretariat breakdown with vihara, bhikku, silmatha and arama counts.
-        Uses cmm_dvsec (dv_dvcode, dv_dvname, dv_distrcd) and cmm_gndata (gn_gnc, gn_dvcode).
+        Viharas are counted by vh_divisional_secretariat; bhikku, silmatha and arama by
+        their GN division, rolled up to its DS through location_closure. Each entity is
+        grouped separately so the counts need no DISTINCT over a joined product.
         """
-        v_where = ""
-        district_filter = ""
-        if filters:
-            if filters.province_code:
-                v_where += f" AND v.vh_province = '{filters.province_code}'"
-            if filters.district_code:
-                v_where += f" AND v.vh_district = '{filters.district_code}'"
-                district_filter = f" AND dv.dv_distrcd = '{filters.district_code}'"
+        params = {}
+        ds_filter = ""
+        condition = closure_condition("lc", location_scope(filters, finest="district"), params)
+        if condition:
+            ds_filter = f"AND {condition}"
+
+        def per_ds(table: str, gn_col: str, deleted_col: str) -> str:
+            return f"""
+                SELECT g.ds_code AS code, COUNT(*) AS n
+                FROM {table} x
+                JOIN location_closure g ON g.level = 'gn' AND g.code = x.{gn_col}
+                WHERE x.{deleted_col} = false OR x.{deleted_col} IS NULL
+                GROUP BY g.ds_code"""
 
         result = await self.db.execute(text(f"""
             SELECT
                 dv.dv_dvcode                    AS ds_code,
                 dv.dv_dvname                    AS ds_name,
-                COUNT(DISTINCT v.vh_trn)        AS vihara_count,
-                COUNT(DISTINCT b.br_id)         AS bhikku_count,
-                COUNT(DISTINCT s.sil_id)        AS silmatha_count,
-                COUNT(DISTINCT a.ar_id)         AS arama_count
-            FROM cmm_dvsec dv
-            LEFT JOIN vihaddata v
-                ON v.vh_divisional_secretariat = dv.dv_dvcode
-               AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
-               {v_where}
-            LEFT JOIN cmm_gndata gn
-                ON gn.gn_dvcode = dv.dv_dvcode
-               AND (gn.gn_is_deleted = false OR gn.gn_is_deleted IS NULL)
-            LEFT JOIN bhikku_regist b
-                ON b.br_gndiv = gn.gn_gnc
-               AND (b.br_is_deleted = false OR b.br_is_deleted IS NULL)
-            LEFT JOIN silmatha_regist s
-                ON s.sil_gndiv = gn.gn_gnc
-               AND (s.sil_is_deleted = false OR s.sil_is_deleted IS NULL)
-            LEFT JOIN aramadata a
-                ON a.ar_gndiv = gn.gn_gnc
-               AND (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL)
-            WHERE (dv.dv_is_deleted = false OR dv.dv_is_deleted IS NULL)
-              {district_filter}
-            GROUP BY dv.dv_dvcode, dv.dv_dvname
-            HAVING COUNT(DISTINCT v.vh_trn) > 0
+                v.n                             AS vihara_count,
+                COALESCE(b.n, 0)                AS bhikku_count,
+                COALESCE(s.n, 0)                AS silmatha_count,
+                COALESCE(a.n, 0)                AS arama_count
+            FROM location_closure lc
+            JOIN cmm_dvsec dv ON dv.dv_dvcode = lc.code
+            JOIN (
+                SELECT vh_divisional_secretariat AS code, COUNT(*) AS n
+                FROM vihaddata
+                WHERE vh_is_deleted = false OR vh_is_deleted IS NULL
+                GROUP BY vh_divisional_secretariat
+            ) v ON v.code = dv.dv_dvcode
+            LEFT JOIN ({per_ds("bhikku_regist", "br_gndiv", "br_is_deleted")})     b ON b.code = dv.dv_dvcode
+            LEFT JOIN ({per_ds("silmatha_regist", "sil_gndiv", "sil_is_deleted")}) s ON s.code = dv.dv_dvcode
+            LEFT JOIN ({per_ds("aramadata", "ar_gndiv", "ar_is_deleted")})          a ON a.code = dv.dv_dvcode
+            WHERE lc.level = 'ds'
+              {ds_filter}
             ORDER BY dv.dv_dvname
-        """))
+        """), params)
         rows = result.fetchall()
 
         return [
@@ -318,34 +417,54 @@ class Section3Service:
         if not filters or not filters.ds_code:
             return []
 
+        # Each table is counted per GN before the join: joining the rows
+        # themselves multiplies vihara x bhikku x silmatha x arama per GN
+        scope = location_scope(ds_code=filters.ds_code)
+        params = {}
+        v_where = entity_location("vihara", "v", scope, params)
+        b_where = entity_location("bikku", "b", scope, params)
+        s_where = entity_location("silmatha", "s", scope, params)
+        a_where = entity_location("arama", "a", scope, params)
+
         result = await self.db.execute(text(f"""
             SELECT
                 gn.gn_gnc                       AS gn_code,
                 gn.gn_gnname                    AS gn_name,
-                COUNT(DISTINCT v.vh_trn)        AS vihara_count,
-                COUNT(DISTINCT b.br_id)         AS bhikku_count,
-                COUNT(DISTINCT s.sil_id)        AS silmatha_count,
-                COUNT(DISTINCT a.ar_id)         AS arama_count
-            FROM cmm_gndata gn
-            LEFT JOIN vihaddata v
-                ON v.vh_gndiv = gn.gn_gnc
-               AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
-            LEFT JOIN bhikku_regist b
-                ON b.br_gndiv = gn.gn_gnc
-               AND (b.br_is_deleted = false OR b.br_is_deleted IS NULL)
-            LEFT JOIN silmatha_regist s
-                ON s.sil_gndiv = gn.gn_gnc
-               AND (s.sil_is_deleted = false OR s.sil_is_deleted IS NULL)
-            LEFT JOIN aramadata a
-                ON a.ar_gndiv = gn.gn_gnc
-               AND (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL)
-            WHERE (gn.gn_is_deleted = false OR gn.gn_is_deleted IS NULL)
-              AND gn.gn_dvcode = '{filters.ds_code}'
-            GROUP BY gn.gn_gnc, gn.gn_gnname
-            HAVING COUNT(DISTINCT v.vh_trn) + COUNT(DISTINCT b.br_id)
-                 + COUNT(DISTINCT s.sil_id) + COUNT(DISTINCT a.ar_id) > 0
+                COALESCE(v.n, 0)                AS vihara_count,
+                COALESCE(b.n, 0)                AS bhikku_count,
+                COALESCE(s.n, 0)                AS silmatha_count,
+                COALESCE(a.n, 0)                AS arama_count
+            FROM location_closure lc
+            JOIN cmm_gndata gn ON gn.gn_gnc = lc.code
+            LEFT JOIN (
+                SELECT v.vh_gndiv AS gn, COUNT(DISTINCT v.vh_trn) AS n
+                FROM vihaddata v
+                WHERE (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL) AND {v_where}
+                GROUP BY 1
+            ) v ON v.gn = gn.gn_gnc
+            LEFT JOIN (
+                SELECT b.br_gndiv AS gn, COUNT(*) AS n
+                FROM bhikku_regist b
+                WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL) AND {b_where}
+                GROUP BY 1
+            ) b ON b.gn = gn.gn_gnc
+            LEFT JOIN (
+                SELECT s.sil_gndiv AS gn, COUNT(*) AS n
+                FROM silmatha_regist s
+                WHERE (s.sil_is_deleted = false OR s.sil_is_deleted IS NULL) AND {s_where}
+                GROUP BY 1
+            ) s ON s.gn = gn.gn_gnc
+            LEFT JOIN (
+                SELECT a.ar_gndiv AS gn, COUNT(*) AS n
+                FROM aramadata a
+                WHERE (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL) AND {a_where}
+                GROUP BY 1
+            ) a ON a.gn = gn.gn_gnc
+            WHERE lc.level = 'gn'
+              AND lc.ds_code = ANY(:loc_codes)
+              AND COALESCE(v.n, 0) + COALESCE(b.n, 0) + COALESCE(s.n, 0) + COALESCE(a.n, 0) > 0
             ORDER BY gn.gn_gnname
-        """))
+        """), params)
         rows = result.fetchall()
 
         return [
@@ -361,42 +480,128 @@ class Section3Service:
             for row in rows
         ]
     
-    async def get_temple_list(self, filters: DashboardFilters = None, limit: int = 200, search: str = None, date_from: str = None, date_to: str = None) -> List[TempleListItem]:
+    async def get_temple_list(self, filters: DashboardFilters = None, limit: int = 200, search: str = None, date_from: date = None, date_to: date = None) -> List[TempleListItem]:
         """
         Get list of temples with rich field joins.
         Supports geographic/ecclesiastical filters, free-text search on name,
         and optional date range filter on vh_updated_at.
+        Served from the temple_listing projection when it exists.
         """
+        temples = await self._temples_from_listing(filters, limit, search, date_from, date_to)
+        if temples is not None:
+            return temples
+        return await self._get_temple_list_fallback(filters, limit, search, date_from, date_to)
+
+    async def _temples_from_listing(self, filters: DashboardFilters, limit: int, search: str, date_from: Optional[date], date_to: Optional[date]) -> Optional[List[TempleListItem]]:
+        """One indexed range scan of temple_listing; None if the table is missing."""
+        params = {"limit": limit}
+        where_clauses = []
+
+        scope = location_scope(filters)
+        if scope:
+            columns = {level: f"t.{column}" for level, column in LISTING_LOCATION_COLUMNS.items()}
+            where_clauses.append(columns_condition(scope, columns, params))
+        if filters:
+            for column, value in (
+                ("nikaya_code",   filters.nikaya_code),
+                ("parshawa_code", filters.parshawa_code),
+                ("grade",         filters.grade),
+            ):
+                if value:
+                    params[column] = value
+                    where_clauses.append(f"t.{column} = ANY(:{column})")
+            if getattr(filters, 'ssbm_code', None):
+                # A temple may belong to several SSBMs (migrations/ssbm_membership.sql)
+                params["ssbm_code"] = filters.ssbm_code
+                where_clauses.append(
+                    "t.vh_trn IN (SELECT m.vh_trn FROM ssbm_membership m WHERE m.ssbm_code = ANY(:ssbm_code))"
+                )
+
+        if search and search.strip():
+            params["search"] = f"%{search.strip()}%"
+            where_clauses.append("(t.vihara_name ILIKE :search OR t.vh_trn ILIKE :search)")
+
+        where_clauses += _updated_between("t.updated_at", date_from, date_to, params)
+
+        where_sql = " AND ".join(where_clauses) or "TRUE"
+
+        try:
+            async with self.db.begin_nested():
+                result = await self.db.execute(text(f"""
+                    SELECT
+                        t.vh_trn, t.vihara_name, t.address, t.nikaya_name, t.parshawa_name,
+                        t.grade, t.province_name, t.district_name, t.ds_name, t.gn_name,
+                        t.chief_of_temple, t.mobile, t.updated_at,
+                        t.bhikku_count, t.ssbm_count
+                    FROM temple_listing t
+                    WHERE {where_sql}
+                    ORDER BY t.vihara_name
+                    LIMIT :limit
+                """), params)
+                rows = result.fetchall()
+        except DBAPIError as exc:
+            if not is_undefined_table(exc):
+                raise
+            # temple_listing not migrated yet
+            return None
+
+        return [
+            TempleListItem(
+                vihara_id=row[0],
+                reg_no=row[0],
+                vihara_name=row[1] or "",
+                vihara_name_en=None,
+                address=row[2],
+                nikaya_name=row[3],
+                parshawa_name=row[4],
+                grade=row[5],
+                province_name=row[6],
+                district_name=row[7],
+                ds_name=row[8],
+                gn_name=row[9],
+                chief_of_temple=row[10],
+                mobile=row[11],
+                updated_at=str(row[12])[:19] if row[12] else None,
+                bhikku_count=row[13],
+                ssbm_count=row[14],
+                # legacy aliases
+                temple_trn=row[0],
+                temple_name=row[1] or "",
+            )
+            for row in rows
+        ]
+
+    async def _get_temple_list_fallback(self, filters: DashboardFilters, limit: int, search: str, date_from: Optional[date], date_to: Optional[date]) -> List[TempleListItem]:
+        """The temple list read from vihaddata, with names from the reference dictionary."""
+        params = {"limit": limit}
         where_clauses = ["(v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)"]
 
+        scope = location_scope(filters)
+        if scope:
+            where_clauses.append(entity_location("vihara", "v", scope, params))
         if filters:
-            if filters.province_code:
-                where_clauses.append(f"v.vh_province = '{filters.province_code}'")
-            if filters.district_code:
-                where_clauses.append(f"v.vh_district = '{filters.district_code}'")
-            if filters.ds_code:
-                where_clauses.append(f"v.vh_divisional_secretariat = '{filters.ds_code}'")
-            if filters.gn_code:
-                where_clauses.append(f"v.vh_gndiv = '{filters.gn_code}'")
             if filters.nikaya_code:
-                where_clauses.append(f"v.vh_nikaya = '{filters.nikaya_code}'")
+                where_clauses.append("v.vh_nikaya = ANY(:nikaya)")
+                params["nikaya"] = filters.nikaya_code
             if filters.parshawa_code:
-                where_clauses.append(f"v.vh_parshawa = '{filters.parshawa_code}'")
+                where_clauses.append("v.vh_parshawa = ANY(:parshawa)")
+                params["parshawa"] = filters.parshawa_code
             if getattr(filters, 'ssbm_code', None):
-                where_clauses.append(f"v.vh_ssbmcode = '{filters.ssbm_code}'")
+                # Temples join their SSBM through the DS (vh_ssbmcode is not populated)
+                where_clauses.append(
+                    "v.vh_divisional_secretariat IN (SELECT s.sr_dvcd FROM cmm_sasanarbm s "
+                    "WHERE s.sr_ssbmcode = ANY(:ssbm) AND (s.sr_is_deleted = false OR s.sr_is_deleted IS NULL))"
+                )
+                params["ssbm"] = filters.ssbm_code
             if filters.grade:
-                where_clauses.append(f"v.vh_typ = '{filters.grade}'")
+                where_clauses.append("v.vh_typ = ANY(:grade)")
+                params["grade"] = filters.grade
 
         if search and search.strip():
-            s = search.strip().replace("'", "''")
-            where_clauses.append(
-                f"(v.vh_vname ILIKE '%{s}%' OR v.vh_trn ILIKE '%{s}%')"
-            )
+            params["search"] = f"%{search.strip()}%"
+            where_clauses.append("(v.vh_vname ILIKE :search OR v.vh_trn ILIKE :search)")
 
-        if date_from:
-            where_clauses.append(f"v.vh_updated_at >= '{date_from}'")
-        if date_to:
-            where_clauses.append(f"v.vh_updated_at < ('{date_to}'::date + INTERVAL '1 day')")
+        where_clauses += _updated_between("v.vh_updated_at", date_from, date_to, params)
 
         where_sql = " AND ".join(where_clauses)
 
@@ -406,28 +611,29 @@ class Section3Service:
                 v.vh_trn                              AS reg_no,
                 v.vh_vname                            AS vihara_name,
                 v.vh_addrs                            AS address,
-                nk.nk_nname                           AS nikaya_name,
-                pr.pr_pname                           AS parshawa_name,
+                v.vh_nikaya                           AS nikaya_code,
+                v.vh_parshawa                         AS parshawa_code,
                 v.vh_typ                              AS grade,
-                prov.cp_name                          AS province_name,
-                dist.dd_dname                         AS district_name,
-                dv.dv_dvname                          AS ds_name,
-                gn.gn_gnname                          AS gn_name,
+                v.vh_province                         AS province_code,
+                v.vh_district                         AS district_code,
+                v.vh_divisional_secretariat           AS ds_code,
+                v.vh_gndiv                            AS gn_code,
                 v.vh_viharadhipathi_name              AS chief_of_temple,
                 v.vh_mobile                           AS mobile,
-                v.vh_updated_at                       AS updated_at
+                v.vh_updated_at                       AS updated_at,
+                (SELECT COUNT(*) FROM bhikku_regist b
+                 WHERE b.br_livtemple = v.vh_trn
+                   AND (b.br_is_deleted = false OR b.br_is_deleted IS NULL))     AS bhikku_count,
+                (SELECT COUNT(*) FROM sasanarakshana_regist sar
+                 WHERE sar.sar_temple_trn = v.vh_trn
+                   AND (sar.sar_is_deleted = false OR sar.sar_is_deleted IS NULL)) AS ssbm_count
             FROM vihaddata v
-            LEFT JOIN cmm_nikayadata  nk   ON nk.nk_nkn     = v.vh_nikaya
-            LEFT JOIN cmm_parshawadata pr  ON pr.pr_prn      = v.vh_parshawa
-            LEFT JOIN cmm_province    prov ON prov.cp_code   = v.vh_province
-            LEFT JOIN cmm_districtdata dist ON dist.dd_dcode = v.vh_district
-            LEFT JOIN cmm_dvsec       dv   ON dv.dv_dvcode   = v.vh_divisional_secretariat
-            LEFT JOIN cmm_gndata      gn   ON gn.gn_gnc      = v.vh_gndiv
             WHERE {where_sql}
             ORDER BY v.vh_vname
-            LIMIT {limit}
-        """))
+            LIMIT :limit
+        """), params)
         rows = result.fetchall()
+        names = await reference_names.get(self.db)
 
         return [
             TempleListItem(
@@ -436,16 +642,18 @@ class Section3Service:
                 vihara_name=row[2] or "",
                 vihara_name_en=None,
                 address=row[3],
-                nikaya_name=row[4],
-                parshawa_name=row[5],
+                nikaya_name=names.name("nikaya", row[4]),
+                parshawa_name=names.name("parshawa", row[5]),
                 grade=row[6],
-                province_name=row[7],
-                district_name=row[8],
-                ds_name=row[9],
-                gn_name=row[10],
+                province_name=names.name("provinces", row[7]),
+                district_name=names.name("districts", row[8]),
+                ds_name=names.name("ds", row[9]),
+                gn_name=names.name("gn", row[10]),
                 chief_of_temple=row[11],
                 mobile=row[12],
                 updated_at=str(row[13])[:19] if row[13] else None,
+                bhikku_count=row[14],
+                ssbm_count=row[15],
                 # legacy aliases
                 temple_trn=row[1],
                 temple_name=row[2] or "",
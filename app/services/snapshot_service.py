@@ -0,0 +1,593 @@
+"""
+Buddhist Affairs MIS Dashboard - Columnar Snapshot
+In-memory copy of the registration tables, one dictionary-encoded int32
+array per dimension (district, GN, nikaya, parshawa, grade, temple, ...),
+answering the Section 1/2/3 counts with boolean masks and np.bincount
+group-bys instead of a query.
+
+The methods mirror the SQL in section1/2/3_service.py, including what each
+one filters on and what it ignores, so their results can be compared
+one-for-one (see SNAPSHOT_METHODS and app/utils/snapshot.py, which decides
+when a snapshot is loaded, refreshed and trusted).
+"""
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import is_undefined_table
+from app.schemas.dashboard import (
+    BikkuTypeItem,
+    GeographicItem,
+    GeographicResponse,
+    ParshawaItem,
+    SSBMItem,
+    SummaryGradeItem,
+    SummaryNikayaItem,
+    SummaryTypeItem,
+)
+from app.schemas.filters import DashboardFilters
+from app.services.location import LocationScope, location_scope
+from app.services.section1_service import Section1Service, grade_name, type_items
+from app.services.section2_service import Section2Service, bikku_type_items
+from app.services.section3_service import Section3Service
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    table: str
+    key: str
+    deleted: str
+    updated: str
+    columns: Tuple[Tuple[str, str, str], ...]  # (array name, column, dimension)
+
+
+# Frame name → table.  Rows are kept whatever their deleted flag, since some
+# of the SQL (SSBM location, the district SSBM counts) joins deleted temples.
+TABLES: Dict[str, TableSpec] = {
+    "bikku": TableSpec("bhikku_regist", "br_id", "br_is_deleted", "br_updated_at", (
+        ("district", "br_district",   "district"),
+        ("gn",       "br_gndiv",      "gn"),
+        ("nikaya",   "br_nikaya",     "nikaya"),
+        ("parshawa", "br_parshawaya", "parshawa"),
+        ("regn",     "br_regn",       "regn"),
+    )),
+    "silmatha": TableSpec("silmatha_regist", "sil_id", "sil_is_deleted", "sil_updated_at", (
+        ("district", "sil_district", "district"),
+        ("gn",       "sil_gndiv",    "gn"),
+    )),
+    "vihara": TableSpec("vihaddata", "vh_id", "vh_is_deleted", "vh_updated_at", (
+        ("district", "vh_district", "district"),
+        ("gn",       "vh_gndiv",    "gn"),
+        ("nikaya",   "vh_nikaya",   "nikaya"),
+        ("parshawa", "vh_parshawa", "parshawa"),
+        ("grade",    "vh_typ",      "grade"),
+        ("trn",      "vh_trn",      "trn"),
+    )),
+    "arama": TableSpec("aramadata", "ar_id", "ar_is_deleted", "ar_updated_at", (
+        ("district", "ar_district", "district"),
+        ("gn",       "ar_gndiv",    "gn"),
+        ("nikaya",   "ar_nikaya",   "nikaya"),
+        ("parshawa", "ar_parshawa", "parshawa"),
+    )),
+    "ssbm": TableSpec("sasanarakshana_regist", "sar_id", "sar_is_deleted", "sar_updated_at", (
+        ("trn", "sar_temple_trn", "trn"),
+    )),
+    # Optional: Section2Service falls back when it does not exist
+    "upasampada": TableSpec("bhikku_high_regist", "bhr_id", "bhr_is_deleted", "bhr_updated_at", (
+        ("regn", "bhr_samanera_serial_no", "regn"),
+    )),
+}
+OPTIONAL_TABLES = ("upasampada",)
+
+# Tables whose changes only need the reference lists reloaded
+REFERENCE_TABLES = frozenset({
+    "cmm_province", "cmm_districtdata", "cmm_dvsec", "cmm_gndata",
+    "cmm_nikayadata", "cmm_parshawadata", "location_closure",
+})
+
+# (service, method) answered by the snapshot — validated against the SQL
+SNAPSHOT_METHODS = (
+    ("section1", "get_type_summary"),
+    ("section1", "get_nikaya_summary"),
+    ("section1", "get_grade_summary"),
+    ("section2", "get_bikku_type_breakdown"),
+    ("section2", "get_province_data"),
+    ("section2", "get_district_data"),
+    ("section3", "get_parshawa_breakdown"),
+    ("section3", "get_ssbm_by_nikaya"),
+)
+
+
+class Dictionary:
+    """Code ↔ integer mapping for one dimension; 0 stands for NULL"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.values: List[Optional[str]] = [None]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: Any) -> int:
+        if value is None:
+            return 0
+        value = str(value)
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Any) -> int:
+        """Code of a value; -1 (matches nothing) if it was never seen"""
+        return self.index.get(str(value), -1)
+
+
+class Frame:
+    """Columns of one table, row-aligned, with upsert by primary key"""
+
+    def __init__(self, spec: TableSpec):
+        self.spec = spec
+        self.ids = np.empty(0, np.int64)
+        self.alive = np.empty(0, bool)
+        self.cols = {name: np.empty(0, np.int32) for name, _, _ in spec.columns}
+        self.dims = {name: dim for name, _, dim in spec.columns}
+        self.position: Dict[int, int] = {}
+        self.updated_at = None  # high-water mark for incremental refreshes
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def upsert(self, rows: List[tuple], dims: Dict[str, Dictionary]) -> None:
+        """Apply (id, deleted, updated_at, *columns) rows: update in place or append."""
+        if not rows:
+            return
+        encoders = [dims[dim].encode for dim in self.dims.values()]
+        encoded = np.array(
+            [[encode(value) for encode, value in zip(encoders, row[3:])] for row in rows],
+            dtype=np.int32,
+        ).reshape(len(rows), len(encoders))
+        ids = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+        alive = np.fromiter((not row[1] for row in rows), bool, len(rows))
+
+        positions = np.fromiter((self.position.get(int(i), -1) for i in ids), np.int64, len(rows))
+        old = positions >= 0
+        if old.any():
+            at = positions[old]
+            self.alive[at] = alive[old]
+            for j, name in enumerate(self.cols):
+                self.cols[name][at] = encoded[old, j]
+        new = ~old
+        if new.any():
+            start = len(self.ids)
+            for offset, row_id in enumerate(ids[new]):
+                self.position[int(row_id)] = start + offset
+            self.ids = np.concatenate([self.ids, ids[new]])
+            self.alive = np.concatenate([self.alive, alive[new]])
+            for j, name in enumerate(self.cols):
+                self.cols[name] = np.concatenate([self.cols[name], encoded[new, j]])
+
+        stamps = [row[2] for row in rows if row[2] is not None]
+        if stamps:
+            latest = max(stamps)
+            if self.updated_at is None or latest > self.updated_at:
+                self.updated_at = latest
+
+
+class Snapshot:
+    """Columnar copy of the registration tables plus the reference lists the counts are keyed by"""
+
+    def __init__(self):
+        self.dims: Dict[str, Dictionary] = {
+            name: Dictionary()
+            for name in ("province", "district", "ds", "gn", "nikaya", "parshawa", "grade", "trn", "regn")
+        }
+        self.frames: Dict[str, Optional[Frame]] = {}
+        # Reference rows, in the order the SQL returns them
+        self.provinces: List[Tuple[str, str]] = []                 # (code, name) by name
+        self.districts: List[Tuple[str, str, str, str]] = []       # (code, name, province, closure district) by name
+        self.nikayas: List[Tuple[str, str]] = []                   # (code, name)
+        self.parshawas: List[Tuple[str, str, str]] = []            # (code, name, nikaya)
+        self._closure: List[tuple] = []
+        # Parent arrays indexed by child code
+        self.province_of = np.zeros(1, np.int32)  # district → province
+        self.ds_of = np.zeros(1, np.int32)        # gn → ds
+
+    def rows(self) -> Dict[str, int]:
+        return {name: len(frame) for name, frame in self.frames.items() if frame is not None}
+
+    # ── Loading ──────────────────────────────────────────────
+
+    async def load(self, db: AsyncSession) -> None:
+        """Full load of every table and reference list."""
+        await self.load_references(db)
+        for name in TABLES:
+            await self.load_table(db, name)
+        self._link()
+
+    async def load_table(self, db: AsyncSession, name: str) -> None:
+        spec = TABLES[name]
+        frame = Frame(spec)
+        try:
+            if name in OPTIONAL_TABLES:
+                async with db.begin_nested():
+                    await self._fetch(db, frame)
+            else:
+                await self._fetch(db, frame)
+        except DBAPIError as exc:
+            if name not in OPTIONAL_TABLES or not is_undefined_table(exc):
+                raise
+            frame = None  # table missing — answered like the SQL fallback
+        self.frames[name] = frame
+
+    async def refresh(self, db: AsyncSession, tables: Optional[set] = None) -> None:
+        """
+        Apply rows updated since the last load / refresh.  For `tables` (those
+        a change was announced on, None = all) the row count is also checked,
+        and a table that lost rows to a hard delete is reloaded.
+        """
+        for name, spec in TABLES.items():
+            frame = self.frames.get(name)
+            if frame is None:
+                if name in OPTIONAL_TABLES and (tables is None or spec.table in tables):
+                    await self.load_table(db, name)
+                continue
+            await self._fetch(db, frame, since=frame.updated_at)
+            if tables is None or spec.table in tables:
+                count = (await db.execute(text(f"SELECT COUNT(*) FROM {spec.table}"))).scalar() or 0
+                if count != len(frame):
+                    await self.load_table(db, name)
+        if tables is None or tables & REFERENCE_TABLES:
+            await self.load_references(db)
+        self._link()
+
+    async def _fetch(self, db: AsyncSession, frame: Frame, since=None) -> None:
+        spec = frame.spec
+        columns = ", ".join(column for _, column, _ in spec.columns)
+        where, params = "", {}
+        if since is not None:
+            # >= re-reads rows sharing the high-water timestamp; upserts are idempotent
+            where, params = f"WHERE {spec.updated} >= :since", {"since": since}
+        result = await db.execute(text(f"""
+            SELECT {spec.key}, {spec.deleted}, {spec.updated}, {columns}
+            FROM {spec.table}
+            {where}
+        """), params)
+        frame.upsert(result.fetchall(), self.dims)
+
+    async def load_references(self, db: AsyncSession) -> None:
+        result = await db.execute(text("""
+            SELECT cp_code, cp_name FROM cmm_province
+            WHERE cp_is_deleted = false OR cp_is_deleted IS NULL
+            ORDER BY cp_name
+        """))
+        self.provinces = [(row[0], row[1]) for row in result.fetchall()]
+
+        result = await db.execute(text("""
+            SELECT d.dd_dcode, d.dd_dname, lc.province_code, lc.district_code
+            FROM cmm_districtdata d
+            JOIN location_closure lc ON lc.level = 'district' AND lc.code = d.dd_dcode
+            WHERE d.dd_is_deleted = false OR d.dd_is_deleted IS NULL
+            ORDER BY d.dd_dname
+        """))
+        self.districts = [tuple(row) for row in result.fetchall()]
+
+        result = await db.execute(text("""
+            SELECT nk_nkn, nk_nname FROM cmm_nikayadata
+            WHERE nk_is_deleted = false OR nk_is_deleted IS NULL
+        """))
+        self.nikayas = list(dict.fromkeys((row[0], row[1]) for row in result.fetchall()))
+
+        result = await db.execute(text("""
+            SELECT pr_prn, pr_pname, pr_nikayacd FROM cmm_parshawadata
+            WHERE pr_is_deleted = false OR pr_is_deleted IS NULL
+        """))
+        self.parshawas = list(dict.fromkeys((row[0], row[1], row[2]) for row in result.fetchall()))
+
+        result = await db.execute(text("""
+            SELECT level, code, province_code, ds_code FROM location_closure
+            WHERE level IN ('district', 'gn')
+        """))
+        self._closure = result.fetchall()
+
+    def _link(self) -> None:
+        """Rebuild the parent arrays (codes may have been added by a refresh)."""
+        dims = self.dims
+        for level, code, province, ds in self._closure:
+            if level == "district":
+                dims["district"].encode(code)
+                dims["province"].encode(province)
+            else:
+                dims["gn"].encode(code)
+                dims["ds"].encode(ds)
+        self.province_of = np.zeros(len(dims["district"]), np.int32)
+        self.ds_of = np.zeros(len(dims["gn"]), np.int32)
+        for level, code, province, ds in self._closure:
+            if level == "district":
+                self.province_of[dims["district"].lookup(code)] = dims["province"].encode(province)
+            else:
+                self.ds_of[dims["gn"].lookup(code)] = dims["ds"].encode(ds)
+
+    # ── Masks and group-bys ──────────────────────────────────
+
+    def _frame(self, name: str) -> Frame:
+        return self.frames[name]
+
+    def _codes(self, dim: str, values: Sequence[str]) -> np.ndarray:
+        """Dictionary codes of `values` (-1 for unknown ones, which match nothing)"""
+        return np.array([self.dims[dim].lookup(value) for value in values], np.int32)
+
+    def _scope_mask(self, frame: Frame, scope: Optional[LocationScope]) -> Optional[np.ndarray]:
+        """Same rows as location.location_condition"""
+        if scope is None:
+            return None
+        mask = None
+        for level, codes in scope.levels():
+            if level == "district":
+                where = np.isin(frame.cols["district"], self._codes("district", codes))
+            elif level == "gn":
+                where = np.isin(frame.cols["gn"], self._codes("gn", codes))
+            elif level == "province":
+                where = np.isin(self.province_of[frame.cols["district"]], self._codes("province", codes))
+            else:
+                where = np.isin(self.ds_of[frame.cols["gn"]], self._codes("ds", codes))
+            mask = where if mask is None else mask & where
+        return mask
+
+    def _mask(self, name: str, scope: Optional[LocationScope] = None, alive: bool = True, **equal: Any) -> np.ndarray:
+        frame = self._frame(name)
+        mask = frame.alive.copy() if alive else np.ones(len(frame), bool)
+        where = self._scope_mask(frame, scope)
+        if where is not None:
+            mask &= where
+        for column, values in equal.items():
+            if values:
+                mask &= np.isin(frame.cols[column], self._codes(frame.dims[column], values))
+        return mask
+
+    def _group(self, name: str, column: str, mask: np.ndarray) -> np.ndarray:
+        """Row counts per code of `column`, indexable by every code of its dimension"""
+        frame = self._frame(name)
+        return np.bincount(frame.cols[column][mask], minlength=len(self.dims[frame.dims[column]]))
+
+    def _temples(self, mask: np.ndarray) -> np.ndarray:
+        """Boolean array over temple codes: a vihara row selected by `mask` has that TRN"""
+        selected = np.zeros(len(self.dims["trn"]), bool)
+        selected[self._frame("vihara").cols["trn"][mask]] = True
+        selected[0] = False  # NULL never joins
+        return selected
+
+    def _district_counts(self) -> Dict[str, np.ndarray]:
+        """Section2Service._DISTRICT_COUNTS: per-district counts, indexed by district code"""
+        counts = {
+            name: self._group(name, "district", self._mask(name))
+            for name in ("vihara", "bikku", "silmatha", "arama")
+        }
+        # SSBM: every registration joined to its temple's district, deleted or not
+        vihara = self._frame("vihara")
+        temple_district = np.zeros(len(self.dims["trn"]), np.int32)
+        temple_district[vihara.cols["trn"]] = vihara.cols["district"]
+        temples = self._temples(np.ones(len(vihara), bool))
+        trn = self._frame("ssbm").cols["trn"]
+        counts["ssbm"] = np.bincount(temple_district[trn[temples[trn]]], minlength=len(self.dims["district"]))
+        return counts
+
+    @staticmethod
+    def _at(counts: np.ndarray, code: int) -> int:
+        return int(counts[code]) if 0 <= code < len(counts) else 0
+
+    # ── Section 1 ────────────────────────────────────────────
+
+    def get_type_summary(self, filters: DashboardFilters = None) -> List[SummaryTypeItem]:
+        scope = location_scope(filters)
+        counts = {
+            name: int(self._mask(name, scope).sum())
+            for name in ("bikku", "silmatha", "vihara", "arama")
+        }
+        ssbm = self._mask("ssbm")
+        if scope:
+            # Located through the temple, deleted or not
+            temples = self._temples(self._mask("vihara", scope, alive=False))
+            ssbm &= temples[self._frame("ssbm").cols["trn"]]
+        counts["ssbm"] = int(ssbm.sum())
+        return type_items(counts)
+
+    def _nikaya_counts(self, scope: Optional[LocationScope], nikaya: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        return {
+            name: self._group(name, "nikaya", self._mask(name, scope, nikaya=nikaya))
+            for name in ("bikku", "vihara", "arama")
+        }
+
+    def get_nikaya_summary(self, filters: DashboardFilters = None) -> List[SummaryNikayaItem]:
+        counts = self._nikaya_counts(location_scope(filters), filters.nikaya_code if filters else None)
+        items = []
+        for code, name in self.nikayas:
+            at = self.dims["nikaya"].lookup(code)
+            bikku, vihara, arama = (self._at(counts[n], at) for n in ("bikku", "vihara", "arama"))
+            if bikku + vihara + arama > 0:
+                items.append(SummaryNikayaItem(
+                    nikaya_code=code, nikaya_name=name, total=bikku, bhikku_count=bikku,
+                    vihara_count=vihara, silmatha_count=0, arama_count=arama,
+                ))
+        items.sort(key=lambda item: -item.bhikku_count)
+        return items
+
+    def get_grade_summary(self, filters: DashboardFilters = None) -> List[SummaryGradeItem]:
+        counts = self._group("vihara", "grade", self._mask("vihara", location_scope(filters)))
+        items = [
+            SummaryGradeItem(grade=grade if grade is not None else "N/A", grade_name=grade_name(grade), total=int(total))
+            for grade, total in zip(self.dims["grade"].values, counts)
+            if total
+        ]
+        items.sort(key=lambda item: -item.total)
+        return items
+
+    # ── Section 2 ────────────────────────────────────────────
+
+    def get_bikku_type_breakdown(self, filters: DashboardFilters = None) -> List[BikkuTypeItem]:
+        bikku = self._mask("bikku", location_scope(filters), nikaya=filters.nikaya_code if filters else None)
+        high = self.frames.get("upasampada")
+        if high is None:
+            return bikku_type_items({"samanera": int(bikku.sum())})
+        # A bhikku is upasampada when an active higher registration names it
+        ordained = np.zeros(len(self.dims["regn"]), bool)
+        ordained[high.cols["regn"][high.alive]] = True
+        ordained[0] = False
+        upasampada = bikku & ordained[self._frame("bikku").cols["regn"]]
+        return bikku_type_items({
+            "samanera":   int((bikku & ~upasampada).sum()),
+            "upasampada": int(upasampada.sum()),
+        })
+
+    @staticmethod
+    def _geographic(code: str, name: str, counts: Dict[str, np.ndarray], at: int) -> GeographicItem:
+        value = lambda key: Snapshot._at(counts[key], at)
+        return GeographicItem(
+            code=code,
+            name=name or code,
+            vihara_count=value("vihara"),
+            bikku_count=value("bikku"),
+            silmatha_count=value("silmatha"),
+            arama_count=value("arama"),
+            dahampasal_teachers_count=0,
+            dahampasal_students_count=0,
+            ssbm_count=value("ssbm"),
+            dahampasal_count=0,
+        )
+
+    def get_province_data(self, filters: DashboardFilters = None) -> GeographicResponse:
+        per_district = self._district_counts()
+        size = len(self.dims["province"])
+        per_province = {
+            key: np.bincount(self.province_of, weights=counts, minlength=size).astype(np.int64)
+            for key, counts in per_district.items()
+        }
+        items = [
+            self._geographic(code, name, per_province, self.dims["province"].lookup(code))
+            for code, name in self.provinces
+        ]
+        return GeographicResponse(data=items, total_count=len(items))
+
+    def get_district_data(self, filters: DashboardFilters = None) -> GeographicResponse:
+        scope = location_scope(filters, finest="district")
+        counts = self._district_counts()
+        items = [
+            self._geographic(code, name, counts, self.dims["district"].lookup(code))
+            for code, name, province, closure_district in self.districts
+            if scope is None or all(
+                (province if level == "province" else closure_district) in codes
+                for level, codes in scope.levels()
+            )
+        ]
+        return GeographicResponse(data=items, total_count=len(items))
+
+    # ── Section 3 ────────────────────────────────────────────
+
+    def get_parshawa_breakdown(self, filters: DashboardFilters = None) -> List[ParshawaItem]:
+        scope = location_scope(filters)
+        counts = {
+            name: self._group(name, "parshawa", self._mask(name, scope))
+            for name in ("vihara", "bikku", "arama")
+        }
+        items = []
+        for code, name, nikaya in self.parshawas:
+            if filters and filters.nikaya_code and nikaya not in filters.nikaya_code:
+                continue
+            if filters and filters.parshawa_code and code not in filters.parshawa_code:
+                continue
+            at = self.dims["parshawa"].lookup(code)
+            vihara, bikku, arama = (self._at(counts[n], at) for n in ("vihara", "bikku", "arama"))
+            if vihara + bikku + arama > 0:
+                items.append(ParshawaItem(
+                    parshawa_code=code, parshawa_name=name or code, total=vihara, vihara_count=vihara,
+                    bhikku_count=bikku, silmatha_count=0, arama_count=arama,
+                ))
+        items.sort(key=lambda item: -item.vihara_count)
+
+        # "No Parshawa": NULL or blank
+        not_assigned = self._at(counts["vihara"], 0) + self._at(counts["vihara"], self.dims["parshawa"].lookup(""))
+        if not_assigned > 0:
+            items.append(ParshawaItem(
+                parshawa_code="NOT_ASSIGNED", parshawa_name="No Parshawa", total=not_assigned,
+                vihara_count=not_assigned, bhikku_count=0, silmatha_count=0, arama_count=0,
+            ))
+        return items
+
+    def get_ssbm_by_nikaya(self, filters: DashboardFilters = None) -> List[SSBMItem]:
+        scope = location_scope(filters)
+        counts = self._nikaya_counts(scope)
+        # SSBM registrations of the in-scope temples, grouped by the temple's nikaya
+        vihara = self._frame("vihara")
+        selected = self._mask("vihara", scope)
+        temple_nikaya = np.zeros(len(self.dims["trn"]), np.int32)
+        temple_nikaya[vihara.cols["trn"][selected]] = vihara.cols["nikaya"][selected]
+        temples = self._temples(selected)
+        ssbm = self._frame("ssbm")
+        trn = ssbm.cols["trn"][ssbm.alive]
+        totals = np.bincount(temple_nikaya[trn[temples[trn]]], minlength=len(self.dims["nikaya"]))
+
+        items = []
+        for code, name in self.nikayas:
+            at = self.dims["nikaya"].lookup(code)
+            total = self._at(totals, at)
+            if total > 0:
+                items.append(SSBMItem(
+                    nikaya_code=code, nikaya_name=name or code, total=total,
+                    vihara_count=self._at(counts["vihara"], at), bhikku_count=self._at(counts["bikku"], at),
+                    silmatha_count=0, arama_count=self._at(counts["arama"], at),
+                ))
+        items.sort(key=lambda item: -item.total)
+        return items
+
+
+def _normalized(result: Any) -> Any:
+    """Comparable form of a service result: rows in a fixed order (the SQL leaves ties unordered)"""
+    data = jsonable_encoder(result)
+    rows = data["data"] if isinstance(data, dict) and "data" in data else data
+    if isinstance(rows, list):
+        rows.sort(key=lambda row: json.dumps(row, sort_keys=True))
+    return data
+
+
+async def validate_snapshot(snapshot: Snapshot, db: AsyncSession) -> List[str]:
+    """
+    Compare every SNAPSHOT_METHODS result with its SQL for the national,
+    per-province and per-nikaya filters; returns the disagreeing calls.
+    """
+    services = {
+        "section1": Section1Service(db, use_snapshot=False),
+        "section2": Section2Service(db, use_snapshot=False),
+        "section3": Section3Service(db, use_snapshot=False),
+    }
+    filter_sets = (
+        [DashboardFilters()]
+        + [DashboardFilters(province_code=code) for code, _ in snapshot.provinces]
+        + [DashboardFilters(nikaya_code=code) for code, _ in snapshot.nikayas]
+        # One multi-value set, through the = ANY(...) predicates
+        + [DashboardFilters(province_code=[code for code, _ in snapshot.provinces[:2]])]
+        # Province and district together: their intersection
+        + [
+            DashboardFilters(province_code=province, district_code=district)
+            for district, _, own_province, _ in snapshot.districts[:1]
+            for province in {own_province, *(code for code, _ in snapshot.provinces[-1:])} if province
+        ]
+    )
+    mismatches = []
+    for filters in filter_sets:
+        for service, method in SNAPSHOT_METHODS:
+            call = f"{service}.{method}({filters.model_dump(exclude_defaults=True)})"
+            try:
+                async with db.begin_nested():
+                    expected = await getattr(services[service], method)(filters)
+            except Exception as e:
+                mismatches.append(f"{call}: SQL failed ({e})")
+                continue
+            if _normalized(getattr(snapshot, method)(filters)) != _normalized(expected):
+                mismatches.append(call)
+    return mismatches
@@ -1,9 +1,11 @@
 """
 Buddhist Affairs MIS Dashboard - Temple Service (Section 4 - Temple Profile)
 """
+import json
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Optional
+from typing import List, Optional
 
 from app.schemas.dashboard import (
     TempleGeneralInfo,
@@ -11,7 +13,12 @@ from app.schemas.dashboard import (
     TempleViharanga,
     TempleDahampasal,
     TempleProfileResponse,
+    TempleBatchItem,
+    TempleBatchResponse,
 )
+from app.schemas.filters import split_codes
+from app.services.location import entity_location, location_scope
+from app.utils.references import reference_names
 
 
 class TempleService:
@@ -34,19 +41,14 @@ class TempleService:
                 v.vh_viharadhipathi_name,
                 v.vh_viharadhipathi_regn,
                 v.vh_nikaya,
-                n.nk_nname as nikaya_name,
                 v.vh_parshawa,
-                p.pr_pname as parshawa_name,
                 v.vh_bgndate,
                 v.vh_period_established,
                 v.vh_province,
-                prov.cp_name as province_name,
                 v.vh_district,
-                dist.dd_dname as district_name,
                 v.vh_divisional_secretariat,
                 v.vh_pradeshya_sabha,
                 v.vh_gndiv,
-                gn.gn_gnname as gn_name,
                 v.vh_buildings_description,
                 v.vh_dayaka_families_count,
                 v.vh_kulangana_committee,
@@ -56,11 +58,6 @@ class TempleService:
                 v.vh_typ,
                 v.vh_workflow_status
             FROM vihaddata v
-            LEFT JOIN cmm_nikayadata n ON v.vh_nikaya = n.nk_nkn
-            LEFT JOIN cmm_parshawadata p ON v.vh_parshawa = p.pr_prn
-            LEFT JOIN cmm_province prov ON v.vh_province = prov.cp_code
-            LEFT JOIN cmm_districtdata dist ON v.vh_district = dist.dd_dcode
-            LEFT JOIN cmm_gndata gn ON v.vh_gndiv = gn.gn_gnc
             WHERE v.vh_trn = :temple_trn
               AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
         """), {"temple_trn": temple_trn})
@@ -69,6 +66,8 @@ class TempleService:
         
         if not row:
             return None
+
+        names = await reference_names.get(self.db)
         
         # Build general info
         general_info = TempleGeneralInfo(
@@ -80,31 +79,31 @@ class TempleService:
             registration_no=row[0],
             viharadhipathi_name=row[5],
             viharadhipathi_regn=row[6],
-            nikaya=row[8] or row[7],  # Use name if available
-            parshawa=row[10] or row[9],  # Use name if available
-            establishment_date=row[11],
-            period_established=row[12]
+            nikaya=names.name("nikaya", row[7]) or row[7],  # Use name if available
+            parshawa=names.name("parshawa", row[8]) or row[8],  # Use name if available
+            establishment_date=row[9],
+            period_established=row[10]
         )
         
         # Build location info
         location = TempleLocation(
-            province=row[13],
-            province_name=row[14],
-            district=row[15],
-            district_name=row[16],
-            divisional_secretariat=row[17],
-            pradeshya_sabha=row[18],
-            gn_division=row[20] or row[19]  # Use name if available
+            province=row[11],
+            province_name=names.name("provinces", row[11]),
+            district=row[12],
+            district_name=names.name("districts", row[12]),
+            divisional_secretariat=row[13],
+            pradeshya_sabha=row[14],
+            gn_division=names.name("gn", row[15]) or row[15]  # Use name if available
         )
         
         # Build viharanga info
         viharanga = TempleViharanga(
-            buildings_description=row[21],
-            dayaka_families_count=row[22],
-            kulangana_committee=row[23],
-            dayaka_sabha=row[24],
-            temple_working_committee=row[25],
-            other_associations=row[26]
+            buildings_description=row[16],
+            dayaka_families_count=row[17],
+            kulangana_committee=row[18],
+            dayaka_sabha=row[19],
+            temple_working_committee=row[20],
+            other_associations=row[21]
         )
         
         # Build dahampasal info (placeholder - table doesn't exist)
@@ -119,8 +118,8 @@ class TempleService:
             location=location,
             viharanga=viharanga,
             dahampasal=dahampasal,
-            grade=row[27],
-            workflow_status=row[28]
+            grade=row[22],
+            workflow_status=row[23]
         )
     
     async def search_temples(
@@ -143,20 +142,18 @@ class TempleService:
             where_clauses.append("(vh_vname ILIKE :search OR vh_addrs ILIKE :search OR vh_trn ILIKE :search)")
             params["search"] = f"%{search_term}%"
         
-        if province_code:
-            where_clauses.append("vh_province = :province")
-            params["province"] = province_code
-        
-        if district_code:
-            where_clauses.append("vh_district = :district")
-            params["district"] = district_code
+        scope = location_scope(province_code=province_code, district_code=district_code)
+        if scope:
+            where_clauses.append(entity_location("vihara", "", scope, params))
         
+        nikaya_code = split_codes(nikaya_code)
         if nikaya_code:
-            where_clauses.append("vh_nikaya = :nikaya")
+            where_clauses.append("vh_nikaya = ANY(:nikaya)")
             params["nikaya"] = nikaya_code
         
+        grade = split_codes(grade)
         if grade:
-            where_clauses.append("vh_typ = :grade")
+            where_clauses.append("vh_typ = ANY(:grade)")
             params["grade"] = grade
         
         where_sql = " AND ".join(where_clauses)
@@ -239,3 +236,108 @@ class TempleService:
         stats["has_ssbm"] = (result.scalar() or 0) > 0
         
         return stats
+
+    async def get_temple_batch(self, temple_trns: List[str]) -> TempleBatchResponse:
+        """
+        Get profiles and statistics for many temples in one statement.
+        Each temple's document is assembled in SQL with json_build_object and
+        the result comes back as a single JSON object keyed by TRN; the
+        documents carry codes and the names are filled in from the reference
+        dictionary.
+        """
+        trns = list(dict.fromkeys(t.strip() for t in temple_trns if t and t.strip()))
+        if not trns:
+            return TempleBatchResponse()
+
+        result = await self.db.execute(text("""
+            WITH bikku AS (
+                SELECT br_livtemple AS trn, COUNT(*) AS bikku_count
+                FROM bhikku_regist
+                WHERE br_livtemple = ANY(:trns)
+                  AND (br_is_deleted = false OR br_is_deleted IS NULL)
+                GROUP BY br_livtemple
+            ),
+            ssbm AS (
+                SELECT sar_temple_trn AS trn, COUNT(*) AS ssbm_count
+                FROM sasanarakshana_regist
+                WHERE sar_temple_trn = ANY(:trns)
+                  AND (sar_is_deleted = false OR sar_is_deleted IS NULL)
+                GROUP BY sar_temple_trn
+            )
+            SELECT COALESCE(json_object_agg(v.vh_trn, json_build_object(
+                'profile', json_build_object(
+                    'general_info', json_build_object(
+                        'temple_trn',          v.vh_trn,
+                        'name',                COALESCE(NULLIF(v.vh_vname, ''), 'Unknown'),
+                        'address',             v.vh_addrs,
+                        'mobile',              v.vh_mobile,
+                        'email',               v.vh_email,
+                        'registration_no',     v.vh_trn,
+                        'viharadhipathi_name', v.vh_viharadhipathi_name,
+                        'viharadhipathi_regn', v.vh_viharadhipathi_regn,
+                        'nikaya',              v.vh_nikaya,
+                        'parshawa',            v.vh_parshawa,
+                        'establishment_date',  v.vh_bgndate,
+                        'period_established',  v.vh_period_established
+                    ),
+                    'location', json_build_object(
+                        'province',               v.vh_province,
+                        'province_name',          NULL,
+                        'district',               v.vh_district,
+                        'district_name',          NULL,
+                        'divisional_secretariat', v.vh_divisional_secretariat,
+                        'pradeshya_sabha',        v.vh_pradeshya_sabha,
+                        'gn_division',            v.vh_gndiv
+                    ),
+                    'viharanga', json_build_object(
+                        'buildings_description',    v.vh_buildings_description,
+                        'dayaka_families_count',    v.vh_dayaka_families_count,
+                        'kulangana_committee',      v.vh_kulangana_committee,
+                        'dayaka_sabha',             v.vh_dayaka_sabha,
+                        'temple_working_committee', v.vh_temple_working_committee,
+                        'other_associations',       v.vh_other_associations
+                    ),
+                    'dahampasal', json_build_object(
+                        'dahampasal_name', NULL,
+                        'teachers_count',  0,
+                        'students_count',  0
+                    ),
+                    'grade',           v.vh_typ,
+                    'workflow_status', v.vh_workflow_status
+                ),
+                'statistics', json_build_object(
+                    'bikku_count',               COALESCE(bk.bikku_count, 0),
+                    'silmatha_count',            0,
+                    'dahampasal_teachers_count', 0,
+                    'dahampasal_students_count', 0,
+                    'has_ssbm',                  COALESCE(sb.ssbm_count, 0) > 0
+                )
+            )), '{}'::json) AS temples
+            FROM vihaddata v
+            LEFT JOIN bikku bk ON bk.trn = v.vh_trn
+            LEFT JOIN ssbm sb ON sb.trn = v.vh_trn
+            WHERE v.vh_trn = ANY(:trns)
+              AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
+        """), {"trns": trns})
+
+        documents = result.scalar() or {}
+        if isinstance(documents, str):
+            documents = json.loads(documents)
+
+        names = await reference_names.get(self.db)
+        for doc in documents.values():
+            general_info = doc["profile"]["general_info"]
+            general_info["nikaya"] = names.name("nikaya", general_info["nikaya"]) or general_info["nikaya"]
+            general_info["parshawa"] = names.name("parshawa", general_info["parshawa"]) or general_info["parshawa"]
+            location = doc["profile"]["location"]
+            location["province_name"] = names.name("provinces", location["province"])
+            location["district_name"] = names.name("districts", location["district"])
+            location["gn_division"] = names.name("gn", location["gn_division"]) or location["gn_division"]
+
+        return TempleBatchResponse(
+            temples={
+                trn: TempleBatchItem.model_validate(doc)
+                for trn, doc in documents.items()
+            },
+            not_found=[trn for trn in trns if trn not in documents],
+        )
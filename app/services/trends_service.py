@@ -0,0 +1,181 @@
+"""
+Buddhist Affairs MIS Dashboard - Registration Trends Service
+New registrations per month / week, by entity type and region.
+
+Monthly series are read from registration_monthly_rollup, which triggers
+keep current (see migrations/registration_trends.sql), so a ten-year chart
+touches a few thousand small rows.  Weekly series — and monthly ones when
+the rollup is not installed — aggregate the base tables over a
+*_created_at range, which the BRIN indexes from the same migration serve.
+Provinces are resolved from each row's district through location_closure.
+"""
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from typing import Any, Dict, List, Optional
+
+from app.database import is_undefined_table
+from app.schemas.dashboard import TrendPoint, TrendResponse
+from app.services.location import location_condition, location_scope
+
+TREND_GRANULARITIES = ("month", "week")
+TREND_GROUP_BY = ("province", "district")
+
+# entity → (FROM clause, created, district, soft-delete flag)
+# Must match the rollup triggers in migrations/registration_trends.sql.
+TREND_ENTITIES: Dict[str, tuple] = {
+    "bikku":    ("bhikku_regist r", "r.br_created_at", "r.br_district", "r.br_is_deleted"),
+    "silmatha": ("silmatha_regist r", "r.sil_created_at", "r.sil_district", "r.sil_is_deleted"),
+    "vihara":   ("vihaddata r", "r.vh_created_at", "r.vh_district", "r.vh_is_deleted"),
+    "arama":    ("aramadata r", "r.ar_created_at", "r.ar_district", "r.ar_is_deleted"),
+    "ssbm":     ("sasanarakshana_regist r LEFT JOIN vihaddata v ON v.vh_trn = r.sar_temple_trn",
+                 "r.sar_created_at", "v.vh_district", "r.sar_is_deleted"),
+}
+
+# Tables a trend response depends on, for change-notification invalidation
+TREND_TABLES = frozenset({
+    "bhikku_regist", "silmatha_regist", "vihaddata", "aramadata",
+    "sasanarakshana_regist", "cmm_districtdata", "location_closure",
+})
+
+# Weekly series without an explicit date_from cover this many weeks
+DEFAULT_WEEKS = 26
+
+
+class TrendsService:
+    """Service for registration trend series"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_registration_trends(
+        self,
+        granularity: str = "month",
+        entities: Optional[List[str]] = None,
+        province_code: Optional[str] = None,
+        district_code: Optional[str] = None,
+        group_by: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> TrendResponse:
+        """
+        Registrations per period for each requested entity type.
+        date_from / date_to are inclusive; periods are those that start in range
+        (monthly) or contain a registration in range (weekly).
+        """
+        entities = [e for e in (entities or TREND_ENTITIES) if e in TREND_ENTITIES]
+        if granularity == "week" and date_from is None:
+            date_from = (date_to or date.today()) - timedelta(weeks=DEFAULT_WEEKS)
+
+        rows = None
+        if granularity == "month":
+            rows = await self._from_rollup(entities, province_code, district_code, group_by, date_from, date_to)
+        if rows is None:
+            rows = await self._from_base_tables(
+                granularity, entities, province_code, district_code, group_by, date_from, date_to
+            )
+
+        return TrendResponse(
+            granularity=granularity,
+            group_by=group_by,
+            date_from=date_from,
+            date_to=date_to,
+            series=[
+                TrendPoint(period=row.period, entity=row.entity, region_code=row.region_code, count=int(row.count))
+                for row in rows
+            ],
+        )
+
+    async def _from_rollup(
+        self,
+        entities: List[str],
+        province_code: Optional[str],
+        district_code: Optional[str],
+        group_by: Optional[str],
+        date_from: Optional[date],
+        date_to: Optional[date],
+    ) -> Optional[list]:
+        """Monthly series from the rollup, or None when it is not installed"""
+        params: Dict[str, Any] = {"entities": entities}
+        where = ["entity = ANY(:entities)"]
+        scope = location_scope(province_code=province_code, district_code=district_code)
+        if scope:
+            where.append(location_condition(scope, "district", "district", params))
+        if date_from:
+            where.append("month >= date_trunc('month', CAST(:date_from AS date))")
+            params["date_from"] = date_from
+        if date_to:
+            where.append("month <= CAST(:date_to AS date)")
+            params["date_to"] = date_to
+
+        region = {"province": "lc.province_code", "district": "NULLIF(district, '')"}.get(group_by, "NULL")
+        sql = f"""
+            SELECT entity, month AS period, {region} AS region_code,
+                   SUM(registrations)::bigint AS count
+            FROM registration_monthly_rollup
+            LEFT JOIN location_closure lc ON lc.level = 'district' AND lc.code = district
+            WHERE {' AND '.join(where)}
+            GROUP BY 1, 2, 3
+            HAVING SUM(registrations) <> 0
+            ORDER BY period, entity, region_code
+        """
+        try:
+            # Savepoint so a missing table does not abort the caller's transaction
+            async with self.db.begin_nested():
+                result = await self.db.execute(text(sql), params)
+                return result.fetchall()
+        except DBAPIError as exc:
+            if not is_undefined_table(exc):
+                raise
+            return None
+
+    async def _from_base_tables(
+        self,
+        granularity: str,
+        entities: List[str],
+        province_code: Optional[str],
+        district_code: Optional[str],
+        group_by: Optional[str],
+        date_from: Optional[date],
+        date_to: Optional[date],
+    ) -> list:
+        """Series aggregated from the registration tables over a created_at range"""
+        if not entities:
+            return []
+
+        params: Dict[str, Any] = {}
+        scope = location_scope(province_code=province_code, district_code=district_code)
+        if date_from:
+            params["date_from"] = date_from
+        if date_to:
+            params["date_to"] = date_to
+
+        parts = []
+        for entity in entities:
+            source, created, district_col, deleted = TREND_ENTITIES[entity]
+            region = {"province": "lc.province_code", "district": district_col}.get(group_by, "NULL")
+
+            where = [f"{created} IS NOT NULL", f"({deleted} = false OR {deleted} IS NULL)"]
+            # Plain range on the raw column so the BRIN index applies
+            if date_from:
+                where.append(f"{created} >= CAST(:date_from AS date)")
+            if date_to:
+                where.append(f"{created} < CAST(:date_to AS date) + 1")
+            if scope:
+                where.append(location_condition(scope, district_col, district_col, params))
+
+            parts.append(f"""
+                SELECT '{entity}' AS entity,
+                       date_trunc('{granularity}', {created})::date AS period,
+                       NULLIF({region}, '') AS region_code,
+                       COUNT(*) AS count
+                FROM {source}
+                LEFT JOIN location_closure lc ON lc.level = 'district' AND lc.code = {district_col}
+                WHERE {' AND '.join(where)}
+                GROUP BY 1, 2, 3
+            """)
+
+        sql = " UNION ALL ".join(parts) + " ORDER BY period, entity, region_code"
+        result = await self.db.execute(text(sql), params)
+        return result.fetchall()
@@ -0,0 +1,361 @@
+"""
+Buddhist Affairs MIS Dashboard - Autocomplete Index
+In-memory type-ahead over district, DS, GN, SSBM and temple names for
+GET /lookups/autocomplete; a search never touches Postgres.
+
+Every name is indexed in one "loose" form: Unicode-normalized, case-folded,
+zero-width joiners removed, Sinhala romanized and long vowels shortened
+(කුරුණෑගල → kurunegala), so Sinhala, romanized and English queries land on
+the same keys.  Each kind keeps
+
+- a sorted token list for prefix matches (every word, the whole name, the code)
+- a trigram posting list for misspelt or mid-word queries, used only when the
+  prefixes do not fill the page
+
+Kinds are rebuilt independently — rows read with the async session, the
+index built in a worker thread — after change notifications for their
+tables (debounced), or every REFERENCE_TTL_SECONDS while the change
+listener is not connected.  Until a rebuild lands the previous index keeps
+answering.
+"""
+import asyncio
+import heapq
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory
+from app.utils.cache import ChangeEvent
+from app.utils.cache_invalidation import cache_listener
+
+# ── Normalization ────────────────────────────────────────────
+
+_ZERO_WIDTH = dict.fromkeys(map(ord, "\u200b\u200c\u200d\ufeff"))
+
+# Sinhala → Latin, the way place names are usually spelt in English
+_SINHALA_VOWELS = {
+    "අ": "a", "ආ": "a", "ඇ": "e", "ඈ": "e", "ඉ": "i", "ඊ": "i", "උ": "u", "ඌ": "u",
+    "ඍ": "ru", "ඎ": "ru", "ඏ": "lu", "ඐ": "lu", "එ": "e", "ඒ": "e", "ඓ": "ai",
+    "ඔ": "o", "ඕ": "o", "ඖ": "au",
+}
+_SINHALA_SIGNS = {
+    "ා": "a", "ැ": "e", "ෑ": "e", "ි": "i", "ී": "i", "ු": "u", "ූ": "u",
+    "ෘ": "ru", "ෲ": "ru", "ෟ": "lu", "ෳ": "lu", "ෙ": "e", "ේ": "e", "ෛ": "ai",
+    "ො": "o", "ෝ": "o", "ෞ": "au",
+}
+_SINHALA_CONSONANTS = {
+    "ක": "k", "ඛ": "kh", "ග": "g", "ඝ": "gh", "ඞ": "ng", "ඟ": "ng",
+    "ච": "ch", "ඡ": "ch", "ජ": "j", "ඣ": "jh", "ඤ": "gn", "ඥ": "gn", "ඦ": "nj",
+    "ට": "t", "ඨ": "th", "ඩ": "d", "ඪ": "dh", "ණ": "n", "ඬ": "nd",
+    "ත": "t", "ථ": "th", "ද": "d", "ධ": "dh", "න": "n", "ඳ": "nd",
+    "ප": "p", "ඵ": "ph", "බ": "b", "භ": "bh", "ම": "m", "ඹ": "mb",
+    "ය": "y", "ර": "r", "ල": "l", "ව": "w", "ශ": "sh", "ෂ": "sh", "ස": "s",
+    "හ": "h", "ළ": "l", "ෆ": "f",
+}
+_SINHALA_MARKS = {"ං": "n", "ඃ": "h", "්": ""}
+# Latin spellings folded the same way as the romanization
+_LOOSE_LATIN = [(re.compile(r"([aeiou])\1+"), r"\1"), (re.compile("v"), "w")]
+
+
+def normalize(value: str) -> str:
+    """NFC, zero-width joiners removed, case-folded, punctuation to single spaces."""
+    value = unicodedata.normalize("NFC", value or "").translate(_ZERO_WIDTH).casefold()
+    # Letters, marks (Sinhala vowel signs) and digits are kept; the rest separates words
+    value = "".join(ch if unicodedata.category(ch)[0] in "LMN" else " " for ch in value)
+    return " ".join(value.split())
+
+
+def romanize(value: str) -> str:
+    """Sinhala letters of `value` in Latin (other characters unchanged)."""
+    out: List[str] = []
+    chars = list(value)
+    for i, ch in enumerate(chars):
+        if ch in _SINHALA_CONSONANTS:
+            out.append(_SINHALA_CONSONANTS[ch])
+            following = chars[i + 1] if i + 1 < len(chars) else ""
+            if following not in _SINHALA_SIGNS and following != "්":
+                out.append("a")  # inherent vowel
+        elif ch in _SINHALA_SIGNS:
+            out.append(_SINHALA_SIGNS[ch])
+        elif ch in _SINHALA_VOWELS:
+            out.append(_SINHALA_VOWELS[ch])
+        elif ch in _SINHALA_MARKS:
+            out.append(_SINHALA_MARKS[ch])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def loose(value: str) -> str:
+    """The single search form of a name or query."""
+    value = romanize(normalize(value))
+    # Strip Latin diacritics (Kōṭṭe → kotte)
+    value = "".join(
+        ch for ch in unicodedata.normalize("NFKD", value) if not unicodedata.combining(ch)
+    )
+    for pattern, replacement in _LOOSE_LATIN:
+        value = pattern.sub(replacement, value)
+    return value
+
+
+def trigrams(value: str) -> Set[str]:
+    padded = f"  {value} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# ── Index ────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class Entry:
+    code: str
+    name: str
+    context: Optional[str]
+    native: str     # normalize(name)
+    key: str        # loose(name)
+    tokens: Tuple[str, ...]
+
+
+class KindIndex:
+    """Prefix + trigram index over one kind's names (immutable once built)"""
+
+    def __init__(self, rows: Iterable[Sequence]):
+        self.entries: List[Entry] = []
+        self.gram_counts: List[int] = []
+        tokens: List[Tuple[str, int]] = []
+        postings: Dict[str, List[int]] = {}
+        for code, name, context in rows:
+            if not name and not code:
+                continue
+            name = str(name or code)
+            key = loose(name)
+            words = tuple(dict.fromkeys([*key.split(), key, str(code).casefold()]))
+            position = len(self.entries)
+            self.entries.append(Entry(str(code), name, context, normalize(name), key, words))
+            tokens.extend((word, position) for word in words)
+            grams = trigrams(key)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        tokens.sort()
+        self.tokens = tokens
+        self.postings = postings
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def prefixed(self, prefix: str, cap: int) -> Set[int]:
+        """Entries with a token starting with `prefix` (at most `cap`)."""
+        found: Set[int] = set()
+        i = bisect_left(self.tokens, (prefix,))
+        while i < len(self.tokens) and len(found) < cap:
+            token, position = self.tokens[i]
+            if not token.startswith(prefix):
+                break
+            found.add(position)
+            i += 1
+        return found
+
+    def similar(self, query_grams: Set[str], cap: int, best: int) -> Dict[int, float]:
+        """The `best` entries sharing most trigrams with the query → Jaccard similarity."""
+        shared: Counter = Counter()
+        for gram in query_grams:
+            posting = self.postings.get(gram, ())
+            if len(posting) <= cap:  # grams in most names say little
+                shared.update(posting)
+        return {
+            position: count / (len(query_grams) + self.gram_counts[position] - count)
+            for position, count in shared.most_common(best)
+        }
+
+
+# kind → loading query (code, name, context); only active rows
+KIND_SOURCES = {
+    "district": """
+        SELECT d.dd_dcode, d.dd_dname, p.cp_name
+        FROM cmm_districtdata d
+        LEFT JOIN cmm_province p ON p.cp_code = d.dd_prcode
+        WHERE d.dd_is_deleted = false OR d.dd_is_deleted IS NULL
+    """,
+    "ds": """
+        SELECT dv.dv_dvcode, dv.dv_dvname, d.dd_dname
+        FROM cmm_dvsec dv
+        LEFT JOIN cmm_districtdata d ON d.dd_dcode = dv.dv_distrcd
+        WHERE dv.dv_is_deleted = false OR dv.dv_is_deleted IS NULL
+    """,
+    "gn": """
+        SELECT gn.gn_gnc, gn.gn_gnname, dv.dv_dvname
+        FROM cmm_gndata gn
+        LEFT JOIN cmm_dvsec dv ON dv.dv_dvcode = gn.gn_dvcode
+        WHERE gn.gn_is_deleted = false OR gn.gn_is_deleted IS NULL
+    """,
+    "ssbm": """
+        SELECT sr.sr_ssbmcode, sr.sr_ssbname, d.dd_dname
+        FROM cmm_sasanarbm sr
+        LEFT JOIN cmm_districtdata d ON d.dd_dcode = sr.sr_discd
+    """,
+    "temple": """
+        SELECT v.vh_trn, v.vh_vname, d.dd_dname
+        FROM vihaddata v
+        LEFT JOIN cmm_districtdata d ON d.dd_dcode = v.vh_district
+        WHERE v.vh_is_deleted = false OR v.vh_is_deleted IS NULL
+    """,
+}
+
+# Table → kinds whose names or contexts it feeds
+KIND_TABLES = {
+    "cmm_province": {"district"},
+    "cmm_districtdata": {"district", "ds", "ssbm", "temple"},
+    "cmm_dvsec": {"ds", "gn"},
+    "cmm_gndata": {"gn"},
+    "cmm_sasanarbm": {"ssbm"},
+    "vihaddata": {"temple"},
+}
+
+# Larger areas first when scores tie
+KIND_WEIGHT = {"district": 4, "ds": 3, "gn": 2, "ssbm": 1, "temple": 0}
+
+# Candidates read per kind; the token list is sorted, so the shortest
+# matching words come first
+_PREFIX_CAP = 200
+_TRIGRAM_CAP = 2000
+_MIN_SIMILARITY = 0.3
+
+
+class AutocompleteIndex:
+    """Per-kind indexes, their loading and their refresh on changes"""
+
+    def __init__(self, ttl_seconds: int, debounce_seconds: float = 1.0):
+        self.ttl_seconds = ttl_seconds
+        self.debounce_seconds = debounce_seconds
+        self.kinds: Dict[str, KindIndex] = {}
+        self.loaded_at: Optional[float] = None
+        self._dirty: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return len(self.kinds) == len(KIND_SOURCES)
+
+    # ── Loading ──────────────────────────────────────────────
+
+    async def load(self, db: AsyncSession, kinds: Iterable[str] = KIND_SOURCES) -> None:
+        async with self._lock:
+            await self._load(db, kinds)
+
+    async def _load(self, db: AsyncSession, kinds: Iterable[str]) -> None:
+        for kind in kinds:
+            self._dirty.discard(kind)
+            result = await db.execute(text(KIND_SOURCES[kind]))
+            rows = result.fetchall()
+            # Building the token and trigram lists is CPU work; keep it off the event loop
+            self.kinds[kind] = await asyncio.to_thread(KindIndex, rows)
+        self.loaded_at = time.time()
+
+    async def ensure(self, db: AsyncSession) -> None:
+        """Load whatever is missing (first request before the warm-up finished)."""
+        if not self.ready:
+            async with self._lock:
+                missing = [kind for kind in KIND_SOURCES if kind not in self.kinds]
+                if missing:
+                    await self._load(db, missing)
+                    print(f"✅ Autocomplete index loaded {self.sizes()}")
+        elif (
+            not cache_listener.connected
+            and time.time() - self.loaded_at > self.ttl_seconds
+        ):
+            self._schedule(KIND_SOURCES)
+
+    def on_change(self, event: ChangeEvent) -> None:
+        """Cache-invalidation subscriber"""
+        kinds = KIND_TABLES.get(event.table)
+        if kinds and self.kinds:
+            self._schedule(kinds)
+
+    def _schedule(self, kinds: Iterable[str]) -> None:
+        self._dirty.update(kinds)
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh(), name="autocomplete-refresh")
+
+    async def _refresh(self) -> None:
+        await asyncio.sleep(self.debounce_seconds)  # let a burst of changes land
+        while self._dirty:
+            kinds = set(self._dirty)
+            try:
+                async with async_session_factory() as session:
+                    await self.load(session, kinds)
+            except Exception as e:
+                print(f"⚠️  Autocomplete refresh failed: {e}")
+                return
+
+    def sizes(self) -> Dict[str, int]:
+        return {kind: len(index) for kind, index in self.kinds.items()}
+
+    # ── Search ───────────────────────────────────────────────
+
+    def search(self, query: str, kinds: Optional[Iterable[str]] = None, limit: int = 10) -> List[dict]:
+        """Ranked suggestions for `query` over `kinds` (default all)."""
+        key = loose(query)
+        if not key:
+            return []
+        native = normalize(query)
+        words = key.split()
+        # The longest word narrows the candidates most
+        anchor = max(words, key=len)
+        grams = trigrams(key) if len(key) >= 3 else set()
+
+        scored: List[Tuple[float, str, Entry]] = []
+        kinds = [kind for kind in (kinds or KIND_SOURCES) if kind in self.kinds]
+        matched: Set[Tuple[str, int]] = set()
+        for kind in kinds:
+            index = self.kinds[kind]
+            for position in index.prefixed(anchor, _PREFIX_CAP):
+                entry = index.entries[position]
+                if len(words) > 1 and not all(
+                    any(token.startswith(word) for token in entry.tokens) for word in words
+                ):
+                    continue
+                matched.add((kind, position))
+                if entry.key == key:
+                    score = 100.0
+                elif entry.key.startswith(key):
+                    score = 90.0
+                else:
+                    score = 70.0
+                if native and entry.native.startswith(native):
+                    score += 5  # same script as typed
+                scored.append((score, kind, entry))
+
+        # Misspelt or mid-word: only when the prefixes did not fill the page
+        if grams and len(scored) < limit:
+            for kind in kinds:
+                index = self.kinds[kind]
+                for position, similarity in index.similar(grams, _TRIGRAM_CAP, limit).items():
+                    if (kind, position) not in matched and similarity >= _MIN_SIMILARITY:
+                        scored.append((50.0 * similarity, kind, index.entries[position]))
+
+        scored = heapq.nsmallest(
+            limit, scored,
+            key=lambda item: (-item[0], -KIND_WEIGHT[item[1]], len(item[2].name), item[2].name),
+        )
+        return [
+            {
+                "type": kind,
+                "code": entry.code,
+                "name": entry.name,
+                "context": entry.context,
+                "score": round(score, 1),
+            }
+            for score, kind, entry in scored
+        ]
+
+
+autocomplete_index = AutocompleteIndex(ttl_seconds=settings.REFERENCE_TTL_SECONDS)
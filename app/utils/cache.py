@@ -0,0 +1,375 @@
+"""
+Buddhist Affairs MIS Dashboard - Response Cache
+In-process cache of serialized JSON responses.
+
+Each entry keeps the UTF-8 body together with gzip / brotli variants that
+are compressed once when the entry is filled, so serving a cache hit costs
+a dictionary lookup and no compression work.
+
+Entries record which tables they were computed from and the location they
+are scoped to, so a change notification from the database (see
+app/utils/cache_invalidation.py) marks only the entries it can affect.
+
+Stale-while-revalidate: past its TTL (soft expiry) an entry is still served,
+marked STALE, while one background task rebuilds it; past CACHE_STALE_SECONDS
+more (hard expiry) it is dropped.  An entry marked by a change is rebuilt
+before it is served again, but if that rebuild fails (e.g. statement_timeout
+under load) or takes longer than CACHE_STALE_WAIT_SECONDS, the last good
+payload is served as STALE instead of an error.
+
+Every build runs in a task and database session owned by the cache, so
+concurrent requests for one key share it and a request that goes away
+(client disconnect, cancelled stream part) does not cancel it for the rest.
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory
+from app.utils.compression import available_encodings, choose_encoding, compress_static
+
+Builder = Callable[[AsyncSession], Awaitable[Any]]
+
+# Build failures that fall back to a stale payload (timeouts, lost connections);
+# anything else is a bug and is raised
+FALLBACK_ERRORS = (SQLAlchemyError, OSError, asyncio.TimeoutError)
+
+# Tables whose changes are announced on the notification channel
+REGISTRATION_TABLES = frozenset({
+    "vihaddata",
+    "bhikku_regist",
+    "bhikku_high_regist",
+    "silmatha_regist",
+    "aramadata",
+    "sasanarakshana_regist",
+})
+REFERENCE_TABLES = frozenset({
+    "cmm_province",
+    "cmm_districtdata",
+    "cmm_dvsec",
+    "cmm_gndata",
+    "cmm_nikayadata",
+    "cmm_parshawadata",
+    "cmm_sasanarbm",
+})
+
+# Query / path parameters that narrow an entry to one location or temple
+_SCOPE_PARAMS = {
+    "province_code": "province",
+    "district_code": "district",
+    "temple_trn": "trn",
+}
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    A committed change to one table.  Key sets are None when unknown,
+    which means "could be anywhere".
+    """
+    table: str
+    provinces: Optional[FrozenSet[str]] = None
+    districts: Optional[FrozenSet[str]] = None
+    trns: Optional[FrozenSet[str]] = None
+
+    def affects(self, tables: Optional[FrozenSet[str]], scope: Dict[str, str]) -> bool:
+        """True if an entry built from `tables` for `scope` may be stale after this change."""
+        if tables is not None and self.table not in tables:
+            return False
+        if self.table in REFERENCE_TABLES:
+            # Names / hierarchy changed — every dependent entry is suspect
+            return True
+        # Scope values may list several codes ("WP,SP")
+        if "trn" in scope and self.trns is not None:
+            return not self.trns.isdisjoint(scope["trn"].split(","))
+        if "district" in scope and self.districts is not None:
+            return not self.districts.isdisjoint(scope["district"].split(","))
+        if "province" in scope and self.provinces is not None:
+            return not self.provinces.isdisjoint(scope["province"].split(","))
+        return True
+
+
+@dataclass
+class CachedPayload:
+    """A serialized response body plus its precompressed variants"""
+    body: bytes
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+    expires_at: float = 0.0   # soft expiry: served STALE while rebuilt after this
+    stale_until: float = 0.0  # hard expiry: never served after this
+    changed: bool = False     # its data changed; rebuild before serving again
+    tables: Optional[FrozenSet[str]] = None  # None = depends on every table
+    scope: Dict[str, str] = field(default_factory=dict)
+
+    def to_response(
+        self,
+        accept_encoding: str,
+        cache_status: str = "HIT",
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """Build a Response, picking the best precompressed variant the client accepts."""
+        headers = {"Vary": "Accept-Encoding", "X-Cache": cache_status, **(extra_headers or {})}
+        if cache_status == "STALE":
+            headers["Age"] = str(int(time.monotonic() - self.created_at))
+            headers["Warning"] = '110 - "Response is Stale"'
+
+        encoding = choose_encoding(accept_encoding, offered=self.encoded.keys())
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            content = self.encoded[encoding]
+        else:
+            content = self.body
+        return Response(content=content, media_type="application/json", headers=headers)
+
+
+@dataclass
+class PendingBuild:
+    """What an in-flight build reads, so a change can discard its result"""
+    tables: Optional[FrozenSet[str]] = None
+    scope: Dict[str, str] = field(default_factory=dict)
+    stale: bool = False  # a change it may have missed was committed; do not store
+
+
+def encode_json(data: Any) -> bytes:
+    """Serialize exactly like FastAPI's JSONResponse (UTF-8, compact separators)."""
+    return json.dumps(
+        jsonable_encoder(data),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def cache_key(path: str, params: Iterable[Tuple[str, str]] = ()) -> str:
+    """Stable cache key from a path and query parameters (order-insensitive, empty values dropped)."""
+    items = sorted((k, v) for k, v in params if v not in (None, ""))
+    return f"{path}?{urlencode(items)}" if items else path
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of CachedPayload entries with a time-to-live and a
+    stale window.  Concurrent misses for the same key share a single build.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_entries: int,
+        min_compress_size: int,
+        stale_seconds: int = 0,
+        stale_wait_seconds: float = 0.0,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.min_compress_size = min_compress_size
+        self.stale_seconds = stale_seconds
+        self.stale_wait_seconds = stale_wait_seconds
+        self._entries: "OrderedDict[str, CachedPayload]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._builds: set = set()  # build tasks, kept referenced
+        self._pending: Dict[str, PendingBuild] = {}  # key → build in flight
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedPayload]:
+        """An entry that may still be served (fresh or stale), or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.stale_until <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedPayload) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Mark every entry changed; old payloads remain only as a fallback."""
+        for entry in self._entries.values():
+            entry.changed = True
+        for pending in self._pending.values():
+            pending.stale = True
+
+    def invalidate(self, event: ChangeEvent) -> int:
+        """
+        Mark every entry the change may affect; returns how many were marked.
+        Builds in flight that read what changed are marked too, so their
+        (possibly older) result is returned to its waiters but not stored.
+        """
+        stale = [
+            entry for entry in self._entries.values()
+            if event.affects(entry.tables, entry.scope)
+        ]
+        for entry in stale:
+            entry.changed = True
+        for pending in self._pending.values():
+            if event.affects(pending.tables, pending.scope):
+                pending.stale = True
+        return len(stale)
+
+    def cap_ttl(self, seconds: int) -> None:
+        """Shorten the remaining lifetime of every entry to at most `seconds`."""
+        deadline = time.monotonic() + seconds
+        for entry in self._entries.values():
+            entry.expires_at = min(entry.expires_at, deadline)
+            entry.stale_until = min(entry.stale_until, deadline + self.stale_seconds)
+
+    async def make_payload(
+        self,
+        data: Any,
+        tables: Optional[FrozenSet[str]] = None,
+        scope: Optional[Dict[str, str]] = None,
+    ) -> CachedPayload:
+        """Serialize and precompress a result (compression runs off the event loop)."""
+        body = encode_json(data)
+        encoded: Dict[str, bytes] = {}
+        if len(body) >= self.min_compress_size:
+            for encoding in available_encodings():
+                encoded[encoding] = await asyncio.to_thread(compress_static, body, encoding)
+        now = time.monotonic()
+        return CachedPayload(
+            body=body,
+            encoded=encoded,
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+            stale_until=now + self.ttl_seconds + self.stale_seconds,
+            tables=tables,
+            scope=scope or {},
+        )
+
+    async def get_or_build(
+        self,
+        key: str,
+        build: Builder,
+        tables: Optional[FrozenSet[str]] = None,
+        scope: Optional[Dict[str, str]] = None,
+    ) -> Tuple[CachedPayload, str]:
+        """
+        Return (payload, status) with status HIT, MISS or STALE.  On a miss
+        `build(session)` runs once even if several requests ask for the same
+        key concurrently.  Builds run in a cache-owned task and session, since
+        they may outlive the request that started them: a caller that is
+        cancelled stops waiting, and the build still completes for the others.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            if not entry.changed and entry.expires_at > time.monotonic():
+                return entry, "HIT"
+            future = self._build(key, build, tables, scope)
+            if not entry.changed:
+                return entry, "STALE"
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), self.stale_wait_seconds), "MISS"
+            except FALLBACK_ERRORS as exc:
+                print(f"⚠️  Serving stale {key}: {type(exc).__name__} {exc}")
+                return entry, "STALE"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight), "HIT"
+
+        return await asyncio.shield(self._build(key, build, tables, scope)), "MISS"
+
+    def _new_inflight(self, key: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        # Mark the exception as retrieved when nobody else was waiting on it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        return future
+
+    def _build(
+        self,
+        key: str,
+        build: Builder,
+        tables: Optional[FrozenSet[str]],
+        scope: Optional[Dict[str, str]],
+    ) -> asyncio.Future:
+        """(Re)build `key` in the background (once); the future resolves to the new payload."""
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return inflight
+        future = self._new_inflight(key)
+        pending = self._pending[key] = PendingBuild(tables, scope or {})
+
+        async def run() -> None:
+            try:
+                async with async_session_factory() as session:
+                    entry = await self.make_payload(await build(session), tables, scope)
+                if not pending.stale:
+                    self.put(key, entry)
+                future.set_result(entry)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as exc:
+                print(f"⚠️  Build of {key} failed: {type(exc).__name__} {exc}")
+                future.set_exception(exc)
+            finally:
+                self._inflight.pop(key, None)
+                self._pending.pop(key, None)
+
+        task = asyncio.create_task(run())
+        self._builds.add(task)
+        task.add_done_callback(self._builds.discard)
+        return future
+
+
+response_cache = ResponseCache(
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    min_compress_size=settings.COMPRESSION_MIN_SIZE,
+    stale_seconds=settings.CACHE_STALE_SECONDS,
+    stale_wait_seconds=settings.CACHE_STALE_WAIT_SECONDS,
+)
+
+
+def request_scope(request: Request) -> Dict[str, str]:
+    """Location / temple scope of a request, taken from its query and path parameters."""
+    scope = {}
+    for param, name in _SCOPE_PARAMS.items():
+        value = request.path_params.get(param) or request.query_params.get(param)
+        if value:
+            scope[name] = value
+    return scope
+
+
+async def cached_response(
+    request: Request,
+    build: Builder,
+    tables: Optional[FrozenSet[str]] = None,
+    variant: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Serve a GET endpoint from the response cache.
+    The key is the request path plus its query string, so every distinct
+    filter combination gets its own entry.  `tables` lists the tables the
+    payload is computed from (None = all of them) for change invalidation.
+    `variant` separates payloads selected by something other than the query
+    string (e.g. a request header); `headers` are added to the response.
+
+    Usage in a router:
+        return await cached_response(request, lambda s: Service(s).method(filters))
+    """
+    key = cache_key(request.url.path, request.query_params.multi_items())
+    if variant:
+        key = f"{key}#{variant}"
+    entry, status = await response_cache.get_or_build(key, build, tables, request_scope(request))
+    return entry.to_response(request.headers.get("accept-encoding", ""), status, headers)
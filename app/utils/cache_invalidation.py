@@ -0,0 +1,160 @@
+"""
+Buddhist Affairs MIS Dashboard - Cache Invalidation Listener
+LISTENs for change notifications raised by the triggers in
+migrations/cache_notify.sql and drops only the cached responses a change
+can affect.
+
+The listener holds one dedicated asyncpg connection outside the SQLAlchemy
+pool.  While it is connected the response cache runs with a long TTL;
+if the connection drops, remaining entries are capped back to the normal
+TTL until notifications flow again, so a missed change is never served
+for longer than without the listener.
+"""
+import asyncio
+import json
+from typing import Callable, List, Optional
+
+import asyncpg
+
+from app.config import settings
+from app.utils.cache import ChangeEvent, ResponseCache, response_cache
+
+Subscriber = Callable[[ChangeEvent], object]
+
+_KEEPALIVE_SECONDS = 30
+_MAX_BACKOFF_SECONDS = 60
+
+
+def parse_change_event(payload: str) -> Optional[ChangeEvent]:
+    """Decode a NOTIFY payload into a ChangeEvent (None if malformed)."""
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not data.get("table"):
+        return None
+
+    def keys(name: str):
+        values = data.get(name)
+        return frozenset(str(v) for v in values) if isinstance(values, list) else None
+
+    return ChangeEvent(
+        table=str(data["table"]),
+        provinces=keys("provinces"),
+        districts=keys("districts"),
+        trns=keys("trns"),
+    )
+
+
+class CacheInvalidationListener:
+    """Background task that applies database change notifications to the cache"""
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        channel: str,
+        listen_ttl_seconds: int,
+    ):
+        self.cache = cache
+        self.channel = channel
+        self.listen_ttl_seconds = listen_ttl_seconds
+        self.default_ttl_seconds = cache.ttl_seconds
+        self.connected = False
+        self._subscribers: List[Subscriber] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """
+        Register a callback run for every change after the cache is updated.
+        Coroutine functions are scheduled as tasks.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="cache-invalidation-listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def dispatch(self, event: ChangeEvent) -> None:
+        """Apply a change to the cache and notify subscribers."""
+        self.cache.invalidate(event)
+        for callback in list(self._subscribers):
+            try:
+                result = callback(event)
+                if asyncio.iscoroutine(result):
+                    asyncio.create_task(result)
+            except Exception as e:
+                print(f"Cache change subscriber failed: {e}")
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        event = parse_change_event(payload)
+        if event is None:
+            # Unknown payload — be safe and drop everything
+            self.cache.clear()
+            return
+        self.dispatch(event)
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected:
+            # Changes may have been missed while disconnected
+            self.cache.clear()
+            self.cache.ttl_seconds = self.listen_ttl_seconds
+        else:
+            self.cache.ttl_seconds = self.default_ttl_seconds
+            self.cache.cap_ttl(self.default_ttl_seconds)
+        self.connected = connected
+
+    async def _run(self) -> None:
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(settings.sync_database_url)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                self._set_connected(True)
+                backoff = 1
+                print(f"✅ Listening for cache invalidations on '{self.channel}'")
+
+                # Keepalive detects half-open connections the server never closed
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        await conn.execute("SELECT 1")
+                raise ConnectionError("listener connection closed")
+            except asyncio.CancelledError:
+                if self.connected:
+                    self._set_connected(False)
+                raise
+            except Exception as e:
+                if self.connected:
+                    self._set_connected(False)
+                print(f"Cache invalidation listener unavailable ({e}); retrying in {backoff}s")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, _MAX_BACKOFF_SECONDS)
+
+
+cache_listener = CacheInvalidationListener(
+    cache=response_cache,
+    channel=settings.CACHE_NOTIFY_CHANNEL,
+    listen_ttl_seconds=settings.CACHE_LISTEN_TTL_SECONDS,
+)
@@ -0,0 +1,220 @@
+"""
+Buddhist Affairs MIS Dashboard - Response Compression
+gzip is always available; brotli is used when the optional `brotli`
+package is installed and the client advertises `br`.
+"""
+import gzip
+import zlib
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # optional — pip install brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+
+# Levels used when compressing on the fly (per request) vs. once at cache
+# fill time, where spending more CPU for a smaller body pays off on every hit.
+DYNAMIC_GZIP_LEVEL = 6
+DYNAMIC_BROTLI_QUALITY = 4
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 9
+
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+# Server-Sent Events must reach the client unbuffered — never compress them
+_EXCLUDED_TYPES = ("text/event-stream",)
+
+
+def available_encodings() -> list[str]:
+    """Encodings this process can produce, best first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def choose_encoding(accept_encoding: str, offered: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Pick the best content-coding from an Accept-Encoding header: the
+    highest q-value wins, and the server's preference order only breaks
+    ties.  Honours q=0 exclusions and `*`; returns None for identity.
+    """
+    if not accept_encoding:
+        return None
+
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    candidates = list(offered) if offered is not None else available_encodings()
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        if encoding not in candidates:
+            continue
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    """True for text-like media types worth compressing."""
+    content_type = (content_type or "").lower()
+    if content_type.startswith(_EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+def compress_static(body: bytes, encoding: str) -> bytes:
+    """Compress a complete body at the (slower, smaller) cache-fill level."""
+    if encoding == "br":
+        return brotli.compress(body, quality=STATIC_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=STATIC_GZIP_LEVEL, mtime=0)
+
+
+def _compress_dynamic(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=DYNAMIC_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=DYNAMIC_GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk (for streamed bodies)."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=DYNAMIC_BROTLI_QUALITY)
+        else:
+            self._c = zlib.compressobj(DYNAMIC_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def push(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.finish()
+        return self._c.compress(data) + self._c.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that gzip/brotli-compresses JSON and text responses
+    of at least `minimum_size` bytes.
+
+    Responses that already carry a Content-Encoding (e.g. precompressed
+    cache hits) pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk tells us the size
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.start_message is not None:
+            await self._send_first_chunk(message)
+            return
+
+        if self.passthrough or self.compressor is None:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        chunk = self.compressor.push(body) if more_body else self.compressor.finish(body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _send_first_chunk(self, message: Message) -> None:
+        start, self.start_message = self.start_message, None
+        headers = MutableHeaders(raw=list(start["headers"]))
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if (
+            "content-encoding" in headers
+            or not is_compressible(headers.get("content-type", ""))
+            or (not more_body and len(body) < self.minimum_size)
+        ):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+
+        if not more_body:
+            body = _compress_dynamic(body, self.encoding)
+            headers["Content-Length"] = str(len(body))
+            start["headers"] = headers.raw
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        # Streaming response — compress chunk by chunk, length unknown
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        start["headers"] = headers.raw
+        self.compressor = _StreamCompressor(self.encoding)
+        await self.send(start)
+        await self.send({
+            "type": "http.response.body",
+            "body": self.compressor.push(body),
+            "more_body": True,
+        })
@@ -0,0 +1,111 @@
+"""
+Buddhist Affairs MIS Dashboard - Progressive Dashboard Stream
+Backs GET /dashboard/stream: every dashboard part is computed in its own
+session and written as one NDJSON line as soon as it is ready, so the UI
+can render tiles without waiting for the temple list.
+
+Parts are started cheapest first, at most DASHBOARD_STREAM_CONCURRENCY at a
+time (the pool is shared with every other request), and go through the
+response cache, so a repeated stream for the same filters is served from
+memory.
+
+Lines:
+    {"type":"start","parts":[...],"filters":{...}}
+    {"type":"part","part":"section1.summary_a","ms":12.3,"cache":"MISS","data":...}
+        ("cache":"STALE" = last good result, served while it is rebuilt or
+        because the rebuild failed)
+    {"type":"error","part":"section3.temples","ms":15001.0,"error":"..."}
+    {"type":"end","ms":842.5}
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+
+from app.config import settings
+from app.schemas.filters import DashboardFilters
+from app.services.section1_service import Section1Service
+from app.services.section2_service import Section2Service
+from app.services.section3_service import Section3Service
+from app.utils.cache import cache_key, encode_json, response_cache
+
+PartBuilder = Callable[[Any, DashboardFilters], Awaitable[Any]]
+
+# (part, builder), cheapest first.  Part names match the live hub's
+# ("section1.summary_a", ...); provinces / districts are extra to GET /dashboard/.
+DASHBOARD_PARTS: List[Tuple[str, PartBuilder]] = [
+    ("section2.dahampasal",             lambda s, f: Section2Service(s).get_dahampasal_breakdown(f)),
+    ("section2.dahampasal_teachers",    lambda s, f: Section2Service(s).get_teachers_breakdown(f)),
+    ("section2.dahampasal_students",    lambda s, f: Section2Service(s).get_students_breakdown(f)),
+    ("section1.summary_a",              lambda s, f: Section1Service(s).get_type_summary(f)),
+    ("section1.summary_c",              lambda s, f: Section1Service(s).get_grade_summary(f)),
+    ("section2.bikku_type",             lambda s, f: Section2Service(s).get_bikku_type_breakdown(f)),
+    ("section1.summary_b",              lambda s, f: Section1Service(s).get_nikaya_summary(f)),
+    ("section2.provinces",              lambda s, f: Section2Service(s).get_province_data(f)),
+    ("section2.districts",              lambda s, f: Section2Service(s).get_district_data(f)),
+    ("section3.gn_divisions",           lambda s, f: Section3Service(s).get_gn_divisions(f)),
+    ("section3.divisional_secretariat", lambda s, f: Section3Service(s).get_divisional_secretariat(f)),
+    ("section3.parshawa",               lambda s, f: Section3Service(s).get_parshawa_breakdown(f)),
+    ("section3.ssbm_by_nikaya",         lambda s, f: Section3Service(s).get_ssbm_by_nikaya(f)),
+    ("section3.temples",                lambda s, f: Section3Service(s).get_temple_list(f)),
+]
+
+
+def _line(head: Dict[str, Any], data: bytes = b"") -> bytes:
+    """One NDJSON line; `data` is an already-encoded JSON value appended as "data"."""
+    body = encode_json(head)
+    if data:
+        body = body[:-1] + b',"data":' + data + b"}"
+    return body + b"\n"
+
+
+async def stream_dashboard(
+    filters: DashboardFilters,
+    params: List[Tuple[str, str]],
+    scope: Dict[str, str],
+) -> AsyncIterator[bytes]:
+    """
+    Yield the NDJSON lines of a progressive dashboard response.
+    `params` / `scope` are the request's filter parameters and cache scope.
+    """
+    started = time.perf_counter()
+    sessions = asyncio.Semaphore(settings.DASHBOARD_STREAM_CONCURRENCY)
+    path = f"{settings.API_V1_PREFIX}/dashboard/stream"
+
+    async def compute(part: str, builder: PartBuilder) -> bytes:
+        part_started = time.perf_counter()
+
+        async def build(session) -> Any:
+            async with sessions:
+                return await builder(session, filters)
+
+        head: Dict[str, Any] = {"type": "part", "part": part}
+        try:
+            entry, status = await response_cache.get_or_build(
+                cache_key(f"{path}#{part}", params), build, scope=scope
+            )
+        except Exception as e:
+            print(f"⚠️  dashboard stream part {part} failed: {e}")
+            return _line({"type": "error", "part": part,
+                          "ms": round((time.perf_counter() - part_started) * 1000, 1), "error": str(e)})
+        head["ms"] = round((time.perf_counter() - part_started) * 1000, 1)
+        head["cache"] = status
+        return _line(head, entry.body)
+
+    yield _line({
+        "type": "start",
+        "parts": [part for part, _ in DASHBOARD_PARTS],
+        "filters": dict(params),
+    })
+
+    # Tasks queue on the semaphore in creation order, so cheap parts start first
+    tasks = [asyncio.create_task(compute(part, builder)) for part, builder in DASHBOARD_PARTS]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away: stop waiting; builds already started still fill the cache
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    yield _line({"type": "end", "ms": round((time.perf_counter() - started) * 1000, 1)})
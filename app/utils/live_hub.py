@@ -0,0 +1,239 @@
+"""
+Buddhist Affairs MIS Dashboard - Live Dashboard Hub
+Fans dashboard updates out to Server-Sent Events / WebSocket subscribers.
+
+Subscribers are grouped by their filter set.  Each group is recomputed at
+most once per change — through the shared response cache, so HTTP clients
+and live clients reuse the same build — and every subscriber in the group
+receives only the dashboard parts whose content actually changed.
+
+Recomputation is triggered by database change notifications (see
+app/utils/cache_invalidation.py) and by a periodic safety tick.
+"""
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+
+from app.config import settings
+from app.schemas.filters import DashboardFilters
+from app.services.dashboard_service import DashboardService
+from app.utils.cache import ChangeEvent, cache_key, response_cache
+
+# Filters a live subscription can carry (same as GET /dashboard/)
+LIVE_FILTER_FIELDS = ("type_filter", "nikaya_code", "grade", "province_code", "district_code")
+
+_QUEUE_SIZE = 16
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha1(
+        json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def _flatten(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Split a dashboard payload into parts: "section1.summary_a", "section3.temples", ..."""
+    parts = {}
+    for section, data in payload.items():
+        if isinstance(data, dict) and section != "filters":
+            for name, value in data.items():
+                parts[f"{section}.{name}"] = value
+        else:
+            parts[section] = data
+    return parts
+
+
+def _nest(parts: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of _flatten for the parts being sent."""
+    nested: Dict[str, Any] = {}
+    for key, value in parts.items():
+        section, _, name = key.partition(".")
+        if name:
+            nested.setdefault(section, {})[name] = value
+        else:
+            nested[section] = value
+    return nested
+
+
+@dataclass
+class _Group:
+    """All subscribers sharing one filter set"""
+    filters: Dict[str, str]
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    parts: Dict[str, Any] = field(default_factory=dict)
+    digests: Dict[str, str] = field(default_factory=dict)
+    version: int = 0
+    pending: Optional[asyncio.Task] = None
+    running: bool = False
+    rerun: bool = False  # a change arrived while a recompute was running
+
+    @property
+    def scope(self) -> Dict[str, str]:
+        scope = {}
+        if self.filters.get("province_code"):
+            scope["province"] = self.filters["province_code"]
+        if self.filters.get("district_code"):
+            scope["district"] = self.filters["district_code"]
+        return scope
+
+
+class LiveDashboardHub:
+    """Registry of live subscribers and the per-filter recomputation loop"""
+
+    def __init__(self, refresh_seconds: int, debounce_seconds: float = 1.0):
+        self.refresh_seconds = refresh_seconds
+        self.debounce_seconds = debounce_seconds
+        self._groups: Dict[str, _Group] = {}
+        self._ticker: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def normalize_filters(filters: Dict[str, Any]) -> Dict[str, str]:
+        """Keep only supported, non-empty filter values."""
+        return {
+            name: str(filters[name])
+            for name in LIVE_FILTER_FIELDS
+            if filters.get(name) not in (None, "")
+        }
+
+    @staticmethod
+    def _group_key(filters: Dict[str, str]) -> str:
+        return cache_key(f"{settings.API_V1_PREFIX}/dashboard/", filters.items())
+
+    # ── Subscription ─────────────────────────────────────────
+
+    def subscribe(self, filters: Dict[str, Any]) -> asyncio.Queue:
+        """
+        Register a subscriber and return the queue its messages arrive on.
+        The first message is always a full snapshot.
+        """
+        filters = self.normalize_filters(filters)
+        key = self._group_key(filters)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _Group(filters=filters)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        group.subscribers.add(queue)
+        if group.version:
+            queue.put_nowait(self._snapshot(group))
+        else:
+            self._schedule(group, delay=0)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        for key, group in list(self._groups.items()):
+            if queue in group.subscribers:
+                group.subscribers.discard(queue)
+                if not group.subscribers:
+                    if group.pending:
+                        group.pending.cancel()
+                    del self._groups[key]
+                return
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(group.subscribers) for group in self._groups.values())
+
+    # ── Triggers ─────────────────────────────────────────────
+
+    def on_change(self, event: ChangeEvent) -> None:
+        """Cache-invalidation subscriber: recompute groups the change may affect."""
+        for group in list(self._groups.values()):
+            if event.affects(None, group.scope):
+                self._schedule(group)
+
+    def start(self) -> None:
+        if self._ticker is None:
+            self._ticker = asyncio.create_task(self._tick(), name="live-dashboard-tick")
+
+    async def stop(self) -> None:
+        tasks = [group.pending for group in self._groups.values() if group.pending]
+        if self._ticker:
+            tasks.append(self._ticker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._ticker = None
+        self._groups.clear()
+
+    async def _tick(self) -> None:
+        # Safety net for changes made without notifications (e.g. view refreshes)
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            for group in list(self._groups.values()):
+                self._schedule(group, delay=0)
+
+    def _schedule(self, group: _Group, delay: Optional[float] = None) -> None:
+        """Queue one recomputation; bursts of changes collapse into it."""
+        if group.pending and not group.pending.done():
+            # Still debouncing: the queued run will see this change anyway
+            group.rerun = group.rerun or group.running
+            return
+        group.rerun = False
+        delay = self.debounce_seconds if delay is None else delay
+        group.pending = asyncio.create_task(self._recompute(group, delay))
+
+    # ── Recomputation ────────────────────────────────────────
+
+    async def _recompute(self, group: _Group, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        group.running = True
+        try:
+            await self._publish(group)
+        finally:
+            group.running = False
+            if group.rerun and group.subscribers:
+                group.pending = None
+                self._schedule(group)
+
+    async def _publish(self, group: _Group) -> None:
+        filters = DashboardFilters(**group.filters)
+        try:
+            entry, _ = await response_cache.get_or_build(
+                self._group_key(group.filters),
+                lambda s: DashboardService(s).get_full_dashboard(filters),
+                scope=group.scope,
+            )
+        except Exception as e:
+            print(f"Live dashboard recompute failed for {group.filters}: {e}")
+            return
+
+        parts = _flatten(json.loads(entry.body))
+        digests = {name: _digest(value) for name, value in parts.items()}
+        changed = {
+            name: parts[name] for name, digest in digests.items()
+            if group.digests.get(name) != digest
+        }
+        removed = [name for name in group.digests if name not in digests]
+        if not changed and not removed and group.version:
+            return
+
+        first = group.version == 0
+        group.parts, group.digests = parts, digests
+        group.version += 1
+        message = self._snapshot(group) if first else {
+            "type": "update",
+            "version": group.version,
+            "data": _nest(changed),
+            "removed": removed,
+        }
+        for queue in list(group.subscribers):
+            self._deliver(group, queue, message)
+
+    def _snapshot(self, group: _Group) -> Dict[str, Any]:
+        return {"type": "snapshot", "version": group.version, "data": _nest(group.parts)}
+
+    def _deliver(self, group: _Group, queue: asyncio.Queue, message: Dict[str, Any]) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Slow consumer: replace its backlog with one full snapshot
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(self._snapshot(group))
+
+
+live_hub = LiveDashboardHub(refresh_seconds=settings.LIVE_REFRESH_SECONDS)
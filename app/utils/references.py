@@ -0,0 +1,145 @@
+"""
+Buddhist Affairs MIS Dashboard - Reference Names
+In-memory code → name dictionaries for the reference tables (nikaya,
+parshawa, province, district, DS, GN) and temple names, so list and profile
+queries read codes from one table and the names are filled in here instead
+of LEFT JOINing five lookup tables per row.
+
+Every load or patch produces a new immutable ReferenceNames with a higher
+version; a request resolves all its names from the one version it got.
+
+- cmm_* change notification → full reload on next use
+- vihaddata notification    → only the TRNs it names are re-read
+- temple TRN not yet known  → read by primary key on first use
+- without the change listener, a full reload every REFERENCE_TTL_SECONDS
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.utils.cache import ChangeEvent, REFERENCE_TABLES
+from app.utils.cache_invalidation import cache_listener
+
+# dictionary → (table, code column, name column)
+REFERENCE_SOURCES = {
+    "nikaya":    ("cmm_nikayadata",   "nk_nkn",    "nk_nname"),
+    "parshawa":  ("cmm_parshawadata", "pr_prn",    "pr_pname"),
+    "provinces": ("cmm_province",     "cp_code",   "cp_name"),
+    "districts": ("cmm_districtdata", "dd_dcode",  "dd_dname"),
+    "ds":        ("cmm_dvsec",        "dv_dvcode", "dv_dvname"),
+    "gn":        ("cmm_gndata",       "gn_gnc",    "gn_gnname"),
+}
+
+
+@dataclass(frozen=True)
+class ReferenceNames:
+    """One consistent version of every dictionary"""
+    version: int
+    loaded_at: float
+    nikaya: Dict[str, str] = field(default_factory=dict)
+    parshawa: Dict[str, str] = field(default_factory=dict)
+    provinces: Dict[str, str] = field(default_factory=dict)
+    districts: Dict[str, str] = field(default_factory=dict)
+    ds: Dict[str, str] = field(default_factory=dict)
+    gn: Dict[str, str] = field(default_factory=dict)
+    # TRN → name; None marks a TRN looked up and not found
+    temples: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    def name(self, dictionary: str, code) -> Optional[str]:
+        """Name of `code`, or None (as the LEFT JOIN gave for an unknown code)."""
+        if code is None:
+            return None
+        return getattr(self, dictionary).get(str(code))
+
+
+class ReferenceDictionary:
+    """Loads, versions and invalidates ReferenceNames"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.current: Optional[ReferenceNames] = None
+        self._stale = True
+        self._dirty_temples: Set[str] = set()
+        self._lock = asyncio.Lock()
+
+    def on_change(self, event: ChangeEvent) -> None:
+        """Cache-invalidation subscriber"""
+        if event.table in REFERENCE_TABLES:
+            self._stale = True
+        elif event.table == "vihaddata":
+            if event.trns is None:
+                self._stale = True
+            else:
+                self._dirty_temples.update(event.trns)
+
+    def _expired(self) -> bool:
+        if self.current is None or self._stale:
+            return True
+        # Changes are only missed when notifications are not flowing
+        return not cache_listener.connected and time.time() - self.current.loaded_at > self.ttl_seconds
+
+    async def get(self, db: AsyncSession, temples: Iterable[str] = ()) -> ReferenceNames:
+        """
+        The current names, reloading or patching first if needed.
+        `temples` are TRNs the caller is about to resolve; unknown ones are
+        read by primary key.
+        """
+        wanted = {str(t) for t in temples if t}
+        names = self.current
+        if not self._expired() and not self._dirty_temples and wanted.issubset(names.temples):
+            return names
+
+        async with self._lock:
+            if self._expired():
+                await self._load(db)
+            names = self.current
+            pending = set(self._dirty_temples) | (wanted - names.temples.keys())
+            if pending:
+                await self._patch_temples(db, pending)
+            return self.current
+
+    async def _load(self, db: AsyncSession) -> None:
+        # Cleared first: a change arriving during the load forces another one
+        self._stale = False
+        self._dirty_temples.clear()
+        dictionaries = {}
+        for dictionary, (table, code_col, name_col) in REFERENCE_SOURCES.items():
+            result = await db.execute(text(
+                f"SELECT {code_col}::text, {name_col} FROM {table} WHERE {code_col} IS NOT NULL"
+            ))
+            names: Dict[str, str] = {}
+            for code, name in result.fetchall():
+                # First row wins for duplicated codes
+                names.setdefault(code, name)
+            dictionaries[dictionary] = names
+
+        result = await db.execute(text("SELECT vh_trn::text, vh_vname FROM vihaddata WHERE vh_trn IS NOT NULL"))
+        temples: Dict[str, Optional[str]] = {}
+        for trn, name in result.fetchall():
+            temples.setdefault(trn, name)
+
+        version = self.current.version + 1 if self.current else 1
+        self.current = ReferenceNames(version=version, loaded_at=time.time(), temples=temples, **dictionaries)
+        print(f"✅ Reference names loaded (v{version}, {len(temples)} temples)")
+
+    async def _patch_temples(self, db: AsyncSession, trns: Set[str]) -> None:
+        self._dirty_temples -= trns
+        result = await db.execute(
+            text("SELECT vh_trn::text, vh_vname FROM vihaddata WHERE vh_trn = ANY(:trns)"),
+            {"trns": list(trns)},
+        )
+        temples = dict(self.current.temples)
+        temples.update(dict.fromkeys(trns))
+        found: Dict[str, Optional[str]] = {}
+        for trn, name in result.fetchall():
+            found.setdefault(trn, name)
+        temples.update(found)
+        self.current = replace(self.current, version=self.current.version + 1, temples=temples)
+
+
+reference_names = ReferenceDictionary(ttl_seconds=settings.REFERENCE_TTL_SECONDS)
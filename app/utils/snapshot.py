@@ -0,0 +1,182 @@
+"""
+Buddhist Affairs MIS Dashboard - Snapshot Engine
+Keeps the optional columnar snapshot (app/services/snapshot_service.py)
+loaded and current, and tells the section services when they may answer
+from it instead of querying.
+
+- load      — full load at startup and every SNAPSHOT_RELOAD_SECONDS, in one
+              REPEATABLE READ transaction together with a validation pass:
+              every snapshot method is compared with its SQL for the national,
+              per-province and per-nikaya filters.  A snapshot that disagrees
+              is never used.
+- refresh   — rows with *_updated_at at or after the last one seen, after each
+              change notification (see app/utils/cache_invalidation.py) and
+              every SNAPSHOT_REFRESH_SECONDS.  Tables that lost rows are reloaded.
+
+Until a notified change has been applied, and while a refresh is running,
+current() returns None and the services fall back to SQL, so the response
+cache never stores a count older than the change that invalidated it.
+
+NumPy is imported only when the engine starts, so it costs nothing when
+SNAPSHOT_ENABLED is off.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from app.config import settings
+from app.database import async_session_factory
+from app.utils.cache import ChangeEvent
+from app.utils.cache_invalidation import cache_listener
+
+
+class SnapshotEngine:
+    """Lifecycle of the in-process snapshot: load, validate, refresh"""
+
+    def __init__(self, enabled: bool, refresh_seconds: int, reload_seconds: int, debounce_seconds: float = 0.5):
+        self.enabled = enabled
+        self.refresh_seconds = refresh_seconds
+        self.reload_seconds = reload_seconds
+        self.debounce_seconds = debounce_seconds
+        self.snapshot = None
+        self.valid = False
+        self.refreshing = False
+        # Change notifications seen / reflected in the snapshot
+        self.changes = 0
+        self.applied = 0
+        self.mismatches: List[str] = []
+        self.error: Optional[str] = None
+        self.stats: Dict[str, Any] = {}
+        self._changed_tables: Set[str] = set()
+        self._reload = True
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def current(self):
+        """The snapshot, if it may answer queries right now; otherwise None."""
+        if self.valid and not self.refreshing and self.applied == self.changes:
+            return self.snapshot
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "serving": self.current() is not None,
+            "valid": self.valid,
+            "pending_changes": self.changes - self.applied,
+            "rows": self.snapshot.rows() if self.snapshot is not None else {},
+            "mismatches": self.mismatches,
+            "error": self.error,
+            **self.stats,
+        }
+
+    # ── Triggers ─────────────────────────────────────────────
+
+    def on_change(self, event: ChangeEvent) -> None:
+        """Cache-invalidation subscriber: stop serving until the change is applied."""
+        self.changes += 1
+        self._changed_tables.add(event.table)
+        if self._wake is not None:
+            self._wake.set()
+
+    def reload(self) -> None:
+        """Schedule a full reload (after changes made without notifications)."""
+        self.changes += 1
+        self._reload = True
+        if self._wake is not None:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="snapshot-engine")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # ── Loading ──────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        try:
+            from app.services.snapshot_service import Snapshot, validate_snapshot
+        except ImportError as e:
+            print(f"⚠️  Snapshot engine disabled: {e}")
+            return
+
+        next_reload = 0.0
+        while True:
+            self._wake.clear()
+            try:
+                if self._reload or self.snapshot is None or time.monotonic() >= next_reload:
+                    self._reload = False
+                    await self._load(Snapshot, validate_snapshot)
+                    next_reload = time.monotonic() + self.reload_seconds
+                else:
+                    await self._refresh()
+                self.error = None
+            except Exception as e:
+                # A failed refresh may leave the snapshot half-applied
+                self.valid = False
+                self._reload = True
+                self.error = f"{type(e).__name__}: {e}"
+                print(f"⚠️  Snapshot update failed: {self.error}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.refresh_seconds)
+                await asyncio.sleep(self.debounce_seconds)  # let a burst of changes land
+            except asyncio.TimeoutError:
+                pass
+
+    async def _load(self, snapshot_class, validate) -> None:
+        started = time.perf_counter()
+        pending = self.changes
+        self._changed_tables.clear()
+        snapshot = snapshot_class()
+        async with async_session_factory() as session:
+            # The validation queries must see exactly the rows that were loaded
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            await snapshot.load(session)
+            loaded = time.perf_counter()
+            mismatches = await validate(snapshot, session)
+            await session.rollback()
+
+        self.snapshot, self.valid, self.mismatches = snapshot, not mismatches, mismatches
+        self.applied = pending
+        self.stats.update(
+            loaded_at=time.time(),
+            load_ms=round((loaded - started) * 1000, 1),
+            validate_ms=round((time.perf_counter() - loaded) * 1000, 1),
+        )
+        if mismatches:
+            print(f"⚠️  Snapshot disagrees with SQL, not serving from it: {mismatches[:5]}")
+        else:
+            print(f"✅ Snapshot loaded and validated {snapshot.rows()}")
+
+    async def _refresh(self) -> None:
+        started = time.perf_counter()
+        pending = self.changes
+        tables, self._changed_tables = self._changed_tables, set()
+        self.refreshing = True
+        try:
+            async with async_session_factory() as session:
+                # Without notifications, deletions can only be noticed by checking every table
+                await self.snapshot.refresh(session, tables if cache_listener.connected else None)
+                await session.rollback()
+        finally:
+            self.refreshing = False
+        self.applied = pending
+        self.stats.update(refreshed_at=time.time(), refresh_ms=round((time.perf_counter() - started) * 1000, 1))
+
+
+snapshot_engine = SnapshotEngine(
+    enabled=settings.SNAPSHOT_ENABLED,
+    refresh_seconds=settings.SNAPSHOT_REFRESH_SECONDS,
+    reload_seconds=settings.SNAPSHOT_RELOAD_SECONDS,
+)
@@ -0,0 +1,83 @@
+"""
+Buddhist Affairs MIS Dashboard - Spreadsheet Reader
+Streams rows from CSV / XLSX / XLS uploads in fixed-size chunks so large
+batches are never held in memory as a whole.
+"""
+from itertools import islice
+from typing import Any, BinaryIO, Iterator, List, Sequence, Tuple
+
+Chunk = Tuple[List[str], List[Sequence[Any]]]  # (headers, rows)
+
+SPREADSHEET_SUFFIXES = (".csv", ".xlsx", ".xlsm", ".xls")
+
+
+def is_blank_row(row: Sequence[Any]) -> bool:
+    return all(value is None or (isinstance(value, str) and not value.strip()) for value in row)
+
+
+def _iter_csv(file: BinaryIO, chunk_size: int) -> Iterator[Chunk]:
+    import pandas as pd
+
+    reader = pd.read_csv(
+        file, chunksize=chunk_size, dtype=str, keep_default_na=False,
+        skip_blank_lines=False, encoding="utf-8-sig",
+    )
+    for frame in reader:
+        yield [str(c) for c in frame.columns], list(frame.itertuples(index=False, name=None))
+
+
+def _iter_xlsx(file: BinaryIO, chunk_size: int) -> Iterator[Chunk]:
+    from openpyxl import load_workbook
+
+    # read_only streams the sheet XML instead of building the whole workbook
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [str(h) if h is not None else "" for h in next(rows, ())]
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield headers, chunk
+    finally:
+        workbook.close()
+
+
+def _iter_xls(file: BinaryIO, chunk_size: int) -> Iterator[Chunk]:
+    import xlrd
+
+    book = xlrd.open_workbook(file_contents=file.read(), on_demand=True)
+    sheet = book.sheet_by_index(0)
+
+    def row_values(index: int) -> List[Any]:
+        values = []
+        for cell in sheet.row(index):
+            if cell.ctype == xlrd.XL_CELL_DATE:
+                values.append(xlrd.xldate_as_datetime(cell.value, book.datemode))
+            elif cell.ctype == xlrd.XL_CELL_EMPTY:
+                values.append(None)
+            else:
+                values.append(cell.value)
+        return values
+
+    if sheet.nrows == 0:
+        return
+    headers = [str(h) for h in row_values(0)]
+    for start in range(1, sheet.nrows, chunk_size):
+        yield headers, [row_values(i) for i in range(start, min(start + chunk_size, sheet.nrows))]
+
+
+def iter_spreadsheet_chunks(file: BinaryIO, filename: str, chunk_size: int) -> Iterator[Chunk]:
+    """
+    Yield (headers, rows) chunks of at most `chunk_size` rows, in file order.
+    Blank rows are passed through so callers can keep spreadsheet row
+    numbers aligned; skip them with is_blank_row().
+    """
+    name = filename.lower()
+    if name.endswith(".csv"):
+        return _iter_csv(file, chunk_size)
+    if name.endswith((".xlsx", ".xlsm")):
+        return _iter_xlsx(file, chunk_size)
+    if name.endswith(".xls"):
+        return _iter_xls(file, chunk_size)
+    raise ValueError(f"Unsupported file type: {filename} (expected {', '.join(SPREADSHEET_SUFFIXES)})")
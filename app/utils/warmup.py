@@ -0,0 +1,157 @@
+"""
+Buddhist Affairs MIS Dashboard - Startup Warm-up
+Runs once in the background after startup so the first real requests are
+served warm:
+
+1. connections  — open every pooled connection (TCP + TLS + auth) and run
+                  the cheap, fixed-text hot statements on each, so asyncpg
+                  has them prepared per connection
+2. reference    — load the lookup lists into the response cache
+3. autocomplete — build the in-memory type-ahead index
+4. dashboards   — precompute the national and per-province dashboards
+
+GET /ready reports 503 until this has finished.
+"""
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory, engine
+from app.schemas.filters import DashboardFilters
+from app.services.counters_service import CountersService
+from app.services.dashboard_service import DashboardService
+from app.services.lookup_service import LookupService, LOOKUP_TABLES
+from app.utils.autocomplete import autocomplete_index
+from app.utils.cache import cache_key, response_cache
+
+
+@dataclass
+class WarmupState:
+    """Progress of the warm-up, reported by GET /ready"""
+    ready: bool = False
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    steps: Dict[str, float] = field(default_factory=dict)  # step → milliseconds
+    errors: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "warming",
+            "steps_ms": self.steps,
+            "errors": self.errors,
+        }
+
+
+warmup_state = WarmupState()
+
+
+async def _prepare_connection(conn: AsyncConnection) -> None:
+    """Run the fixed-text hot statements once on this connection."""
+    async with AsyncSession(bind=conn) as session:
+        await CountersService(session).get_counters()
+        await LookupService(session).get_provinces()
+        await LookupService(session).get_districts()
+        await LookupService(session).get_nikaya()
+        await session.rollback()
+
+
+async def _warm_connections() -> None:
+    size = engine.pool.size()
+    async with AsyncExitStack() as stack:
+        # Hold all connections at once so the pool opens `size` distinct ones
+        connections = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(size))
+        )
+        await asyncio.gather(*(_prepare_connection(conn) for conn in connections))
+
+
+async def _warm_reference() -> List[Dict[str, Any]]:
+    """Cache the lookup lists; returns the provinces for the dashboard step."""
+    prefix = f"{settings.API_V1_PREFIX}/lookups"
+    lookups = {
+        "provinces": lambda s: LookupService(s).get_provinces(),
+        "districts": lambda s: LookupService(s).get_districts(),
+        "nikaya": lambda s: LookupService(s).get_nikaya(),
+        "parshawa": lambda s: LookupService(s).get_parshawa(),
+    }
+    for name, build in lookups.items():
+        await response_cache.get_or_build(
+            cache_key(f"{prefix}/{name}"), build, tables=LOOKUP_TABLES[name]
+        )
+    # Read the provinces directly: the cache entry only holds encoded bytes
+    async with async_session_factory() as session:
+        return await LookupService(session).get_provinces()
+
+
+async def _warm_autocomplete() -> None:
+    async with async_session_factory() as session:
+        await autocomplete_index.ensure(session)
+
+
+async def _warm_dashboards(provinces: List[Dict[str, Any]]) -> None:
+    path = f"{settings.API_V1_PREFIX}/dashboard/"
+    semaphore = asyncio.Semaphore(engine.pool.size())
+
+    async def build_one(province_code: Optional[str]) -> None:
+        filters = DashboardFilters(province_code=province_code)
+        params = [("province_code", province_code)] if province_code else []
+        scope = {"province": province_code} if province_code else {}
+        async with semaphore:
+            try:
+                await response_cache.get_or_build(
+                    cache_key(path, params),
+                    lambda s: DashboardService(s).get_full_dashboard(filters),
+                    scope=scope,
+                )
+            except Exception as e:
+                warmup_state.errors.append(f"dashboard {province_code or 'national'}: {e}")
+
+    await asyncio.gather(
+        build_one(None),
+        *(build_one(p["code"]) for p in provinces if p.get("code")),
+    )
+
+
+async def _step(name: str, coro):
+    started = time.perf_counter()
+    try:
+        return await coro
+    except Exception as e:
+        warmup_state.errors.append(f"{name}: {e}")
+        return None
+    finally:
+        warmup_state.steps[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _run() -> None:
+    await _step("connections", _warm_connections())
+    provinces = await _step("reference", _warm_reference()) or []
+    await _step("autocomplete", _warm_autocomplete())
+    await _step("dashboards", _warm_dashboards(provinces))
+
+
+async def warm_up() -> None:
+    """
+    Run every warm-up step, bounded by WARMUP_TIMEOUT_SECONDS.
+    The service is marked ready afterwards even if a step failed, so a
+    slow or unavailable database cannot block deploys indefinitely.
+    """
+    warmup_state.started_at = time.perf_counter()
+    try:
+        await asyncio.wait_for(_run(), timeout=settings.WARMUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        warmup_state.errors.append(f"timed out after {settings.WARMUP_TIMEOUT_SECONDS}s")
+    finally:
+        warmup_state.finished_at = time.perf_counter()
+        warmup_state.ready = True
+
+    total = (warmup_state.finished_at - warmup_state.started_at) * 1000
+    steps = ", ".join(f"{name} {ms:.0f}ms" for name, ms in warmup_state.steps.items())
+    print(f"🔥 Warm-up finished in {total:.0f}ms ({steps}); {len(response_cache)} cached payloads")
+    for error in warmup_state.errors:
+        print(f"⚠️  Warm-up: {error}")
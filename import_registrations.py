@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Bulk Registration Import
+Loads a CSV / Excel batch from a regional office into the database using
+the same pipeline as POST /api/v1/imports/{entity}.
+
+Usage:
+    python import_registrations.py <bikku|silmatha|vihara|arama> <file> [--dry-run] [--chunk-size N]
+"""
+import argparse
+import asyncio
+import sys
+
+from app.database import async_session_factory, engine
+from app.services.import_service import ImportService, IMPORT_TARGETS
+
+
+async def run_import(entity, path, dry_run, chunk_size):
+    async with async_session_factory() as session:
+        with open(path, 'rb') as f:
+            result = await ImportService(session).import_file(
+                f, path, entity, user="import-cli", chunk_size=chunk_size, dry_run=dry_run,
+            )
+    await engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import registrations from a spreadsheet")
+    parser.add_argument("entity", choices=sorted(IMPORT_TARGETS))
+    parser.add_argument("file")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        result = asyncio.run(run_import(args.entity, args.file, args.dry_run, args.chunk_size))
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}")
+        return False
+
+    rate = result.rows_read / (result.elapsed_ms / 1000) if result.elapsed_ms else 0
+    print(f"\n📊 {result.rows_read:,} rows read ({rate:,.0f} rows/s), {result.chunks} chunks")
+    print(f"   ✅ inserted: {result.inserted:,}  updated: {result.updated:,}")
+    print(f"   ❌ rejected: {result.rejected:,}")
+    if result.ignored_columns:
+        print(f"   ⚠️  ignored columns: {', '.join(result.ignored_columns)}")
+    for error in result.errors[:20]:
+        where = f"row {error.row}" if error.row else "file"
+        column = f" [{error.column}]" if error.column else ""
+        print(f"   - {where}{column}: {error.message}")
+    if not args.dry_run:
+        print(f"   🔄 views refreshed: {'yes' if result.views_refreshed else 'no'}")
+    return result.rejected == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -4,7 +4,7 @@ Database Initialization and Restore Script
 This will:
 1. Create the pglocal database if it doesn't exist
 2. Create all tables from SQLAlchemy models
-3. Restore data from the dump file
+3. Restore data from the dump file (parallel pg_restore, see restore_db.py)
 """
 
 import subprocess
@@ -14,6 +14,8 @@ import psycopg2
 import asyncio
 from pathlib import Path
 
+from restore_db import find_pg_binary, restore_data_dump, analyze_database, create_views
+
 # Database connection parameters (matching the connection string provided)
 DB_HOST = "localhost"
 DB_PORT = 5432
@@ -42,8 +44,9 @@ def run_postgres_command(command, connection_params=None):
     env['PGPASSWORD'] = connection_params['password']
     
     psql_cmd = [
-        r'C:\Program Files\PostgreSQL\17\bin\psql.exe',
+        find_pg_binary('psql'),
         '-h', connection_params['host'],
+        '-p', str(connection_params['port']),
         '-U', connection_params['user'],
     ]
     
@@ -107,63 +110,13 @@ def create_app_admin_user():
     return True
 
 
-def restore_dump_file():
-    """Restore data from the dump file"""
-    print("\n" + "="*60)
-    print("STEP 3: Restoring Data from Dump File")
-    print("="*60)
-    
+def restore_dump_file(jobs=None):
+    """Restore data from the dump file, then ANALYZE and create the views"""
     dump_file = Path(__file__).parent.parent / "dbahrms-ranjith.dump"
-    
-    if not dump_file.exists():
-        print(f"❌ Dump file not found: {dump_file}")
-        return False
-    
-    print(f"📂 Using dump file: {dump_file}")
-    print(f"📊 File size: {dump_file.stat().st_size / (1024*1024):.2f} MB")
-    
-    env = os.environ.copy()
-    env['PGPASSWORD'] = DB_PASSWORD
-    
-    psql_cmd = [
-        r'C:\Program Files\PostgreSQL\17\bin\psql.exe',
-        '-h', DB_HOST,
-        '-U', DB_USER,
-        '-d', DB_NAME,
-        '-f', str(dump_file)
-    ]
-    
-    print("\n⏳ Restoring data... (this may take several minutes)")
-    try:
-        result = subprocess.run(
-            psql_cmd,
-            env=env,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minutes timeout
-        )
-        
-        if result.returncode == 0:
-            print("✅ Data restored successfully")
-            return True
-        else:
-            # The restore might have partially succeeded despite exit code 1
-            # Check if tables were created
-            if result.stderr and 'ERROR' in result.stderr:
-                print(f"⚠️  Some errors occurred during restore (but data might be partially restored):")
-                # Print last few lines of error
-                error_lines = result.stderr.split('\n')
-                for line in error_lines[-10:]:
-                    if line.strip():
-                        print(f"   {line}")
-            
-            return True  # Consider it successful even with warnings
-    except subprocess.TimeoutExpired:
-        print("❌ Restore timed out after 10 minutes")
-        return False
-    except Exception as e:
-        print(f"❌ Error during restore: {e}")
-        return False
+    success = restore_data_dump(dump_file, DB_NAME, jobs)
+    analyze_database(DB_NAME, jobs)
+    create_views(DB_NAME)
+    return success
 
 
 def verify_restore():
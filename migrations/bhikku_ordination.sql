@@ -0,0 +1,155 @@
+-- =============================================
+-- Buddhist Affairs MIS Dashboard - Bhikku Ordination Status
+-- =============================================
+-- bhikku_ordination: one row per bhikku (br_regn) with a higher
+-- ordination on record, with its status.  A bhikku without a row is a
+-- samanera.
+--
+--   upasampada → an active bhikku_high_regist row names the bhikku
+--                (bhr_samanera_serial_no = br_regn)
+--
+-- The bikku-type breakdown becomes one grouped scan of bhikku_regist
+-- LEFT JOINed to this table by primary key, under the same filters as
+-- every other tile, instead of a NOT EXISTS probe per bhikku plus a
+-- separate count of bhikku_high_regist
+-- (app/services/section2_service.py derives the same rows from
+-- bhikku_high_regist when this table is missing).
+--
+-- Kept current by statement-level triggers on bhikku_high_regist: the
+-- bhikkus its changed rows name (before and after) are re-derived.
+--
+-- Run with: python run_migration.py migrations/bhikku_ordination.sql
+-- =============================================
+
+-- =============================================
+-- 1. TABLE
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS bhikku_ordination (
+    br_regn    text PRIMARY KEY,
+    status     text NOT NULL,
+    updated_at timestamp NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_bhikku_ordination_status ON bhikku_ordination (status);
+
+
+-- =============================================
+-- 2. REFRESH FUNCTION
+-- =============================================
+-- Re-derives the status of the given registration numbers (NULL = every
+-- bhikku).
+
+CREATE OR REPLACE FUNCTION bhikku_ordination_refresh(regns text[])
+RETURNS void AS $$
+BEGIN
+    DELETE FROM bhikku_ordination WHERE regns IS NULL OR br_regn = ANY(regns);
+
+    INSERT INTO bhikku_ordination (br_regn, status)
+    SELECT DISTINCT bh.bhr_samanera_serial_no, 'upasampada'
+    FROM bhikku_high_regist bh
+    WHERE (bh.bhr_is_deleted = false OR bh.bhr_is_deleted IS NULL)
+      AND bh.bhr_samanera_serial_no IS NOT NULL
+      AND (regns IS NULL OR bh.bhr_samanera_serial_no = ANY(regns))
+    ON CONFLICT (br_regn) DO NOTHING;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- =============================================
+-- 3. TRIGGER FUNCTIONS
+-- =============================================
+-- Old and new row images are both used so a higher registration moved to
+-- another bhikku refreshes both.
+
+CREATE OR REPLACE FUNCTION bhikku_ordination_on_change()
+RETURNS trigger AS $$
+DECLARE
+    src   text;
+    regns text[];
+BEGIN
+    src := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    EXECUTE format(
+        'WITH r AS (%s) SELECT ARRAY(SELECT DISTINCT r.bhr_samanera_serial_no::text FROM r
+                                     WHERE r.bhr_samanera_serial_no IS NOT NULL)',
+        src
+    ) INTO regns;
+    IF cardinality(regns) > 0 THEN
+        PERFORM bhikku_ordination_refresh(regns);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bhikku_ordination_rebuild()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM bhikku_ordination_refresh(NULL);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- =============================================
+-- 4. TRIGGERS
+-- =============================================
+-- Transition tables are allowed only on single-event triggers, hence one
+-- trigger per event.
+
+DROP TRIGGER IF EXISTS trg_bhikku_ordination_ins ON bhikku_high_regist;
+DROP TRIGGER IF EXISTS trg_bhikku_ordination_upd ON bhikku_high_regist;
+DROP TRIGGER IF EXISTS trg_bhikku_ordination_del ON bhikku_high_regist;
+DROP TRIGGER IF EXISTS trg_bhikku_ordination_trunc ON bhikku_high_regist;
+
+CREATE TRIGGER trg_bhikku_ordination_ins AFTER INSERT ON bhikku_high_regist
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bhikku_ordination_on_change();
+
+CREATE TRIGGER trg_bhikku_ordination_upd AFTER UPDATE ON bhikku_high_regist
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bhikku_ordination_on_change();
+
+CREATE TRIGGER trg_bhikku_ordination_del AFTER DELETE ON bhikku_high_regist
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bhikku_ordination_on_change();
+
+CREATE TRIGGER trg_bhikku_ordination_trunc AFTER TRUNCATE ON bhikku_high_regist
+    FOR EACH STATEMENT EXECUTE FUNCTION bhikku_ordination_rebuild();
+
+
+-- =============================================
+-- 5. SUPPORTING INDEXES
+-- =============================================
+-- The refresh looks higher registrations up by the bhikku they name.
+-- Built before the initial build so it can use it.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bhikku_high_regist_samanera_serial ON bhikku_high_regist (bhr_samanera_serial_no);
+
+
+-- =============================================
+-- 6. INITIAL BUILD
+-- =============================================
+
+SELECT bhikku_ordination_refresh(NULL);
+
+ANALYZE bhikku_ordination;
+
+
+-- =============================================
+-- GRANT PERMISSIONS
+-- =============================================
+
+GRANT SELECT ON bhikku_ordination TO app_admin;
+
+-- =============================================
+-- NOTES:
+-- 1. Only bhikkus with a higher ordination have a row, so the table stays
+--    small and the LEFT JOIN is a hash join against it.
+-- 2. bhikku_regist changes need no refresh: the status is keyed by
+--    registration number.
+-- 3. Rebuild by hand with: SELECT bhikku_ordination_refresh(NULL);
+-- =============================================
@@ -0,0 +1,238 @@
+-- =============================================
+-- Buddhist Affairs MIS Dashboard - Change Notifications
+-- =============================================
+-- Statement-level triggers that NOTIFY the `dashboard_changes` channel
+-- whenever a registration or reference table changes.  The API listens
+-- on this channel (app/utils/cache_invalidation.py) and drops only the
+-- cached responses the change can affect, so caches can use long TTLs.
+--
+-- Payload (JSON):
+--   {"table": "vihaddata",
+--    "provinces": ["WP"], "districts": ["CMB"], "trns": ["TRN0001"]}
+-- Key arrays are omitted when unknown or too large for a NOTIFY payload;
+-- listeners then treat the change as affecting every location.
+--
+-- Run with: python run_migration.py migrations/cache_notify.sql
+-- =============================================
+
+-- =============================================
+-- 1. REGISTRATION TABLES (with location keys)
+-- =============================================
+-- TG_ARGV[0] = province column, TG_ARGV[1] = district column,
+-- TG_ARGV[2] = temple TRN column ('' when the table has none).
+-- Old and new row images are both included so a record that moves
+-- between districts invalidates both.
+
+CREATE OR REPLACE FUNCTION notify_registration_change()
+RETURNS trigger AS $$
+DECLARE
+    province_col text := TG_ARGV[0];
+    district_col text := TG_ARGV[1];
+    trn_col      text := NULLIF(TG_ARGV[2], '');
+    src          text;
+    provinces    text[];
+    districts    text[];
+    trns         text[];
+    payload      text;
+BEGIN
+    src := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+
+    -- Province from the row itself and via its district, since either may be blank
+    EXECUTE format(
+        'WITH r AS (%s)
+         SELECT
+             ARRAY(SELECT DISTINCT p FROM (
+                       SELECT NULLIF(r.%I::text, '''') AS p FROM r
+                       UNION
+                       SELECT d.dd_prcode::text FROM r
+                       JOIN cmm_districtdata d ON d.dd_dcode = r.%I::text
+                   ) x WHERE p IS NOT NULL),
+             ARRAY(SELECT DISTINCT NULLIF(r.%I::text, '''') FROM r
+                   WHERE NULLIF(r.%I::text, '''') IS NOT NULL)',
+        src, province_col, district_col, district_col, district_col
+    ) INTO provinces, districts;
+
+    IF trn_col IS NOT NULL THEN
+        EXECUTE format(
+            'WITH r AS (%s)
+             SELECT ARRAY(SELECT DISTINCT r.%I::text FROM r WHERE r.%I IS NOT NULL)',
+            src, trn_col, trn_col
+        ) INTO trns;
+    END IF;
+
+    payload := json_build_object(
+        'table', TG_TABLE_NAME,
+        'provinces', provinces,
+        'districts', districts,
+        'trns', trns
+    )::text;
+
+    -- NOTIFY payloads are limited to 8000 bytes; fall back to "anywhere"
+    IF octet_length(payload) > 7900 THEN
+        payload := json_build_object('table', TG_TABLE_NAME)::text;
+    END IF;
+
+    PERFORM pg_notify('dashboard_changes', payload);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('vihaddata',             'vh_province',  'vh_district',  'vh_trn'),
+            ('bhikku_regist',         'br_province',  'br_district',  'br_livtemple'),
+            ('silmatha_regist',       'sil_province', 'sil_district', 'sil_robing_after_residence_temple'),
+            ('aramadata',             'ar_province',  'ar_district',  '')
+        ) AS v(tbl, province_col, district_col, trn_col)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_notify_change_ins ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_notify_change_upd ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_notify_change_del ON %I', t.tbl);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_notify_change_ins AFTER INSERT ON %I
+                 REFERENCING NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION notify_registration_change(%L, %L, %L)',
+            t.tbl, t.province_col, t.district_col, t.trn_col);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_notify_change_upd AFTER UPDATE ON %I
+                 REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION notify_registration_change(%L, %L, %L)',
+            t.tbl, t.province_col, t.district_col, t.trn_col);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_notify_change_del AFTER DELETE ON %I
+                 REFERENCING OLD TABLE AS old_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION notify_registration_change(%L, %L, %L)',
+            t.tbl, t.province_col, t.district_col, t.trn_col);
+    END LOOP;
+END;
+$$;
+
+
+-- =============================================
+-- 2. SSBM REGISTRATIONS (location via the temple)
+-- =============================================
+-- sasanarakshana_regist has no location columns of its own; resolve
+-- them through vihaddata so only the temple's province/district is hit.
+
+CREATE OR REPLACE FUNCTION notify_ssbm_change()
+RETURNS trigger AS $$
+DECLARE
+    src       text;
+    provinces text[];
+    districts text[];
+    trns      text[];
+    payload   text;
+BEGIN
+    src := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+
+    EXECUTE format(
+        'WITH r AS (%s),
+              v AS (SELECT v.vh_province, v.vh_district, v.vh_trn
+                    FROM vihaddata v JOIN r ON r.sar_temple_trn = v.vh_trn)
+         SELECT
+             ARRAY(SELECT DISTINCT p FROM (
+                       SELECT NULLIF(v.vh_province, '''') AS p FROM v
+                       UNION
+                       SELECT d.dd_prcode FROM v
+                       JOIN cmm_districtdata d ON d.dd_dcode = v.vh_district
+                   ) x WHERE p IS NOT NULL),
+             ARRAY(SELECT DISTINCT v.vh_district FROM v WHERE NULLIF(v.vh_district, '''') IS NOT NULL),
+             ARRAY(SELECT DISTINCT r.sar_temple_trn FROM r WHERE r.sar_temple_trn IS NOT NULL)',
+        src
+    ) INTO provinces, districts, trns;
+
+    payload := json_build_object(
+        'table', TG_TABLE_NAME,
+        'provinces', provinces,
+        'districts', districts,
+        'trns', trns
+    )::text;
+
+    IF octet_length(payload) > 7900 THEN
+        payload := json_build_object('table', TG_TABLE_NAME)::text;
+    END IF;
+
+    PERFORM pg_notify('dashboard_changes', payload);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_change_ins ON sasanarakshana_regist;
+DROP TRIGGER IF EXISTS trg_notify_change_upd ON sasanarakshana_regist;
+DROP TRIGGER IF EXISTS trg_notify_change_del ON sasanarakshana_regist;
+
+CREATE TRIGGER trg_notify_change_ins AFTER INSERT ON sasanarakshana_regist
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_ssbm_change();
+
+CREATE TRIGGER trg_notify_change_upd AFTER UPDATE ON sasanarakshana_regist
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_ssbm_change();
+
+CREATE TRIGGER trg_notify_change_del AFTER DELETE ON sasanarakshana_regist
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_ssbm_change();
+
+
+-- =============================================
+-- 3. TABLES WITHOUT LOCATION KEYS
+-- =============================================
+-- Reference (cmm_*) tables and bhikku_high_regist: announce the table
+-- only.  Reference changes rename or re-parent locations, so listeners
+-- drop every entry that depends on them.
+
+CREATE OR REPLACE FUNCTION notify_table_change()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('dashboard_changes', json_build_object('table', TG_TABLE_NAME)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tbl text;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY[
+        'bhikku_high_regist',
+        'cmm_province',
+        'cmm_districtdata',
+        'cmm_dvsec',
+        'cmm_gndata',
+        'cmm_nikayadata',
+        'cmm_parshawadata',
+        'cmm_sasanarbm'
+    ]
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_notify_change ON %I', tbl);
+        EXECUTE format(
+            'CREATE TRIGGER trg_notify_change
+                 AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                 FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change()',
+            tbl);
+    END LOOP;
+END;
+$$;
+
+-- =============================================
+-- NOTES:
+-- 1. NOTIFY is delivered on commit; identical payloads raised in one
+--    transaction are delivered once.
+-- 2. TRUNCATE on a registration table is not announced with keys; run
+--    POST /api/v1/dashboard/refresh-views afterwards to clear caches.
+-- =============================================
@@ -101,16 +101,27 @@ DROP MATERIALIZED VIEW IF EXISTS mv_dashboard_nikaya_summary CASCADE;
 
 CREATE MATERIALIZED VIEW mv_dashboard_nikaya_summary AS
 -- First, get nikaya from cmm_nikayadata with proper names
+-- Counted per nikaya before the join: joining the rows themselves
+-- multiplies viharas x bhikkus per nikaya
 SELECT
     n.nk_nkn as nikaya_code,
     n.nk_nname as nikaya_name,
-    COUNT(DISTINCT v.vh_trn) as vihara_count,
-    COUNT(DISTINCT b.br_regn) as bikku_count
+    COALESCE(v_grp.vihara_count, 0) as vihara_count,
+    COALESCE(b_grp.bikku_count, 0) as bikku_count
 FROM cmm_nikayadata n
-LEFT JOIN vihaddata v ON v.vh_nikaya = n.nk_nkn AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
-LEFT JOIN bhikku_regist b ON b.br_nikaya = n.nk_nkn AND (b.br_is_deleted = false OR b.br_is_deleted IS NULL)
+LEFT JOIN (
+    SELECT vh_nikaya, COUNT(DISTINCT vh_trn) as vihara_count
+    FROM vihaddata
+    WHERE vh_is_deleted = false OR vh_is_deleted IS NULL
+    GROUP BY vh_nikaya
+) v_grp ON v_grp.vh_nikaya = n.nk_nkn
+LEFT JOIN (
+    SELECT br_nikaya, COUNT(DISTINCT br_regn) as bikku_count
+    FROM bhikku_regist
+    WHERE br_is_deleted = false OR br_is_deleted IS NULL
+    GROUP BY br_nikaya
+) b_grp ON b_grp.br_nikaya = n.nk_nkn
 WHERE n.nk_is_deleted = false OR n.nk_is_deleted IS NULL
-GROUP BY n.nk_nkn, n.nk_nname
 
 UNION ALL
 
@@ -330,16 +341,26 @@ CREATE UNIQUE INDEX idx_mv_dashboard_bikku_types ON mv_dashboard_bikku_types(typ
 DROP MATERIALIZED VIEW IF EXISTS mv_dashboard_parshawa_summary CASCADE;
 
 CREATE MATERIALIZED VIEW mv_dashboard_parshawa_summary AS
+-- Counted per parshawa before the join, as in the nikaya summary
 SELECT
     p.pr_prn as parshawa_code,
     p.pr_pname as parshawa_name,
-    COUNT(DISTINCT v.vh_trn) as vihara_count,
-    COUNT(DISTINCT b.br_regn) as bikku_count
+    COALESCE(v_grp.vihara_count, 0) as vihara_count,
+    COALESCE(b_grp.bikku_count, 0) as bikku_count
 FROM cmm_parshawadata p
-LEFT JOIN vihaddata v ON v.vh_parshawa = p.pr_prn AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
-LEFT JOIN bhikku_regist b ON b.br_parshawaya = p.pr_prn AND (b.br_is_deleted = false OR b.br_is_deleted IS NULL)
+LEFT JOIN (
+    SELECT vh_parshawa, COUNT(DISTINCT vh_trn) as vihara_count
+    FROM vihaddata
+    WHERE vh_is_deleted = false OR vh_is_deleted IS NULL
+    GROUP BY vh_parshawa
+) v_grp ON v_grp.vh_parshawa = p.pr_prn
+LEFT JOIN (
+    SELECT br_parshawaya, COUNT(DISTINCT br_regn) as bikku_count
+    FROM bhikku_regist
+    WHERE br_is_deleted = false OR br_is_deleted IS NULL
+    GROUP BY br_parshawaya
+) b_grp ON b_grp.br_parshawaya = p.pr_prn
 WHERE p.pr_is_deleted = false OR p.pr_is_deleted IS NULL
-GROUP BY p.pr_prn, p.pr_pname
 
 UNION ALL
 
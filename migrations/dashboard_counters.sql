@@ -0,0 +1,176 @@
+-- =============================================
+-- Buddhist Affairs MIS Dashboard - Headline Counters
+-- =============================================
+-- Exact counts behind the Summary A tiles / GET /dashboard/stats,
+-- kept in a single row by statement-level triggers with transition
+-- tables on the five registration tables.  Reading the tiles becomes a
+-- primary-key lookup instead of five COUNT(*) scans.
+--
+-- A row counts when its *_is_deleted flag is false or NULL, so inserts,
+-- hard deletes and soft-delete flips (UPDATE ... SET *_is_deleted = true)
+-- all move the counters.
+--
+-- Run with: python run_migration.py migrations/dashboard_counters.sql
+-- =============================================
+
+-- =============================================
+-- 1. COUNTERS TABLE
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    id          smallint PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    bikku       bigint NOT NULL DEFAULT 0,
+    silmatha    bigint NOT NULL DEFAULT 0,
+    vihara      bigint NOT NULL DEFAULT 0,
+    arama       bigint NOT NULL DEFAULT 0,
+    ssbm        bigint NOT NULL DEFAULT 0,
+    updated_at  timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO dashboard_counters (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+
+-- =============================================
+-- 2. TRIGGER FUNCTIONS
+-- =============================================
+-- TG_ARGV[0] = counter column, TG_ARGV[1] = soft-delete flag column.
+-- Transition tables are named new_rows / old_rows on every trigger.
+
+CREATE OR REPLACE FUNCTION dashboard_counters_apply()
+RETURNS trigger AS $$
+DECLARE
+    counter_col text := TG_ARGV[0];
+    deleted_col text := TG_ARGV[1];
+    delta       bigint := 0;
+    n           bigint;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        EXECUTE format(
+            'SELECT COUNT(*) FROM new_rows WHERE %1$I = false OR %1$I IS NULL', deleted_col
+        ) INTO n;
+        delta := delta + n;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        EXECUTE format(
+            'SELECT COUNT(*) FROM old_rows WHERE %1$I = false OR %1$I IS NULL', deleted_col
+        ) INTO n;
+        delta := delta - n;
+    END IF;
+
+    IF delta <> 0 THEN
+        EXECUTE format(
+            'UPDATE dashboard_counters SET %1$I = %1$I + $1, updated_at = now() WHERE id = 1',
+            counter_col
+        ) USING delta;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TRUNCATE cannot expose transition tables; just zero the counter
+CREATE OR REPLACE FUNCTION dashboard_counters_reset()
+RETURNS trigger AS $$
+BEGIN
+    EXECUTE format(
+        'UPDATE dashboard_counters SET %1$I = 0, updated_at = now() WHERE id = 1',
+        TG_ARGV[0]
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- =============================================
+-- 3. TRIGGERS
+-- =============================================
+-- Postgres allows transition tables only on single-event triggers,
+-- hence one trigger per event and table.
+
+DO $$
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('bhikku_regist',         'bikku',    'br_is_deleted'),
+            ('silmatha_regist',       'silmatha', 'sil_is_deleted'),
+            ('vihaddata',             'vihara',   'vh_is_deleted'),
+            ('aramadata',             'arama',    'ar_is_deleted'),
+            ('sasanarakshana_regist', 'ssbm',     'sar_is_deleted')
+        ) AS v(tbl, counter_col, deleted_col)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_dashboard_counters_ins ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_dashboard_counters_upd ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_dashboard_counters_del ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_dashboard_counters_trunc ON %I', t.tbl);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_dashboard_counters_ins AFTER INSERT ON %I
+                 REFERENCING NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counters_apply(%L, %L)',
+            t.tbl, t.counter_col, t.deleted_col);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_dashboard_counters_upd AFTER UPDATE ON %I
+                 REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counters_apply(%L, %L)',
+            t.tbl, t.counter_col, t.deleted_col);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_dashboard_counters_del AFTER DELETE ON %I
+                 REFERENCING OLD TABLE AS old_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counters_apply(%L, %L)',
+            t.tbl, t.counter_col, t.deleted_col);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_dashboard_counters_trunc AFTER TRUNCATE ON %I
+                 FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counters_reset(%L)',
+            t.tbl, t.counter_col);
+    END LOOP;
+END;
+$$;
+
+
+-- =============================================
+-- 4. RECONCILE
+-- =============================================
+-- Recomputes the counters from the base tables.  Run once after the
+-- triggers are installed (below) and any time drift is suspected.
+
+CREATE OR REPLACE FUNCTION reconcile_dashboard_counters()
+RETURNS void AS $$
+BEGIN
+    UPDATE dashboard_counters SET
+        bikku    = (SELECT COUNT(*) FROM bhikku_regist
+                    WHERE br_is_deleted = false OR br_is_deleted IS NULL),
+        silmatha = (SELECT COUNT(*) FROM silmatha_regist
+                    WHERE sil_is_deleted = false OR sil_is_deleted IS NULL),
+        vihara   = (SELECT COUNT(*) FROM vihaddata
+                    WHERE vh_is_deleted = false OR vh_is_deleted IS NULL),
+        arama    = (SELECT COUNT(*) FROM aramadata
+                    WHERE ar_is_deleted = false OR ar_is_deleted IS NULL),
+        ssbm     = (SELECT COUNT(*) FROM sasanarakshana_regist
+                    WHERE sar_is_deleted = false OR sar_is_deleted IS NULL),
+        updated_at = now()
+    WHERE id = 1;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT reconcile_dashboard_counters();
+
+
+-- =============================================
+-- GRANT PERMISSIONS
+-- =============================================
+
+GRANT SELECT ON dashboard_counters TO app_admin;
+
+-- =============================================
+-- NOTES:
+-- 1. Every write to a registration table now also updates the single
+--    counters row, so concurrent writers serialize briefly on it.  The
+--    registration workload is low-volume, so this is acceptable.
+-- 2. SELECT reconcile_dashboard_counters(); is safe to run at any time.
+-- =============================================
@@ -0,0 +1,156 @@
+-- =============================================
+-- Buddhist Affairs MIS Dashboard - Location Closure
+-- =============================================
+-- location_closure: one row per province, district, divisional
+-- secretariat (DS) and GN division, carrying the codes of all of its
+-- ancestors.  Every geographic filter in the API resolves through it
+-- (app/services/location.py):
+--
+--   province / district filter → row's district  → closure row (level 'district')
+--   DS / GN filter             → row's GN code   → closure row (level 'gn')
+--
+-- so a province filter is one indexed equality lookup instead of a
+-- mix of *_province columns, EXISTS on cmm_districtdata and GN joins.
+--
+-- The table is rebuilt by statement-level triggers whenever
+-- cmm_province, cmm_districtdata, cmm_dvsec or cmm_gndata change.
+--
+-- Run with: python run_migration.py migrations/location_closure.sql
+-- =============================================
+
+-- =============================================
+-- 1. TABLE
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS location_closure (
+    level         text NOT NULL,   -- province | district | ds | gn
+    code          text NOT NULL,   -- code of the node itself
+    province_code text,
+    district_code text,
+    ds_code       text,
+    gn_code       text,
+    PRIMARY KEY (level, code)
+);
+
+-- "All districts of province X", "all GNs of DS Y": index-only scans
+CREATE INDEX IF NOT EXISTS idx_location_closure_province ON location_closure (level, province_code, code);
+CREATE INDEX IF NOT EXISTS idx_location_closure_district ON location_closure (level, district_code, code);
+CREATE INDEX IF NOT EXISTS idx_location_closure_ds       ON location_closure (level, ds_code, code);
+
+
+-- =============================================
+-- 2. REBUILD
+-- =============================================
+-- Soft-deleted reference rows are left out, so filters never resolve
+-- through a deleted district or DS.
+
+CREATE OR REPLACE FUNCTION rebuild_location_closure()
+RETURNS void AS $$
+BEGIN
+    DELETE FROM location_closure;
+
+    INSERT INTO location_closure (level, code, province_code, district_code, ds_code, gn_code)
+    SELECT 'province', p.cp_code, p.cp_code, NULL, NULL, NULL
+    FROM cmm_province p
+    WHERE p.cp_is_deleted IS NOT TRUE
+    UNION ALL
+    SELECT 'district', d.dd_dcode, d.dd_prcode, d.dd_dcode, NULL, NULL
+    FROM cmm_districtdata d
+    WHERE d.dd_is_deleted IS NOT TRUE
+    UNION ALL
+    SELECT 'ds', dv.dv_dvcode, d.dd_prcode, d.dd_dcode, dv.dv_dvcode, NULL
+    FROM cmm_dvsec dv
+    LEFT JOIN cmm_districtdata d
+        ON d.dd_dcode = dv.dv_distrcd AND d.dd_is_deleted IS NOT TRUE
+    WHERE dv.dv_is_deleted IS NOT TRUE
+    UNION ALL
+    SELECT 'gn', gn.gn_gnc, d.dd_prcode, d.dd_dcode, dv.dv_dvcode, gn.gn_gnc
+    FROM cmm_gndata gn
+    LEFT JOIN cmm_dvsec dv
+        ON dv.dv_dvcode = gn.gn_dvcode AND dv.dv_is_deleted IS NOT TRUE
+    LEFT JOIN cmm_districtdata d
+        ON d.dd_dcode = dv.dv_distrcd AND d.dd_is_deleted IS NOT TRUE
+    WHERE gn.gn_is_deleted IS NOT TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION location_closure_refresh()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM rebuild_location_closure();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- =============================================
+-- 3. TRIGGERS
+-- =============================================
+-- Statement-level: a bulk load of GN divisions rebuilds once.
+
+DROP TRIGGER IF EXISTS trg_location_closure ON cmm_province;
+CREATE TRIGGER trg_location_closure
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cmm_province
+    FOR EACH STATEMENT EXECUTE FUNCTION location_closure_refresh();
+
+DROP TRIGGER IF EXISTS trg_location_closure ON cmm_districtdata;
+CREATE TRIGGER trg_location_closure
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cmm_districtdata
+    FOR EACH STATEMENT EXECUTE FUNCTION location_closure_refresh();
+
+DROP TRIGGER IF EXISTS trg_location_closure ON cmm_dvsec;
+CREATE TRIGGER trg_location_closure
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cmm_dvsec
+    FOR EACH STATEMENT EXECUTE FUNCTION location_closure_refresh();
+
+DROP TRIGGER IF EXISTS trg_location_closure ON cmm_gndata;
+CREATE TRIGGER trg_location_closure
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cmm_gndata
+    FOR EACH STATEMENT EXECUTE FUNCTION location_closure_refresh();
+
+
+-- =============================================
+-- 4. INITIAL BUILD
+-- =============================================
+
+SELECT rebuild_location_closure();
+
+ANALYZE location_closure;
+
+
+-- =============================================
+-- 5. SUPPORTING INDEXES
+-- =============================================
+-- Registration rows are matched on their district (province / district
+-- filters) or GN code (DS / GN filters).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bhikku_regist_district   ON bhikku_regist   (br_district);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bhikku_regist_gndiv      ON bhikku_regist   (br_gndiv);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_silmatha_regist_district ON silmatha_regist (sil_district);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_silmatha_regist_gndiv    ON silmatha_regist (sil_gndiv);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vihaddata_district       ON vihaddata       (vh_district);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vihaddata_gndiv          ON vihaddata       (vh_gndiv);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_aramadata_district       ON aramadata       (ar_district);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_aramadata_gndiv          ON aramadata       (ar_gndiv);
+
+-- Province filters no longer read *_province (see NOTES)
+DROP INDEX CONCURRENTLY IF EXISTS idx_bhikku_regist_province_sort_name;
+DROP INDEX CONCURRENTLY IF EXISTS idx_silmatha_regist_province_sort_name;
+
+
+-- =============================================
+-- GRANT PERMISSIONS
+-- =============================================
+
+GRANT SELECT ON location_closure TO app_admin;
+
+-- =============================================
+-- NOTES:
+-- 1. Province totals are derived from each row's district, not from the
+--    *_province columns (often NULL), so they always equal the sum of
+--    their districts.  Likewise DS totals equal the sum of their GNs.
+-- 2. /persons province filters resolve through the district too, so the
+--    idx_*_province_sort_name indexes an earlier persons_keyset.sql built
+--    are unused; they are dropped above.
+-- 3. Rebuild by hand with: SELECT rebuild_location_closure();
+-- =============================================
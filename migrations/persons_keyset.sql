@@ -0,0 +1,53 @@
+-- =============================================
+-- Buddhist Affairs MIS Dashboard - Persons Keyset Indexes
+-- =============================================
+-- Expression indexes matching the sort key of GET /persons and
+-- GET /persons/page: (display name, reg no) over active rows.
+-- Each branch of the listing is then an index range scan that stops
+-- after `limit` rows, whatever page is requested.
+--
+-- The name expressions must stay identical to BHIKKU_SORT_NAME /
+-- SILMATHA_SORT_NAME in app/services/persons_service.py.
+--
+-- Run with: python run_migration.py migrations/persons_keyset.sql
+-- =============================================
+
+-- =============================================
+-- 1. BHIKKU
+-- =============================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bhikku_regist_sort_name
+    ON bhikku_regist ((COALESCE(NULLIF(br_mahananame, ''), br_gihiname, '')), br_regn)
+    WHERE (br_is_deleted = false OR br_is_deleted IS NULL);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bhikku_regist_district_sort_name
+    ON bhikku_regist (br_district, (COALESCE(NULLIF(br_mahananame, ''), br_gihiname, '')), br_regn)
+    WHERE (br_is_deleted = false OR br_is_deleted IS NULL);
+
+
+-- =============================================
+-- 2. SILMATHA
+-- =============================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_silmatha_regist_sort_name
+    ON silmatha_regist ((COALESCE(NULLIF(sil_mahananame, ''), sil_gihiname, '')), sil_regn)
+    WHERE (sil_is_deleted = false OR sil_is_deleted IS NULL);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_silmatha_regist_district_sort_name
+    ON silmatha_regist (sil_district, (COALESCE(NULLIF(sil_mahananame, ''), sil_gihiname, '')), sil_regn)
+    WHERE (sil_is_deleted = false OR sil_is_deleted IS NULL);
+
+ANALYZE bhikku_regist;
+ANALYZE silmatha_regist;
+
+-- =============================================
+-- NOTES:
+-- 1. Free-text search (ILIKE '%...%') still filters while walking the
+--    index; the scan stops as soon as a page of matches is found.
+-- 2. The indexes are built CONCURRENTLY: reads and writes continue while
+--    they build.  run_migration.py runs these steps outside a transaction.
+-- 3. Province filters resolve through location_closure to the province's
+--    districts (migrations/location_closure.sql): each district is a range
+--    of its district index, merged by a top-N sort of the province's
+--    rows.  There is no per-province index.
+-- =============================================
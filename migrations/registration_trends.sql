@@ -0,0 +1,296 @@
+-- =============================================
+-- Buddhist Affairs MIS Dashboard - Registration Trends
+-- =============================================
+-- 1. registration_monthly_rollup: registrations per month, entity and
+--    district, kept current by statement-level triggers.
+--    GET /trends/registrations?granularity=month reads only this table.
+-- 2. BRIN indexes on the created / updated timestamps of the registration
+--    tables for ad-hoc ranges (weekly trends, date_from / date_to lists).
+--
+-- A registration counts in the month of its *_created_at while its
+-- *_is_deleted flag is false or NULL; an unknown district is ''.
+-- Provinces are resolved from the district through location_closure when
+-- the rollup is read, as they are for the base tables.
+--
+-- Run with: python run_migration.py migrations/registration_trends.sql
+-- =============================================
+
+-- =============================================
+-- 1. ROLLUP TABLE
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS registration_monthly_rollup (
+    entity        text   NOT NULL,   -- bikku | silmatha | vihara | arama | ssbm
+    month         date   NOT NULL,   -- first day of the month
+    district      text   NOT NULL DEFAULT '',
+    registrations bigint NOT NULL DEFAULT 0,
+    PRIMARY KEY (entity, month, district)
+);
+
+CREATE INDEX IF NOT EXISTS idx_registration_rollup_district
+    ON registration_monthly_rollup (district, entity, month);
+
+
+-- =============================================
+-- 2. TRIGGER FUNCTIONS
+-- =============================================
+-- TG_ARGV[0] = entity, [1] = created column, [2] = district column,
+-- [3] = soft-delete flag column.
+-- sasanarakshana_regist has no location of its own: its district is
+-- taken from the temple (vihaddata) at write time, and
+-- registration_rollup_ssbm_move() re-buckets a temple's SSBM rows when the
+-- temple's location changes, so later SSBM writes subtract from the
+-- bucket they were counted in.
+
+CREATE OR REPLACE FUNCTION registration_rollup_rows(
+    rows_name text, sign int,
+    created_col text, district_col text, deleted_col text
+)
+RETURNS text AS $$
+BEGIN
+    -- Builds "SELECT created, district, delta" over one transition table
+    RETURN format(
+        'SELECT r.%1$I AS created,
+                COALESCE(%2$s::text, '''') AS district,
+                %3$s AS delta
+         FROM %4$I r %5$s
+         WHERE r.%1$I IS NOT NULL AND r.%6$I IS NOT TRUE',
+        created_col,
+        CASE WHEN district_col = '' THEN 'v.vh_district' ELSE 'r.' || quote_ident(district_col) END,
+        sign,
+        rows_name,
+        CASE WHEN district_col = '' THEN 'LEFT JOIN vihaddata v ON v.vh_trn = r.sar_temple_trn' ELSE '' END,
+        deleted_col
+    );
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION registration_rollup_apply()
+RETURNS trigger AS $$
+DECLARE
+    src text;
+BEGIN
+    src := CASE TG_OP
+        WHEN 'INSERT' THEN registration_rollup_rows('new_rows', 1, TG_ARGV[1], TG_ARGV[2], TG_ARGV[3])
+        WHEN 'DELETE' THEN registration_rollup_rows('old_rows', -1, TG_ARGV[1], TG_ARGV[2], TG_ARGV[3])
+        ELSE registration_rollup_rows('new_rows', 1, TG_ARGV[1], TG_ARGV[2], TG_ARGV[3])
+             || ' UNION ALL '
+             || registration_rollup_rows('old_rows', -1, TG_ARGV[1], TG_ARGV[2], TG_ARGV[3])
+    END;
+
+    EXECUTE format(
+        'INSERT INTO registration_monthly_rollup AS m (entity, month, district, registrations)
+         SELECT %L, date_trunc(''month'', created)::date, district, SUM(delta)
+         FROM (%s) x
+         GROUP BY 2, 3
+         HAVING SUM(delta) <> 0
+         ON CONFLICT (entity, month, district)
+         DO UPDATE SET registrations = m.registrations + EXCLUDED.registrations',
+        TG_ARGV[0], src
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- On vihaddata: moves the live SSBM registrations of every temple whose
+-- district changed from the old bucket to the new one.  A temple that is
+-- inserted, deleted or renumbered moves from / to the unknown ('')
+-- bucket, where its SSBM rows counted without it.
+CREATE OR REPLACE FUNCTION registration_rollup_ssbm_move()
+RETURNS trigger AS $$
+DECLARE
+    none text := 'SELECT NULL::text AS vh_trn, NULL::text AS district WHERE false';
+    located text := 'SELECT t.vh_trn::text AS vh_trn, COALESCE(t.vh_district::text, '''') AS district
+                     FROM %I t';
+BEGIN
+    EXECUTE format(
+        'INSERT INTO registration_monthly_rollup AS m (entity, month, district, registrations)
+         SELECT ''ssbm'', date_trunc(''month'', s.sar_created_at)::date, x.district, SUM(x.delta)
+         FROM (
+             SELECT COALESCE(o.vh_trn, n.vh_trn) AS vh_trn,
+                    COALESCE(o.district, '''') AS old_district,
+                    COALESCE(n.district, '''') AS new_district
+             FROM (%s) o
+             FULL JOIN (%s) n ON n.vh_trn = o.vh_trn
+         ) t
+         CROSS JOIN LATERAL (
+             SELECT r.sar_created_at
+             FROM sasanarakshana_regist r
+             WHERE r.sar_temple_trn = t.vh_trn
+               AND r.sar_created_at IS NOT NULL AND r.sar_is_deleted IS NOT TRUE
+         ) s
+         CROSS JOIN LATERAL (VALUES
+             (t.old_district, -1),
+             (t.new_district, 1)
+         ) x(district, delta)
+         WHERE t.old_district IS DISTINCT FROM t.new_district
+         GROUP BY 2, 3
+         HAVING SUM(x.delta) <> 0
+         ON CONFLICT (entity, month, district)
+         DO UPDATE SET registrations = m.registrations + EXCLUDED.registrations',
+        CASE WHEN TG_OP = 'INSERT' THEN none ELSE format(located, 'old_rows') END,
+        CASE WHEN TG_OP = 'DELETE' THEN none ELSE format(located, 'new_rows') END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION registration_rollup_reset()
+RETURNS trigger AS $$
+BEGIN
+    DELETE FROM registration_monthly_rollup WHERE entity = TG_ARGV[0];
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- =============================================
+-- 3. TRIGGERS
+-- =============================================
+-- One trigger per event: transition tables need single-event triggers.
+
+DO $$
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('bhikku_regist',         'bikku',    'br_created_at',  'br_district',  'br_is_deleted'),
+            ('silmatha_regist',       'silmatha', 'sil_created_at', 'sil_district', 'sil_is_deleted'),
+            ('vihaddata',             'vihara',   'vh_created_at',  'vh_district',  'vh_is_deleted'),
+            ('aramadata',             'arama',    'ar_created_at',  'ar_district',  'ar_is_deleted'),
+            ('sasanarakshana_regist', 'ssbm',     'sar_created_at', '',             'sar_is_deleted')
+        ) AS v(tbl, entity, created_col, district_col, deleted_col)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_registration_rollup_ins ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_registration_rollup_upd ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_registration_rollup_del ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_registration_rollup_trunc ON %I', t.tbl);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_registration_rollup_ins AFTER INSERT ON %I
+                 REFERENCING NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_apply(%L, %L, %L, %L)',
+            t.tbl, t.entity, t.created_col, t.district_col, t.deleted_col);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_registration_rollup_upd AFTER UPDATE ON %I
+                 REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_apply(%L, %L, %L, %L)',
+            t.tbl, t.entity, t.created_col, t.district_col, t.deleted_col);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_registration_rollup_del AFTER DELETE ON %I
+                 REFERENCING OLD TABLE AS old_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_apply(%L, %L, %L, %L)',
+            t.tbl, t.entity, t.created_col, t.district_col, t.deleted_col);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_registration_rollup_trunc AFTER TRUNCATE ON %I
+                 FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_reset(%L)',
+            t.tbl, t.entity);
+    END LOOP;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_registration_rollup_ssbm_ins ON vihaddata;
+DROP TRIGGER IF EXISTS trg_registration_rollup_ssbm_upd ON vihaddata;
+DROP TRIGGER IF EXISTS trg_registration_rollup_ssbm_del ON vihaddata;
+
+CREATE TRIGGER trg_registration_rollup_ssbm_ins AFTER INSERT ON vihaddata
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_ssbm_move();
+CREATE TRIGGER trg_registration_rollup_ssbm_upd AFTER UPDATE ON vihaddata
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_ssbm_move();
+CREATE TRIGGER trg_registration_rollup_ssbm_del AFTER DELETE ON vihaddata
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_ssbm_move();
+
+
+-- =============================================
+-- 4. REBUILD
+-- =============================================
+-- Recomputes the rollup from the base tables.  Run once after install
+-- (below) and whenever drift is suspected.
+
+CREATE OR REPLACE FUNCTION rebuild_registration_rollup()
+RETURNS void AS $$
+BEGIN
+    DELETE FROM registration_monthly_rollup;
+
+    INSERT INTO registration_monthly_rollup (entity, month, district, registrations)
+    SELECT entity, date_trunc('month', created)::date, district, COUNT(*)
+    FROM (
+        SELECT 'bikku' AS entity, r.br_created_at AS created, COALESCE(r.br_district, '') AS district
+        FROM bhikku_regist r
+        WHERE r.br_created_at IS NOT NULL AND r.br_is_deleted IS NOT TRUE
+        UNION ALL
+        SELECT 'silmatha', r.sil_created_at, COALESCE(r.sil_district, '')
+        FROM silmatha_regist r
+        WHERE r.sil_created_at IS NOT NULL AND r.sil_is_deleted IS NOT TRUE
+        UNION ALL
+        SELECT 'vihara', r.vh_created_at, COALESCE(r.vh_district, '')
+        FROM vihaddata r
+        WHERE r.vh_created_at IS NOT NULL AND r.vh_is_deleted IS NOT TRUE
+        UNION ALL
+        SELECT 'arama', r.ar_created_at, COALESCE(r.ar_district, '')
+        FROM aramadata r
+        WHERE r.ar_created_at IS NOT NULL AND r.ar_is_deleted IS NOT TRUE
+        UNION ALL
+        SELECT 'ssbm', r.sar_created_at, COALESCE(v.vh_district, '')
+        FROM sasanarakshana_regist r
+        LEFT JOIN vihaddata v ON v.vh_trn = r.sar_temple_trn
+        WHERE r.sar_created_at IS NOT NULL AND r.sar_is_deleted IS NOT TRUE
+    ) x
+    GROUP BY 1, 2, 3;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_registration_rollup();
+
+
+-- =============================================
+-- 5. BRIN INDEXES
+-- =============================================
+-- Registration rows are appended roughly in time order, so block ranges
+-- correlate with the timestamps and a BRIN index skips almost all of the
+-- table for a date range at a tiny fraction of a B-tree's size.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_bhikku_regist_created_at    ON bhikku_regist         USING brin (br_created_at)  WITH (pages_per_range = 32);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_bhikku_regist_updated_at    ON bhikku_regist         USING brin (br_updated_at)  WITH (pages_per_range = 32);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_silmatha_regist_created_at  ON silmatha_regist       USING brin (sil_created_at) WITH (pages_per_range = 32);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_silmatha_regist_updated_at  ON silmatha_regist       USING brin (sil_updated_at) WITH (pages_per_range = 32);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_vihaddata_created_at        ON vihaddata             USING brin (vh_created_at)  WITH (pages_per_range = 32);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_vihaddata_updated_at        ON vihaddata             USING brin (vh_updated_at)  WITH (pages_per_range = 32);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_aramadata_created_at        ON aramadata             USING brin (ar_created_at)  WITH (pages_per_range = 32);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_aramadata_updated_at        ON aramadata             USING brin (ar_updated_at)  WITH (pages_per_range = 32);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_sasanarakshana_created_at   ON sasanarakshana_regist USING brin (sar_created_at) WITH (pages_per_range = 32);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS brin_sasanarakshana_updated_at   ON sasanarakshana_regist USING brin (sar_updated_at) WITH (pages_per_range = 32);
+
+-- SSBM registrations of one temple, for registration_rollup_ssbm_move()
+-- (the same index temple_listing.sql creates)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sasanarakshana_regist_temple_trn ON sasanarakshana_regist (sar_temple_trn);
+
+ANALYZE registration_monthly_rollup;
+
+
+-- =============================================
+-- GRANT PERMISSIONS
+-- =============================================
+
+GRANT SELECT ON registration_monthly_rollup TO app_admin;
+
+-- =============================================
+-- NOTES:
+-- 1. An SSBM counts under its temple's current district.  The rollup
+--    stores no province, so moving a district to another province is
+--    reported under the new one once location_closure is refreshed.
+--    SELECT rebuild_registration_rollup(); re-derives every bucket when
+--    drift is suspected.
+-- 2. *_updated_at correlates less with physical order than *_created_at
+--    once rows are edited; its BRIN index stays useful for recent ranges
+--    and can be re-summarized with brin_summarize_new_values().
+-- 3. The BRIN indexes are built CONCURRENTLY so the registration tables
+--    stay writable; run_migration.py runs them outside a transaction.
+-- =============================================
@@ -0,0 +1,304 @@
+-- =============================================
+-- Buddhist Affairs MIS Dashboard - SSBM Membership
+-- =============================================
+-- vh_ssbmcode is not populated, so a temple's Sasanarakshana Bala Mandala
+-- is the SSBM of its Divisional Secretariat
+-- (vihaddata.vh_divisional_secretariat = cmm_sasanarbm.sr_dvcd), and the
+-- bhikkus, silmathas and aramas of an SSBM are those in the GN divisions
+-- of its temples.  Resolving that per request meant joining cmm_sasanarbm
+-- to vihaddata and fanning out through vh_gndiv with COUNT(DISTINCT).
+--
+--   ssbm_membership: one row per (SSBM, active temple), with the temple's
+--                    GN / DS / district
+--   ssbm_stats:      one row per active SSBM with its vihara, bhikku,
+--                    silmatha and arama counts and the location keys the
+--                    /section3/ssbm-org filters use
+--
+-- /section3/ssbm-org reads ssbm_stats and /lookups/gn?ssbm_code= reads
+-- ssbm_membership by index (app/services/section3_service.py and
+-- lookup_service.py fall back to the joins when the tables are missing).
+--
+-- Kept current by statement-level triggers: changes to cmm_sasanarbm,
+-- vihaddata (its DS) and the GN division of bhikku / silmatha / arama rows
+-- refresh the SSBMs they touch; province / district changes rebuild.
+--
+-- Run with: python run_migration.py migrations/ssbm_membership.sql
+-- =============================================
+
+-- =============================================
+-- 1. TABLES
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS ssbm_membership (
+    ssbm_code     text NOT NULL,
+    vh_trn        text NOT NULL,
+    gn_code       text,
+    ds_code       text,
+    district_code text,
+    PRIMARY KEY (ssbm_code, vh_trn)
+);
+
+-- /lookups/gn?ssbm_code= and the GN → SSBM step of the triggers
+CREATE INDEX IF NOT EXISTS idx_ssbm_membership_ssbm_gn ON ssbm_membership (ssbm_code, gn_code);
+CREATE INDEX IF NOT EXISTS idx_ssbm_membership_gn      ON ssbm_membership (gn_code);
+CREATE INDEX IF NOT EXISTS idx_ssbm_membership_trn     ON ssbm_membership (vh_trn);
+
+CREATE TABLE IF NOT EXISTS ssbm_stats (
+    ssbm_code      text PRIMARY KEY,
+    ssbm_name      text,
+    district_code  text,                  -- sr_discd
+    ds_code        text,                  -- sr_dvcd
+    loc_province   text,                  -- location_closure: province of district_code
+    vihara_count   integer NOT NULL DEFAULT 0,
+    bhikku_count   integer NOT NULL DEFAULT 0,
+    silmatha_count integer NOT NULL DEFAULT 0,
+    arama_count    integer NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_ssbm_stats_province ON ssbm_stats (loc_province, ssbm_name);
+CREATE INDEX IF NOT EXISTS idx_ssbm_stats_district ON ssbm_stats (district_code, ssbm_name);
+CREATE INDEX IF NOT EXISTS idx_ssbm_stats_ds       ON ssbm_stats (ds_code, ssbm_name);
+
+
+-- =============================================
+-- 2. REFRESH FUNCTION
+-- =============================================
+-- Recomputes the membership and counts of the given SSBM codes (NULL =
+-- every SSBM).  Counts match the query-time join: distinct member temples,
+-- and distinct bhikkus / silmathas / aramas in any member temple's GN.
+--
+-- Concurrent refreshes of the same SSBM are serialised by a
+-- transaction-level advisory lock per SSBM code (taken in a fixed order so
+-- two refreshes cannot deadlock); a full rebuild locks both tables.  The
+-- statements after the lock see every write committed before it, and the
+-- stats insert is an upsert, so the last refresh to commit carries the
+-- latest counts.
+
+CREATE OR REPLACE FUNCTION ssbm_membership_refresh(ssbms text[])
+RETURNS void AS $$
+BEGIN
+    IF ssbms IS NULL THEN
+        LOCK TABLE ssbm_membership, ssbm_stats IN SHARE ROW EXCLUSIVE MODE;
+    ELSE
+        PERFORM pg_advisory_xact_lock(hashtext('ssbm_membership'), k)
+        FROM (SELECT DISTINCT hashtext(c) AS k FROM unnest(ssbms) c ORDER BY 1) keys;
+    END IF;
+
+    DELETE FROM ssbm_membership WHERE ssbms IS NULL OR ssbm_code = ANY(ssbms);
+    DELETE FROM ssbm_stats      WHERE ssbms IS NULL OR ssbm_code = ANY(ssbms);
+
+    INSERT INTO ssbm_membership (ssbm_code, vh_trn, gn_code, ds_code, district_code)
+    SELECT s.sr_ssbmcode, v.vh_trn, v.vh_gndiv, v.vh_divisional_secretariat, v.vh_district
+    FROM cmm_sasanarbm s
+    JOIN vihaddata v
+        ON v.vh_divisional_secretariat = s.sr_dvcd
+       AND (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
+    WHERE (s.sr_is_deleted = false OR s.sr_is_deleted IS NULL)
+      AND s.sr_ssbmcode IS NOT NULL
+      AND v.vh_trn IS NOT NULL
+      AND (ssbms IS NULL OR s.sr_ssbmcode = ANY(ssbms))
+    ON CONFLICT (ssbm_code, vh_trn) DO UPDATE SET
+        gn_code       = EXCLUDED.gn_code,
+        ds_code       = EXCLUDED.ds_code,
+        district_code = EXCLUDED.district_code;
+
+    INSERT INTO ssbm_stats (
+        ssbm_code, ssbm_name, district_code, ds_code, loc_province,
+        vihara_count, bhikku_count, silmatha_count, arama_count
+    )
+    SELECT
+        s.sr_ssbmcode,
+        s.sr_ssbname,
+        s.sr_discd,
+        s.sr_dvcd,
+        ld.province_code,
+        (SELECT COUNT(*) FROM ssbm_membership m WHERE m.ssbm_code = s.sr_ssbmcode),
+        (SELECT COUNT(*) FROM bhikku_regist b
+         WHERE (b.br_is_deleted = false OR b.br_is_deleted IS NULL)
+           AND b.br_gndiv IN (SELECT m.gn_code FROM ssbm_membership m WHERE m.ssbm_code = s.sr_ssbmcode)),
+        (SELECT COUNT(*) FROM silmatha_regist sl
+         WHERE (sl.sil_is_deleted = false OR sl.sil_is_deleted IS NULL)
+           AND sl.sil_gndiv IN (SELECT m.gn_code FROM ssbm_membership m WHERE m.ssbm_code = s.sr_ssbmcode)),
+        (SELECT COUNT(*) FROM aramadata a
+         WHERE (a.ar_is_deleted = false OR a.ar_is_deleted IS NULL)
+           AND a.ar_gndiv IN (SELECT m.gn_code FROM ssbm_membership m WHERE m.ssbm_code = s.sr_ssbmcode))
+    FROM cmm_sasanarbm s
+    LEFT JOIN location_closure ld ON ld.level = 'district' AND ld.code = s.sr_discd
+    WHERE (s.sr_is_deleted = false OR s.sr_is_deleted IS NULL)
+      AND s.sr_ssbmcode IS NOT NULL
+      AND (ssbms IS NULL OR s.sr_ssbmcode = ANY(ssbms))
+    ON CONFLICT (ssbm_code) DO UPDATE SET
+        ssbm_name      = EXCLUDED.ssbm_name,
+        district_code  = EXCLUDED.district_code,
+        ds_code        = EXCLUDED.ds_code,
+        loc_province   = EXCLUDED.loc_province,
+        vihara_count   = EXCLUDED.vihara_count,
+        bhikku_count   = EXCLUDED.bhikku_count,
+        silmatha_count = EXCLUDED.silmatha_count,
+        arama_count    = EXCLUDED.arama_count;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- =============================================
+-- 3. TRIGGER FUNCTIONS
+-- =============================================
+-- TG_ARGV[0] = the column that locates the changed rows, TG_ARGV[1] = what
+-- it holds:
+--   ssbm → an SSBM code (cmm_sasanarbm)
+--   ds   → a DS code; its SSBMs are those with that sr_dvcd (vihaddata)
+--   gn   → a GN code; its SSBMs come from ssbm_membership
+--          (bhikku_regist, silmatha_regist, aramadata)
+-- Old and new row images are both used so a temple moving DS refreshes
+-- both SSBMs.
+
+CREATE OR REPLACE FUNCTION ssbm_membership_on_change()
+RETURNS trigger AS $$
+DECLARE
+    key_col text := TG_ARGV[0];
+    kind    text := TG_ARGV[1];
+    src     text;
+    keys    text[];
+    ssbms   text[];
+BEGIN
+    src := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    EXECUTE format(
+        'WITH r AS (%s) SELECT ARRAY(SELECT DISTINCT r.%I::text FROM r WHERE r.%I IS NOT NULL)',
+        src, key_col, key_col
+    ) INTO keys;
+    IF cardinality(keys) = 0 THEN
+        RETURN NULL;
+    END IF;
+
+    IF kind = 'ssbm' THEN
+        ssbms := keys;
+    ELSIF kind = 'ds' THEN
+        ssbms := ARRAY(SELECT DISTINCT s.sr_ssbmcode::text FROM cmm_sasanarbm s WHERE s.sr_dvcd::text = ANY(keys));
+    ELSE
+        ssbms := ARRAY(SELECT DISTINCT m.ssbm_code FROM ssbm_membership m WHERE m.gn_code = ANY(keys));
+    END IF;
+
+    IF cardinality(ssbms) > 0 THEN
+        PERFORM ssbm_membership_refresh(ssbms);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Province / district changes re-parent SSBMs; truncates lose track of rows
+CREATE OR REPLACE FUNCTION ssbm_membership_rebuild()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM ssbm_membership_refresh(NULL);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- =============================================
+-- 4. TRIGGERS
+-- =============================================
+-- Transition tables are allowed only on single-event triggers, hence one
+-- trigger per event.  On cmm_province / cmm_districtdata,
+-- trg_location_closure fires before trg_ssbm_membership (same event,
+-- triggers fire in name order), so the rebuild sees the new closure.
+
+DO $$
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('cmm_sasanarbm',   'sr_ssbmcode',               'ssbm'),
+            ('vihaddata',       'vh_divisional_secretariat', 'ds'),
+            ('bhikku_regist',   'br_gndiv',                  'gn'),
+            ('silmatha_regist', 'sil_gndiv',                 'gn'),
+            ('aramadata',       'ar_gndiv',                  'gn')
+        ) AS v(tbl, key_col, kind)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_ssbm_membership_ins ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_ssbm_membership_upd ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_ssbm_membership_del ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_ssbm_membership_trunc ON %I', t.tbl);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_ssbm_membership_ins AFTER INSERT ON %I
+                 REFERENCING NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION ssbm_membership_on_change(%L, %L)',
+            t.tbl, t.key_col, t.kind);
+        EXECUTE format(
+            'CREATE TRIGGER trg_ssbm_membership_upd AFTER UPDATE ON %I
+                 REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION ssbm_membership_on_change(%L, %L)',
+            t.tbl, t.key_col, t.kind);
+        EXECUTE format(
+            'CREATE TRIGGER trg_ssbm_membership_del AFTER DELETE ON %I
+                 REFERENCING OLD TABLE AS old_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION ssbm_membership_on_change(%L, %L)',
+            t.tbl, t.key_col, t.kind);
+        EXECUTE format(
+            'CREATE TRIGGER trg_ssbm_membership_trunc AFTER TRUNCATE ON %I
+                 FOR EACH STATEMENT EXECUTE FUNCTION ssbm_membership_rebuild()',
+            t.tbl);
+    END LOOP;
+END;
+$$;
+
+DO $$
+DECLARE
+    tbl text;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['cmm_province', 'cmm_districtdata']
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_ssbm_membership ON %I', tbl);
+        EXECUTE format(
+            'CREATE TRIGGER trg_ssbm_membership
+                 AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                 FOR EACH STATEMENT EXECUTE FUNCTION ssbm_membership_rebuild()',
+            tbl);
+    END LOOP;
+END;
+$$;
+
+
+-- =============================================
+-- 5. SUPPORTING INDEXES
+-- =============================================
+-- Membership looks temples up by DS; the counts use the GN indexes from
+-- location_closure.sql.
+-- Built before the initial build so it can use them.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vihaddata_divisional_secretariat ON vihaddata     (vh_divisional_secretariat);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cmm_sasanarbm_dvcd               ON cmm_sasanarbm (sr_dvcd);
+
+
+-- =============================================
+-- 6. INITIAL BUILD
+-- =============================================
+
+SELECT ssbm_membership_refresh(NULL);
+
+ANALYZE ssbm_membership;
+ANALYZE ssbm_stats;
+
+
+-- =============================================
+-- GRANT PERMISSIONS
+-- =============================================
+
+GRANT SELECT ON ssbm_membership TO app_admin;
+GRANT SELECT ON ssbm_stats TO app_admin;
+
+-- =============================================
+-- NOTES:
+-- 1. Every vihaddata statement refreshes the SSBMs of the DS values its
+--    rows had or now have, whichever columns it changed (column lists
+--    cannot be combined with transition tables); likewise the GN-keyed
+--    triggers on bhikku_regist, silmatha_regist and aramadata.
+-- 2. A refresh recounts one SSBM with a few index lookups per member GN.
+-- 3. Rebuild by hand with: SELECT ssbm_membership_refresh(NULL);
+-- =============================================
@@ -0,0 +1,305 @@
+-- =============================================
+-- Buddhist Affairs MIS Dashboard - Temple Listing Projection
+-- =============================================
+-- temple_listing: one row per active temple (vihaddata) with every name
+-- the Section 3 temple list shows already resolved, its resident bhikku
+-- and SSBM counts, and the location_closure keys its filters use:
+--
+--   province filter → loc_province (province of the temple's district)
+--   district filter → district_code
+--   DS filter       → loc_ds       (DS of the temple's GN division)
+--   GN filter       → gn_code
+--   SSBM filter     → vh_trn IN the SSBM's ssbm_membership rows
+--                     (a temple can belong to several SSBMs, and
+--                     vh_ssbmcode is not populated)
+--
+-- GET /section3/temples becomes one range scan of a (filter, name) index
+-- with LIMIT, instead of joining vihaddata to six lookup tables per call
+-- (app/services/section3_service.py falls back to that join when this
+-- table is missing).
+--
+-- Kept current by statement-level triggers: changes to vihaddata,
+-- bhikku_regist (br_livtemple) and sasanarakshana_regist refresh the
+-- temples they touch; changes to the lookup tables rebuild the table.
+--
+-- Run with: python run_migration.py migrations/temple_listing.sql
+-- =============================================
+
+-- =============================================
+-- 1. TABLE
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS temple_listing (
+    vh_trn          text PRIMARY KEY,
+    vihara_name     text,
+    address         text,
+    grade           text,
+    nikaya_code     text,
+    nikaya_name     text,
+    parshawa_code   text,
+    parshawa_name   text,
+    province_name   text,                -- from vh_province, as the list has always shown
+    district_code   text,
+    district_name   text,
+    ds_name         text,
+    gn_code         text,
+    gn_name         text,
+    loc_province    text,                -- location_closure: province of district_code
+    loc_ds          text,                -- location_closure: DS of gn_code
+    chief_of_temple text,
+    mobile          text,
+    updated_at      timestamp,
+    bhikku_count    integer NOT NULL DEFAULT 0,  -- active bhikkus whose br_livtemple is this temple
+    ssbm_count      integer NOT NULL DEFAULT 0   -- active SSBM registrations of this temple
+);
+
+-- One index per filter, each ordered like the list (ORDER BY vihara_name LIMIT n)
+CREATE INDEX IF NOT EXISTS idx_temple_listing_name     ON temple_listing (vihara_name, vh_trn);
+CREATE INDEX IF NOT EXISTS idx_temple_listing_province ON temple_listing (loc_province, vihara_name);
+CREATE INDEX IF NOT EXISTS idx_temple_listing_district ON temple_listing (district_code, vihara_name);
+CREATE INDEX IF NOT EXISTS idx_temple_listing_ds       ON temple_listing (loc_ds, vihara_name);
+CREATE INDEX IF NOT EXISTS idx_temple_listing_gn       ON temple_listing (gn_code, vihara_name);
+CREATE INDEX IF NOT EXISTS idx_temple_listing_nikaya   ON temple_listing (nikaya_code, vihara_name);
+CREATE INDEX IF NOT EXISTS idx_temple_listing_parshawa ON temple_listing (parshawa_code, vihara_name);
+CREATE INDEX IF NOT EXISTS idx_temple_listing_grade    ON temple_listing (grade, vihara_name);
+-- date_from / date_to variants: range on updated_at, alone or within a district
+CREATE INDEX IF NOT EXISTS idx_temple_listing_updated          ON temple_listing (updated_at);
+CREATE INDEX IF NOT EXISTS idx_temple_listing_district_updated ON temple_listing (district_code, updated_at);
+
+
+-- =============================================
+-- 2. REFRESH FUNCTION
+-- =============================================
+-- Recomputes the rows of the given TRNs (NULL = every temple).  Names are
+-- scalar lookups so duplicate codes in a lookup table cannot duplicate a
+-- temple.
+--
+-- Concurrent refreshes of the same temple are serialised: each takes a
+-- transaction-level advisory lock per TRN (in a fixed order, so two
+-- refreshes cannot deadlock) and a full rebuild locks the table.  The
+-- statements after the lock see every write committed before it, so the
+-- last refresh to commit carries the latest counts; the upsert keeps that
+-- true even if a row appears in between.
+
+CREATE OR REPLACE FUNCTION temple_listing_refresh(trns text[])
+RETURNS void AS $$
+BEGIN
+    IF trns IS NULL THEN
+        LOCK TABLE temple_listing IN SHARE ROW EXCLUSIVE MODE;
+    ELSE
+        PERFORM pg_advisory_xact_lock(hashtext('temple_listing'), k)
+        FROM (SELECT DISTINCT hashtext(t) AS k FROM unnest(trns) t ORDER BY 1) keys;
+    END IF;
+
+    DELETE FROM temple_listing WHERE trns IS NULL OR vh_trn = ANY(trns);
+
+    INSERT INTO temple_listing (
+        vh_trn, vihara_name, address, grade,
+        nikaya_code, nikaya_name, parshawa_code, parshawa_name,
+        province_name, district_code, district_name, ds_name, gn_code, gn_name,
+        loc_province, loc_ds, chief_of_temple, mobile, updated_at,
+        bhikku_count, ssbm_count
+    )
+    SELECT
+        v.vh_trn,
+        v.vh_vname,
+        v.vh_addrs,
+        v.vh_typ,
+        v.vh_nikaya,
+        (SELECT nk.nk_nname  FROM cmm_nikayadata nk   WHERE nk.nk_nkn     = v.vh_nikaya  LIMIT 1),
+        v.vh_parshawa,
+        (SELECT pr.pr_pname  FROM cmm_parshawadata pr WHERE pr.pr_prn     = v.vh_parshawa LIMIT 1),
+        (SELECT p.cp_name    FROM cmm_province p      WHERE p.cp_code     = v.vh_province LIMIT 1),
+        v.vh_district,
+        (SELECT d.dd_dname   FROM cmm_districtdata d  WHERE d.dd_dcode    = v.vh_district LIMIT 1),
+        (SELECT dv.dv_dvname FROM cmm_dvsec dv        WHERE dv.dv_dvcode  = v.vh_divisional_secretariat LIMIT 1),
+        v.vh_gndiv,
+        (SELECT gn.gn_gnname FROM cmm_gndata gn       WHERE gn.gn_gnc     = v.vh_gndiv    LIMIT 1),
+        ld.province_code,
+        lg.ds_code,
+        v.vh_viharadhipathi_name,
+        v.vh_mobile,
+        v.vh_updated_at,
+        (SELECT COUNT(*) FROM bhikku_regist b
+         WHERE b.br_livtemple = v.vh_trn
+           AND (b.br_is_deleted = false OR b.br_is_deleted IS NULL)),
+        (SELECT COUNT(*) FROM sasanarakshana_regist sar
+         WHERE sar.sar_temple_trn = v.vh_trn
+           AND (sar.sar_is_deleted = false OR sar.sar_is_deleted IS NULL))
+    FROM vihaddata v
+    LEFT JOIN location_closure ld ON ld.level = 'district' AND ld.code = v.vh_district
+    LEFT JOIN location_closure lg ON lg.level = 'gn'       AND lg.code = v.vh_gndiv
+    WHERE (v.vh_is_deleted = false OR v.vh_is_deleted IS NULL)
+      AND (trns IS NULL OR v.vh_trn = ANY(trns))
+    ON CONFLICT (vh_trn) DO UPDATE SET
+        vihara_name     = EXCLUDED.vihara_name,
+        address         = EXCLUDED.address,
+        grade           = EXCLUDED.grade,
+        nikaya_code     = EXCLUDED.nikaya_code,
+        nikaya_name     = EXCLUDED.nikaya_name,
+        parshawa_code   = EXCLUDED.parshawa_code,
+        parshawa_name   = EXCLUDED.parshawa_name,
+        province_name   = EXCLUDED.province_name,
+        district_code   = EXCLUDED.district_code,
+        district_name   = EXCLUDED.district_name,
+        ds_name         = EXCLUDED.ds_name,
+        gn_code         = EXCLUDED.gn_code,
+        gn_name         = EXCLUDED.gn_name,
+        loc_province    = EXCLUDED.loc_province,
+        loc_ds          = EXCLUDED.loc_ds,
+        chief_of_temple = EXCLUDED.chief_of_temple,
+        mobile          = EXCLUDED.mobile,
+        updated_at      = EXCLUDED.updated_at,
+        bhikku_count    = EXCLUDED.bhikku_count,
+        ssbm_count      = EXCLUDED.ssbm_count;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- =============================================
+-- 3. TRIGGER FUNCTIONS
+-- =============================================
+-- TG_ARGV[0] = the column holding the temple TRN.  Old and new row images
+-- are both used so a bhikku moving temples refreshes both.
+
+CREATE OR REPLACE FUNCTION temple_listing_on_change()
+RETURNS trigger AS $$
+DECLARE
+    trn_col text := TG_ARGV[0];
+    src     text;
+    trns    text[];
+BEGIN
+    src := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    EXECUTE format(
+        'WITH r AS (%s) SELECT ARRAY(SELECT DISTINCT r.%I::text FROM r WHERE r.%I IS NOT NULL)',
+        src, trn_col, trn_col
+    ) INTO trns;
+    IF cardinality(trns) > 0 THEN
+        PERFORM temple_listing_refresh(trns);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Lookup-table changes rename or re-parent many temples at once
+CREATE OR REPLACE FUNCTION temple_listing_rebuild()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM temple_listing_refresh(NULL);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- =============================================
+-- 4. TRIGGERS
+-- =============================================
+-- Transition tables are allowed only on single-event triggers, hence one
+-- trigger per event.  On cmm_province / cmm_districtdata / cmm_dvsec /
+-- cmm_gndata, trg_location_closure fires before trg_temple_listing
+-- (same event, triggers fire in name order), so the rebuild sees the new
+-- closure.
+
+DO $$
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('vihaddata',             'vh_trn'),
+            ('bhikku_regist',         'br_livtemple'),
+            ('sasanarakshana_regist', 'sar_temple_trn')
+        ) AS v(tbl, trn_col)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_temple_listing_ins ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_temple_listing_upd ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_temple_listing_del ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_temple_listing_trunc ON %I', t.tbl);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_temple_listing_ins AFTER INSERT ON %I
+                 REFERENCING NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION temple_listing_on_change(%L)',
+            t.tbl, t.trn_col);
+        EXECUTE format(
+            'CREATE TRIGGER trg_temple_listing_upd AFTER UPDATE ON %I
+                 REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION temple_listing_on_change(%L)',
+            t.tbl, t.trn_col);
+        EXECUTE format(
+            'CREATE TRIGGER trg_temple_listing_del AFTER DELETE ON %I
+                 REFERENCING OLD TABLE AS old_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION temple_listing_on_change(%L)',
+            t.tbl, t.trn_col);
+        EXECUTE format(
+            'CREATE TRIGGER trg_temple_listing_trunc AFTER TRUNCATE ON %I
+                 FOR EACH STATEMENT EXECUTE FUNCTION temple_listing_rebuild()',
+            t.tbl);
+    END LOOP;
+END;
+$$;
+
+DO $$
+DECLARE
+    tbl text;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY[
+        'cmm_nikayadata',
+        'cmm_parshawadata',
+        'cmm_province',
+        'cmm_districtdata',
+        'cmm_dvsec',
+        'cmm_gndata'
+    ]
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_temple_listing ON %I', tbl);
+        EXECUTE format(
+            'CREATE TRIGGER trg_temple_listing
+                 AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                 FOR EACH STATEMENT EXECUTE FUNCTION temple_listing_rebuild()',
+            tbl);
+    END LOOP;
+END;
+$$;
+
+
+-- =============================================
+-- 5. SUPPORTING INDEXES
+-- =============================================
+-- The per-temple counts look bhikkus and SSBM registrations up by TRN.
+-- Built before the initial build, which would otherwise scan both
+-- tables once per temple.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bhikku_regist_livtemple          ON bhikku_regist         (br_livtemple);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sasanarakshana_regist_temple_trn ON sasanarakshana_regist (sar_temple_trn);
+
+
+-- =============================================
+-- 6. INITIAL BUILD
+-- =============================================
+
+SELECT temple_listing_refresh(NULL);
+
+ANALYZE temple_listing;
+
+
+-- =============================================
+-- GRANT PERMISSIONS
+-- =============================================
+
+GRANT SELECT ON temple_listing TO app_admin;
+
+-- =============================================
+-- NOTES:
+-- 1. Only active temples are listed; a soft-deleted temple's row is
+--    removed by the same trigger that sees the flag change.
+-- 2. Every bhikku_regist statement refreshes the temples its rows live in,
+--    whichever columns it changed (column lists cannot be combined with
+--    transition tables).  The refresh is a handful of index lookups per
+--    temple.
+-- 3. Rebuild by hand with: SELECT temple_listing_refresh(NULL);
+-- =============================================
@@ -1,69 +1,340 @@
 #!/usr/bin/env python3
 """
 Database Migration Runner
-Executes SQL migration scripts
+Applies the SQL scripts in migrations/ in order and records each one in
+schema_migrations (version, checksum, duration).
+
+- Credentials come from the application Settings (.env / environment).
+- Each migration runs in a transaction, statement by statement, with the
+  duration of every step reported.
+- Statements that cannot run inside a transaction — CREATE / DROP INDEX
+  CONCURRENTLY, REINDEX CONCURRENTLY, REFRESH MATERIALIZED VIEW
+  CONCURRENTLY, VACUUM — run on their own in autocommit, so index builds
+  on the registration tables do not block reads or writes.
+- An applied migration whose file has since changed is reported and not
+  re-run unless --reapply is given.
+
+Usage:
+    python run_migration.py                       # apply all pending migrations
+    python run_migration.py migrations/X.sql      # apply one file
+    python run_migration.py --status              # list applied / pending
+    python run_migration.py --baseline            # record all as applied without running them
 """
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-import sys
+import argparse
+import asyncio
+import hashlib
 import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import asyncpg
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(SCRIPT_DIR, 'migrations')
+
+# Apply order.  Append new migrations here.
+MIGRATIONS = [
+    'create_views.sql',
+    'dashboard_counters.sql',
+    'cache_notify.sql',
+    'persons_keyset.sql',
+    'registration_trends.sql',
+    'location_closure.sql',
+    'temple_listing.sql',
+    'ssbm_membership.sql',
+    'bhikku_ordination.sql',
+]
+
+_NON_TRANSACTIONAL = re.compile(r'\bCONCURRENTLY\b|^\s*VACUUM\b', re.IGNORECASE)
+_CONCURRENT_INDEX = re.compile(
+    r'^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?("?[\w.]+"?)',
+    re.IGNORECASE,
+)
+_DOLLAR_TAG = re.compile(r'\$([A-Za-z_][A-Za-z0-9_]*)?\$')
+
+
+@dataclass
+class Statement:
+    sql: str    # statement as written (comments included)
+    bare: str   # statement with comments and quoted text removed, for keyword checks
+
+    @property
+    def transactional(self) -> bool:
+        return not _NON_TRANSACTIONAL.search(self.bare)
+
+    @property
+    def summary(self) -> str:
+        line = ' '.join(self.bare.split())
+        return line if len(line) <= 80 else line[:77] + '...'
+
+
+def split_statements(sql: str) -> List[Statement]:
+    """
+    Split a script on top-level semicolons.  Semicolons inside comments
+    (-- and nested /* */), string literals ('' and E'' escapes), quoted
+    identifiers and dollar-quoted bodies ($$ / $tag$) do not split.
+    """
+    statements: List[Statement] = []
+    text_buf: List[str] = []
+    bare_buf: List[str] = []
+    i, n = 0, len(sql)
+
+    def flush():
+        bare = ''.join(bare_buf).strip()
+        if bare:
+            statements.append(Statement(''.join(text_buf).strip(), bare))
+        text_buf.clear()
+        bare_buf.clear()
+
+    while i < n:
+        ch = sql[i]
+        nxt = sql[i + 1] if i + 1 < n else ''
+
+        if ch == '-' and nxt == '-':
+            end = sql.find('\n', i)
+            end = n if end == -1 else end
+            text_buf.append(sql[i:end])
+            i = end
+        elif ch == '/' and nxt == '*':
+            depth, j = 1, i + 2
+            while j < n and depth:
+                if sql.startswith('/*', j):
+                    depth, j = depth + 1, j + 2
+                elif sql.startswith('*/', j):
+                    depth, j = depth - 1, j + 2
+                else:
+                    j += 1
+            text_buf.append(sql[i:j])
+            bare_buf.append(' ')
+            i = j
+        elif ch in ("'", '"'):
+            backslash = ch == "'" and i > 0 and sql[i - 1] in 'eE' and (i < 2 or not (sql[i - 2].isalnum() or sql[i - 2] == '_'))
+            j = i + 1
+            while j < n:
+                if backslash and sql[j] == '\\':
+                    j += 2
+                    continue
+                if sql[j] == ch:
+                    if j + 1 < n and sql[j + 1] == ch:  # doubled quote
+                        j += 2
+                        continue
+                    break
+                j += 1
+            j = min(j + 1, n)
+            text_buf.append(sql[i:j])
+            bare_buf.append(sql[i:j] if ch == '"' else "''")
+            i = j
+        elif ch == '$' and (i == 0 or not (sql[i - 1].isalnum() or sql[i - 1] == '_')) and _DOLLAR_TAG.match(sql, i):
+            tag = _DOLLAR_TAG.match(sql, i).group(0)
+            end = sql.find(tag, i + len(tag))
+            end = n if end == -1 else end + len(tag)
+            text_buf.append(sql[i:end])
+            bare_buf.append('$$ $$')
+            i = end
+        elif ch == ';':
+            flush()
+            i += 1
+        else:
+            text_buf.append(ch)
+            bare_buf.append(ch)
+            i += 1
+
+    flush()
+    return statements
+
+
+def checksum(sql: str) -> str:
+    return hashlib.sha256(sql.encode('utf-8')).hexdigest()
+
+
+async def connect() -> asyncpg.Connection:
+    # Imported here so --help works without a configured .env
+    from app.config import settings
+    conn = await asyncpg.connect(settings.sync_database_url)
+    print(f"✅ Connected to {settings.DB_NAME if not settings.DATABASE_URL_OVERRIDE else 'DATABASE_URL'}")
+    return conn
+
+
+async def ensure_tracking_table(conn: asyncpg.Connection) -> None:
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version     text PRIMARY KEY,
+            checksum    text NOT NULL,
+            applied_at  timestamptz NOT NULL DEFAULT now(),
+            duration_ms numeric
+        )
+    """)
+
+
+async def applied_versions(conn: asyncpg.Connection) -> dict:
+    rows = await conn.fetch("SELECT version, checksum, applied_at FROM schema_migrations")
+    return {r['version']: r for r in rows}
+
+
+async def record(conn: asyncpg.Connection, version: str, digest: str, duration_ms: Optional[float]) -> None:
+    await conn.execute("""
+        INSERT INTO schema_migrations (version, checksum, duration_ms)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (version) DO UPDATE
+        SET checksum = EXCLUDED.checksum, applied_at = now(), duration_ms = EXCLUDED.duration_ms
+    """, version, digest, duration_ms)
 
-def run_migration(sql_file_path):
-    """Execute SQL migration file"""
-    
-    # Database connection parameters
-    db_config = {
-        'host': '127.0.0.1',
-        'port': 5432,
-        'database': 'pglocal',
-        'user': 'postgres',
-        'password': '12345'
-    }
-    
+
+async def _drop_invalid_index(conn: asyncpg.Connection, statement: Statement) -> None:
+    """A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind; IF NOT EXISTS would keep it."""
+    match = _CONCURRENT_INDEX.match(statement.bare)
+    if not match:
+        return
+    name = match.group(1).strip('"').split('.')[-1]
+    invalid = await conn.fetchval("""
+        SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+        WHERE c.relname = $1 AND NOT i.indisvalid
+    """, name)
+    if invalid:
+        print(f"   🧹 dropping invalid index {name} left by an earlier failed build")
+        await conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+async def _run_step(conn: asyncpg.Connection, statement: Statement) -> None:
+    started = time.perf_counter()
+    await conn.execute(statement.sql)
+    elapsed = (time.perf_counter() - started) * 1000
+    marker = '' if statement.transactional else '  ⚡ no transaction'
+    print(f"   {elapsed:9.1f} ms  {statement.summary}{marker}")
+
+
+async def apply_migration(conn: asyncpg.Connection, version: str, sql: str) -> bool:
+    """Run one migration; returns True when it completed and was recorded."""
+    statements = split_statements(sql)
+    digest = checksum(sql)
+    print(f"\n⚙️  Applying {version} ({len(statements)} statements)")
+
+    # Consecutive transactional statements share a transaction; each
+    # non-transactional statement runs on its own in between
+    segments: List[List[Statement]] = []
+    for statement in statements:
+        if statement.transactional and segments and segments[-1][0].transactional:
+            segments[-1].append(statement)
+        else:
+            segments.append([statement])
+
+    started = time.perf_counter()
     try:
-        # Read the SQL file
-        if not os.path.exists(sql_file_path):
-            print(f"Error: File not found: {sql_file_path}")
+        for index, segment in enumerate(segments):
+            last = index == len(segments) - 1
+            if segment[0].transactional:
+                async with conn.transaction():
+                    for statement in segment:
+                        await _run_step(conn, statement)
+                    if last:
+                        await record(conn, version, digest, round((time.perf_counter() - started) * 1000, 1))
+            else:
+                await _drop_invalid_index(conn, segment[0])
+                await _run_step(conn, segment[0])
+                if last:
+                    await record(conn, version, digest, round((time.perf_counter() - started) * 1000, 1))
+        if not segments:
+            await record(conn, version, digest, 0)
+    except asyncpg.PostgresError as e:
+        print(f"\n❌ {version} failed: {e}")
+        if getattr(e, 'sqlstate', None):
+            print(f"   Error code: {e.sqlstate}")
+        if len(segments) > 1:
+            print("   Statements outside a transaction that already ran are kept; "
+                  "the migration is safe to re-run once fixed if its steps are idempotent.")
+        return False
+
+    print(f"✅ {version} applied in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return True
+
+
+def read_migration(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _pending_files() -> List[str]:
+    listed = [os.path.join(MIGRATIONS_DIR, name) for name in MIGRATIONS]
+    unlisted = sorted(
+        name for name in os.listdir(MIGRATIONS_DIR)
+        if name.endswith('.sql') and name not in MIGRATIONS
+    )
+    for name in unlisted:
+        print(f"⚠️  migrations/{name} is not listed in MIGRATIONS; run it explicitly")
+    return listed
+
+
+async def run(args) -> bool:
+    files = [os.path.abspath(args.file)] if args.file else _pending_files()
+    for path in files:
+        if not os.path.exists(path):
+            print(f"Error: File not found: {path}")
             return False
-            
-        with open(sql_file_path, 'r', encoding='utf-8') as f:
-            sql_content = f.read()
-        
-        print(f"📂 Reading migration file: {sql_file_path}")
-        print(f"📊 SQL content size: {len(sql_content)} bytes")
-        
-        # Connect to database
-        print("\n🔗 Connecting to database...")
-        conn = psycopg2.connect(**db_config)
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        cursor = conn.cursor()
-        
-        print(f"✅ Connected to {db_config['database']} as {db_config['user']}")
-        
-        # Execute the SQL
-        print("\n⚙️  Executing migration script...")
-        cursor.execute(sql_content)
-        
-        print("✅ Migration executed successfully!")
-        
-        # Close connection
-        cursor.close()
-        conn.close()
-        
+
+    conn = await connect()
+    try:
+        await ensure_tracking_table(conn)
+        applied = await applied_versions(conn)
+
+        if args.status:
+            for path in files:
+                version = os.path.basename(path)
+                row = applied.get(version)
+                if row is None:
+                    state = 'pending'
+                elif row['checksum'] != checksum(read_migration(path)):
+                    state = f"CHANGED since {row['applied_at']:%Y-%m-%d %H:%M}"
+                else:
+                    state = f"applied {row['applied_at']:%Y-%m-%d %H:%M}"
+                print(f"   {version:<32} {state}")
+            return True
+
+        for path in files:
+            version = os.path.basename(path)
+            sql = read_migration(path)
+            digest = checksum(sql)
+            row = applied.get(version)
+
+            if args.baseline:
+                if row is None:
+                    await record(conn, version, digest, None)
+                    print(f"📌 {version} recorded as applied")
+                continue
+
+            if row is not None and not args.reapply:
+                if row['checksum'] != digest:
+                    print(f"❌ {version} changed since it was applied on {row['applied_at']:%Y-%m-%d}; "
+                          f"use --reapply to run it again")
+                    return False
+                print(f"⏭️  {version} already applied")
+                continue
+
+            if not await apply_migration(conn, version, sql):
+                return False
         return True
-        
-    except psycopg2.Error as e:
-        print(f"\n❌ Database error: {e}")
-        print(f"   Error code: {e.pgcode}")
-        print(f"   Error details: {e.pgerror}")
-        return False
-    except Exception as e:
+    finally:
+        await conn.close()
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Apply SQL migrations")
+    parser.add_argument('file', nargs='?', help="Apply only this migration file")
+    parser.add_argument('--status', action='store_true', help="List applied and pending migrations")
+    parser.add_argument('--baseline', action='store_true',
+                        help="Record migrations as applied without running them (existing databases)")
+    parser.add_argument('--reapply', action='store_true', help="Run even if already applied")
+    args = parser.parse_args()
+
+    sys.path.insert(0, SCRIPT_DIR)
+    try:
+        return asyncio.run(run(args))
+    except (OSError, asyncpg.PostgresError) as e:
         print(f"\n❌ Error: {e}")
         return False
 
+
 if __name__ == "__main__":
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    migration_file = os.path.join(script_dir, 'migrations', 'create_views.sql')
-    
-    success = run_migration(migration_file)
-    sys.exit(0 if success else 1)
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,184 @@
+"""
+Buddhist Affairs MIS Dashboard - Endpoint Performance Budgets
+Each endpoint declares what one uncached request may cost:
+
+- statements: SQL statements executed (savepoints excluded).  Does not
+  grow with the data, so an extra per-row query fails at any scale.
+- rows:       rows read from tables, as a multiple of the seeded
+  registration rows (1.0 = one full pass over every registration table).
+  Measured with EXPLAIN ANALYZE of each recorded statement, so a dropped
+  index shows up as a sequential scan.
+- ms:         wall time of the request at scale factor 1; the limit grows
+  linearly with PERF_SCALE.
+
+Requests are measured after a warm-up call, so the in-process reference
+and autocomplete dictionaries are loaded; the response cache is disabled
+for the run (see conftest.py).
+"""
+import json
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass(frozen=True)
+class Budget:
+    path: str
+    statements: int
+    rows: float
+    ms: float
+
+
+BUDGETS = [
+    # Dashboard
+    Budget("/dashboard/", statements=9, rows=5.0, ms=400),
+    Budget("/dashboard/?province_code=P1", statements=9, rows=6.0, ms=350),
+    Budget("/dashboard/?district_code=D01,D02", statements=9, rows=2.25, ms=200),
+    Budget("/dashboard/stats", statements=1, rows=0.001, ms=50),
+    Budget("/dashboard/facets", statements=1, rows=1.25, ms=100),
+    Budget("/dashboard/compare?province_code=P1,P2,P3", statements=1, rows=1.25, ms=150),
+    # Sections
+    Budget("/section1/", statements=3, rows=1.0, ms=75),
+    Budget("/section2/", statements=1, rows=0.8, ms=50),
+    Budget("/section2/provinces", statements=1, rows=1.25, ms=50),
+    Budget("/section3/", statements=5, rows=3.25, ms=300),
+    Budget("/section3/temples", statements=1, rows=0.02, ms=150),
+    Budget("/section3/temples?ssbm_code=SS002", statements=1, rows=0.002, ms=50),
+    Budget("/section3/ssbm-org", statements=1, rows=0.025, ms=75),
+    Budget("/section3/gn?ds_code=DS001", statements=1, rows=0.15, ms=50),
+    # Temples
+    Budget("/temples/TRN0000001", statements=1, rows=0.001, ms=50),
+    Budget("/temples/TRN0000001/statistics", statements=2, rows=0.001, ms=50),
+    Budget("/temples/batch?trn=TRN0000001,TRN0000002,TRN0000003", statements=1, rows=0.04, ms=50),
+    Budget("/temples/?search=Vihara 1", statements=2, rows=0.4, ms=50),
+    # Lookups
+    Budget("/lookups/provinces", statements=1, rows=0.001, ms=50),
+    Budget("/lookups/districts?province_code=P1", statements=1, rows=0.003, ms=50),
+    Budget("/lookups/gn?ssbm_code=SS002", statements=1, rows=0.1, ms=50),
+    Budget("/lookups/autocomplete?q=vihara", statements=0, rows=0, ms=50),
+    # Persons and trends
+    Budget("/persons/page", statements=1, rows=0.02, ms=150),
+    Budget("/persons/page?district_code=D01", statements=1, rows=0.03, ms=150),
+    # P1 holds over half the seeded registrations, so reading all of them
+    # and keeping the first page beats merging its districts' indexes
+    Budget("/persons/page?province_code=P1", statements=1, rows=0.75, ms=150),
+    Budget("/trends/registrations", statements=1, rows=0.5, ms=75),
+]
+
+# Transaction control is protocol overhead, not a query
+_CONTROL = re.compile(r"^\s*(SAVEPOINT|RELEASE|ROLLBACK|BEGIN|COMMIT)\b", re.IGNORECASE)
+_READ = re.compile(r"^[\s(]*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+@dataclass
+class RecordedStatement:
+    sql: str
+    parameters: Any
+    rows: Optional[int] = None  # rows read from tables; None until explained, or if it could not be
+
+    @property
+    def summary(self) -> str:
+        line = " ".join(self.sql.split())
+        return line if len(line) <= 100 else line[:97] + "..."
+
+
+class QueryRecorder:
+    """Records every statement the application's engine executes while recording."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.statements: List[RecordedStatement] = []
+        self._recording = False
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def close(self) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self._recording and not _CONTROL.match(statement):
+            self.statements.append(RecordedStatement(statement, parameters))
+
+    @contextmanager
+    def record(self) -> Iterator[List[RecordedStatement]]:
+        self.statements = []
+        self._recording = True
+        try:
+            yield self.statements
+        finally:
+            self._recording = False
+
+    async def explain(self, statements: List[RecordedStatement]) -> int:
+        """Re-run each read statement under EXPLAIN ANALYZE; returns the rows read from tables."""
+        total = 0
+        async with self.engine.connect() as conn:
+            for statement in statements:
+                if not _READ.match(statement.sql):
+                    statement.rows = 0
+                    continue
+                parameters = tuple(statement.parameters) if isinstance(statement.parameters, list) else statement.parameters
+                try:
+                    result = await conn.exec_driver_sql(
+                        "EXPLAIN (ANALYZE, FORMAT JSON) " + statement.sql, parameters
+                    )
+                    plan = result.scalar()
+                except DBAPIError:
+                    await conn.rollback()
+                    continue
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                statement.rows = _rows_read(plan[0]["Plan"])
+                total += statement.rows
+        return total
+
+
+def _rows_read(node: dict) -> int:
+    """Rows every table scan in the plan visited, including those its filters discarded."""
+    rows = 0
+    if "Relation Name" in node:
+        per_loop = (
+            node.get("Actual Rows", 0)
+            + node.get("Rows Removed by Filter", 0)
+            + node.get("Rows Removed by Index Recheck", 0)
+        )
+        rows += round(per_loop * node.get("Actual Loops", 1))
+    for child in node.get("Plans", ()):
+        rows += _rows_read(child)
+    return rows
+
+
+@dataclass
+class Measurement:
+    budget: Budget
+    statements: List[RecordedStatement]
+    rows: int
+    ms: float
+    violations: List[str] = field(default_factory=list)
+
+    def check(self, registrations: int, scale: int) -> List[str]:
+        """Budget violations of this measurement at the seeded size."""
+        budget = self.budget
+        rows_limit = budget.rows * registrations
+        ms_limit = budget.ms * scale
+        self.violations = []
+        if len(self.statements) > budget.statements:
+            self.violations.append(f"{len(self.statements)} statements > budget {budget.statements}")
+        unexplained = sum(1 for statement in self.statements if statement.rows is None)
+        if unexplained:
+            self.violations.append(f"{unexplained} statements could not be re-run under EXPLAIN ANALYZE")
+        if self.rows > rows_limit:
+            self.violations.append(f"{self.rows:,} rows read > budget {rows_limit:,.0f} ({budget.rows} x {registrations:,})")
+        if self.ms > ms_limit:
+            self.violations.append(f"{self.ms:.0f} ms > budget {ms_limit:.0f} ms (scale {scale})")
+        return self.violations
+
+    def report(self) -> str:
+        lines = [f"{self.budget.path}: " + "; ".join(self.violations)]
+        for index, statement in enumerate(self.statements, 1):
+            rows = "?" if statement.rows is None else f"{statement.rows:,}"
+            lines.append(f"  {index:>2}. {rows:>10} rows  {statement.summary}")
+        return "\n".join(lines)
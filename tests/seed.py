@@ -0,0 +1,224 @@
+"""
+Buddhist Affairs MIS Dashboard - Performance Test Seed
+Builds a synthetic, deterministic database for the budget tests:
+
+1. public is dropped and recreated (the database name must contain "test")
+2. tables are created from app/models, plus the columns the live schema
+   has that the models do not declare
+3. geography and reference tables are filled at a fixed size; the
+   registration tables at `scale` times their base size
+4. every migration in run_migration.MIGRATIONS is applied, as on a real
+   database, so the projections and indexes the services rely on exist
+"""
+from dataclasses import dataclass
+from typing import Dict
+
+import asyncpg
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, Table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateTable
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.database import Base
+from run_migration import MIGRATIONS, MIGRATIONS_DIR, apply_migration, ensure_tracking_table, read_migration
+
+# Columns present in the production schema but missing from app/models
+SCHEMA_DRIFT = {
+    "bhikku_regist": ["br_parshawaya varchar(10)", "br_mahananame varchar(200)"],
+    "cmm_sasanarbm": [
+        "sr_ssbname varchar(200)", "sr_dvcd varchar(10)", "sr_discd varchar(10)", "sr_is_deleted boolean",
+    ],
+}
+
+# Fixed-size geography / reference data
+PROVINCES = 9
+DISTRICTS = 25
+DS_DIVISIONS = 250
+GN_DIVISIONS = 1000
+NIKAYAS = 3
+PARSHAWAS = 12
+
+# Registration rows at scale factor 1
+VIHARAS = 2000
+BHIKKUS = 6000
+SILMATHAS = 1500
+ARAMAS = 500
+HIGHER_ORDINATIONS = BHIKKUS * 2 // 5
+SSBM_REGISTRATIONS = VIHARAS // 5
+
+# Every registration is placed in a GN division and carries that division's DS, district and province
+_LOCATED = f"""
+    FROM generate_series(1, {{n}}) i
+    JOIN cmm_gndata g ON g.gn_id = 1 + (i::bigint * 7919) % {GN_DIVISIONS}
+    JOIN cmm_dvsec dv ON dv.dv_dvcode = g.gn_dvcode
+    JOIN cmm_districtdata d ON d.dd_dcode = dv.dv_distrcd
+"""
+_SERIES = "FROM generate_series(1, {n}) i"
+
+
+@dataclass(frozen=True)
+class Seed:
+    scale: int
+    registrations: int  # rows in the registration tables, the unit of the rows budgets
+
+
+def _code(prefix: str, expression: str, width: int) -> str:
+    return f"'{prefix}' || lpad(({expression})::text, {width}, '0')"
+
+
+def _filler(table: Table, name: str) -> str:
+    """A value for a NOT NULL column the seed does not care about."""
+    column_type = table.c[name].type
+    if isinstance(column_type, Boolean):
+        return "false"
+    if isinstance(column_type, DateTime):
+        return "now()"
+    if isinstance(column_type, Date):
+        return "current_date"
+    if isinstance(column_type, (Integer, Numeric)):
+        return "0"
+    return "''"
+
+
+async def _insert(conn: asyncpg.Connection, table_name: str, n: int, values: Dict[str, str], source: str = _SERIES) -> None:
+    """INSERT n generated rows; `values` maps columns to SQL expressions over the series index i."""
+    table = Base.metadata.tables[table_name]
+    columns = dict(values)
+    for column in table.columns:
+        if not column.nullable and not column.primary_key and column.name not in columns:
+            columns[column.name] = _filler(table, column.name)
+    await conn.execute(f"""
+        INSERT INTO {table_name} ({", ".join(columns)})
+        SELECT {", ".join(columns.values())}
+        {source.format(n=n)}
+    """)
+
+
+async def _create_schema(conn: asyncpg.Connection) -> None:
+    await conn.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+    await conn.execute("""
+        DO $$ BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'app_admin') THEN
+                CREATE ROLE app_admin;
+            END IF;
+        END $$;
+    """)
+    dialect = postgresql.dialect()
+    for table in Base.metadata.tables.values():
+        # The models' foreign keys do not all resolve (e.g. cmm_gndata_old); the data is consistent by construction
+        await conn.execute(str(CreateTable(table, include_foreign_key_constraints=()).compile(dialect=dialect)))
+    for table_name, columns in SCHEMA_DRIFT.items():
+        for column in columns:
+            await conn.execute(f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {column}")
+
+
+async def _fill_reference(conn: asyncpg.Connection) -> None:
+    await _insert(conn, "cmm_province", PROVINCES, {
+        "cp_code": "'P' || i", "cp_name": "'Province ' || i", "cp_is_deleted": "false",
+    })
+    await _insert(conn, "cmm_districtdata", DISTRICTS, {
+        "dd_dcode": _code("D", "i", 2), "dd_dname": "'District ' || i",
+        "dd_prcode": f"'P' || (1 + (i - 1) % {PROVINCES})", "dd_is_deleted": "false",
+    })
+    await _insert(conn, "cmm_dvsec", DS_DIVISIONS, {
+        "dv_dvcode": _code("DS", "i", 3), "dv_dvname": "'DS Division ' || i",
+        "dv_distrcd": _code("D", f"1 + (i - 1) % {DISTRICTS}", 2), "dv_is_deleted": "false",
+    })
+    await _insert(conn, "cmm_gndata", GN_DIVISIONS, {
+        "gn_gnc": _code("GN", "i", 4), "gn_gnname": "'GN Division ' || i",
+        "gn_dvcode": _code("DS", f"1 + (i - 1) % {DS_DIVISIONS}", 3), "gn_is_deleted": "false",
+    })
+    await _insert(conn, "cmm_nikayadata", NIKAYAS, {
+        "nk_nkn": "'NK' || i", "nk_nname": "'Nikaya ' || i", "nk_is_deleted": "false",
+    })
+    await _insert(conn, "cmm_parshawadata", PARSHAWAS, {
+        "pr_prn": _code("PR", "i", 2), "pr_pname": "'Parshawa ' || i",
+        "pr_nikayacd": f"'NK' || (1 + (i - 1) % {NIKAYAS})", "pr_is_deleted": "false",
+    })
+    # One SSBM per DS division
+    await _insert(conn, "cmm_sasanarbm", DS_DIVISIONS, {
+        "sr_ssbmcode": _code("SS", "i", 3), "sr_ssbname": "'Sasanarakshaka Mandalaya ' || i",
+        "sr_dvcd": _code("DS", "i", 3), "sr_discd": _code("D", f"1 + (i - 1) % {DISTRICTS}", 2),
+        "sr_is_deleted": "false",
+    })
+
+
+async def _fill_registrations(conn: asyncpg.Connection, scale: int) -> int:
+    viharas, bhikkus, silmathas, aramas = VIHARAS * scale, BHIKKUS * scale, SILMATHAS * scale, ARAMAS * scale
+    higher, ssbm = HIGHER_ORDINATIONS * scale, SSBM_REGISTRATIONS * scale
+
+    # Roughly one row in fifty is soft-deleted; registrations spread over about five years
+    deleted = "i % 50 = 0"
+    created = "timestamp '2021-01-01' + (i * 37 % 1800) * interval '1 day'"
+    nikaya = f"'NK' || (1 + i % {NIKAYAS})"
+    parshawa = f"CASE WHEN i % 7 = 0 THEN NULL ELSE {_code('PR', f'1 + i % {PARSHAWAS}', 2)} END"
+    temple = _code("TRN", f"1 + i % {viharas}", 7)
+
+    await _insert(conn, "vihaddata", viharas, {
+        "vh_trn": _code("TRN", "i", 7), "vh_vname": "'Vihara ' || i", "vh_addrs": "i || ' Temple Road'",
+        "vh_typ": "(ARRAY['A', 'B', 'C', 'D', NULL])[1 + i % 5]",
+        "vh_gndiv": "g.gn_gnc", "vh_divisional_secretariat": "dv.dv_dvcode",
+        "vh_district": "d.dd_dcode", "vh_province": "d.dd_prcode",
+        "vh_nikaya": nikaya, "vh_parshawa": parshawa, "vh_ssbmcode": "'SS' || substr(dv.dv_dvcode, 3)",
+        "vh_viharadhipathi_name": "'Thera ' || i", "vh_workflow_status": "'COMPLETED'",
+        "vh_is_deleted": deleted, "vh_created_at": created, "vh_updated_at": created,
+    }, _LOCATED)
+    await _insert(conn, "bhikku_regist", bhikkus, {
+        "br_regn": _code("BR", "i", 8), "br_reqstdate": f"({created})::date",
+        "br_gihiname": "'Gihi ' || i", "br_mahananame": "CASE WHEN i % 4 = 0 THEN NULL ELSE 'Thera ' || i END",
+        "br_dofb": "date '1960-01-01' + i % 15000", "br_mobile": "lpad(i::text, 10, '0')",
+        "br_gndiv": "g.gn_gnc", "br_division": "dv.dv_dvcode", "br_district": "d.dd_dcode", "br_province": "d.dd_prcode",
+        "br_nikaya": nikaya, "br_parshawaya": parshawa, "br_livtemple": temple,
+        "br_currstat": "'ACT'", "br_workflow_status": "'COMPLETED'",
+        "br_is_deleted": deleted, "br_created_at": created, "br_updated_at": created,
+    }, _LOCATED)
+    await _insert(conn, "bhikku_high_regist", higher, {
+        "bhr_regn": _code("BHR", "i", 9),
+        "bhr_samanera_serial_no": _code("BR", f"1 + i * 3 % {bhikkus}", 8),
+        "bhr_workflow_status": "'COMPLETED'",
+        "bhr_is_deleted": deleted, "bhr_created_at": created, "bhr_updated_at": created,
+    })
+    await _insert(conn, "silmatha_regist", silmathas, {
+        "sil_regn": _code("SIL", "i", 8), "sil_reqstdate": f"({created})::date",
+        "sil_gihiname": "'Gihi ' || i", "sil_mahananame": "'Silmatha ' || i",
+        "sil_dofb": "date '1960-01-01' + i % 15000", "sil_mobile": "lpad(i::text, 10, '0')",
+        "sil_gndiv": "g.gn_gnc", "sil_division": "dv.dv_dvcode", "sil_district": "d.dd_dcode", "sil_province": "d.dd_prcode",
+        "sil_robing_after_residence_temple": temple, "sil_currstat": "'ACT'", "sil_workflow_status": "'COMPLETED'",
+        "sil_is_deleted": deleted, "sil_created_at": created, "sil_updated_at": created,
+    }, _LOCATED)
+    await _insert(conn, "aramadata", aramas, {
+        "ar_trn": _code("AR", "i", 8), "ar_vname": "'Arama ' || i", "ar_typ": "'ARAMA'",
+        "ar_gndiv": "g.gn_gnc", "ar_divisional_secretariat": "dv.dv_dvcode",
+        "ar_district": "d.dd_dcode", "ar_province": "d.dd_prcode",
+        "ar_nikaya": nikaya, "ar_parshawa": f"COALESCE({parshawa}, '')", "ar_workflow_status": "'COMPLETED'",
+        "ar_is_deleted": deleted, "ar_created_at": created, "ar_updated_at": created,
+    }, _LOCATED)
+    await _insert(conn, "sasanarakshana_regist", ssbm, {
+        "sar_temple_trn": _code("TRN", "i * 5", 7), "sar_mandala_name": "'Mandalaya ' || i",
+        "sar_is_deleted": deleted, "sar_created_at": created, "sar_updated_at": created,
+    })
+    return viharas + bhikkus + higher + silmathas + aramas + ssbm
+
+
+async def seed_database(url: str, scale: int = 1) -> Seed:
+    """Rebuild the test database at `url` (a plain postgresql:// URL) at the given scale factor."""
+    database = make_url(url).database or ""
+    if "test" not in database:
+        raise RuntimeError(f"Refusing to seed '{database}': the test database name must contain 'test'")
+
+    conn = await asyncpg.connect(url)
+    try:
+        await _create_schema(conn)
+        await _fill_reference(conn)
+        registrations = await _fill_registrations(conn, scale)
+        await conn.execute("ANALYZE")
+
+        await ensure_tracking_table(conn)
+        for name in MIGRATIONS:
+            if not await apply_migration(conn, name, read_migration(f"{MIGRATIONS_DIR}/{name}")):
+                raise RuntimeError(f"Migration {name} failed on the test database")
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+    return Seed(scale=scale, registrations=registrations)
@@ -0,0 +1,53 @@
+"""
+Buddhist Affairs MIS Dashboard - Autocomplete Index Tests
+loose() folding and KindIndex prefix / trigram lookups.
+"""
+import pytest
+
+from app.utils.autocomplete import KindIndex, loose, trigrams
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("KOTTE", "kotte"),
+    ("Kōṭṭe", "kotte"),
+    ("කොට්ටේ", "kotte"),
+    ("  Sri  Jayawardenepura ", "sri jayawardenepura"),
+])
+def test_loose_folds_case_script_and_diacritics(value, expected):
+    assert loose(value) == expected
+
+
+def test_loose_spellings_meet():
+    assert loose("Maha Vihara") == loose("maha wihara")
+
+
+@pytest.fixture
+def districts():
+    return KindIndex([
+        ("D01", "Colombo", "Western"),
+        ("D02", "Gampaha", "Western"),
+        ("D03", "Kalutara", None),
+        ("X", None, None),      # no name: indexed under its code
+        (None, None, None),     # nothing to index
+    ])
+
+
+def test_rows_without_name_or_code_are_skipped(districts):
+    assert len(districts) == 4
+    assert districts.entries[3].name == "X"
+
+
+def test_prefix_matches_words_and_codes(districts):
+    assert districts.prefixed("col", cap=10) == {0}
+    assert districts.prefixed("d0", cap=10) == {0, 1, 2}
+    assert districts.prefixed("zz", cap=10) == set()
+
+
+def test_prefix_respects_cap(districts):
+    assert len(districts.prefixed("d0", cap=2)) == 2
+
+
+def test_similar_finds_misspellings(districts):
+    similar = districts.similar(trigrams(loose("Colmbo")), cap=100, best=3)
+    assert max(similar, key=similar.get) == 0
+    assert 0 < similar[0] <= 1
@@ -0,0 +1,45 @@
+"""
+Buddhist Affairs MIS Dashboard - Budget Harness Tests
+Measurement.check and plan row counting, without a database.
+"""
+from tests.budgets import Budget, Measurement, RecordedStatement, _rows_read
+
+
+def measurement(statements=1, rows=100, ms=10.0, explained=True):
+    recorded = [RecordedStatement("SELECT 1", (), 0 if explained else None) for _ in range(statements)]
+    return Measurement(Budget("/x", statements=2, rows=0.5, ms=100), recorded, rows, ms)
+
+
+def test_within_budget():
+    assert measurement().check(registrations=1000, scale=1) == []
+
+
+def test_statement_and_row_overruns():
+    violations = measurement(statements=3, rows=600).check(registrations=1000, scale=1)
+    assert violations == ["3 statements > budget 2", "600 rows read > budget 500 (0.5 x 1,000)"]
+
+
+def test_unexplained_statements_fail():
+    assert measurement(explained=False).check(registrations=1000, scale=1) == [
+        "1 statements could not be re-run under EXPLAIN ANALYZE"
+    ]
+
+
+def test_timing_limit_grows_with_scale():
+    slow = measurement(ms=150.0)
+    assert slow.check(registrations=1000, scale=1) == ["150 ms > budget 100 ms (scale 1)"]
+    assert slow.check(registrations=1000, scale=2) == []
+
+
+def test_rows_read_counts_filtered_rows_of_every_loop():
+    plan = {
+        "Node Type": "Nested Loop",
+        "Plans": [
+            {"Relation Name": "vihaddata", "Actual Rows": 10, "Rows Removed by Filter": 90, "Actual Loops": 1},
+            {"Node Type": "Materialize", "Plans": [
+                {"Relation Name": "bhikku_regist", "Actual Rows": 2, "Rows Removed by Index Recheck": 1,
+                 "Actual Loops": 10},
+            ]},
+        ],
+    }
+    assert _rows_read(plan) == 100 + 30
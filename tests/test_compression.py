@@ -0,0 +1,44 @@
+"""
+Buddhist Affairs MIS Dashboard - Content Negotiation Tests
+choose_encoding against Accept-Encoding headers.
+"""
+import pytest
+
+from app.utils.compression import choose_encoding
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("*", "gzip"),
+    ("gzip;q=0", None),
+    ("*;q=0", None),
+    ("gzip;q=abc", None),  # unparsable q counts as 0
+    ("identity", None),
+    ("", None),
+])
+def test_choose_encoding_gzip_only(header, expected):
+    assert choose_encoding(header, offered=["gzip"]) == expected
+
+
+def test_explicit_exclusion_beats_wildcard():
+    assert choose_encoding("*, gzip;q=0", offered=["gzip"]) is None
+
+
+def test_only_offered_encodings_are_chosen():
+    assert choose_encoding("br, gzip", offered=["gzip"]) == "gzip"
+    assert choose_encoding("br", offered=["gzip"]) is None
+
+
+def test_brotli_preferred_when_available():
+    pytest.importorskip("brotli")
+    assert choose_encoding("gzip, br", offered=["br", "gzip"]) == "br"
+    assert choose_encoding("gzip, br;q=0", offered=["br", "gzip"]) == "gzip"
+
+
+def test_highest_q_beats_server_preference():
+    pytest.importorskip("brotli")
+    assert choose_encoding("br;q=0.1, gzip;q=1.0", offered=["br", "gzip"]) == "gzip"
+    assert choose_encoding("br;q=0.5, *;q=0.8", offered=["br", "gzip"]) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip;q=0.5", offered=["br", "gzip"]) == "br"
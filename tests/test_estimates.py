@@ -0,0 +1,32 @@
+"""
+Buddhist Affairs MIS Dashboard - Sampled Estimate Tests
+Estimate.value / Estimate.margin for ?approx=true counts.
+"""
+import math
+
+from app.services.estimate_service import Z_95, Estimate
+
+
+def test_full_read_is_exact():
+    estimate = Estimate(hits=1234, fraction=1.0)
+    assert estimate.value == 1234
+    assert estimate.margin == 0
+
+
+def test_scaled_value_and_margin():
+    estimate = Estimate(hits=100, fraction=0.01)
+    assert estimate.value == 10_000
+    assert estimate.margin == math.ceil(Z_95 * math.sqrt(100 * 0.99) / 0.01) == 1951
+
+
+def test_no_hits_uses_rule_of_three():
+    assert Estimate(hits=0, fraction=0.01).value == 0
+    assert Estimate(hits=0, fraction=0.01).margin == 300
+
+
+def test_margin_shrinks_with_larger_sample():
+    assert Estimate(hits=500, fraction=0.05).margin < Estimate(hits=100, fraction=0.01).margin
+
+
+def test_groups_of_one_sample_add():
+    assert Estimate(1, 0.1) + Estimate(2, 0.1) == Estimate(3, 0.1)
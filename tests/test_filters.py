@@ -0,0 +1,23 @@
+"""
+Buddhist Affairs MIS Dashboard - Filter Parsing Tests
+split_codes against the single, repeated and comma-separated forms a
+filter parameter can take.
+"""
+import pytest
+
+from app.schemas.filters import split_codes
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    (" , ,", None),
+    ("WP", ["WP"]),
+    ("WP,SP", ["WP", "SP"]),
+    (" WP , SP ,WP", ["WP", "SP"]),
+    (["WP", "SP,NP"], ["WP", "SP", "NP"]),
+    (("WP",), ["WP"]),
+    (5, ["5"]),
+])
+def test_split_codes(value, expected):
+    assert split_codes(value) == expected
@@ -0,0 +1,62 @@
+"""
+Buddhist Affairs MIS Dashboard - Location Filter Tests
+The location scopes built from province / district / DS / GN filters and
+the predicates they render.
+"""
+from app.services.location import (
+    LocationScope,
+    closure_condition,
+    entity_location,
+    location_scope,
+)
+
+
+def test_no_filters_no_scope():
+    assert location_scope(province_code=None, district_code="") is None
+
+
+def test_finest_filter_is_the_scope():
+    assert location_scope(province_code="P1,P2") == LocationScope("province", ("P1", "P2"))
+    assert location_scope(district_code="D1", gn_code="G1", finest="district") == LocationScope("district", ("D1",))
+
+
+def test_coarser_filters_are_kept():
+    scope = location_scope(province_code="P1", district_code="D30")
+    assert scope == LocationScope("district", ("D30",), LocationScope("province", ("P1",)))
+    assert list(scope.levels()) == [("district", ("D30",)), ("province", ("P1",))]
+
+
+def test_predicates_intersect_every_level():
+    params = {}
+    condition = entity_location("bikku", "b", location_scope(province_code="P1", district_code="D30"), params)
+    assert condition == (
+        "b.br_district = :loc_codes AND b.br_district IN (SELECT lc.code FROM location_closure lc "
+        "WHERE lc.level = 'district' AND lc.province_code = ANY(:loc_province_codes))"
+    )
+    assert params == {"loc_codes": "D30", "loc_province_codes": ["P1"]}
+
+
+def test_province_resolves_through_the_district():
+    params = {}
+    condition = entity_location("silmatha", "s", location_scope(province_code="P1,P2"), params)
+    assert condition == (
+        "s.sil_district IN (SELECT lc.code FROM location_closure lc "
+        "WHERE lc.level = 'district' AND lc.province_code = ANY(:loc_codes))"
+    )
+    assert params == {"loc_codes": ["P1", "P2"]}
+
+
+def test_closure_condition():
+    params = {}
+    scope = location_scope(province_code="P1", district_code="D1", finest="district")
+    assert closure_condition("lc", scope, params) == (
+        "lc.district_code = :loc_codes AND lc.province_code = :loc_province_codes"
+    )
+    assert closure_condition("lc", None, params) is None
+
+
+def test_several_codes_match_any():
+    params = {}
+    condition = entity_location("vihara", "", location_scope(district_code="D1,D2", gn_code="G1"), params)
+    assert condition == "vh_gndiv = :loc_codes AND vh_district = ANY(:loc_district_codes)"
+    assert params == {"loc_codes": "G1", "loc_district_codes": ["D1", "D2"]}
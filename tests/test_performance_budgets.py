@@ -0,0 +1,32 @@
+"""
+Buddhist Affairs MIS Dashboard - Endpoint Performance Budget Tests
+Fails when a request to an endpoint in tests/budgets.py runs more
+statements, reads more rows or takes longer than its budget.
+"""
+import time
+
+import pytest
+
+from tests.budgets import BUDGETS, Budget, Measurement
+
+pytestmark = pytest.mark.db
+
+# Best of this many timed requests, so one scheduling hiccup does not fail the build
+TIMED_RUNS = 3
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=lambda budget: budget.path)
+def test_endpoint_within_budget(budget: Budget, client, recorder, seeded, run):
+    response = run(client.get(budget.path))  # warm-up: loads the reference dictionaries
+    assert response.status_code == 200, response.text
+
+    timings = []
+    for _ in range(TIMED_RUNS):
+        with recorder.record() as statements:
+            started = time.perf_counter()
+            response = run(client.get(budget.path))
+            timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+
+    measurement = Measurement(budget, statements, run(recorder.explain(statements)), min(timings))
+    assert not measurement.check(seeded.registrations, seeded.scale), measurement.report()
@@ -0,0 +1,53 @@
+"""
+Buddhist Affairs MIS Dashboard - Persons Keyset Cursor Tests
+encode_cursor / decode_cursor and the per-branch keyset predicates of
+/persons/page.
+"""
+import pytest
+
+from app.services.persons_service import (
+    BHIKKU_SORT_NAME,
+    SILMATHA_SORT_NAME,
+    _after_cursor,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def test_first_page_has_no_predicate():
+    assert _after_cursor("BHIKKU", BHIKKU_SORT_NAME, "b.br_regn", None) is None
+
+
+def test_same_branch_continues_after_name_and_regn():
+    cursor = ("Ananda", "BHIKKU", "BR001")
+    assert _after_cursor("BHIKKU", BHIKKU_SORT_NAME, "b.br_regn", cursor) == (
+        f"({BHIKKU_SORT_NAME}, b.br_regn) > (:cursor_name, :cursor_regn)"
+    )
+
+
+def test_later_branch_includes_equal_names():
+    # SILMATHA sorts after BHIKKU, so silmatha rows with the cursor's name are still ahead
+    cursor = ("Ananda", "BHIKKU", "BR001")
+    assert _after_cursor("SILMATHA", SILMATHA_SORT_NAME, "s.sil_regn", cursor) == (
+        f"{SILMATHA_SORT_NAME} >= :cursor_name"
+    )
+
+
+def test_earlier_branch_excludes_equal_names():
+    cursor = ("Ananda", "SILMATHA", "SL001")
+    assert _after_cursor("BHIKKU", BHIKKU_SORT_NAME, "b.br_regn", cursor) == (
+        f"{BHIKKU_SORT_NAME} > :cursor_name"
+    )
+
+
+def test_cursor_round_trip():
+    cursor = ("ආනන්ද", "SILMATHA", "SL/2024/001")
+    token = encode_cursor(cursor)
+    assert "=" not in token
+    assert decode_cursor(token) == cursor
+
+
+@pytest.mark.parametrize("token", ["", "not-base64!", encode_cursor(("a", "MONK", "1"))])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
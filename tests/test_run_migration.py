@@ -0,0 +1,54 @@
+"""
+Buddhist Affairs MIS Dashboard - Migration Splitter Tests
+split_statements must split only on top-level semicolons, and every
+shipped migration must split cleanly.
+"""
+import os
+
+import pytest
+
+from run_migration import MIGRATIONS, MIGRATIONS_DIR, split_statements
+
+
+def sqls(script):
+    return [statement.sql for statement in split_statements(script)]
+
+
+def test_top_level_semicolons_split():
+    assert sqls("SELECT 1; SELECT 2;") == ["SELECT 1", "SELECT 2"]
+    assert sqls(";;  ;") == []
+
+
+@pytest.mark.parametrize("script, first", [
+    ("SELECT ';'; SELECT 2", "SELECT ';'"),
+    ("SELECT 'it''s; fine'; SELECT 2", "SELECT 'it''s; fine'"),
+    ("SELECT E'it\\'s;'; SELECT 2", "SELECT E'it\\'s;'"),
+    ('SELECT 1 AS "a;b"; SELECT 2', 'SELECT 1 AS "a;b"'),
+    ("SELECT $tag$ ; $tag$; SELECT 2", "SELECT $tag$ ; $tag$"),
+    ("CREATE FUNCTION f() RETURNS int AS $$ BEGIN RETURN 1; END; $$ LANGUAGE plpgsql; SELECT 2",
+     "CREATE FUNCTION f() RETURNS int AS $$ BEGIN RETURN 1; END; $$ LANGUAGE plpgsql"),
+    ("/* a; /* b; */ c; */ SELECT 1; SELECT 2", "/* a; /* b; */ c; */ SELECT 1"),
+])
+def test_quoted_semicolons_do_not_split(script, first):
+    assert sqls(script) == [first, "SELECT 2"]
+
+
+def test_line_comment_stays_with_following_statement():
+    assert sqls("SELECT 1; -- a;b\nSELECT 2") == ["SELECT 1", "-- a;b\nSELECT 2"]
+
+
+def test_non_transactional_statements():
+    statements = split_statements(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS i ON t (c); VACUUM t; SELECT 'CONCURRENTLY'"
+    )
+    assert [statement.transactional for statement in statements] == [False, False, True]
+
+
+@pytest.mark.parametrize("name", MIGRATIONS)
+def test_shipped_migrations_split(name):
+    with open(os.path.join(MIGRATIONS_DIR, name), encoding="utf-8") as f:
+        statements = split_statements(f.read())
+    assert statements
+    for statement in statements:
+        # A quote or dollar tag left open swallows the rest of the file into one statement
+        assert statement.bare.count("'") % 2 == 0, statement.summary
@@ -0,0 +1,67 @@
+"""
+Buddhist Affairs MIS Dashboard - Snapshot Frame Tests
+Frame.upsert: dictionary-encoded columns, in-place updates and appends.
+"""
+from datetime import datetime
+
+from app.services.snapshot_service import TABLES, Dictionary, Frame
+
+
+def new_frame():
+    spec = TABLES["arama"]  # district, gn, nikaya, parshawa
+    return Frame(spec), {dim: Dictionary() for _, _, dim in spec.columns}
+
+
+def decoded(frame, dims, name):
+    return [dims[frame.dims[name]].values[code] for code in frame.cols[name]]
+
+
+def test_append_encodes_columns():
+    frame, dims = new_frame()
+    frame.upsert([
+        (1, False, datetime(2024, 1, 1), "D1", "G1", "N1", None),
+        (2, None,  None,                 "D2", "G2", "N1", "P1"),
+    ], dims)
+
+    assert len(frame) == 2
+    assert frame.ids.tolist() == [1, 2]
+    assert frame.alive.tolist() == [True, True]  # NULL deleted flag is alive
+    assert decoded(frame, dims, "district") == ["D1", "D2"]
+    assert decoded(frame, dims, "parshawa") == [None, "P1"]
+    assert frame.cols["nikaya"][0] == frame.cols["nikaya"][1]
+    assert frame.updated_at == datetime(2024, 1, 1)
+
+
+def test_existing_rows_update_in_place():
+    frame, dims = new_frame()
+    frame.upsert([
+        (1, False, datetime(2024, 1, 1), "D1", "G1", "N1", None),
+        (2, False, datetime(2024, 1, 2), "D2", "G2", "N1", "P1"),
+    ], dims)
+    frame.upsert([
+        (2, True,  datetime(2024, 2, 1), "D1", "G2", "N1", "P1"),
+        (3, False, datetime(2023, 1, 1), "D3", None, None, None),
+    ], dims)
+
+    assert frame.ids.tolist() == [1, 2, 3]
+    assert frame.position == {1: 0, 2: 1, 3: 2}
+    assert frame.alive.tolist() == [True, False, True]
+    assert decoded(frame, dims, "district") == ["D1", "D1", "D3"]
+    assert decoded(frame, dims, "gn") == ["G1", "G2", None]
+    # The high-water mark only moves forward
+    assert frame.updated_at == datetime(2024, 2, 1)
+
+
+def test_empty_upsert_is_a_no_op():
+    frame, dims = new_frame()
+    frame.upsert([], dims)
+    assert len(frame) == 0
+    assert frame.updated_at is None
+
+
+def test_dictionary_lookup_of_unknown_value():
+    dictionary = Dictionary()
+    assert dictionary.encode(None) == 0
+    assert dictionary.encode("WP") == dictionary.encode("WP") == 1
+    assert dictionary.lookup("WP") == 1
+    assert dictionary.lookup("SP") == -1